@@ -0,0 +1,21 @@
+"""index sales_order_items by order for list progress
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-03-13 10:00:00.000000
+"""
+
+from alembic import op
+
+revision = "a3b4c5d6e7f8"
+down_revision = "f2a3b4c5d6e7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_sales_order_items_order", "sales_order_items", ["sales_order_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_sales_order_items_order", table_name="sales_order_items")
@@ -0,0 +1,36 @@
+"""add pg_trgm suggest indexes on customers and suppliers
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-03-03 10:00:00.000000
+"""
+
+from alembic import op
+
+revision = "a7b8c9d0e1f2"
+down_revision = "f6a7b8c9d0e1"
+branch_labels = None
+depends_on = None
+
+SUGGEST_COLUMNS = {
+    "customers": ["customer_code", "name", "short_name"],
+    "suppliers": ["supplier_code", "name"],
+}
+
+
+def upgrade() -> None:
+    for table, columns in SUGGEST_COLUMNS.items():
+        for column in columns:
+            op.create_index(
+                f"idx_{table}_{column}_trgm",
+                table,
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+
+
+def downgrade() -> None:
+    for table, columns in SUGGEST_COLUMNS.items():
+        for column in columns:
+            op.drop_index(f"idx_{table}_{column}_trgm", table_name=table)
@@ -0,0 +1,61 @@
+"""add product_category_closure table
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-03-04 10:00:00.000000
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision = "b8c9d0e1f2a3"
+down_revision = "a7b8c9d0e1f2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "product_category_closure",
+        sa.Column(
+            "ancestor_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("product_categories.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "descendant_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("product_categories.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("depth", sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        "idx_category_closure_descendant",
+        "product_category_closure",
+        ["descendant_id", "depth"],
+    )
+
+    # Backfill from the existing adjacency list
+    op.execute(
+        """
+        INSERT INTO product_category_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE paths AS (
+            SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth
+            FROM product_categories
+            UNION ALL
+            SELECT p.ancestor_id, c.id, p.depth + 1
+            FROM paths p
+            JOIN product_categories c ON c.parent_id = p.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, depth FROM paths
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_category_closure_descendant", table_name="product_category_closure")
+    op.drop_table("product_category_closure")
@@ -0,0 +1,26 @@
+"""flag logistics records whose landed cost allocation is stale
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-03-15 10:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "c5d6e7f8a9b0"
+down_revision = "b4c5d6e7f8a9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "logistics_records",
+        sa.Column("allocation_stale", sa.Boolean(), server_default="false", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("logistics_records", "allocation_stale")
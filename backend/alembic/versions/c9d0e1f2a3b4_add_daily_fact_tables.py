@@ -0,0 +1,97 @@
+"""add daily fact tables for statistics
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-03-05 10:00:00.000000
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ENUM, UUID
+
+from alembic import op
+
+revision = "c9d0e1f2a3b4"
+down_revision = "b8c9d0e1f2a3"
+branch_labels = None
+depends_on = None
+
+currency_type = ENUM(name="currency_type", create_type=False)
+container_type = ENUM(name="container_type", create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "fact_sales_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("customer_id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("currency", currency_type, primary_key=True),
+        sa.Column("order_count", sa.Integer(), nullable=False),
+        sa.Column("total_amount", sa.Numeric(16, 2), nullable=False),
+    )
+    op.create_table(
+        "fact_sales_product_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("customer_id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("product_id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("currency", currency_type, primary_key=True),
+        sa.Column("total_quantity", sa.Integer(), nullable=False),
+        sa.Column("total_amount", sa.Numeric(16, 2), nullable=False),
+    )
+    op.create_table(
+        "fact_purchase_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("supplier_id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("order_count", sa.Integer(), nullable=False),
+        sa.Column("total_amount", sa.Numeric(16, 2), nullable=False),
+    )
+    op.create_table(
+        "fact_container_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("container_type", container_type, primary_key=True),
+        sa.Column("plan_count", sa.Integer(), nullable=False),
+        sa.Column("container_count", sa.Integer(), nullable=False),
+    )
+
+    # Backfill from the existing orders
+    op.execute(
+        """
+        INSERT INTO fact_sales_daily (day, customer_id, currency, order_count, total_amount)
+        SELECT order_date, customer_id, currency, count(*), coalesce(sum(total_amount), 0)
+        FROM sales_orders
+        GROUP BY order_date, customer_id, currency
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO fact_sales_product_daily
+            (day, customer_id, product_id, currency, total_quantity, total_amount)
+        SELECT so.order_date, so.customer_id, i.product_id, so.currency,
+               coalesce(sum(i.quantity), 0), coalesce(sum(i.amount), 0)
+        FROM sales_order_items i
+        JOIN sales_orders so ON so.id = i.sales_order_id
+        GROUP BY so.order_date, so.customer_id, i.product_id, so.currency
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO fact_purchase_daily (day, supplier_id, order_count, total_amount)
+        SELECT order_date, supplier_id, count(*), coalesce(sum(total_amount), 0)
+        FROM purchase_orders
+        GROUP BY order_date, supplier_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO fact_container_daily (day, container_type, plan_count, container_count)
+        SELECT created_at::date, container_type, count(*), coalesce(sum(container_count), 0)
+        FROM container_plans
+        GROUP BY created_at::date, container_type
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("fact_container_daily")
+    op.drop_table("fact_purchase_daily")
+    op.drop_table("fact_sales_product_daily")
+    op.drop_table("fact_sales_daily")
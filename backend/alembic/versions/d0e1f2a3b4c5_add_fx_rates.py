@@ -0,0 +1,45 @@
+"""add fx rate table
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-03-09 10:00:00.000000
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ENUM, UUID
+
+from alembic import op
+
+revision = "d0e1f2a3b4c5"
+down_revision = "c9d0e1f2a3b4"
+branch_labels = None
+depends_on = None
+
+currency_type = ENUM(name="currency_type", create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "fx_rates",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("rate_date", sa.Date(), nullable=False),
+        sa.Column("currency", currency_type, nullable=False),
+        sa.Column("rate", sa.Numeric(18, 8), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.UniqueConstraint("currency", "rate_date", name="uq_fx_rates_currency_date"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("fx_rates")
@@ -0,0 +1,39 @@
+"""add unigram/bigram search index on products
+
+Revision ID: d6e7f8a9b0c1
+Revises: c5d6e7f8a9b0
+Create Date: 2026-03-16 10:00:00.000000
+"""
+
+from alembic import op
+
+revision = "d6e7f8a9b0c1"
+down_revision = "c5d6e7f8a9b0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Trigram indexes extract nothing from one- or two-character queries (most
+    # Chinese name searches); a GIN index over unigrams and bigrams serves them.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION product_search_grams(VARIADIC fields text[])
+        RETURNS text[] LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT coalesce(array_agg(DISTINCT substr(f, i, n)), '{}')
+            FROM unnest(fields) AS field,
+                lower(field) AS f,
+                generate_series(1, 2) AS n,
+                generate_series(1, length(f) - n + 1) AS i
+        $$
+        """
+    )
+    op.execute(
+        "CREATE INDEX idx_products_search_grams ON products "
+        "USING gin (product_search_grams(sku_code, name_cn, name_en, brand))"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_products_search_grams", table_name="products")
+    op.execute("DROP FUNCTION product_search_grams(text[])")
@@ -0,0 +1,74 @@
+"""add landed cost allocations
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-03-11 10:00:00.000000
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ENUM, UUID
+
+from alembic import op
+
+revision = "e1f2a3b4c5d6"
+down_revision = "d0e1f2a3b4c5"
+branch_labels = None
+depends_on = None
+
+allocation_method = ENUM("volume", "weight", "value", name="allocation_method", create_type=False)
+currency_type = ENUM(name="currency_type", create_type=False)
+
+
+def upgrade() -> None:
+    allocation_method.create(op.get_bind(), checkfirst=True)
+    op.create_table(
+        "landed_cost_allocations",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "logistics_record_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("logistics_records.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "container_plan_item_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("container_plan_items.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "sales_order_id", UUID(as_uuid=True), sa.ForeignKey("sales_orders.id"), nullable=True
+        ),
+        sa.Column("product_id", UUID(as_uuid=True), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("method", allocation_method, nullable=False),
+        sa.Column("currency", currency_type, nullable=False),
+        sa.Column("basis", sa.Numeric(16, 4), nullable=False),
+        sa.Column("amount", sa.Numeric(14, 2), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_landed_cost_allocations_logistics_record_id",
+        "landed_cost_allocations",
+        ["logistics_record_id"],
+    )
+    op.create_index(
+        "ix_landed_cost_allocations_sales_order_id",
+        "landed_cost_allocations",
+        ["sales_order_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("landed_cost_allocations")
+    allocation_method.drop(op.get_bind(), checkfirst=True)
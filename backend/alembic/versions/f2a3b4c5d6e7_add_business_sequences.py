@@ -0,0 +1,82 @@
+"""add business number sequences
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-03-12 10:00:00.000000
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision = "f2a3b4c5d6e7"
+down_revision = "e1f2a3b4c5d6"
+branch_labels = None
+depends_on = None
+
+# (prefix, table, number column) of numbers shaped PREFIX-YYYYMMDD-NNN
+DATED = [
+    ("SO", "sales_orders", "order_no"),
+    ("PO", "purchase_orders", "order_no"),
+    ("RCV", "receiving_notes", "note_no"),
+    ("CL", "container_plans", "plan_no"),
+    ("OUT", "outbound_orders", "order_no"),
+    ("LOG", "logistics_records", "logistics_no"),
+]
+# ... and of codes shaped PREFIX-NNNN
+RUNNING = [
+    ("CUS", "customers", "customer_code"),
+    ("SUP", "suppliers", "supplier_code"),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "business_sequences",
+        sa.Column(
+            "id", UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()")
+        ),
+        sa.Column("prefix", sa.String(20), nullable=False),
+        sa.Column("period", sa.String(8), nullable=False, server_default=""),
+        sa.Column("last_value", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.UniqueConstraint("prefix", "period", name="uq_business_sequences_key"),
+    )
+
+    # Continue from the highest number already issued
+    for prefix, table, column in DATED:
+        op.execute(
+            f"""
+            INSERT INTO business_sequences (prefix, period, last_value)
+            SELECT '{prefix}', split_part({column}, '-', 2), max(split_part({column}, '-', 3)::int)
+            FROM {table}
+            WHERE {column} ~ '^{prefix}-[0-9]{{8}}-[0-9]+$'
+            GROUP BY 2
+            """
+        )
+    for prefix, table, column in RUNNING:
+        op.execute(
+            f"""
+            INSERT INTO business_sequences (prefix, period, last_value)
+            SELECT '{prefix}', '', max(split_part({column}, '-', 2)::int)
+            FROM {table}
+            WHERE {column} ~ '^{prefix}-[0-9]+$'
+            HAVING count(*) > 0
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("business_sequences")
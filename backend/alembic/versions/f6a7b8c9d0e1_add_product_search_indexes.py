@@ -0,0 +1,34 @@
+"""add pg_trgm search indexes on products
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-03-02 10:00:00.000000
+"""
+
+from alembic import op
+
+revision = "f6a7b8c9d0e1"
+down_revision = "e5f6a7b8c9d0"
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = ["sku_code", "name_cn", "name_en", "brand"]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # GIN trigram indexes serve both ILIKE '%kw%' substring filters (incl. CJK text
+    # on a UTF-8 database) and similarity() ranking.
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f"idx_products_{column}_trgm",
+            "products",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for column in SEARCH_COLUMNS:
+        op.drop_index(f"idx_products_{column}_trgm", table_name="products")
@@ -1,8 +1,12 @@
+import json
+import time
 import uuid
+from dataclasses import dataclass
 
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import Depends, HTTPException, Query, Request, Response, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError
+from pydantic import BaseModel
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -13,18 +17,14 @@ from app.models.user import User
 from app.repositories.user_repo import UserRepository
 
 security_scheme = HTTPBearer()
+optional_security_scheme = HTTPBearer(auto_error=False)
 
 
 async def get_redis(request: Request) -> Redis:
     return request.app.state.redis
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
-    db: AsyncSession = Depends(get_db),
-    redis: Redis = Depends(get_redis),
-) -> User:
-    token = credentials.credentials
+async def _authenticate(token: str, db: AsyncSession, redis: Redis) -> User:
     try:
         payload = decode_token(token)
     except JWTError:
@@ -32,7 +32,10 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={"code": 40101, "message": "Token 无效或已过期"},
         )
+    return await _load_user(payload, db, redis)
+
 
+async def _load_user(payload: dict, db: AsyncSession, redis: Redis) -> User:
     # Check blacklist
     jti = payload.get("jti")
     if jti:
@@ -56,6 +59,56 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+) -> User:
+    return await _authenticate(credentials.credentials, db, redis)
+
+
+@dataclass
+class StreamAuth:
+    """The user of an event stream and the access token it was opened with."""
+
+    user: User
+    jti: str | None
+    expires_at: float
+
+    async def is_valid(self, redis: Redis) -> bool:
+        """Whether the token has neither expired nor been logged out since."""
+        if time.time() >= self.expires_at:
+            return False
+        return not (self.jti and await redis.exists(f"token_blacklist:{self.jti}"))
+
+
+async def get_stream_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_security_scheme),
+    ticket: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+) -> StreamAuth:
+    """Authenticate an event stream by bearer token or by a ``?ticket=`` from
+    ``POST /events/ticket`` (EventSource cannot set headers). A ticket works once."""
+    payload = None
+    if credentials:
+        try:
+            payload = decode_token(credentials.credentials)
+        except JWTError:
+            pass
+    elif ticket:
+        claims = await redis.getdel(f"stream_ticket:{ticket}")
+        if claims:
+            payload = json.loads(claims)
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={"code": 40101, "message": "Token 无效或已过期"},
+        )
+    user = await _load_user(payload, db, redis)
+    return StreamAuth(user, payload.get("jti"), float(payload["exp"]))
+
+
 def require_permission(permission: Permission):
     """Permission check dependency factory."""
 
@@ -78,3 +131,16 @@ def require_super_admin(current_user: User = Depends(get_current_user)) -> User:
             detail={"code": 40390, "message": "仅超级管理员可操作"},
         )
     return current_user
+
+
+def sparse_fields_param(
+    fields: str | None = Query(None, description="逗号分隔的返回字段（稀疏字段集）"),
+) -> list[str] | None:
+    names = [name.strip() for name in (fields or "").split(",") if name.strip()]
+    return names or None
+
+
+def sparse_response(payload: BaseModel) -> Response:
+    """Serialise a sparse-fieldset payload directly, bypassing ``response_model``
+    validation (its items hold only the requested fields)."""
+    return Response(content=payload.model_dump_json(), media_type="application/json")
@@ -67,6 +67,8 @@ async def list_container_plans(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.CONTAINER_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -79,6 +81,8 @@ async def list_container_plans(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
     )
     service = ContainerService(db)
     data = await service.list_plans(params)
@@ -8,7 +8,7 @@ from app.api.deps import require_permission
 from app.core.permissions import Permission
 from app.database import get_db
 from app.models.user import User
-from app.schemas.common import ApiResponse, PaginatedResponse
+from app.schemas.common import ApiResponse, PaginatedResponse, SuggestItem
 from app.schemas.customer import (
     CustomerCreate,
     CustomerListParams,
@@ -34,6 +34,18 @@ CUSTOMER_EXPORT_HEADERS = [
 ]
 
 
+@router.get("/suggest", response_model=ApiResponse[list[SuggestItem]])
+async def suggest_customers(
+    # Trigram indexes need three characters; shorter keywords would scan
+    q: str = Query(..., min_length=3, max_length=50),
+    limit: int = Query(10, ge=1, le=20),
+    user: User = Depends(require_permission(Permission.CUSTOMER_VIEW)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = CustomerService(db)
+    return ApiResponse(data=await service.suggest(q, limit))
+
+
 @router.get("", response_model=PaginatedResponse[CustomerRead])
 async def list_customers(
     keyword: str | None = None,
@@ -42,6 +54,8 @@ async def list_customers(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.CUSTOMER_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -53,6 +67,8 @@ async def list_customers(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
     )
     data = await service.list_customers(params)
     return PaginatedResponse(data=data)
@@ -133,6 +149,8 @@ async def get_customer_orders(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.CUSTOMER_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -147,6 +165,8 @@ async def get_customer_orders(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
     )
     data = await so_service.list_orders(params)
     return PaginatedResponse(data=data)
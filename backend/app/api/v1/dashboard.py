@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import require_permission
@@ -7,12 +7,14 @@ from app.database import get_db
 from app.models.user import User
 from app.schemas.common import ApiResponse
 from app.schemas.dashboard import (
+    DashboardSummaryResponse,
     ExpiryWarningResponse,
     InTransitResponse,
     OverviewResponse,
     TodoResponse,
 )
 from app.services.dashboard_service import DashboardService
+from app.utils.etag import etag_response
 
 router = APIRouter(prefix="/dashboard", tags=["仪表盘"])
 
@@ -27,6 +29,17 @@ async def get_overview(
     return ApiResponse(data=data)
 
 
+@router.get("/summary", response_model=ApiResponse[DashboardSummaryResponse])
+async def get_summary(
+    request: Request,
+    user: User = Depends(require_permission(Permission.SALES_ORDER_VIEW)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = DashboardService(db)
+    data = await service.get_summary()
+    return etag_response(request, ApiResponse(data=data))
+
+
 @router.get("/todos", response_model=ApiResponse[TodoResponse])
 async def get_todos(
     user: User = Depends(require_permission(Permission.SALES_ORDER_VIEW)),
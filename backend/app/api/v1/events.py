@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import (
+    StreamAuth,
+    get_current_user,
+    get_redis,
+    get_stream_user,
+    security_scheme,
+)
+from app.config import settings
+from app.core.events import event_bus
+from app.core.permissions import ROLE_PERMISSIONS
+from app.database import get_db
+from app.models.user import User
+from app.schemas.common import ApiResponse
+from app.schemas.user import StreamTicketResponse
+from app.services.auth_service import AuthService
+from app.services.live_updates import derive_messages
+
+router = APIRouter(prefix="/events", tags=["实时推送"])
+
+KEEPALIVE_SECONDS = 15
+
+
+def _format(name: str, data: dict) -> str:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {name}\ndata: {payload}\n\n"
+
+
+@router.post("/ticket", response_model=ApiResponse[StreamTicketResponse])
+async def create_ticket(
+    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
+    _: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+):
+    """Single-use ticket for opening ``/events/stream?ticket=``."""
+    ticket = await AuthService(db, redis).issue_stream_ticket(credentials.credentials)
+    return ApiResponse(
+        data=StreamTicketResponse(ticket=ticket, expires_in=settings.STREAM_TICKET_EXPIRE_SECONDS)
+    )
+
+
+@router.get("/stream")
+async def stream(
+    request: Request,
+    auth: StreamAuth = Depends(get_stream_user),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+):
+    """Server-sent events: dashboard todo / kanban deltas and domain events.
+
+    Clients apply the deltas to the views they loaded and reload them on ``resync``.
+    Once the access token expires or is logged out the stream sends ``expired``
+    and closes; clients reconnect with a new ticket.
+    """
+    permissions = ROLE_PERMISSIONS.get(auth.user.role.value, set())
+    # The stream never touches the database; give the connection back to the pool
+    await db.close()
+
+    async def generate():
+        loop = asyncio.get_running_loop()
+        async with event_bus.subscribe() as queue:
+            yield _format("ready", {})
+            checked = loop.time()
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except TimeoutError:
+                    item = None
+                # Re-check the token at the keep-alive interval, busy or not
+                if loop.time() - checked >= KEEPALIVE_SECONDS:
+                    checked = loop.time()
+                    if not await auth.is_valid(redis):
+                        yield _format("expired", {})
+                        return
+                if item is None:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                for name, data in derive_messages(item, permissions):
+                    yield _format(name, data)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
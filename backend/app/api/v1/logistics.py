@@ -9,6 +9,8 @@ from app.database import get_db
 from app.models.user import User
 from app.schemas.common import ApiResponse, PaginatedResponse
 from app.schemas.logistics import (
+    LandedCostAllocate,
+    LandedCostAllocationResponse,
     LogisticsCostCreate,
     LogisticsCostRead,
     LogisticsCostUpdate,
@@ -20,6 +22,7 @@ from app.schemas.logistics import (
     LogisticsRecordUpdate,
     LogisticsStatusUpdate,
 )
+from app.services.landed_cost_service import LandedCostService
 from app.services.logistics_service import LogisticsService
 
 router = APIRouter(prefix="/logistics", tags=["物流管理"])
@@ -34,6 +37,8 @@ async def list_logistics_records(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.LOGISTICS_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -47,6 +52,8 @@ async def list_logistics_records(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
     )
     service = LogisticsService(db)
     data = await service.list_records(params)
@@ -151,3 +158,27 @@ async def delete_logistics_cost(
 ):
     service = LogisticsService(db)
     await service.delete_cost(id, cost_id)
+
+
+@router.get("/{id}/allocations", response_model=ApiResponse[LandedCostAllocationResponse])
+async def get_landed_cost_allocations(
+    id: uuid.UUID,
+    user: User = Depends(require_permission(Permission.LOGISTICS_VIEW)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = LandedCostService(db)
+    data = await service.get_allocations(id)
+    return ApiResponse(data=data)
+
+
+@router.post("/{id}/allocations", response_model=ApiResponse[LandedCostAllocationResponse])
+async def allocate_landed_cost(
+    id: uuid.UUID,
+    body: LandedCostAllocate,
+    user: User = Depends(require_permission(Permission.LOGISTICS_EDIT)),
+    db: AsyncSession = Depends(get_db),
+):
+    """Split the record's costs over its container plan items (replaces earlier results)."""
+    service = LandedCostService(db)
+    data = await service.allocate(id, body.method)
+    return ApiResponse(data=data)
@@ -28,6 +28,8 @@ async def list_outbound_orders(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.OUTBOUND_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -40,6 +42,8 @@ async def list_outbound_orders(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
     )
     service = OutboundService(db)
     data = await service.list_orders(params)
@@ -4,20 +4,20 @@ from fastapi import APIRouter, Depends, Query, UploadFile, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import require_permission
+from app.api.deps import require_permission, sparse_fields_param, sparse_response
 from app.core.permissions import Permission
 from app.database import get_db
 from app.models.enums import ProductStatus
 from app.models.user import User
-from app.schemas.common import ApiResponse, PaginatedResponse
+from app.schemas.common import ApiResponse, PaginatedResponse, SuggestItem
 from app.schemas.product import (
     ProductCreate,
     ProductListParams,
     ProductRead,
+    ProductSearchHit,
     ProductStatusUpdate,
     ProductUpdate,
 )
-from app.services.product_category_service import ProductCategoryService
 from app.services.product_service import ProductService
 from app.utils.excel import create_template, create_workbook, read_workbook
 
@@ -67,6 +67,38 @@ async def list_brands(
     return ApiResponse(data=brands)
 
 
+@router.get("/suggest", response_model=ApiResponse[list[SuggestItem]])
+async def suggest_products(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=20),
+    user: User = Depends(require_permission(Permission.PRODUCT_VIEW)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = ProductService(db)
+    return ApiResponse(data=await service.suggest(q, limit))
+
+
+@router.get("/search", response_model=PaginatedResponse[ProductSearchHit])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    category_id: uuid.UUID | None = None,
+    product_status: ProductStatus | None = Query(None, alias="status"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    user: User = Depends(require_permission(Permission.PRODUCT_VIEW)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = ProductService(db)
+    data = await service.search_products(
+        q,
+        category_id=category_id,
+        status=product_status,
+        page=page,
+        page_size=page_size,
+    )
+    return PaginatedResponse(data=data)
+
+
 @router.get("", response_model=PaginatedResponse[ProductRead])
 async def list_products(
     keyword: str | None = None,
@@ -77,6 +109,9 @@ async def list_products(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
+    fields: list[str] | None = Depends(sparse_fields_param),
     user: User = Depends(require_permission(Permission.PRODUCT_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -91,8 +126,13 @@ async def list_products(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
+        fields=fields,
     )
     data = await service.list_products(params)
+    if fields:
+        return sparse_response(PaginatedResponse(data=data))
     return PaginatedResponse(data=data)
 
 
@@ -112,53 +152,21 @@ async def create_product(
 @router.post("/import", response_model=ApiResponse)
 async def import_products(
     file: UploadFile,
+    mode: str = Query("create", pattern="^(create|upsert)$"),
+    dry_run: bool = False,
+    deactivate_missing: bool = False,
     user: User = Depends(require_permission(Permission.PRODUCT_IMPORT)),
     db: AsyncSession = Depends(get_db),
 ):
     content = await file.read()
     rows = read_workbook(content)
     service = ProductService(db)
-    cat_service = ProductCategoryService(db)
-
-    # Build name→id lookup from category tree
-    all_cats = await cat_service.repo.get_all_ordered()
-    name_to_id: dict[str, uuid.UUID] = {}
-    for cat in all_cats:
-        name_to_id[cat.name] = cat.id
-
-    created = 0
-    errors = []
-    for i, row in enumerate(rows):
-        try:
-            category_name = str(row.get("category_name", row.get("category", "")))
-            cat_id = name_to_id.get(category_name)
-            if not cat_id:
-                # Fall back: try matching against level-1 "其他" category
-                cat_id = name_to_id.get("其他")
-            if not cat_id:
-                raise ValueError(f"品类 '{category_name}' 未找到")
-
-            data = ProductCreate(
-                sku_code=str(row.get("sku_code", "")),
-                name_cn=str(row.get("name_cn", "")),
-                name_en=str(row.get("name_en", "")),
-                category_id=cat_id,
-                spec=str(row.get("spec", "N/A")),
-                unit_weight_kg=row.get("unit_weight_kg", 0.1),
-                unit_volume_cbm=row.get("unit_volume_cbm", 0.001),
-                packing_spec=str(row.get("packing_spec", "N/A")),
-                carton_length_cm=row.get("carton_length_cm", 40),
-                carton_width_cm=row.get("carton_width_cm", 30),
-                carton_height_cm=row.get("carton_height_cm", 25),
-                carton_gross_weight_kg=row.get("carton_gross_weight_kg", 10),
-                shelf_life_days=int(row.get("shelf_life_days", 365)),
-                brand=row.get("brand"),
-            )
-            await service.create(data, user.id)
-            created += 1
-        except Exception as e:
-            errors.append({"row": i + 2, "error": str(e)})
-    return ApiResponse(data={"created": created, "errors": errors})
+    if mode == "upsert":
+        report = await service.upsert_rows(
+            rows, user.id, dry_run=dry_run, deactivate_missing=deactivate_missing
+        )
+        return ApiResponse(data=report)
+    return ApiResponse(data=await service.import_rows(rows, user.id))
 
 
 @router.get("/export")
@@ -7,9 +7,11 @@ from app.api.deps import require_permission, require_super_admin
 from app.core.permissions import Permission
 from app.database import get_db
 from app.models.user import User
-from app.schemas.common import ApiResponse, PaginatedResponse
+from app.schemas.common import ApiResponse, BulkIdsRequest, BulkStatusResult, PaginatedResponse
 from app.schemas.purchase_order import (
     LinkSalesOrdersRequest,
+    MrpRunRequest,
+    MrpRunResult,
     PurchaseOrderCreate,
     PurchaseOrderListParams,
     PurchaseOrderListRead,
@@ -17,6 +19,7 @@ from app.schemas.purchase_order import (
     PurchaseOrderUpdate,
 )
 from app.schemas.warehouse import ReceivingNoteListParams, ReceivingNoteListRead
+from app.services.mrp_service import MrpService
 from app.services.purchase_order_service import PurchaseOrderService
 from app.services.warehouse_service import WarehouseService
 
@@ -32,6 +35,8 @@ async def list_purchase_orders(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.PURCHASE_ORDER_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -45,6 +50,8 @@ async def list_purchase_orders(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
     )
     service = PurchaseOrderService(db)
     data = await service.list_orders(params)
@@ -63,6 +70,28 @@ async def create_purchase_order(
     return ApiResponse(data=read)
 
 
+@router.post("/mrp-run", response_model=ApiResponse[MrpRunResult])
+async def run_mrp(
+    body: MrpRunRequest,
+    user: User = Depends(require_permission(Permission.PURCHASE_ORDER_EDIT)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = MrpService(db)
+    data = await service.run(body, user.id)
+    return ApiResponse(data=data)
+
+
+@router.post("/confirm", response_model=ApiResponse[BulkStatusResult])
+async def bulk_confirm_purchase_orders(
+    body: BulkIdsRequest,
+    user: User = Depends(require_permission(Permission.PURCHASE_ORDER_CONFIRM)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = PurchaseOrderService(db)
+    data = await service.bulk_confirm(body.ids, user.id)
+    return ApiResponse(data=data)
+
+
 @router.get("/{id}", response_model=ApiResponse[PurchaseOrderRead])
 async def get_purchase_order(
     id: uuid.UUID,
@@ -132,6 +161,8 @@ async def get_receiving_notes(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.PURCHASE_ORDER_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -146,6 +177,8 @@ async def get_receiving_notes(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
     )
     data = await wh_service.list_receiving_notes(params)
     return PaginatedResponse(data=data)
@@ -5,6 +5,7 @@ from app.api.v1 import (
     containers,
     customers,
     dashboard,
+    events,
     logistics,
     outbound,
     product_categories,
@@ -31,5 +32,6 @@ api_router.include_router(containers.router)
 api_router.include_router(outbound.router)
 api_router.include_router(logistics.router)
 api_router.include_router(dashboard.router)
+api_router.include_router(events.router)
 api_router.include_router(statistics.router)
 api_router.include_router(system.router)
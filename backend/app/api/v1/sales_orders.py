@@ -1,25 +1,33 @@
 import uuid
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, UploadFile, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import require_permission, require_super_admin
+from app.api.deps import (
+    require_permission,
+    require_super_admin,
+    sparse_fields_param,
+    sparse_response,
+)
 from app.core.permissions import Permission
 from app.database import get_db
 from app.models.user import User
-from app.schemas.common import ApiResponse, PaginatedResponse
+from app.schemas.common import ApiResponse, BulkStatusResult, PaginatedResponse
 from app.schemas.sales_order import (
     KanbanResponse,
+    SalesOrderBulkStatusUpdate,
     SalesOrderCreate,
+    SalesOrderImportResult,
     SalesOrderListParams,
     SalesOrderListRead,
     SalesOrderRead,
     SalesOrderStatusUpdate,
     SalesOrderUpdate,
 )
+from app.services.sales_order_import_service import IMPORT_HEADERS, SalesOrderImportService
 from app.services.sales_order_service import SalesOrderService
-from app.utils.excel import create_workbook
+from app.utils.excel import create_template, create_workbook, iter_workbook
 
 router = APIRouter(prefix="/sales-orders", tags=["销售订单"])
 
@@ -47,6 +55,9 @@ async def list_sales_orders(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
+    fields: list[str] | None = Depends(sparse_fields_param),
     user: User = Depends(require_permission(Permission.SALES_ORDER_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -62,9 +73,14 @@ async def list_sales_orders(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
+        fields=fields,
     )
     service = SalesOrderService(db)
     data = await service.list_orders(params)
+    if fields:
+        return sparse_response(PaginatedResponse(data=data))
     return PaginatedResponse(data=data)
 
 
@@ -110,6 +126,53 @@ async def export_sales_orders(
     )
 
 
+@router.post("/import", response_model=ApiResponse[SalesOrderImportResult])
+async def import_sales_orders(
+    file: UploadFile,
+    dry_run: bool = False,
+    user: User = Depends(require_permission(Permission.SALES_ORDER_EDIT)),
+    db: AsyncSession = Depends(get_db),
+):
+    content = await file.read()
+    service = SalesOrderImportService(db)
+    data = await service.import_rows(iter_workbook(content), user.id, dry_run=dry_run)
+    return ApiResponse(data=data)
+
+
+@router.get("/template")
+async def download_template(
+    user: User = Depends(require_permission(Permission.SALES_ORDER_EDIT)),
+):
+    output = create_template("销售订单导入模板", IMPORT_HEADERS)
+    return StreamingResponse(
+        output,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": "attachment; filename=sales_order_template.xlsx"},
+    )
+
+
+@router.get("/fulfillment", response_model=ApiResponse)
+async def get_fulfillments(
+    ids: list[uuid.UUID] = Query(..., min_length=1, max_length=100),
+    user: User = Depends(require_permission(Permission.SALES_ORDER_VIEW)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = SalesOrderService(db)
+    data = await service.get_fulfillments(ids)
+    return ApiResponse(data=data)
+
+
+@router.patch("/status", response_model=ApiResponse[BulkStatusResult])
+async def bulk_update_status(
+    body: SalesOrderBulkStatusUpdate,
+    user: User = Depends(require_super_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    service = SalesOrderService(db)
+    data = await service.bulk_update_status(body.ids, body.status, user.id)
+    return ApiResponse(data=data)
+
+
 @router.get("/kanban", response_model=ApiResponse[KanbanResponse])
 async def get_kanban(
     user: User = Depends(require_permission(Permission.SALES_ORDER_VIEW)),
@@ -1,18 +1,29 @@
-from fastapi import APIRouter, Depends, Query
+import uuid
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import require_permission
 from app.core.permissions import Permission
 from app.database import get_db
+from app.models.enums import CurrencyType, SalesOrderStatus
 from app.models.user import User
 from app.schemas.common import ApiResponse
 from app.schemas.statistics import (
+    CategorySalesRollupResponse,
     ContainerSummaryStatResponse,
     CustomerRankingResponse,
+    FxRateImportResult,
+    FxRateRead,
+    MarginReportResponse,
+    PivotResponse,
     ProductRankingResponse,
     PurchaseSummaryResponse,
     SalesSummaryResponse,
 )
+from app.services.fx_rate_service import FxRateService
+from app.services.landed_cost_service import LandedCostService
 from app.services.statistics_service import StatisticsService
 
 router = APIRouter(prefix="/statistics", tags=["统计报表"])
@@ -23,11 +34,17 @@ async def sales_summary(
     group_by: str = Query("month", pattern="^(month|customer)$"),
     date_from: str | None = None,
     date_to: str | None = None,
+    report_currency: CurrencyType | None = Query(None, description="换算后的报表币种"),
     user: User = Depends(require_permission(Permission.STATISTICS_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
     service = StatisticsService(db)
-    data = await service.sales_summary(group_by=group_by, date_from=date_from, date_to=date_to)
+    data = await service.sales_summary(
+        group_by=group_by,
+        date_from=date_from,
+        date_to=date_to,
+        report_currency=report_currency,
+    )
     return ApiResponse(data=data)
 
 
@@ -62,11 +79,14 @@ async def customer_ranking(
     date_from: str | None = None,
     date_to: str | None = None,
     top_n: int = Query(20, ge=1, le=100),
+    report_currency: CurrencyType | None = Query(None, description="换算后的报表币种"),
     user: User = Depends(require_permission(Permission.STATISTICS_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
     service = StatisticsService(db)
-    data = await service.customer_ranking(date_from=date_from, date_to=date_to, top_n=top_n)
+    data = await service.customer_ranking(
+        date_from=date_from, date_to=date_to, top_n=top_n, report_currency=report_currency
+    )
     return ApiResponse(data=data)
 
 
@@ -75,9 +95,108 @@ async def product_ranking(
     date_from: str | None = None,
     date_to: str | None = None,
     top_n: int = Query(20, ge=1, le=100),
+    report_currency: CurrencyType | None = Query(None, description="换算后的报表币种"),
+    user: User = Depends(require_permission(Permission.STATISTICS_VIEW)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = StatisticsService(db)
+    data = await service.product_ranking(
+        date_from=date_from, date_to=date_to, top_n=top_n, report_currency=report_currency
+    )
+    return ApiResponse(data=data)
+
+
+@router.get("/category-sales", response_model=ApiResponse[CategorySalesRollupResponse])
+async def category_sales(
+    date_from: str | None = None,
+    date_to: str | None = None,
+    order_status: list[SalesOrderStatus] | None = Query(None, alias="status"),
+    category_id: uuid.UUID | None = None,
+    report_currency: CurrencyType | None = Query(None, description="换算后的报表币种"),
+    user: User = Depends(require_permission(Permission.STATISTICS_VIEW)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = StatisticsService(db)
+    data = await service.category_sales_rollup(
+        date_from=date_from,
+        date_to=date_to,
+        statuses=order_status,
+        category_id=category_id,
+        report_currency=report_currency,
+    )
+    return ApiResponse(data=data)
+
+
+@router.get("/margin", response_model=ApiResponse[MarginReportResponse])
+async def margin_report(
+    group_by: str = Query("sales_order", pattern="^(sales_order|product)$"),
+    date_from: date | None = None,
+    date_to: date | None = None,
+    report_currency: CurrencyType = CurrencyType.USD,
+    user: User = Depends(require_permission(Permission.STATISTICS_VIEW)),
+    db: AsyncSession = Depends(get_db),
+):
+    """Revenue, purchase cost, allocated freight and margin per sales order or SKU."""
+    service = LandedCostService(db)
+    data = await service.margin_report(
+        group_by=group_by,
+        date_from=date_from,
+        date_to=date_to,
+        report_currency=report_currency,
+    )
+    return ApiResponse(data=data)
+
+
+@router.get("/pivot", response_model=ApiResponse[PivotResponse])
+async def pivot(
+    dimensions: list[str] = Query(
+        ..., description="1-3 个维度，如 customer、month、category_level1"
+    ),
+    aggregates: list[str] = Query(["count", "amount_sum"]),
+    date_from: str | None = None,
+    date_to: str | None = None,
+    limit: int = Query(5000, ge=1, le=50000),
+    refresh: bool = False,
+    report_currency: CurrencyType | None = Query(
+        None, description="金额换算币种；不指定时金额汇总需包含 currency 维度"
+    ),
     user: User = Depends(require_permission(Permission.STATISTICS_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
     service = StatisticsService(db)
-    data = await service.product_ranking(date_from=date_from, date_to=date_to, top_n=top_n)
+    data = await service.pivot(
+        dimensions=dimensions,
+        aggregates=aggregates,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        refresh=refresh,
+        report_currency=report_currency,
+    )
+    return ApiResponse(data=data)
+
+
+@router.get("/fx-rates", response_model=ApiResponse[list[FxRateRead]])
+async def list_fx_rates(
+    currency: CurrencyType | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    user: User = Depends(require_permission(Permission.STATISTICS_VIEW)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = FxRateService(db)
+    data = await service.list_rates(currency=currency, date_from=date_from, date_to=date_to)
+    return ApiResponse(data=data)
+
+
+@router.post("/fx-rates/import", response_model=ApiResponse[FxRateImportResult])
+async def import_fx_rates(
+    file: UploadFile,
+    user: User = Depends(require_permission(Permission.SYSTEM_CONFIG)),
+    db: AsyncSession = Depends(get_db),
+):
+    """CSV with columns date,currency,rate (USD value of one unit of the currency)."""
+    content = await file.read()
+    service = FxRateService(db)
+    data = await service.import_csv(content)
     return ApiResponse(data=data)
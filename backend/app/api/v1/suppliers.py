@@ -8,11 +8,13 @@ from app.api.deps import require_permission
 from app.core.permissions import Permission
 from app.database import get_db
 from app.models.user import User
-from app.schemas.common import ApiResponse, PaginatedResponse
+from app.schemas.common import ApiResponse, PaginatedResponse, SuggestItem
 from app.schemas.purchase_order import PurchaseOrderListParams, PurchaseOrderListRead
 from app.schemas.supplier import (
     SupplierCreate,
     SupplierListParams,
+    SupplierPriceListUpdate,
+    SupplierPriceRead,
     SupplierProductCreate,
     SupplierProductRead,
     SupplierRead,
@@ -33,6 +35,18 @@ SUPPLIER_EXPORT_HEADERS = [
 ]
 
 
+@router.get("/suggest", response_model=ApiResponse[list[SuggestItem]])
+async def suggest_suppliers(
+    # Trigram indexes need three characters; shorter keywords would scan
+    q: str = Query(..., min_length=3, max_length=50),
+    limit: int = Query(10, ge=1, le=20),
+    user: User = Depends(require_permission(Permission.SUPPLIER_VIEW)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = SupplierService(db)
+    return ApiResponse(data=await service.suggest(q, limit))
+
+
 @router.get("", response_model=PaginatedResponse[SupplierRead])
 async def list_suppliers(
     keyword: str | None = None,
@@ -40,6 +54,8 @@ async def list_suppliers(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.SUPPLIER_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -50,6 +66,8 @@ async def list_suppliers(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
     )
     data = await service.list_suppliers(params)
     return PaginatedResponse(data=data)
@@ -123,6 +141,8 @@ async def get_supplier_purchase_orders(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.SUPPLIER_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -137,6 +157,8 @@ async def get_supplier_purchase_orders(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
     )
     data = await po_service.list_orders(params)
     return PaginatedResponse(data=data)
@@ -167,3 +189,26 @@ async def remove_supplier_product(
 ):
     service = SupplierService(db)
     await service.remove_product(id, product_id)
+
+
+@router.get("/{id}/prices", response_model=ApiResponse[list[SupplierPriceRead]])
+async def get_supplier_prices(
+    id: uuid.UUID,
+    user: User = Depends(require_permission(Permission.SUPPLIER_VIEW)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = SupplierService(db)
+    prices = await service.get_prices(id)
+    return ApiResponse(data=[SupplierPriceRead.model_validate(p) for p in prices])
+
+
+@router.put("/{id}/prices", response_model=ApiResponse[list[SupplierPriceRead]])
+async def replace_supplier_prices(
+    id: uuid.UUID,
+    body: SupplierPriceListUpdate,
+    user: User = Depends(require_permission(Permission.SUPPLIER_EDIT)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = SupplierService(db)
+    prices = await service.replace_prices(id, body)
+    return ApiResponse(data=[SupplierPriceRead.model_validate(p) for p in prices])
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import require_permission, require_super_admin
 from app.core.permissions import Permission
+from app.core.result_cache import result_cache
 from app.database import get_db
 from app.models.enums import AuditAction, UserRole
 from app.models.user import User
@@ -12,6 +13,7 @@ from app.schemas.common import ApiResponse, PaginatedResponse
 from app.schemas.system import (
     AuditLogListParams,
     AuditLogRead,
+    CacheNamespaceStats,
     SystemConfigRead,
     SystemConfigUpdate,
     SystemUserCreate,
@@ -35,6 +37,8 @@ async def list_users(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.USER_MANAGE)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -47,6 +51,8 @@ async def list_users(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
     )
     data = await service.list_users(params)
     return PaginatedResponse(data=data)
@@ -123,6 +129,8 @@ async def list_audit_logs(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.AUDIT_LOG_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -137,6 +145,8 @@ async def list_audit_logs(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
     )
     data = await service.list_audit_logs(params)
     return PaginatedResponse(data=data)
@@ -162,3 +172,15 @@ async def update_config(
     service = SystemService(db)
     data = await service.update_config(key, body, user.id)
     return ApiResponse(data=data)
+
+
+@router.get("/cache-stats", response_model=ApiResponse[list[CacheNamespaceStats]])
+async def cache_stats(
+    user: User = Depends(require_permission(Permission.SYSTEM_CONFIG)),
+):
+    stats = await result_cache.stats()
+    data = [
+        CacheNamespaceStats(namespace=namespace, **counters)
+        for namespace, counters in sorted(stats.items())
+    ]
+    return ApiResponse(data=data)
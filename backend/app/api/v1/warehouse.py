@@ -46,6 +46,8 @@ async def list_receiving_notes(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.WAREHOUSE_OPERATE)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -56,6 +58,8 @@ async def list_receiving_notes(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
     )
     service = WarehouseService(db)
     data = await service.list_receiving_notes(params)
@@ -120,7 +124,7 @@ async def list_inventory_batches(
 
     repo = InventoryRepository(db)
     offset = (page - 1) * page_size
-    records, _ = await repo.get_available_batches(
+    batches = await repo.get_available_batches(
         product_id=product_id,
         sales_order_id=sales_order_id,
         destination_port=destination_port,
@@ -129,7 +133,7 @@ async def list_inventory_batches(
     )
     result = []
     today = date_type.today()
-    for inv in records:
+    for inv in batches.items:
         # Get product name and shelf_life
         from sqlalchemy import select
 
@@ -174,6 +178,8 @@ async def get_inventory(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: str = "created_at",
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.INVENTORY_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -183,6 +189,8 @@ async def get_inventory(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_total,
     )
     service = WarehouseService(db)
     data = await service.get_inventory_by_product(params)
@@ -197,6 +205,8 @@ async def list_pending_inspection(
     keyword: str | None = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    include_total: bool = True,
     user: User = Depends(require_permission(Permission.INVENTORY_VIEW)),
     db: AsyncSession = Depends(get_db),
 ):
@@ -204,6 +214,8 @@ async def list_pending_inspection(
         keyword=keyword,
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
     )
     service = WarehouseService(db)
     data = await service.list_pending_inspection(params)
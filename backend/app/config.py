@@ -42,10 +42,15 @@ class Settings(BaseSettings):
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 120
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     JWT_ALGORITHM: str = "HS256"
+    # Single-use tickets that open an event stream (EventSource cannot send headers)
+    STREAM_TICKET_EXPIRE_SECONDS: int = 30
 
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000"
 
+    # Lists: above this many estimated rows, totals are estimates (no count(*))
+    APPROX_COUNT_THRESHOLD: int = 100_000
+
     # App
     APP_ENV: str = "development"
     LOG_LEVEL: str = "INFO"
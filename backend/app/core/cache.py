@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_MISSING = object()
+# Session.info key: caches to clear once the session's transaction ends
+_CLEAR_ON_END = "lru_caches_to_clear"
+
+
+class LRUCache:
+    """Small thread-safe in-process LRU cache with a per-entry TTL.
+
+    Entries are local to the worker process; callers clear the cache on writes
+    they make themselves (:meth:`clear_on_commit`) and rely on the TTL for writes
+    made by other workers.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def clear_on_commit(self, db: AsyncSession) -> None:
+        """Clear once ``db``'s transaction ends.
+
+        Clearing before the commit would let a concurrent request cache the old
+        rows again until the TTL runs out.
+        """
+        db.sync_session.info.setdefault(_CLEAR_ON_END, set()).add(self)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_caches(session: Session) -> None:
+    for cache in session.info.pop(_CLEAR_ON_END, ()):
+        cache.clear()
@@ -0,0 +1,119 @@
+"""Domain event bus feeding the server-sent events stream.
+
+Services queue events on their session with :meth:`EventBus.publish`; once the
+transaction commits they are published to a single Redis channel. Each worker
+subscribes to that channel once and fans every event out to the in-process
+queues of its open SSE connections, so idle browser tabs cost no database work.
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.logging import logger
+
+CHANNEL = "domain_events"
+_PENDING = "domain_events_pending"
+# Sentinel queued to a subscriber that fell behind: it must reload its views
+RESYNC = {"type": "resync", "data": {}}
+
+
+class EventBus:
+    def __init__(self):
+        self._redis: Redis | None = None
+        self._listener: asyncio.Task | None = None
+        self._subscribers: set[asyncio.Queue] = set()
+        self._pending: set[asyncio.Task] = set()
+
+    def publish(self, session: Session, type: str, **data: Any) -> None:
+        """Queue an event; it is delivered only if the transaction commits."""
+        session.info.setdefault(_PENDING, []).append({"type": type, "data": data})
+
+    def publish_soon(self, events: list[dict]) -> None:
+        """Schedule :meth:`send` from synchronous session event hooks."""
+        try:
+            task = asyncio.get_running_loop().create_task(self.send(events))
+        except RuntimeError:
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def send(self, events: list[dict]) -> None:
+        if self._redis is None:
+            # No broker (tests, scripts): deliver to this worker only
+            for item in events:
+                self.dispatch(item)
+            return
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for item in events:
+                    pipe.publish(CHANNEL, json.dumps(item, default=str))
+                await pipe.execute()
+        except Exception:
+            logger.warning("domain_event_publish_failed", exc_info=True)
+
+    def dispatch(self, item: dict) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and tell it to reload
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+    @asynccontextmanager
+    async def subscribe(self, maxsize: int = 256) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    async def start(self, redis: Redis) -> None:
+        self._redis = redis
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        self._redis = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.dispatch(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("domain_event_listener_error", exc_info=True)
+                # Events may have been missed while disconnected
+                self.dispatch(RESYNC)
+                await asyncio.sleep(1)
+
+
+event_bus = EventBus()
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    events = session.info.pop(_PENDING, None)
+    if events:
+        event_bus.publish_soon(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,259 @@
+"""Redis-backed cache for aggregate query results with table-tag invalidation.
+
+Every entry stores the version of each table tag it was computed from. Writes are
+detected on the session (ORM flushes and DML statements), and once the
+transaction commits the versions of the touched tables are bumped, turning the
+entries that read them into misses. Entries past their fresh TTL but inside the
+stale window are served at once while a background task recomputes them.
+
+Sessions holding uncommitted writes bypass the cache entirely: they must see their
+own changes, and what they compute must never be shared.
+"""
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import time
+import typing
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.logging import logger
+from app.database import async_session_factory
+
+KEY_PREFIX = "result_cache"
+STATS_KEY = f"{KEY_PREFIX}:stats"
+OUTCOMES = ("hit", "stale", "miss", "bypass")
+_WRITE_TAGS = "result_cache_write_tags"
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class ResultCache:
+    def __init__(self):
+        self._redis: Redis | None = None
+        self._pending: set[asyncio.Task] = set()
+
+    async def start(self, redis: Redis) -> None:
+        self._redis = redis
+
+    async def stop(self) -> None:
+        self._redis = None
+
+    # ==================== Read path ====================
+
+    async def get_or_compute(
+        self,
+        db: AsyncSession,
+        namespace: str,
+        params: dict[str, Any],
+        tags: Iterable[str],
+        model: type[T],
+        compute: Callable[[AsyncSession], Awaitable[T]],
+        fresh_ttl: int = 60,
+        stale_ttl: int = 300,
+    ) -> T:
+        redis = self._redis
+        if redis is None:
+            return await compute(db)
+        if db.sync_session.info.get(_WRITE_TAGS):
+            self._count(namespace, "bypass")
+            return await compute(db)
+
+        key = self._key(namespace, params)
+        tag_keys = [f"{KEY_PREFIX}:tag:{tag}" for tag in tags]
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.mget(tag_keys)
+                raw, raw_versions = await pipe.execute()
+        except Exception:
+            logger.warning("result_cache_read_failed", namespace=namespace, exc_info=True)
+            return await compute(db)
+
+        versions = [int(v or 0) for v in raw_versions]
+        if raw is not None:
+            header, _, payload = raw.partition("\n")
+            stored_versions, computed_at = json.loads(header)
+            if stored_versions == versions:
+                age = time.time() - computed_at
+                if age < fresh_ttl:
+                    self._count(namespace, "hit")
+                    return model.model_validate_json(payload)
+                if age < fresh_ttl + stale_ttl:
+                    self._count(namespace, "stale")
+                    self._spawn(self._revalidate(key, versions, compute, fresh_ttl + stale_ttl))
+                    return model.model_validate_json(payload)
+
+        self._count(namespace, "miss")
+        value = await compute(db)
+        # Versions read before computing: a write landing meanwhile makes this entry stale
+        await self._store(key, versions, value, fresh_ttl + stale_ttl)
+        return value
+
+    async def _revalidate(
+        self,
+        key: str,
+        versions: list[int],
+        compute: Callable[[AsyncSession], Awaitable[BaseModel]],
+        ttl: int,
+    ) -> None:
+        # One refresher per entry across all workers
+        try:
+            if not await self._redis.set(f"{key}:refresh", 1, nx=True, ex=30):
+                return
+            async with async_session_factory() as session:
+                value = await compute(session)
+        except Exception:
+            logger.warning("result_cache_refresh_failed", key=key, exc_info=True)
+            return
+        await self._store(key, versions, value, ttl)
+
+    async def _store(self, key: str, versions: list[int], value: BaseModel, ttl: int) -> None:
+        header = json.dumps([versions, time.time()])
+        try:
+            await self._redis.set(key, f"{header}\n{value.model_dump_json()}", ex=ttl)
+        except Exception:
+            logger.warning("result_cache_write_failed", key=key, exc_info=True)
+
+    @staticmethod
+    def _key(namespace: str, params: dict[str, Any]) -> str:
+        normalised = {k: sorted(v) if isinstance(v, list) else v for k, v in params.items()}
+        digest = hashlib.sha1(
+            json.dumps(normalised, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"{KEY_PREFIX}:{namespace}:{digest}"
+
+    # ==================== Invalidation ====================
+
+    def mark_dirty(self, session: Session, *tags: str) -> None:
+        """Record table writes; their tags are bumped when the transaction commits."""
+        session.info.setdefault(_WRITE_TAGS, set()).update(tags)
+
+    def bump_soon(self, tags: Iterable[str]) -> None:
+        """Schedule :meth:`bump` from synchronous session event hooks."""
+        self._spawn(self.bump(tags))
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        if self._redis is None:
+            return
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(f"{KEY_PREFIX}:tag:{tag}")
+                await pipe.execute()
+        except Exception:
+            logger.warning("result_cache_bump_failed", exc_info=True)
+
+    # ==================== Metrics ====================
+
+    def _count(self, namespace: str, outcome: str) -> None:
+        self._spawn(self._record(f"{namespace}:{outcome}"))
+
+    async def _record(self, field: str) -> None:
+        try:
+            await self._redis.hincrby(STATS_KEY, field, 1)
+        except Exception:
+            logger.debug("result_cache_stats_failed", exc_info=True)
+
+    async def stats(self) -> dict[str, dict[str, float]]:
+        """Per-namespace outcome counters (all workers) with the hit ratio."""
+        if self._redis is None:
+            return {}
+        raw = await self._redis.hgetall(STATS_KEY)
+        stats: dict[str, dict[str, float]] = {}
+        for field, count in raw.items():
+            namespace, _, outcome = field.rpartition(":")
+            stats.setdefault(namespace, dict.fromkeys(OUTCOMES, 0))[outcome] = int(count)
+        for counters in stats.values():
+            total = sum(counters[o] for o in OUTCOMES)
+            served = counters["hit"] + counters["stale"]
+            counters["hit_ratio"] = round(served / total, 4) if total else 0.0
+        return stats
+
+    def _spawn(self, coro: Awaitable) -> None:
+        try:
+            task = asyncio.get_running_loop().create_task(coro)
+        except RuntimeError:
+            coro.close()
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+
+result_cache = ResultCache()
+
+
+def cached_result(
+    namespace: str,
+    *,
+    tags: tuple[str, ...],
+    fresh_ttl: int = 60,
+    stale_ttl: int = 300,
+):
+    """Cache a service method returning a pydantic model.
+
+    The service must take ``db`` as its only constructor argument and keep it as
+    ``self.db``; background refreshes build a new instance on their own session.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        model = typing.get_type_hints(func)["return"]
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            params.pop("self")
+
+            def compute(db: AsyncSession):
+                return func(self if db is self.db else type(self)(db), *args, **kwargs)
+
+            return await result_cache.get_or_compute(
+                self.db, namespace, params, tags, model, compute, fresh_ttl, stale_ttl
+            )
+
+        return wrapper
+
+    return decorator
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    tables = {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(obj, "__table__")
+    }
+    if tables:
+        result_cache.mark_dirty(session, *tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None:
+            result_cache.mark_dirty(state.session, table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    tags = session.info.pop(_WRITE_TAGS, None)
+    if tags:
+        result_cache.bump_soon(tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_WRITE_TAGS, None)
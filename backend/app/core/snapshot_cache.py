@@ -0,0 +1,145 @@
+"""Process-wide immutable snapshots of small reference tables, invalidated over Redis.
+
+Each worker keeps one snapshot built from a single load. Services that write the
+underlying tables mark their session dirty; once that transaction commits the
+local snapshot is dropped and a new version is published on the cache's Redis
+channel so the other workers drop theirs too. A session holding uncommitted
+writes gets a private snapshot that is never shared.
+"""
+
+import abc
+import asyncio
+from typing import Generic, TypeVar
+
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.logging import logger
+
+T = TypeVar("T")
+C = TypeVar("C", bound="SnapshotCache")
+
+_caches: list["SnapshotCache"] = []
+
+
+class SnapshotCache(abc.ABC, Generic[T]):
+    """Subclasses set ``name`` and implement :meth:`_load`."""
+
+    name: str
+
+    def __init__(self):
+        self._snapshot: T | None = None
+        # Bumped on every invalidation so a load racing with a write is discarded
+        self._generation = 0
+        self.version = 0
+        self._redis: Redis | None = None
+        self._listener: asyncio.Task | None = None
+        self._pending: set[asyncio.Task] = set()
+
+    @property
+    def channel(self) -> str:
+        return f"{self.name}:invalidate"
+
+    @property
+    def version_key(self) -> str:
+        return f"{self.name}:version"
+
+    @property
+    def dirty_flag(self) -> str:
+        return f"{self.name}_dirty"
+
+    async def get(self, db: AsyncSession) -> T:
+        if db.sync_session.info.get(self.dirty_flag):
+            # Uncommitted changes: build a private snapshot, never share it
+            return await self._load(db)
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Concurrent misses may each load once; the load is a single query
+            generation = self._generation
+            snapshot = await self._load(db)
+            if generation == self._generation:
+                self._snapshot = snapshot
+        return snapshot
+
+    @abc.abstractmethod
+    async def _load(self, db: AsyncSession) -> T:
+        """Build a fresh snapshot from the database."""
+
+    def invalidate(self, version: int | None = None) -> None:
+        self._generation += 1
+        self._snapshot = None
+        if version is not None and version > self.version:
+            self.version = version
+
+    def mark_dirty(self, db: AsyncSession) -> None:
+        """Record a write; the cache is invalidated when the transaction ends."""
+        db.sync_session.info[self.dirty_flag] = True
+        self.invalidate()
+
+    def publish_soon(self) -> None:
+        """Schedule :meth:`publish` from synchronous session event hooks."""
+        try:
+            task = asyncio.get_running_loop().create_task(self.publish())
+        except RuntimeError:
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def publish(self) -> None:
+        if self._redis is None:
+            return
+        try:
+            version = await self._redis.incr(self.version_key)
+            self.invalidate(version)
+            await self._redis.publish(self.channel, version)
+        except Exception:
+            logger.warning(f"{self.name}_publish_failed", exc_info=True)
+
+    async def start(self, redis: Redis) -> None:
+        self._redis = redis
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        self._redis = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.invalidate(int(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(f"{self.name}_listener_error", exc_info=True)
+                # Updates may have been missed while disconnected
+                self.invalidate()
+                await asyncio.sleep(1)
+
+
+def register(cache: C) -> C:
+    """Have ``cache`` follow the commits and rollbacks of every session."""
+    _caches.append(cache)
+    return cache
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    for cache in _caches:
+        if session.info.pop(cache.dirty_flag, False):
+            cache.invalidate()
+            cache.publish_soon()
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    for cache in _caches:
+        if session.info.pop(cache.dirty_flag, False):
+            cache.invalidate()
@@ -6,6 +6,7 @@ from fastapi.responses import JSONResponse
 
 from app.api.v1.router import api_router
 from app.config import settings
+from app.core.events import event_bus
 from app.core.exceptions import (
     AppError,
     BusinessError,
@@ -14,14 +15,25 @@ from app.core.exceptions import (
     PermissionDeniedError,
 )
 from app.core.logging import setup_logging
+from app.core.result_cache import result_cache
 from app.dependencies import create_redis_pool
+from app.services.category_tree_cache import category_tree_cache
+from app.services.supplier_price_cache import supplier_price_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     setup_logging()
     app.state.redis = await create_redis_pool()
+    await category_tree_cache.start(app.state.redis)
+    await supplier_price_cache.start(app.state.redis)
+    await result_cache.start(app.state.redis)
+    await event_bus.start(app.state.redis)
     yield
+    await event_bus.stop()
+    await result_cache.stop()
+    await supplier_price_cache.stop()
+    await category_tree_cache.stop()
     await app.state.redis.aclose()
 
 
@@ -7,13 +7,21 @@ from app.models.container import (
     ContainerStuffingRecord,
 )
 from app.models.customer import Customer
-from app.models.logistics import LogisticsCost, LogisticsRecord
+from app.models.fact import (
+    fact_container_daily,
+    fact_purchase_daily,
+    fact_sales_daily,
+    fact_sales_product_daily,
+)
+from app.models.fx_rate import FxRate
+from app.models.logistics import LandedCostAllocation, LogisticsCost, LogisticsRecord
 from app.models.outbound import OutboundOrder, OutboundOrderItem
 from app.models.product import Product
 from app.models.product_category import ProductCategoryModel
 from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem
 from app.models.sales_order import SalesOrder, SalesOrderItem
-from app.models.supplier import Supplier, SupplierProduct
+from app.models.sequence import BusinessSequence
+from app.models.supplier import Supplier, SupplierPrice, SupplierProduct
 from app.models.system_config import SystemConfig
 from app.models.user import User
 from app.models.warehouse import InventoryRecord, ReceivingNote, ReceivingNoteItem
@@ -21,12 +29,15 @@ from app.models.warehouse import InventoryRecord, ReceivingNote, ReceivingNoteIt
 __all__ = [
     "AuditLog",
     "Base",
+    "BusinessSequence",
     "ContainerPlan",
     "ContainerPlanItem",
     "ContainerStuffingPhoto",
     "ContainerStuffingRecord",
     "Customer",
+    "FxRate",
     "InventoryRecord",
+    "LandedCostAllocation",
     "LogisticsCost",
     "LogisticsRecord",
     "OutboundOrder",
@@ -40,7 +51,12 @@ __all__ = [
     "SalesOrder",
     "SalesOrderItem",
     "Supplier",
+    "SupplierPrice",
     "SupplierProduct",
     "SystemConfig",
     "User",
+    "fact_container_daily",
+    "fact_purchase_daily",
+    "fact_sales_daily",
+    "fact_sales_product_daily",
 ]
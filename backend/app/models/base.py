@@ -25,3 +25,16 @@ class AuditMixin:
     updated_by: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id"), nullable=True
     )
+
+
+class EagerDefaultsMixin:
+    """Server-generated columns (created_at / updated_at) come back with the INSERT or
+    UPDATE via RETURNING, so a flushed object never needs a refresh before serializing.
+
+    Only for the aggregates whose services patch the loaded object in place and
+    return it (orders, container plans, logistics records) and for rows returned
+    straight from a batched insert (supplier prices). Every other model is
+    refreshed by ``BaseRepository.create/update``.
+    """
+
+    __mapper_args__ = {"eager_defaults": True}
@@ -18,7 +18,7 @@ from sqlalchemy import (
 from sqlalchemy.dialects.postgresql import ENUM, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import AuditMixin, Base
+from app.models.base import AuditMixin, Base, EagerDefaultsMixin
 from app.models.enums import ContainerPlanStatus, ContainerType
 
 if TYPE_CHECKING:
@@ -36,7 +36,7 @@ container_plan_sales_orders = Table(
 )
 
 
-class ContainerPlan(AuditMixin, Base):
+class ContainerPlan(AuditMixin, EagerDefaultsMixin, Base):
     __tablename__ = "container_plans"
 
     plan_no: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
@@ -74,7 +74,7 @@ class ContainerPlan(AuditMixin, Base):
     )
 
 
-class ContainerPlanItem(Base):
+class ContainerPlanItem(EagerDefaultsMixin, Base):
     __tablename__ = "container_plan_items"
 
     container_plan_id: Mapped[uuid.UUID] = mapped_column(
@@ -97,7 +97,7 @@ class ContainerPlanItem(Base):
     container_plan: Mapped[ContainerPlan] = relationship(back_populates="items")
 
 
-class ContainerStuffingRecord(AuditMixin, Base):
+class ContainerStuffingRecord(AuditMixin, EagerDefaultsMixin, Base):
     __tablename__ = "container_stuffing_records"
 
     container_plan_id: Mapped[uuid.UUID] = mapped_column(
@@ -116,7 +116,7 @@ class ContainerStuffingRecord(AuditMixin, Base):
     )
 
 
-class ContainerStuffingPhoto(Base):
+class ContainerStuffingPhoto(EagerDefaultsMixin, Base):
     __tablename__ = "container_stuffing_photos"
 
     stuffing_record_id: Mapped[uuid.UUID] = mapped_column(
@@ -1,7 +1,6 @@
 import enum
 
 
-
 class ProductStatus(str, enum.Enum):
     ACTIVE = "active"
     INACTIVE = "inactive"
@@ -114,6 +113,12 @@ class LogisticsCostType(str, enum.Enum):
     OTHER = "other"
 
 
+class AllocationMethod(str, enum.Enum):
+    VOLUME = "volume"
+    WEIGHT = "weight"
+    VALUE = "value"
+
+
 class OutboundOrderStatus(str, enum.Enum):
     DRAFT = "draft"
     CONFIRMED = "confirmed"
@@ -0,0 +1,57 @@
+"""Daily pre-aggregated fact tables read by the statistics module.
+
+Each row is the aggregate of one day-slice of the source table. Slices are
+recomputed (delete + insert-select) whenever an order in them is written, and the
+whole range can be rebuilt with ``scripts/rebuild_facts.py``.
+"""
+
+from sqlalchemy import Column, Date, Integer, Numeric, Table
+from sqlalchemy.dialects.postgresql import ENUM, UUID
+
+from app.models.base import Base
+
+_currency = ENUM(name="currency_type", create_type=False)
+_container_type = ENUM(name="container_type", create_type=False)
+
+# sales_orders by order_date x customer (x currency)
+fact_sales_daily = Table(
+    "fact_sales_daily",
+    Base.metadata,
+    Column("day", Date, primary_key=True),
+    Column("customer_id", UUID(as_uuid=True), primary_key=True),
+    Column("currency", _currency, primary_key=True),
+    Column("order_count", Integer, nullable=False),
+    Column("total_amount", Numeric(16, 2), nullable=False),
+)
+
+# sales_order_items by order_date x customer x product (x currency)
+fact_sales_product_daily = Table(
+    "fact_sales_product_daily",
+    Base.metadata,
+    Column("day", Date, primary_key=True),
+    Column("customer_id", UUID(as_uuid=True), primary_key=True),
+    Column("product_id", UUID(as_uuid=True), primary_key=True),
+    Column("currency", _currency, primary_key=True),
+    Column("total_quantity", Integer, nullable=False),
+    Column("total_amount", Numeric(16, 2), nullable=False),
+)
+
+# purchase_orders by order_date x supplier
+fact_purchase_daily = Table(
+    "fact_purchase_daily",
+    Base.metadata,
+    Column("day", Date, primary_key=True),
+    Column("supplier_id", UUID(as_uuid=True), primary_key=True),
+    Column("order_count", Integer, nullable=False),
+    Column("total_amount", Numeric(16, 2), nullable=False),
+)
+
+# container_plans by created date x container_type
+fact_container_daily = Table(
+    "fact_container_daily",
+    Base.metadata,
+    Column("day", Date, primary_key=True),
+    Column("container_type", _container_type, primary_key=True),
+    Column("plan_count", Integer, nullable=False),
+    Column("container_count", Integer, nullable=False),
+)
@@ -0,0 +1,31 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Date, Numeric, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+from app.models.enums import CurrencyType
+
+
+class FxRate(Base):
+    """Daily exchange rate: one unit of ``currency`` is worth ``rate`` USD.
+
+    A rate stays in effect until the next rate_date loaded for the currency.
+    """
+
+    __tablename__ = "fx_rates"
+    __table_args__ = (UniqueConstraint("currency", "rate_date", name="uq_fx_rates_currency_date"),)
+
+    rate_date: Mapped[date] = mapped_column(Date, nullable=False)
+    currency: Mapped[CurrencyType] = mapped_column(
+        ENUM(
+            CurrencyType,
+            name="currency_type",
+            create_type=False,
+            values_callable=lambda e: [m.value for m in e],
+        ),
+        nullable=False,
+    )
+    rate: Mapped[Decimal] = mapped_column(Numeric(18, 8), nullable=False)
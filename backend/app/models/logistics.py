@@ -1,15 +1,16 @@
 import uuid
 from datetime import date
+from decimal import Decimal
 
-from sqlalchemy import Date, ForeignKey, Numeric, String, Text
+from sqlalchemy import Boolean, Date, ForeignKey, Numeric, String, Text
 from sqlalchemy.dialects.postgresql import ENUM, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import AuditMixin, Base
-from app.models.enums import CurrencyType, LogisticsCostType, LogisticsStatus
+from app.models.base import AuditMixin, Base, EagerDefaultsMixin
+from app.models.enums import AllocationMethod, CurrencyType, LogisticsCostType, LogisticsStatus
 
 
-class LogisticsRecord(AuditMixin, Base):
+class LogisticsRecord(AuditMixin, EagerDefaultsMixin, Base):
     __tablename__ = "logistics_records"
 
     logistics_no: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
@@ -37,6 +38,8 @@ class LogisticsRecord(AuditMixin, Base):
     )
     customs_declaration_no: Mapped[str | None] = mapped_column(String(100), nullable=True)
     total_cost: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, server_default="0")
+    # Set when a landed cost re-allocation could not run; cleared by the next one that does
+    allocation_stale: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default="false")
     remark: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     costs: Mapped[list["LogisticsCost"]] = relationship(
@@ -44,7 +47,7 @@ class LogisticsRecord(AuditMixin, Base):
     )
 
 
-class LogisticsCost(Base):
+class LogisticsCost(EagerDefaultsMixin, Base):
     __tablename__ = "logistics_costs"
 
     logistics_record_id: Mapped[uuid.UUID] = mapped_column(
@@ -72,3 +75,49 @@ class LogisticsCost(Base):
     remark: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     logistics_record: Mapped["LogisticsRecord"] = relationship(back_populates="costs")
+
+
+class LandedCostAllocation(Base):
+    """Share of one logistics record's costs (in one currency) borne by a plan item."""
+
+    __tablename__ = "landed_cost_allocations"
+
+    logistics_record_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("logistics_records.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    container_plan_item_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("container_plan_items.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # Denormalised from the plan item for the margin report
+    sales_order_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("sales_orders.id"), nullable=True, index=True
+    )
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("products.id"), nullable=False
+    )
+    method: Mapped[AllocationMethod] = mapped_column(
+        ENUM(
+            AllocationMethod,
+            name="allocation_method",
+            create_type=False,
+            values_callable=lambda e: [m.value for m in e],
+        ),
+        nullable=False,
+    )
+    currency: Mapped[CurrencyType] = mapped_column(
+        ENUM(
+            CurrencyType,
+            name="currency_type",
+            create_type=False,
+            values_callable=lambda e: [m.value for m in e],
+        ),
+        nullable=False,
+    )
+    # Volume (CBM), weight (kg) or USD value of the item, per the method
+    basis: Mapped[Decimal] = mapped_column(Numeric(16, 4), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False)
@@ -1,7 +1,7 @@
 import uuid
 
-from sqlalchemy import ForeignKey, Integer, Numeric, String, Text
-from sqlalchemy.dialects.postgresql import ENUM, UUID
+from sqlalchemy import DDL, ForeignKey, Index, Integer, Numeric, String, Text, event, func
+from sqlalchemy.dialects.postgresql import ARRAY, ENUM, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import AuditMixin, Base
@@ -47,3 +47,26 @@ class Product(AuditMixin, Base):
     remark: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     category = relationship("ProductCategoryModel", lazy="joined")
+
+
+# Lower-cased unigrams and bigrams of the searchable columns. pg_trgm indexes cannot
+# serve queries shorter than three characters, which most Chinese product name
+# searches are; an array of grams in a GIN index can, for any query length.
+_SEARCH_GRAMS_FUNCTION = DDL(
+    """
+    CREATE OR REPLACE FUNCTION product_search_grams(VARIADIC fields text[])
+    RETURNS text[] LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT coalesce(array_agg(DISTINCT substr(f, i, n)), '{}')
+        FROM unnest(fields) AS field,
+            lower(field) AS f,
+            generate_series(1, 2) AS n,
+            generate_series(1, length(f) - n + 1) AS i
+    $$
+    """
+)
+event.listen(Base.metadata, "before_create", _SEARCH_GRAMS_FUNCTION)
+
+search_grams = func.product_search_grams(
+    Product.sku_code, Product.name_cn, Product.name_en, Product.brand, type_=ARRAY(Text)
+)
+Index("idx_products_search_grams", search_grams, postgresql_using="gin")
@@ -1,11 +1,32 @@
 import uuid
 
-from sqlalchemy import ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Table, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
 
+# Closure table: one row per (ancestor, descendant) pair, including depth-0 self rows,
+# so subtree and "level-N ancestor" lookups are single indexed joins.
+product_category_closure = Table(
+    "product_category_closure",
+    Base.metadata,
+    Column(
+        "ancestor_id",
+        UUID(as_uuid=True),
+        ForeignKey("product_categories.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "descendant_id",
+        UUID(as_uuid=True),
+        ForeignKey("product_categories.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("depth", Integer, nullable=False),
+    Index("idx_category_closure_descendant", "descendant_id", "depth"),
+)
+
 
 class ProductCategoryModel(Base):
     __tablename__ = "product_categories"
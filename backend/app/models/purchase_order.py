@@ -18,7 +18,7 @@ from sqlalchemy import (
 from sqlalchemy.dialects.postgresql import ENUM, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import AuditMixin, Base
+from app.models.base import AuditMixin, Base, EagerDefaultsMixin
 from app.models.enums import PurchaseOrderStatus, UnitType
 
 if TYPE_CHECKING:
@@ -36,7 +36,7 @@ purchase_order_sales_orders = Table(
 )
 
 
-class PurchaseOrder(AuditMixin, Base):
+class PurchaseOrder(AuditMixin, EagerDefaultsMixin, Base):
     __tablename__ = "purchase_orders"
 
     order_no: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
@@ -66,7 +66,7 @@ class PurchaseOrder(AuditMixin, Base):
     )
 
 
-class PurchaseOrderItem(Base):
+class PurchaseOrderItem(EagerDefaultsMixin, Base):
     __tablename__ = "purchase_order_items"
 
     purchase_order_id: Mapped[uuid.UUID] = mapped_column(
@@ -3,9 +3,9 @@ from datetime import date
 
 from sqlalchemy import Date, ForeignKey, Integer, Numeric, String, Text
 from sqlalchemy.dialects.postgresql import ENUM, UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, query_expression, relationship
 
-from app.models.base import AuditMixin, Base
+from app.models.base import AuditMixin, Base, EagerDefaultsMixin
 from app.models.enums import (
     CurrencyType,
     PaymentMethod,
@@ -15,7 +15,7 @@ from app.models.enums import (
 )
 
 
-class SalesOrder(AuditMixin, Base):
+class SalesOrder(AuditMixin, EagerDefaultsMixin, Base):
     __tablename__ = "sales_orders"
 
     order_no: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
@@ -73,8 +73,12 @@ class SalesOrder(AuditMixin, Base):
         back_populates="sales_order", cascade="all, delete-orphan"
     )
 
+    # Filled only by list queries that ask for them (SalesOrderRepository.search)
+    purchase_progress: Mapped[float | None] = query_expression()
+    arrival_progress: Mapped[float | None] = query_expression()
 
-class SalesOrderItem(Base):
+
+class SalesOrderItem(EagerDefaultsMixin, Base):
     __tablename__ = "sales_order_items"
 
     sales_order_id: Mapped[uuid.UUID] = mapped_column(
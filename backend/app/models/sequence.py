@@ -0,0 +1,19 @@
+from sqlalchemy import Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class BusinessSequence(Base):
+    """Last number handed out for a business-number prefix and period.
+
+    ``period`` is the ``YYYYMMDD`` day for dated numbers (SO-20260227-001) and
+    empty for running entity codes (CUS-0001).
+    """
+
+    __tablename__ = "business_sequences"
+    __table_args__ = (UniqueConstraint("prefix", "period", name="uq_business_sequences_key"),)
+
+    prefix: Mapped[str] = mapped_column(String(20), nullable=False)
+    period: Mapped[str] = mapped_column(String(8), nullable=False, default="")
+    last_value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
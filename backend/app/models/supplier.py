@@ -1,10 +1,12 @@
 import uuid
+from datetime import date
+from decimal import Decimal
 
-from sqlalchemy import ForeignKey, Numeric, String, Text, UniqueConstraint
+from sqlalchemy import Date, ForeignKey, Index, Integer, Numeric, String, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import AuditMixin, Base
+from app.models.base import AuditMixin, Base, EagerDefaultsMixin
 
 
 class Supplier(AuditMixin, Base):
@@ -28,6 +30,9 @@ class Supplier(AuditMixin, Base):
     products: Mapped[list["SupplierProduct"]] = relationship(
         back_populates="supplier", cascade="all, delete-orphan"
     )
+    prices: Mapped[list["SupplierPrice"]] = relationship(
+        back_populates="supplier", cascade="all, delete-orphan"
+    )
 
 
 class SupplierProduct(Base):
@@ -44,3 +49,27 @@ class SupplierProduct(Base):
     remark: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     supplier: Mapped["Supplier"] = relationship(back_populates="products")
+
+
+class SupplierPrice(EagerDefaultsMixin, Base):
+    """One tier of a supplier's price list.
+
+    The price applies to orders of at least ``min_quantity`` placed between
+    ``valid_from`` and ``valid_to`` inclusive; an open bound never expires.
+    """
+
+    __tablename__ = "supplier_prices"
+    __table_args__ = (Index("idx_supplier_prices_supplier", "supplier_id", "product_id"),)
+
+    supplier_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("suppliers.id"), nullable=False
+    )
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("products.id"), nullable=False
+    )
+    min_quantity: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
+    unit_price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    valid_from: Mapped[date | None] = mapped_column(Date, nullable=True)
+    valid_to: Mapped[date | None] = mapped_column(Date, nullable=True)
+
+    supplier: Mapped["Supplier"] = relationship(back_populates="prices")
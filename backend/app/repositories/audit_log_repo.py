@@ -1,11 +1,12 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.audit_log import AuditLog
 from app.models.enums import AuditAction
+from app.repositories.base import ListPage, paginate
 
 
 class AuditLogRepository:
@@ -46,10 +47,9 @@ class AuditLogRepository:
         limit: int = 20,
         order_by: str = "created_at",
         order_desc: bool = True,
-    ) -> tuple[list[AuditLog], int]:
-        query = select(AuditLog)
-        count_query = select(func.count()).select_from(AuditLog)
-
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> ListPage[AuditLog]:
         filters = []
         if user_id:
             filters.append(AuditLog.user_id == user_id)
@@ -62,20 +62,16 @@ class AuditLogRepository:
         if date_to:
             filters.append(AuditLog.created_at <= datetime.fromisoformat(date_to + "T23:59:59"))
 
-        for f in filters:
-            query = query.where(f)
-            count_query = count_query.where(f)
-
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar_one()
-
-        order_col = getattr(AuditLog, order_by, AuditLog.created_at)
-        if order_desc:
-            query = query.order_by(order_col.desc())
-        else:
-            query = query.order_by(order_col.asc())
-
-        query = query.offset(offset).limit(limit)
-        result = await self.db.execute(query)
-        items = list(result.scalars().all())
-        return items, total
+        return await paginate(
+            self.db,
+            AuditLog,
+            select(AuditLog),
+            offset=offset,
+            limit=limit,
+            order_by=order_by,
+            order_desc=order_desc,
+            filters=filters,
+            cursor=cursor,
+            include_total=include_total,
+            approximate_total=True,
+        )
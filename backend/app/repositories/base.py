@@ -1,15 +1,244 @@
+import base64
+import enum
+import json
+import operator
 import uuid
-from typing import Any, Generic, TypeVar
+from collections.abc import Sequence
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Generic, NamedTuple, TypeVar
 
-from sqlalchemy import func, select
+from sqlalchemy import Column, Select, and_, case, func, inspect, or_, select, text, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
+from app.config import settings
+from app.core.exceptions import BusinessError
 from app.models.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
+T = TypeVar("T")
+
+
+class ListPage(NamedTuple, Generic[T]):
+    items: list[T]
+    total: int | None
+    next_cursor: str | None = None
+    total_is_estimate: bool = False
+
+
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a statement, with its parameters bound as usual."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally (use with ``escape="\\"``)."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def estimate_rows(db: AsyncSession, model: type[Base], filters: list[Any]) -> int:
+    """Planner row estimate: table statistics unfiltered, the query plan otherwise.
+
+    Returns -1 when the table has never been analyzed.
+    """
+    if not filters:
+        reltuples = await db.scalar(
+            text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": model.__tablename__},
+        )
+        return int(reltuples) if reltuples is not None else -1
+    plan = await db.scalar(Explain(select(model.id).where(*filters)))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(
+    db: AsyncSession, model: type[Base], filters: list[Any], *, approximate: bool = False
+) -> tuple[int, bool]:
+    """``(total, is_estimate)``: exact ``count(*)`` unless ``approximate`` and the
+    estimate is at least ``APPROX_COUNT_THRESHOLD``, where exact counts get expensive.
+    """
+    if approximate:
+        estimate = await estimate_rows(db, model, filters)
+        if estimate >= settings.APPROX_COUNT_THRESHOLD:
+            return estimate, True
+    count_query = select(func.count()).select_from(model).where(*filters)
+    return (await db.execute(count_query)).scalar_one(), False
+
+
+def sparse_fields(
+    model: type[Base], fields: Sequence[str] | None, schema: type[Any]
+) -> list[str] | None:
+    """Validate a ``fields=`` projection: each name must be a mapped column of
+    ``model`` that ``schema`` (the full read schema) also exposes.
+    """
+    if not fields:
+        return None
+    allowed = set(schema.model_fields) & _column_names(model)
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise BusinessError(
+            code=42285,
+            message="不支持的字段",
+            detail={"fields": unknown, "allowed": sorted(allowed)},
+        )
+    return list(dict.fromkeys(fields))
+
+
+def _invalid_cursor() -> BusinessError:
+    return BusinessError(code=42284, message="无效的分页游标，请从第一页重新加载")
+
+
+def _column_names(model: type[Base]) -> set[str]:
+    """Attributes mapped to table columns (``query_expression`` attributes excluded)."""
+    return {key for key, col in inspect(model).columns.items() if isinstance(col, Column)}
+
+
+def _sort_key(model: type[Base], order_by: str) -> str:
+    """Mapped column to sort on; unknown names fall back to ``created_at``."""
+    return order_by if order_by in _column_names(model) else "created_at"
+
+
+def encode_cursor(order_by: str, order_desc: bool, value: Any, id: uuid.UUID) -> str:
+    """Opaque token for the position after the row with sort ``value`` and ``id``."""
+    if isinstance(value, enum.Enum):
+        value = value.value
+    elif isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    elif isinstance(value, (Decimal, uuid.UUID)):
+        value = str(value)
+    payload = json.dumps({"s": order_by, "d": order_desc, "v": value, "i": str(id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key: str, column: Any, order_desc: bool) -> tuple[Any, uuid.UUID]:
+    """``(sort value, id)`` of a cursor made for the same sort column and direction."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["s"] != key or payload["d"] != order_desc:
+            raise _invalid_cursor()
+        value, id = payload["v"], uuid.UUID(payload["i"])
+        if value is not None:
+            python_type = column.type.python_type
+            if python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+            elif python_type is not str:
+                value = python_type(value)
+    # ArithmeticError: decimal.InvalidOperation from a malformed Numeric value
+    except (ValueError, TypeError, KeyError, ArithmeticError, NotImplementedError):
+        raise _invalid_cursor()
+    return value, id
+
+
+def _after_cursor(column: Any, id_column: Any, order_desc: bool, value: Any, id: uuid.UUID) -> Any:
+    """Rows strictly after ``(value, id)`` in ``(column, id)`` order.
+
+    Postgres sorts NULLs last ascending and first descending, so nullable
+    columns spell the comparison out; non-null ones use a row comparison that
+    the ``(column, id)`` indexes can serve directly.
+    """
+    if column is id_column:
+        return id_column < id if order_desc else id_column > id
+    id_after = id_column < id if order_desc else id_column > id
+    if not column.nullable:
+        if order_desc:
+            return tuple_(column, id_column) < tuple_(value, id)
+        return tuple_(column, id_column) > tuple_(value, id)
+    if value is None:
+        tie = and_(column.is_(None), id_after)
+        return or_(tie, column.isnot(None)) if order_desc else tie
+    after = or_(column < value if order_desc else column > value, and_(column == value, id_after))
+    return after if order_desc else or_(after, column.is_(None))
+
+
+async def paginate(
+    db: AsyncSession,
+    model: type[Base],
+    query: Select,
+    *,
+    offset: int = 0,
+    limit: int = 20,
+    order_by: str = "created_at",
+    order_desc: bool = True,
+    filters: list[Any] | None = None,
+    cursor: str | None = None,
+    include_total: bool = True,
+    approximate_total: bool = False,
+    fields: Sequence[str] | None = None,
+) -> ListPage:
+    """Run a list query a page at a time.
+
+    Rows are ordered by the sort column with ``id`` as tie-break, so every row
+    has a unique position. With a ``cursor`` the page starts right after the row
+    it encodes (keyset pagination) and ``offset`` is ignored; ``next_cursor`` is
+    set whenever more rows follow. ``total`` is None when ``include_total`` is
+    off, which skips the count query, and may be a planner estimate with
+    ``approximate_total`` (see ``count_rows``).
+
+    With ``fields`` (see ``sparse_fields``) only those columns plus ``id`` are
+    selected instead of ``query``'s entities, and items are plain dicts.
+    """
+    filters = list(filters or [])
+    total, total_is_estimate = None, False
+    if include_total:
+        total, total_is_estimate = await count_rows(
+            db, model, filters, approximate=approximate_total
+        )
+
+    mapper = inspect(model)
+    sort_key = _sort_key(model, order_by)
+    order_col = mapper.columns[sort_key]
+    id_col = mapper.columns["id"]
+    if fields:
+        output = list(dict.fromkeys(["id", *fields]))
+        query = select(
+            *(mapper.columns[name].label(name) for name in dict.fromkeys([*output, sort_key]))
+        )
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_key, order_col, order_desc)
+        filters.append(_after_cursor(order_col, id_col, order_desc, value, last_id))
+        offset = 0
+
+    order_cols = [order_col] if order_col is id_col else [order_col, id_col]
+    query = query.where(*filters).order_by(
+        *(col.desc() if order_desc else col.asc() for col in order_cols)
+    )
+    result = await db.execute(query.offset(offset).limit(limit + 1))
+    if fields:
+        rows = result.mappings().all()
+        get = operator.getitem
+    else:
+        rows = result.scalars().unique().all()
+        get = getattr
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort_key, order_desc, get(last, sort_key), get(last, "id"))
+    if fields:
+        items = [{name: row[name] for name in output} for row in rows]
+    else:
+        items = list(rows)
+    return ListPage(items, total, next_cursor, total_is_estimate)
 
 
 class BaseRepository(Generic[ModelType]):
+    # Large, append-heavy tables report estimated totals (see count_rows)
+    approximate_total = False
+
     def __init__(self, model: type[ModelType], db: AsyncSession):
         self.model = model
         self.db = db
@@ -26,36 +255,65 @@ class BaseRepository(Generic[ModelType]):
         order_by: str = "created_at",
         order_desc: bool = True,
         filters: list[Any] | None = None,
-    ) -> tuple[list[ModelType], int]:
-        query = select(self.model)
-        count_query = select(func.count()).select_from(self.model)
-
-        if filters:
-            for f in filters:
-                query = query.where(f)
-                count_query = count_query.where(f)
-
-        # Count total
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar_one()
+        cursor: str | None = None,
+        include_total: bool = True,
+        fields: Sequence[str] | None = None,
+    ) -> ListPage[ModelType]:
+        return await paginate(
+            self.db,
+            self.model,
+            select(self.model),
+            offset=offset,
+            limit=limit,
+            order_by=order_by,
+            order_desc=order_desc,
+            filters=filters,
+            cursor=cursor,
+            include_total=include_total,
+            approximate_total=self.approximate_total,
+            fields=fields,
+        )
 
-        # Ordering
-        order_col = getattr(self.model, order_by, self.model.created_at)
-        if order_desc:
-            query = query.order_by(order_col.desc())
-        else:
-            query = query.order_by(order_col.asc())
+    async def suggest(
+        self,
+        keyword: str,
+        *,
+        code_column: Any,
+        name_columns: list[Any],
+        limit: int = 10,
+        filters: list[Any] | None = None,
+    ) -> list[tuple[uuid.UUID, str, str]]:
+        """Top-N typeahead matches as ``(id, code, name)`` tuples, without a total count.
 
-        query = query.offset(offset).limit(limit)
+        Code prefix matches rank first, then trigram similarity of the first name
+        column. The trigram GIN indexes serve the ILIKE predicates only for keywords
+        of three or more characters; shorter ones extract no trigrams and scan, so
+        callers either enforce that minimum or pass an indexed prefilter in
+        ``filters`` (see ``ProductRepository.suggest``).
+        """
+        escaped = escape_like(keyword)
+        code_prefix = code_column.ilike(f"{escaped}%", escape="\\")
+        query = (
+            select(self.model.id, code_column, name_columns[0])
+            .where(
+                or_(code_prefix, *(col.ilike(f"%{escaped}%", escape="\\") for col in name_columns))
+            )
+            .order_by(
+                case((code_prefix, 0), else_=1),
+                func.similarity(name_columns[0], keyword).desc(),
+                code_column,
+            )
+            .limit(limit)
+        )
+        if filters:
+            query = query.where(*filters)
         result = await self.db.execute(query)
-        items = list(result.scalars().all())
-
-        return items, total
+        return [tuple(row) for row in result.all()]
 
     async def create(self, obj: ModelType) -> ModelType:
         self.db.add(obj)
         await self.db.flush()
-        await self.db.refresh(obj)
+        await self._load_server_values(obj)
         return obj
 
     async def update(self, obj: ModelType, data: dict[str, Any]) -> ModelType:
@@ -63,9 +321,14 @@ class BaseRepository(Generic[ModelType]):
             if value is not None:
                 setattr(obj, key, value)
         await self.db.flush()
-        await self.db.refresh(obj)
+        await self._load_server_values(obj)
         return obj
 
+    async def _load_server_values(self, obj: ModelType) -> None:
+        # Models with eager_defaults already got them back through RETURNING
+        if inspect(type(obj)).eager_defaults is not True:
+            await self.db.refresh(obj)
+
     async def delete(self, obj: ModelType) -> None:
         await self.db.delete(obj)
         await self.db.flush()
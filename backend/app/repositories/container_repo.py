@@ -1,10 +1,10 @@
 import uuid
-from datetime import date
 
-from sqlalchemy import func, insert, or_, select
+from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.exceptions import NotFoundError
 from app.models.container import (
     ContainerPlan,
     ContainerPlanItem,
@@ -12,7 +12,8 @@ from app.models.container import (
     ContainerStuffingRecord,
     container_plan_sales_orders,
 )
-from app.repositories.base import BaseRepository
+from app.models.sales_order import SalesOrder
+from app.repositories.base import BaseRepository, ListPage
 
 
 class ContainerPlanRepository(BaseRepository[ContainerPlan]):
@@ -33,14 +34,6 @@ class ContainerPlanRepository(BaseRepository[ContainerPlan]):
         )
         return result.scalar_one_or_none()
 
-    async def count_by_date(self, d: date) -> int:
-        result = await self.db.execute(
-            select(func.count())
-            .select_from(ContainerPlan)
-            .where(func.date(ContainerPlan.created_at) == d)
-        )
-        return result.scalar_one()
-
     async def search(
         self,
         *,
@@ -50,7 +43,9 @@ class ContainerPlanRepository(BaseRepository[ContainerPlan]):
         limit: int = 20,
         order_by: str = "created_at",
         order_desc: bool = True,
-    ) -> tuple[list[ContainerPlan], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> ListPage[ContainerPlan]:
         filters = []
         if status:
             filters.append(ContainerPlan.status == status)
@@ -62,24 +57,31 @@ class ContainerPlanRepository(BaseRepository[ContainerPlan]):
                 )
             )
         return await self.get_list(
-            offset=offset, limit=limit, order_by=order_by, order_desc=order_desc, filters=filters
+            offset=offset,
+            limit=limit,
+            order_by=order_by,
+            order_desc=order_desc,
+            filters=filters,
+            cursor=cursor,
+            include_total=include_total,
         )
 
-    async def link_sales_orders(self, plan_id: uuid.UUID, so_ids: list[uuid.UUID]) -> None:
-        for so_id in so_ids:
-            existing = await self.db.execute(
-                select(container_plan_sales_orders).where(
-                    container_plan_sales_orders.c.container_plan_id == plan_id,
-                    container_plan_sales_orders.c.sales_order_id == so_id,
-                )
-            )
-            if not existing.first():
-                await self.db.execute(
-                    insert(container_plan_sales_orders).values(
-                        container_plan_id=plan_id, sales_order_id=so_id
-                    )
-                )
-        await self.db.flush()
+    async def link_sales_orders(self, plan: ContainerPlan, so_ids: list[uuid.UUID]) -> None:
+        """Add sales orders to the loaded ``plan.sales_orders`` collection.
+
+        Existing links are skipped in memory and the new link rows go out with the
+        next flush, so the collection stays current without reloading the plan.
+        """
+        linked = {so.id for so in plan.sales_orders}
+        new_ids = [so_id for so_id in dict.fromkeys(so_ids) if so_id not in linked]
+        if not new_ids:
+            return
+        result = await self.db.execute(select(SalesOrder).where(SalesOrder.id.in_(new_ids)))
+        found = {so.id: so for so in result.scalars().all()}
+        for so_id in new_ids:
+            if so_id not in found:
+                raise NotFoundError("销售订单", str(so_id))
+            plan.sales_orders.append(found[so_id])
 
     async def get_linked_so_ids(self, plan_id: uuid.UUID) -> list[uuid.UUID]:
         result = await self.db.execute(
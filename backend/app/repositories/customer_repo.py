@@ -1,8 +1,8 @@
-from sqlalchemy import func, or_, select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.customer import Customer
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, ListPage
 
 
 class CustomerRepository(BaseRepository[Customer]):
@@ -15,10 +15,13 @@ class CustomerRepository(BaseRepository[Customer]):
         )
         return result.scalar_one_or_none()
 
-    async def get_next_sequence(self) -> int:
-        result = await self.db.execute(select(func.count()).select_from(Customer))
-        count = result.scalar_one()
-        return count + 1
+    async def get_by_codes(self, customer_codes: list[str]) -> dict[str, Customer]:
+        if not customer_codes:
+            return {}
+        result = await self.db.execute(
+            select(Customer).where(Customer.customer_code.in_(customer_codes))
+        )
+        return {c.customer_code: c for c in result.scalars().all()}
 
     async def search(
         self,
@@ -29,7 +32,9 @@ class CustomerRepository(BaseRepository[Customer]):
         limit: int = 20,
         order_by: str = "created_at",
         order_desc: bool = True,
-    ) -> tuple[list[Customer], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> ListPage[Customer]:
         filters = []
         if keyword:
             filters.append(
@@ -49,4 +54,6 @@ class CustomerRepository(BaseRepository[Customer]):
             order_by=order_by,
             order_desc=order_desc,
             filters=filters,
+            cursor=cursor,
+            include_total=include_total,
         )
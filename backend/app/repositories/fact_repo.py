@@ -0,0 +1,175 @@
+import uuid
+from collections.abc import Callable, Iterable
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import Date, DateTime, Select, Table, cast, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.container import ContainerPlan
+from app.models.enums import ContainerType
+from app.models.fact import (
+    fact_container_daily,
+    fact_purchase_daily,
+    fact_sales_daily,
+    fact_sales_product_daily,
+)
+from app.models.purchase_order import PurchaseOrder
+from app.models.sales_order import SalesOrder, SalesOrderItem
+
+_container_day = cast(ContainerPlan.created_at, Date)
+
+
+def _sales_source(*where: Any) -> Select:
+    return (
+        select(
+            SalesOrder.order_date,
+            SalesOrder.customer_id,
+            SalesOrder.currency,
+            func.count(),
+            func.coalesce(func.sum(SalesOrder.total_amount), 0),
+        )
+        .where(*where)
+        .group_by(SalesOrder.order_date, SalesOrder.customer_id, SalesOrder.currency)
+    )
+
+
+def _sales_product_source(*where: Any) -> Select:
+    return (
+        select(
+            SalesOrder.order_date,
+            SalesOrder.customer_id,
+            SalesOrderItem.product_id,
+            SalesOrder.currency,
+            func.coalesce(func.sum(SalesOrderItem.quantity), 0),
+            func.coalesce(func.sum(SalesOrderItem.amount), 0),
+        )
+        .join(SalesOrder, SalesOrderItem.sales_order_id == SalesOrder.id)
+        .where(*where)
+        .group_by(
+            SalesOrder.order_date,
+            SalesOrder.customer_id,
+            SalesOrderItem.product_id,
+            SalesOrder.currency,
+        )
+    )
+
+
+def _purchase_source(*where: Any) -> Select:
+    return (
+        select(
+            PurchaseOrder.order_date,
+            PurchaseOrder.supplier_id,
+            func.count(),
+            func.coalesce(func.sum(PurchaseOrder.total_amount), 0),
+        )
+        .where(*where)
+        .group_by(PurchaseOrder.order_date, PurchaseOrder.supplier_id)
+    )
+
+
+def _container_source(*where: Any) -> Select:
+    return (
+        select(
+            _container_day,
+            ContainerPlan.container_type,
+            func.count(),
+            func.coalesce(func.sum(ContainerPlan.container_count), 0),
+        )
+        .where(*where)
+        .group_by(_container_day, ContainerPlan.container_type)
+    )
+
+
+class FactRepository:
+    """Maintains the daily fact tables by recomputing whole day-slices.
+
+    Recomputing a slice (delete + insert-select) is idempotent, so callers only
+    need to name every slice a write may have touched, old and new.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def refresh_sales(self, keys: Iterable[tuple[date, uuid.UUID]]) -> None:
+        """Recompute sales facts for (order_date, customer_id) slices."""
+        for day, customer_id in set(keys):
+            await self._lock(f"fact_sales:{day}:{customer_id}")
+            slice_ = (SalesOrder.order_date == day, SalesOrder.customer_id == customer_id)
+            await self._replace(
+                fact_sales_daily,
+                (fact_sales_daily.c.day == day, fact_sales_daily.c.customer_id == customer_id),
+                _sales_source(*slice_),
+            )
+            await self._replace(
+                fact_sales_product_daily,
+                (
+                    fact_sales_product_daily.c.day == day,
+                    fact_sales_product_daily.c.customer_id == customer_id,
+                ),
+                _sales_product_source(*slice_),
+            )
+
+    async def refresh_purchases(self, keys: Iterable[tuple[date, uuid.UUID]]) -> None:
+        """Recompute purchase facts for (order_date, supplier_id) slices."""
+        for day, supplier_id in set(keys):
+            await self._lock(f"fact_purchase:{day}:{supplier_id}")
+            await self._replace(
+                fact_purchase_daily,
+                (
+                    fact_purchase_daily.c.day == day,
+                    fact_purchase_daily.c.supplier_id == supplier_id,
+                ),
+                _purchase_source(
+                    PurchaseOrder.order_date == day, PurchaseOrder.supplier_id == supplier_id
+                ),
+            )
+
+    async def refresh_containers(self, keys: Iterable[tuple[datetime, ContainerType]]) -> None:
+        """Recompute container facts for (created_at, container_type) slices.
+
+        The day is derived in SQL so it matches the session time zone used by the
+        aggregate itself.
+        """
+        for created_at, container_type in set(keys):
+            await self._lock(f"fact_container:{created_at.date()}:{container_type.value}")
+            day = cast(literal(created_at, DateTime(timezone=True)), Date)
+            await self._replace(
+                fact_container_daily,
+                (
+                    fact_container_daily.c.day == day,
+                    fact_container_daily.c.container_type == container_type.value,
+                ),
+                _container_source(
+                    _container_day == day, ContainerPlan.container_type == container_type
+                ),
+            )
+
+    async def rebuild(self, date_from: date | None = None, date_to: date | None = None) -> None:
+        """Rebuild every fact table for a date range (whole history when unbounded)."""
+
+        def day_range(column: Any) -> list[Any]:
+            conditions = []
+            if date_from:
+                conditions.append(column >= date_from)
+            if date_to:
+                conditions.append(column <= date_to)
+            return conditions
+
+        sources: list[tuple[Table, Callable[..., Select], Any]] = [
+            (fact_sales_daily, _sales_source, SalesOrder.order_date),
+            (fact_sales_product_daily, _sales_product_source, SalesOrder.order_date),
+            (fact_purchase_daily, _purchase_source, PurchaseOrder.order_date),
+            (fact_container_daily, _container_source, _container_day),
+        ]
+        for table, source, source_day in sources:
+            await self._replace(table, day_range(table.c.day), source(*day_range(source_day)))
+
+    async def _lock(self, key: str) -> None:
+        # Serialise concurrent refreshes of one slice; otherwise both transactions
+        # delete nothing the other can see and then collide on the primary key.
+        await self.db.execute(select(func.pg_advisory_xact_lock(func.hashtext(key))))
+
+    async def _replace(self, table: Table, where: Iterable[Any], source: Select) -> None:
+        await self.db.execute(delete(table).where(*where))
+        await self.db.execute(insert(table).from_select([c.name for c in table.columns], source))
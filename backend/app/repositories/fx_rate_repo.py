@@ -0,0 +1,55 @@
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.enums import CurrencyType
+from app.models.fx_rate import FxRate
+
+
+class FxRateRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_version(self) -> tuple[int, datetime | None]:
+        """Cheap fingerprint of the table; changes whenever a rate is written."""
+        result = await self.db.execute(select(func.count(), func.max(FxRate.updated_at)))
+        count, updated_at = result.one()
+        return count, updated_at
+
+    async def get_all(self) -> list[tuple[CurrencyType, date, Any]]:
+        result = await self.db.execute(
+            select(FxRate.currency, FxRate.rate_date, FxRate.rate).order_by(
+                FxRate.currency, FxRate.rate_date
+            )
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def list_rates(
+        self,
+        currency: CurrencyType | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ) -> list[FxRate]:
+        query = select(FxRate)
+        if currency:
+            query = query.where(FxRate.currency == currency)
+        if date_from:
+            query = query.where(FxRate.rate_date >= date_from)
+        if date_to:
+            query = query.where(FxRate.rate_date <= date_to)
+        result = await self.db.execute(query.order_by(FxRate.rate_date.desc(), FxRate.currency))
+        return list(result.scalars().all())
+
+    async def upsert_many(self, rows: list[dict[str, Any]], batch_size: int = 1000) -> None:
+        """INSERT ... ON CONFLICT (currency, rate_date) DO UPDATE for many rows, in batches."""
+        for start in range(0, len(rows), batch_size):
+            stmt = pg_insert(FxRate.__table__).values(rows[start : start + batch_size])
+            await self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["currency", "rate_date"],
+                    set_={"rate": stmt.excluded.rate, "updated_at": func.now()},
+                )
+            )
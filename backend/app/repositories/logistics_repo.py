@@ -1,14 +1,13 @@
 import uuid
-from datetime import date
 from decimal import Decimal
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import delete, func, insert, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.enums import LogisticsStatus
-from app.models.logistics import LogisticsCost, LogisticsRecord
-from app.repositories.base import BaseRepository
+from app.models.enums import CurrencyType, LogisticsStatus
+from app.models.logistics import LandedCostAllocation, LogisticsCost, LogisticsRecord
+from app.repositories.base import BaseRepository, ListPage
 
 
 class LogisticsRecordRepository(BaseRepository[LogisticsRecord]):
@@ -23,14 +22,6 @@ class LogisticsRecordRepository(BaseRepository[LogisticsRecord]):
         )
         return result.scalar_one_or_none()
 
-    async def count_by_date(self, d: date) -> int:
-        result = await self.db.execute(
-            select(func.count())
-            .select_from(LogisticsRecord)
-            .where(func.date(LogisticsRecord.created_at) == d)
-        )
-        return result.scalar_one()
-
     async def search(
         self,
         *,
@@ -41,7 +32,9 @@ class LogisticsRecordRepository(BaseRepository[LogisticsRecord]):
         limit: int = 20,
         order_by: str = "created_at",
         order_desc: bool = True,
-    ) -> tuple[list[LogisticsRecord], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> ListPage[LogisticsRecord]:
         filters = []
         if status:
             filters.append(LogisticsRecord.status == status)
@@ -56,7 +49,13 @@ class LogisticsRecordRepository(BaseRepository[LogisticsRecord]):
                 )
             )
         return await self.get_list(
-            offset=offset, limit=limit, order_by=order_by, order_desc=order_desc, filters=filters
+            offset=offset,
+            limit=limit,
+            order_by=order_by,
+            order_desc=order_desc,
+            filters=filters,
+            cursor=cursor,
+            include_total=include_total,
         )
 
     async def get_kanban_stats(self) -> list[dict]:
@@ -91,3 +90,30 @@ class LogisticsRecordRepository(BaseRepository[LogisticsRecord]):
     async def delete_cost(self, cost: LogisticsCost) -> None:
         await self.db.delete(cost)
         await self.db.flush()
+
+    # ==================== Landed cost allocations ====================
+
+    async def get_cost_totals(self, record_id: uuid.UUID) -> dict[CurrencyType, Decimal]:
+        result = await self.db.execute(
+            select(LogisticsCost.currency, func.sum(LogisticsCost.amount))
+            .where(LogisticsCost.logistics_record_id == record_id)
+            .group_by(LogisticsCost.currency)
+        )
+        return {currency: Decimal(str(total)) for currency, total in result.all()}
+
+    async def get_allocations(self, record_id: uuid.UUID) -> list[LandedCostAllocation]:
+        result = await self.db.execute(
+            select(LandedCostAllocation)
+            .where(LandedCostAllocation.logistics_record_id == record_id)
+            .order_by(LandedCostAllocation.currency, LandedCostAllocation.amount.desc())
+        )
+        return list(result.scalars().all())
+
+    async def replace_allocations(self, record_id: uuid.UUID, rows: list[dict]) -> None:
+        await self.db.execute(
+            delete(LandedCostAllocation).where(
+                LandedCostAllocation.logistics_record_id == record_id
+            )
+        )
+        if rows:
+            await self.db.execute(insert(LandedCostAllocation), rows)
@@ -1,12 +1,11 @@
 import uuid
-from datetime import date
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.outbound import OutboundOrder, OutboundOrderItem
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, ListPage
 
 
 class OutboundOrderRepository(BaseRepository[OutboundOrder]):
@@ -21,14 +20,6 @@ class OutboundOrderRepository(BaseRepository[OutboundOrder]):
         )
         return result.scalar_one_or_none()
 
-    async def count_by_date(self, d: date) -> int:
-        result = await self.db.execute(
-            select(func.count())
-            .select_from(OutboundOrder)
-            .where(func.date(OutboundOrder.created_at) == d)
-        )
-        return result.scalar_one()
-
     async def get_by_container_plan(self, container_plan_id: uuid.UUID) -> OutboundOrder | None:
         result = await self.db.execute(
             select(OutboundOrder)
@@ -49,7 +40,9 @@ class OutboundOrderRepository(BaseRepository[OutboundOrder]):
         limit: int = 20,
         order_by: str = "created_at",
         order_desc: bool = True,
-    ) -> tuple[list[OutboundOrder], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> ListPage[OutboundOrder]:
         filters = []
         if status:
             filters.append(OutboundOrder.status == status)
@@ -61,7 +54,13 @@ class OutboundOrderRepository(BaseRepository[OutboundOrder]):
                 )
             )
         return await self.get_list(
-            offset=offset, limit=limit, order_by=order_by, order_desc=order_desc, filters=filters
+            offset=offset,
+            limit=limit,
+            order_by=order_by,
+            order_desc=order_desc,
+            filters=filters,
+            cursor=cursor,
+            include_total=include_total,
         )
 
     async def add_items(self, items: list[OutboundOrderItem]) -> None:
@@ -1,10 +1,10 @@
 import uuid
 
-from sqlalchemy import exists, select
+from sqlalchemy import exists, insert, literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.product import Product
-from app.models.product_category import ProductCategoryModel
+from app.models.product_category import ProductCategoryModel, product_category_closure
 from app.repositories.base import BaseRepository
 
 
@@ -43,33 +43,31 @@ class ProductCategoryRepository(BaseRepository[ProductCategoryModel]):
 
     async def has_products(self, category_id: uuid.UUID) -> bool:
         """Check if this category or any of its descendants have associated products."""
-        # Collect all descendant IDs (including self)
-        ids = await self._collect_descendant_ids(category_id)
+        closure = product_category_closure
         result = await self.db.execute(
-            select(exists().where(Product.category_id.in_(ids)))
+            select(
+                exists().where(
+                    closure.c.ancestor_id == category_id,
+                    Product.category_id == closure.c.descendant_id,
+                )
+            )
         )
         return result.scalar_one()
 
-    async def _collect_descendant_ids(self, category_id: uuid.UUID) -> list[uuid.UUID]:
-        """Recursively collect this category's ID and all descendant IDs."""
-        ids = [category_id]
-        children = await self.get_by_parent_id(category_id)
-        for child in children:
-            ids.extend(await self._collect_descendant_ids(child.id))
-        return ids
-
-    async def get_descendant_leaf_ids(self, category_id: uuid.UUID) -> list[uuid.UUID]:
-        """Get all level-3 (leaf) descendant IDs for a given category."""
-        cat = await self.get_by_id(category_id)
-        if not cat:
-            return []
-        if cat.level == 3:
-            return [cat.id]
-        children = await self.get_by_parent_id(category_id)
-        leaf_ids: list[uuid.UUID] = []
-        for child in children:
-            if child.level == 3:
-                leaf_ids.append(child.id)
-            else:
-                leaf_ids.extend(await self.get_descendant_leaf_ids(child.id))
-        return leaf_ids
+    async def add_closure(self, category_id: uuid.UUID, parent_id: uuid.UUID | None) -> None:
+        """Insert closure rows for a new category: its self row plus one per ancestor."""
+        closure = product_category_closure
+        self_row = select(literal(category_id), literal(category_id), literal(0))
+        if parent_id is None:
+            rows = self_row
+        else:
+            rows = self_row.union_all(
+                select(
+                    closure.c.ancestor_id,
+                    literal(category_id),
+                    closure.c.depth + 1,
+                ).where(closure.c.descendant_id == parent_id)
+            )
+        await self.db.execute(
+            insert(closure).from_select(["ancestor_id", "descendant_id", "depth"], rows)
+        )
@@ -1,10 +1,26 @@
 import uuid
+from typing import Any
 
-from sqlalchemy import distinct, or_, select
+from sqlalchemy import (
+    String,
+    Text,
+    all_,
+    any_,
+    bindparam,
+    case,
+    distinct,
+    func,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.product import Product
-from app.repositories.base import BaseRepository
+from app.models.enums import ProductStatus
+from app.models.product import Product, search_grams
+from app.repositories.base import BaseRepository, ListPage, escape_like
 
 
 class ProductRepository(BaseRepository[Product]):
@@ -15,6 +31,45 @@ class ProductRepository(BaseRepository[Product]):
         result = await self.db.execute(select(Product).where(Product.sku_code == sku_code))
         return result.scalar_one_or_none()
 
+    async def get_by_sku_codes(self, sku_codes: list[str]) -> dict[str, Product]:
+        """Load many products by SKU in one query (single array bind, no per-value params)."""
+        if not sku_codes:
+            return {}
+        result = await self.db.execute(
+            select(Product).where(Product.sku_code == any_(_sku_array(sku_codes)))
+        )
+        return {p.sku_code: p for p in result.scalars().all()}
+
+    async def get_active_sku_codes_excluding(self, sku_codes: list[str]) -> list[str]:
+        """Return SKUs of active products that are not in ``sku_codes``."""
+        query = select(Product.sku_code).where(Product.status == ProductStatus.ACTIVE)
+        if sku_codes:
+            query = query.where(Product.sku_code != all_(_sku_array(sku_codes)))
+        result = await self.db.execute(query.order_by(Product.sku_code))
+        return list(result.scalars().all())
+
+    async def upsert_many(
+        self, rows: list[dict[str, Any]], update_fields: list[str], batch_size: int = 1000
+    ) -> None:
+        """INSERT ... ON CONFLICT (sku_code) DO UPDATE for many rows, in batches."""
+        for start in range(0, len(rows), batch_size):
+            stmt = pg_insert(Product.__table__).values(rows[start : start + batch_size])
+            set_ = {field: stmt.excluded[field] for field in update_fields}
+            set_["updated_at"] = func.now()
+            await self.db.execute(
+                stmt.on_conflict_do_update(index_elements=["sku_code"], set_=set_)
+            )
+
+    async def deactivate_by_sku_codes(self, sku_codes: list[str], user_id: uuid.UUID) -> None:
+        if not sku_codes:
+            return
+        await self.db.execute(
+            update(Product)
+            .where(Product.sku_code == any_(_sku_array(sku_codes)))
+            .values(status=ProductStatus.INACTIVE, updated_by=user_id)
+            .execution_options(synchronize_session=False)
+        )
+
     async def search(
         self,
         *,
@@ -26,7 +81,10 @@ class ProductRepository(BaseRepository[Product]):
         limit: int = 20,
         order_by: str = "created_at",
         order_desc: bool = True,
-    ) -> tuple[list[Product], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+        fields: list[str] | None = None,
+    ) -> ListPage[Product]:
         filters = []
         if keyword:
             filters.append(
@@ -50,6 +108,77 @@ class ProductRepository(BaseRepository[Product]):
             order_by=order_by,
             order_desc=order_desc,
             filters=filters,
+            cursor=cursor,
+            include_total=include_total,
+            fields=fields,
+        )
+
+    async def search_ranked(
+        self,
+        keyword: str,
+        *,
+        category_ids: list[uuid.UUID] | None = None,
+        status: str | None = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> tuple[list[tuple[Product, float]], int]:
+        """Substring search over the searchable columns, ordered by trigram relevance.
+
+        Candidates come from the gram index (every unigram or bigram of the keyword
+        must occur), then the ILIKE keeps the real substring matches. The total
+        comes from ``count(*) OVER ()`` on the same statement, so the filter is
+        evaluated once instead of in a separate count query.
+        """
+        columns = [Product.sku_code, Product.name_cn, Product.name_en, Product.brand]
+        pattern = f"%{escape_like(keyword)}%"
+        score = func.greatest(
+            *(func.similarity(func.coalesce(col, ""), keyword) for col in columns)
+        ) + case((func.lower(Product.sku_code) == keyword.lower(), 1.0), else_=0.0)
+        score = score.label("score")
+        total = func.count().over().label("total")
+
+        filters = [
+            _has_grams(keyword),
+            or_(*(col.ilike(pattern, escape="\\") for col in columns)),
+        ]
+        if category_ids:
+            filters.append(Product.category_id.in_(category_ids))
+        if status:
+            filters.append(Product.status == status)
+
+        query = (
+            select(Product, score, total)
+            .where(*filters)
+            .order_by(score.desc(), Product.sku_code)
+            .offset(offset)
+            .limit(limit)
+        )
+        rows = (await self.db.execute(query)).all()
+        if not rows:
+            if offset == 0:
+                return [], 0
+            # Page past the end: no row carries the window count, so count separately
+            count_query = select(func.count()).select_from(Product).where(*filters)
+            return [], (await self.db.execute(count_query)).scalar_one()
+        return [(row.Product, float(row.score)) for row in rows], rows[0].total
+
+    async def suggest(
+        self,
+        keyword: str,
+        *,
+        code_column: Any,
+        name_columns: list[Any],
+        limit: int = 10,
+        filters: list[Any] | None = None,
+    ) -> list[tuple[uuid.UUID, str, str]]:
+        """Typeahead prefiltered on the gram index, which also serves the one- and
+        two-character keystrokes that trigram indexes cannot."""
+        return await super().suggest(
+            keyword,
+            code_column=code_column,
+            name_columns=name_columns,
+            limit=limit,
+            filters=[_has_grams(keyword), *(filters or [])],
         )
 
     async def get_distinct_brands(self) -> list[str]:
@@ -59,3 +188,19 @@ class ProductRepository(BaseRepository[Product]):
             .order_by(Product.brand)
         )
         return list(result.scalars().all())
+
+
+def _has_grams(keyword: str):
+    return search_grams.contains(bindparam("grams", keyword_grams(keyword), type_=ARRAY(Text)))
+
+
+def keyword_grams(keyword: str) -> list[str]:
+    """Grams of ``keyword`` that every row containing it has in ``search_grams``."""
+    keyword = keyword.lower()
+    if len(keyword) < 2:
+        return [keyword] if keyword else []
+    return sorted({keyword[i : i + 2] for i in range(len(keyword) - 1)})
+
+
+def _sku_array(sku_codes: list[str]):
+    return bindparam("sku_codes", sku_codes, type_=ARRAY(String(50)), unique=True)
@@ -1,18 +1,20 @@
 import uuid
-from datetime import date
+from collections.abc import Iterable
 
-from sqlalchemy import func, insert, or_, select
+from sqlalchemy import case, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.exceptions import NotFoundError
 from app.models.enums import PurchaseOrderStatus
 from app.models.purchase_order import (
     PurchaseOrder,
     PurchaseOrderItem,
     purchase_order_sales_orders,
 )
-from app.models.sales_order import SalesOrderItem
-from app.repositories.base import BaseRepository
+from app.models.sales_order import SalesOrder, SalesOrderItem
+from app.repositories.base import BaseRepository, ListPage
 
 
 class PurchaseOrderRepository(BaseRepository[PurchaseOrder]):
@@ -30,14 +32,6 @@ class PurchaseOrderRepository(BaseRepository[PurchaseOrder]):
         )
         return result.scalar_one_or_none()
 
-    async def count_by_date(self, order_date: date) -> int:
-        result = await self.db.execute(
-            select(func.count())
-            .select_from(PurchaseOrder)
-            .where(PurchaseOrder.order_date == order_date)
-        )
-        return result.scalar_one()
-
     async def search(
         self,
         *,
@@ -48,7 +42,9 @@ class PurchaseOrderRepository(BaseRepository[PurchaseOrder]):
         limit: int = 20,
         order_by: str = "created_at",
         order_desc: bool = True,
-    ) -> tuple[list[PurchaseOrder], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> ListPage[PurchaseOrder]:
         filters = []
         if keyword:
             filters.append(
@@ -67,24 +63,33 @@ class PurchaseOrderRepository(BaseRepository[PurchaseOrder]):
             order_by=order_by,
             order_desc=order_desc,
             filters=filters,
+            cursor=cursor,
+            include_total=include_total,
         )
 
-    async def link_sales_orders(self, po_id: uuid.UUID, so_ids: list[uuid.UUID]) -> None:
-        for so_id in so_ids:
-            # Check if already linked
-            existing = await self.db.execute(
-                select(purchase_order_sales_orders).where(
-                    purchase_order_sales_orders.c.purchase_order_id == po_id,
-                    purchase_order_sales_orders.c.sales_order_id == so_id,
-                )
-            )
-            if not existing.first():
-                await self.db.execute(
-                    insert(purchase_order_sales_orders).values(
-                        purchase_order_id=po_id, sales_order_id=so_id
-                    )
-                )
+    async def link_sales_orders(self, order: PurchaseOrder, so_ids: list[uuid.UUID]) -> None:
+        """Add sales orders to the loaded ``order.sales_orders`` collection.
+
+        Existing links are skipped in memory and the new link rows go out with the
+        next flush, so the collection stays current without reloading the order.
+        """
+        linked = {so.id for so in order.sales_orders}
+        new_ids = [so_id for so_id in dict.fromkeys(so_ids) if so_id not in linked]
+        if not new_ids:
+            return
+        result = await self.db.execute(select(SalesOrder).where(SalesOrder.id.in_(new_ids)))
+        found = {so.id: so for so in result.scalars().all()}
+        for so_id in new_ids:
+            if so_id not in found:
+                raise NotFoundError("销售订单", str(so_id))
+            order.sales_orders.append(found[so_id])
+
+    async def add_orders(self, orders: list[PurchaseOrder], links: list[dict]) -> None:
+        """Insert orders, their items and sales order links with batched INSERTs."""
+        self.db.add_all(orders)
         await self.db.flush()
+        if links:
+            await self.db.execute(insert(purchase_order_sales_orders).values(links))
 
     async def get_linked_so_ids(self, po_id: uuid.UUID) -> list[uuid.UUID]:
         result = await self.db.execute(
@@ -94,20 +99,50 @@ class PurchaseOrderRepository(BaseRepository[PurchaseOrder]):
         )
         return [row[0] for row in result.all()]
 
-    async def get_sales_order_item(self, item_id: uuid.UUID) -> SalesOrderItem | None:
-        result = await self.db.execute(select(SalesOrderItem).where(SalesOrderItem.id == item_id))
-        return result.scalar_one_or_none()
+    async def lock_sales_order_items(
+        self, ids: Iterable[uuid.UUID | None]
+    ) -> dict[uuid.UUID, SalesOrderItem]:
+        """Load and lock sales order lines with one ``SELECT ... FOR UPDATE``.
 
-    async def delete_items(self, order_id: uuid.UUID) -> list[PurchaseOrderItem]:
-        """Delete all items for an order, returning them first for rollback logic."""
+        Rows are locked in id order, like ``SalesOrderRepository.get_net_requirements``,
+        so concurrent writers cannot deadlock on them; copies already in the session
+        are overwritten with the values read under the lock.
+        """
+        ids = sorted({so_item_id for so_item_id in ids if so_item_id})
+        if not ids:
+            return {}
         result = await self.db.execute(
-            select(PurchaseOrderItem).where(PurchaseOrderItem.purchase_order_id == order_id)
+            select(SalesOrderItem)
+            .where(SalesOrderItem.id.in_(ids))
+            .order_by(SalesOrderItem.id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
         )
-        old_items = list(result.scalars().all())
-        for item in old_items:
-            await self.db.delete(item)
-        await self.db.flush()
-        return old_items
+        return {item.id: item for item in result.scalars().all()}
+
+    async def add_purchased_quantities(
+        self, so_items: dict[uuid.UUID, SalesOrderItem], deltas: dict[uuid.UUID, int]
+    ) -> None:
+        """Add ``deltas`` to the lines' purchased quantity with one UPDATE.
+
+        ``so_items`` are the rows locked by :meth:`lock_sales_order_items`; the new
+        values are set on them directly rather than expiring them for a reload.
+        """
+        deltas = {so_item_id: delta for so_item_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        await self.db.execute(
+            update(SalesOrderItem)
+            .where(SalesOrderItem.id.in_(deltas))
+            .values(
+                purchased_quantity=SalesOrderItem.purchased_quantity
+                + case(deltas, value=SalesOrderItem.id)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        for so_item_id, delta in deltas.items():
+            so_item = so_items[so_item_id]
+            set_committed_value(so_item, "purchased_quantity", so_item.purchased_quantity + delta)
 
     async def add_items(self, items: list[PurchaseOrderItem]) -> None:
         self.db.add_all(items)
@@ -1,14 +1,17 @@
 import uuid
 from datetime import date
 from decimal import Decimal
+from typing import Any
 
-from sqlalchemy import delete, func, or_, select
+from sqlalchemy import Numeric, Row, cast, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, with_expression
+from sqlalchemy.sql.selectable import ScalarSelect
 
 from app.models.enums import SalesOrderStatus
+from app.models.product import Product
 from app.models.sales_order import SalesOrder, SalesOrderItem
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, ListPage, paginate
 
 
 class SalesOrderRepository(BaseRepository[SalesOrder]):
@@ -21,12 +24,6 @@ class SalesOrderRepository(BaseRepository[SalesOrder]):
         )
         return result.scalar_one_or_none()
 
-    async def count_by_date(self, order_date: date) -> int:
-        result = await self.db.execute(
-            select(func.count()).select_from(SalesOrder).where(SalesOrder.order_date == order_date)
-        )
-        return result.scalar_one()
-
     async def search(
         self,
         *,
@@ -39,8 +36,11 @@ class SalesOrderRepository(BaseRepository[SalesOrder]):
         limit: int = 20,
         order_by: str = "created_at",
         order_desc: bool = True,
-        load_items: bool = False,
-    ) -> tuple[list[SalesOrder], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+        fields: list[str] | None = None,
+        with_progress: bool = False,
+    ) -> ListPage[SalesOrder]:
         filters = []
         if keyword:
             filters.append(
@@ -58,13 +58,25 @@ class SalesOrderRepository(BaseRepository[SalesOrder]):
         if date_to:
             filters.append(SalesOrder.order_date <= date_to)
 
-        if load_items:
-            return await self._get_list_with_items(
+        if with_progress and not fields:
+            return await paginate(
+                self.db,
+                SalesOrder,
+                select(SalesOrder).options(
+                    with_expression(
+                        SalesOrder.purchase_progress, _progress(SalesOrderItem.purchased_quantity)
+                    ),
+                    with_expression(
+                        SalesOrder.arrival_progress, _progress(SalesOrderItem.received_quantity)
+                    ),
+                ),
                 offset=offset,
                 limit=limit,
                 order_by=order_by,
                 order_desc=order_desc,
                 filters=filters,
+                cursor=cursor,
+                include_total=include_total,
             )
 
         return await self.get_list(
@@ -73,39 +85,11 @@ class SalesOrderRepository(BaseRepository[SalesOrder]):
             order_by=order_by,
             order_desc=order_desc,
             filters=filters,
+            cursor=cursor,
+            include_total=include_total,
+            fields=fields,
         )
 
-    async def _get_list_with_items(
-        self,
-        *,
-        offset: int = 0,
-        limit: int = 20,
-        order_by: str = "created_at",
-        order_desc: bool = True,
-        filters: list | None = None,
-    ) -> tuple[list[SalesOrder], int]:
-        query = select(SalesOrder).options(selectinload(SalesOrder.items))
-        count_query = select(func.count()).select_from(SalesOrder)
-
-        if filters:
-            for f in filters:
-                query = query.where(f)
-                count_query = count_query.where(f)
-
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar_one()
-
-        order_col = getattr(SalesOrder, order_by, SalesOrder.created_at)
-        if order_desc:
-            query = query.order_by(order_col.desc())
-        else:
-            query = query.order_by(order_col.asc())
-
-        query = query.offset(offset).limit(limit)
-        result = await self.db.execute(query)
-        items = list(result.scalars().unique().all())
-        return items, total
-
     async def get_kanban_stats(self) -> list[dict]:
         result = await self.db.execute(
             select(
@@ -124,15 +108,81 @@ class SalesOrderRepository(BaseRepository[SalesOrder]):
             for row in rows
         ]
 
-    async def delete_items(self, order_id: uuid.UUID) -> None:
-        await self.db.execute(
-            delete(SalesOrderItem).where(SalesOrderItem.sales_order_id == order_id)
-        )
+    async def add_orders(self, orders: list[SalesOrder]) -> None:
+        """Insert orders with their items in one flush (multi-row INSERTs per table)."""
+        self.db.add_all(orders)
+        await self.db.flush()
 
     async def add_items(self, items: list[SalesOrderItem]) -> None:
         self.db.add_all(items)
         await self.db.flush()
 
+    async def get_net_requirements(
+        self, statuses: list[SalesOrderStatus], so_ids: list[uuid.UUID] | None = None
+    ) -> list[Row]:
+        """Unpurchased quantity of every open line, with its product's default supplier.
+
+        ``unit_price`` is the product's default purchase price, else the line's sales
+        price; both are the fallback for products no supplier price list covers.
+
+        The lines are locked until the transaction ends so concurrent runs cannot
+        buy the same demand twice. Locks are taken in line id order, as purchase
+        order writes take them, and the rows are returned by order number.
+        """
+        net = SalesOrderItem.quantity - SalesOrderItem.purchased_quantity
+        query = (
+            select(
+                SalesOrderItem.id,
+                SalesOrderItem.sales_order_id,
+                SalesOrderItem.product_id,
+                SalesOrderItem.unit,
+                net.label("quantity"),
+                func.coalesce(Product.default_purchase_price, SalesOrderItem.unit_price).label(
+                    "unit_price"
+                ),
+                Product.default_supplier_id.label("supplier_id"),
+                SalesOrder.order_no,
+                SalesOrderItem.created_at,
+            )
+            .join(SalesOrder, SalesOrderItem.sales_order_id == SalesOrder.id)
+            .join(Product, SalesOrderItem.product_id == Product.id)
+            .where(SalesOrder.status.in_(statuses), net > 0)
+            .order_by(SalesOrderItem.id)
+            .with_for_update(of=SalesOrderItem)
+        )
+        if so_ids:
+            query = query.where(SalesOrder.id.in_(so_ids))
+        rows = list((await self.db.execute(query)).all())
+        rows.sort(key=lambda row: (row.order_no, row.created_at))
+        return rows
+
+    async def mark_purchased(self, item_ids: list[uuid.UUID]) -> None:
+        """Set the lines' purchased quantity to their full quantity in one UPDATE."""
+        await self.db.execute(
+            update(SalesOrderItem)
+            .where(SalesOrderItem.id.in_(item_ids))
+            .values(purchased_quantity=SalesOrderItem.quantity)
+        )
+
     async def get_item_by_id(self, item_id: uuid.UUID) -> SalesOrderItem | None:
         result = await self.db.execute(select(SalesOrderItem).where(SalesOrderItem.id == item_id))
         return result.scalar_one_or_none()
+
+
+def _progress(quantity: Any) -> ScalarSelect:
+    """Share of an order's quantity covered by the item column ``quantity``, rounded to 4 places.
+
+    A correlated aggregate rather than a join, so Postgres evaluates it only for
+    the rows left after the sort and LIMIT, one index lookup each.
+    """
+    return (
+        select(
+            func.round(
+                cast(func.sum(quantity), Numeric)
+                / func.nullif(func.sum(SalesOrderItem.quantity), 0),
+                4,
+            )
+        )
+        .where(SalesOrderItem.sales_order_id == SalesOrder.id)
+        .scalar_subquery()
+    )
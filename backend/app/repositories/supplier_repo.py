@@ -1,10 +1,12 @@
 import uuid
+from collections.abc import Iterable
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import Date, Row, delete, literal, null, or_, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.supplier import Supplier, SupplierProduct
-from app.repositories.base import BaseRepository
+from app.models.product import Product
+from app.models.supplier import Supplier, SupplierPrice, SupplierProduct
+from app.repositories.base import BaseRepository, ListPage
 
 
 class SupplierRepository(BaseRepository[Supplier]):
@@ -17,11 +19,6 @@ class SupplierRepository(BaseRepository[Supplier]):
         )
         return result.scalar_one_or_none()
 
-    async def get_next_sequence(self) -> int:
-        result = await self.db.execute(select(func.count()).select_from(Supplier))
-        count = result.scalar_one()
-        return count + 1
-
     async def search(
         self,
         *,
@@ -30,7 +27,9 @@ class SupplierRepository(BaseRepository[Supplier]):
         limit: int = 20,
         order_by: str = "created_at",
         order_desc: bool = True,
-    ) -> tuple[list[Supplier], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> ListPage[Supplier]:
         filters = []
         if keyword:
             filters.append(
@@ -47,6 +46,8 @@ class SupplierRepository(BaseRepository[Supplier]):
             order_by=order_by,
             order_desc=order_desc,
             filters=filters,
+            cursor=cursor,
+            include_total=include_total,
         )
 
     async def add_product(self, supplier_product: SupplierProduct) -> SupplierProduct:
@@ -75,3 +76,57 @@ class SupplierRepository(BaseRepository[Supplier]):
             select(SupplierProduct).where(SupplierProduct.supplier_id == supplier_id)
         )
         return list(result.scalars().all())
+
+    async def get_prices(self, supplier_id: uuid.UUID) -> list[SupplierPrice]:
+        result = await self.db.execute(
+            select(SupplierPrice)
+            .where(SupplierPrice.supplier_id == supplier_id)
+            .order_by(
+                SupplierPrice.product_id,
+                SupplierPrice.min_quantity,
+                SupplierPrice.valid_from.nulls_first(),
+            )
+        )
+        return list(result.scalars().all())
+
+    async def replace_prices(self, supplier_id: uuid.UUID, prices: list[SupplierPrice]) -> None:
+        """Swap the supplier's price list with one DELETE and one batched INSERT."""
+        await self.db.execute(delete(SupplierPrice).where(SupplierPrice.supplier_id == supplier_id))
+        self.db.add_all(prices)
+        await self.db.flush()
+
+    async def get_unknown_product_ids(self, product_ids: Iterable[uuid.UUID]) -> set[uuid.UUID]:
+        wanted = set(product_ids)
+        if not wanted:
+            return set()
+        result = await self.db.execute(select(Product.id).where(Product.id.in_(wanted)))
+        return wanted - set(result.scalars().all())
+
+    async def get_price_tiers(self) -> list[Row]:
+        """Every price tier of every supplier, ordered by supplier, product and min quantity.
+
+        A linked product's flat ``supply_price`` counts as an open-ended tier from a
+        quantity of one.
+        """
+        tiers = union_all(
+            select(
+                SupplierPrice.supplier_id,
+                SupplierPrice.product_id,
+                SupplierPrice.min_quantity,
+                SupplierPrice.unit_price,
+                SupplierPrice.valid_from,
+                SupplierPrice.valid_to,
+            ),
+            select(
+                SupplierProduct.supplier_id,
+                SupplierProduct.product_id,
+                literal(1).label("min_quantity"),
+                SupplierProduct.supply_price.label("unit_price"),
+                null().cast(Date).label("valid_from"),
+                null().cast(Date).label("valid_to"),
+            ).where(SupplierProduct.supply_price.is_not(None)),
+        ).subquery()
+        result = await self.db.execute(
+            select(tiers).order_by(tiers.c.supplier_id, tiers.c.product_id, tiers.c.min_quantity)
+        )
+        return list(result.all())
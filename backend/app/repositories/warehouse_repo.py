@@ -1,13 +1,13 @@
 import uuid
-from datetime import date
 
 from sqlalchemy import delete, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.purchase_order import PurchaseOrderItem
+from app.models.sales_order import SalesOrderItem
 from app.models.warehouse import InventoryRecord, ReceivingNote, ReceivingNoteItem
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, ListPage, decode_cursor, encode_cursor
 
 
 class ReceivingNoteRepository(BaseRepository[ReceivingNote]):
@@ -22,14 +22,6 @@ class ReceivingNoteRepository(BaseRepository[ReceivingNote]):
         )
         return result.scalar_one_or_none()
 
-    async def count_by_date(self, receiving_date: date) -> int:
-        result = await self.db.execute(
-            select(func.count())
-            .select_from(ReceivingNote)
-            .where(ReceivingNote.receiving_date == receiving_date)
-        )
-        return result.scalar_one()
-
     async def search(
         self,
         *,
@@ -39,7 +31,9 @@ class ReceivingNoteRepository(BaseRepository[ReceivingNote]):
         limit: int = 20,
         order_by: str = "created_at",
         order_desc: bool = True,
-    ) -> tuple[list[ReceivingNote], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> ListPage[ReceivingNote]:
         filters = []
         if purchase_order_id:
             filters.append(ReceivingNote.purchase_order_id == purchase_order_id)
@@ -51,7 +45,13 @@ class ReceivingNoteRepository(BaseRepository[ReceivingNote]):
                 )
             )
         return await self.get_list(
-            offset=offset, limit=limit, order_by=order_by, order_desc=order_desc, filters=filters
+            offset=offset,
+            limit=limit,
+            order_by=order_by,
+            order_desc=order_desc,
+            filters=filters,
+            cursor=cursor,
+            include_total=include_total,
         )
 
     async def delete_items(self, note_id: uuid.UUID) -> None:
@@ -63,6 +63,38 @@ class ReceivingNoteRepository(BaseRepository[ReceivingNote]):
         self.db.add_all(items)
         await self.db.flush()
 
+    async def lock_purchase_order_items(
+        self, item_ids: list[uuid.UUID]
+    ) -> dict[uuid.UUID, PurchaseOrderItem]:
+        """Lock purchase order lines being received, and the sales order lines they
+        feed, in id order. Sales order lines are locked first, as purchase order
+        writes lock them before touching their own lines.
+        """
+        ids = sorted(set(item_ids))
+        if not ids:
+            return {}
+        await self.db.execute(
+            select(SalesOrderItem)
+            .where(
+                SalesOrderItem.id.in_(
+                    select(PurchaseOrderItem.sales_order_item_id).where(
+                        PurchaseOrderItem.id.in_(ids)
+                    )
+                )
+            )
+            .order_by(SalesOrderItem.id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(
+            select(PurchaseOrderItem)
+            .where(PurchaseOrderItem.id.in_(ids))
+            .order_by(PurchaseOrderItem.id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        return {item.id: item for item in result.scalars().all()}
+
     async def get_purchase_order_item(self, item_id: uuid.UUID) -> PurchaseOrderItem | None:
         result = await self.db.execute(
             select(PurchaseOrderItem).where(PurchaseOrderItem.id == item_id)
@@ -71,6 +103,8 @@ class ReceivingNoteRepository(BaseRepository[ReceivingNote]):
 
 
 class InventoryRepository(BaseRepository[InventoryRecord]):
+    approximate_total = True
+
     def __init__(self, db: AsyncSession):
         super().__init__(InventoryRecord, db)
 
@@ -80,14 +114,20 @@ class InventoryRepository(BaseRepository[InventoryRecord]):
         product_id: uuid.UUID | None = None,
         offset: int = 0,
         limit: int = 20,
-    ) -> tuple[list[dict], int]:
-        """Group inventory by product."""
-        query = select(
-            InventoryRecord.product_id,
-            func.sum(InventoryRecord.quantity).label("total_quantity"),
-            func.sum(InventoryRecord.reserved_quantity).label("reserved_quantity"),
-            func.sum(InventoryRecord.available_quantity).label("available_quantity"),
-        ).group_by(InventoryRecord.product_id)
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> ListPage[dict]:
+        """Group inventory by product, paged in product_id order."""
+        query = (
+            select(
+                InventoryRecord.product_id,
+                func.sum(InventoryRecord.quantity).label("total_quantity"),
+                func.sum(InventoryRecord.reserved_quantity).label("reserved_quantity"),
+                func.sum(InventoryRecord.available_quantity).label("available_quantity"),
+            )
+            .group_by(InventoryRecord.product_id)
+            .order_by(InventoryRecord.product_id)
+        )
         count_query = select(func.count()).select_from(
             select(InventoryRecord.product_id).group_by(InventoryRecord.product_id).subquery()
         )
@@ -95,12 +135,22 @@ class InventoryRepository(BaseRepository[InventoryRecord]):
             query = query.where(InventoryRecord.product_id == product_id)
             count_query = select(func.literal(1))  # single product
 
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar_one()
+        total = None
+        if include_total:
+            total_result = await self.db.execute(count_query)
+            total = total_result.scalar_one()
 
-        query = query.offset(offset).limit(limit)
+        if cursor:
+            _, last_id = decode_cursor(cursor, "product_id", InventoryRecord.product_id, False)
+            query = query.where(InventoryRecord.product_id > last_id)
+            offset = 0
+        query = query.offset(offset).limit(limit + 1)
         result = await self.db.execute(query)
         rows = result.all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor("product_id", False, None, rows[-1].product_id)
         items = [
             {
                 "product_id": row.product_id,
@@ -110,7 +160,7 @@ class InventoryRepository(BaseRepository[InventoryRecord]):
             }
             for row in rows
         ]
-        return items, total
+        return ListPage(items, total, next_cursor)
 
     async def get_by_sales_order(
         self,
@@ -155,7 +205,7 @@ class InventoryRepository(BaseRepository[InventoryRecord]):
         destination_port: str | None = None,
         offset: int = 0,
         limit: int = 50,
-    ) -> tuple[list[InventoryRecord], int]:
+    ) -> ListPage[InventoryRecord]:
         """Return available inventory batches for container allocation."""
         filters = [InventoryRecord.available_quantity > 0]
         if product_id:
@@ -168,6 +218,7 @@ class InventoryRepository(BaseRepository[InventoryRecord]):
             order_by="production_date",
             order_desc=False,
             filters=filters,
+            include_total=False,
         )
 
     async def reserve(self, inventory_record_id: uuid.UUID, quantity: int) -> None:
@@ -214,14 +265,22 @@ class InventoryRepository(BaseRepository[InventoryRecord]):
         limit: int = 20,
         order_by: str = "created_at",
         order_desc: bool = True,
-    ) -> tuple[list[InventoryRecord], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> ListPage[InventoryRecord]:
         filters = []
         if product_id:
             filters.append(InventoryRecord.product_id == product_id)
         if sales_order_id:
             filters.append(InventoryRecord.sales_order_id == sales_order_id)
         return await self.get_list(
-            offset=offset, limit=limit, order_by=order_by, order_desc=order_desc, filters=filters
+            offset=offset,
+            limit=limit,
+            order_by=order_by,
+            order_desc=order_desc,
+            filters=filters,
+            cursor=cursor,
+            include_total=include_total,
         )
 
 
@@ -237,7 +296,9 @@ class ReceivingNoteItemRepository(BaseRepository[ReceivingNoteItem]):
         limit: int = 20,
         order_by: str = "id",
         order_desc: bool = True,
-    ) -> tuple[list[ReceivingNoteItem], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> ListPage[ReceivingNoteItem]:
         from app.models.enums import InspectionResult
 
         filters = [
@@ -250,5 +311,11 @@ class ReceivingNoteItemRepository(BaseRepository[ReceivingNoteItem]):
                 )
             )
         return await self.get_list(
-            offset=offset, limit=limit, order_by=order_by, order_desc=order_desc, filters=filters
+            offset=offset,
+            limit=limit,
+            order_by=order_by,
+            order_desc=order_desc,
+            filters=filters,
+            cursor=cursor,
+            include_total=include_total,
         )
@@ -1,4 +1,6 @@
-from typing import Generic, TypeVar
+import math
+import uuid
+from typing import Any, Generic, TypeVar
 
 from pydantic import BaseModel, Field
 
@@ -19,6 +21,13 @@ class SortParams(BaseModel):
     sort_order: str = Field(default="desc", pattern="^(asc|desc)$")
 
 
+class CursorParams(BaseModel):
+    """Keyset paging: pass the previous page's ``next_cursor`` instead of ``page``."""
+
+    cursor: str | None = None
+    include_total: bool = True
+
+
 class ApiResponse(BaseModel, Generic[T]):
     code: int = 0
     message: str = "success"
@@ -27,13 +36,74 @@ class ApiResponse(BaseModel, Generic[T]):
 
 class PaginatedData(BaseModel, Generic[T]):
     items: list[T]
-    total: int
+    total: int | None
     page: int
     page_size: int
-    total_pages: int
+    total_pages: int | None
+    next_cursor: str | None = None
+    total_is_estimate: bool = False
+
+    @classmethod
+    def build(
+        cls,
+        items: list,
+        total: int | None,
+        *,
+        page: int,
+        page_size: int,
+        next_cursor: str | None = None,
+        total_is_estimate: bool = False,
+    ) -> "PaginatedData":
+        if total is None:
+            total_pages = None
+        else:
+            total_pages = math.ceil(total / page_size) if total > 0 else 0
+        return cls(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages,
+            next_cursor=next_cursor,
+            total_is_estimate=total_is_estimate,
+        )
+
+    @classmethod
+    def from_page(cls, items: list, result: Any, *, page: int, page_size: int) -> "PaginatedData":
+        """Wrap the converted ``items`` of a repository ``ListPage``."""
+        return cls.build(
+            items,
+            result.total,
+            page=page,
+            page_size=page_size,
+            next_cursor=result.next_cursor,
+            total_is_estimate=result.total_is_estimate,
+        )
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
     code: int = 0
     message: str = "success"
     data: PaginatedData[T]
+
+
+class SuggestItem(BaseModel):
+    id: uuid.UUID
+    code: str
+    name: str
+
+
+class BulkIdsRequest(BaseModel):
+    ids: list[uuid.UUID] = Field(..., min_length=1, max_length=500)
+
+
+class BulkStatusOutcome(BaseModel):
+    id: uuid.UUID
+    success: bool
+    previous_status: str | None = None
+    message: str | None = None
+
+
+class BulkStatusResult(BaseModel):
+    updated: int
+    items: list[BulkStatusOutcome]
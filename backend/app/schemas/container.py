@@ -5,6 +5,7 @@ from decimal import Decimal
 from pydantic import BaseModel, Field
 
 from app.models.enums import ContainerPlanStatus, ContainerType
+from app.schemas.common import CursorParams
 
 
 # --- Container Plan Item ---
@@ -86,7 +87,7 @@ class ContainerPlanListRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
-class ContainerPlanListParams(BaseModel):
+class ContainerPlanListParams(CursorParams):
     status: ContainerPlanStatus | None = None
     keyword: str | None = None
     page: int = Field(default=1, ge=1)
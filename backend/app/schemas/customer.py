@@ -4,6 +4,7 @@ from datetime import datetime
 from pydantic import BaseModel, Field
 
 from app.models.enums import CurrencyType, PaymentMethod, TradeTerm
+from app.schemas.common import CursorParams
 
 
 class CustomerCreate(BaseModel):
@@ -57,7 +58,7 @@ class CustomerRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
-class CustomerListParams(BaseModel):
+class CustomerListParams(CursorParams):
     keyword: str | None = None
     country: str | None = None
     page: int = Field(default=1, ge=1)
@@ -23,6 +23,11 @@ class TodoResponse(BaseModel):
     arriving_soon_containers: int
 
 
+class DashboardSummaryResponse(BaseModel):
+    overview: OverviewResponse
+    todos: TodoResponse
+
+
 class InTransitItem(BaseModel):
     logistics_id: uuid.UUID
     logistics_no: str
@@ -4,7 +4,8 @@ from decimal import Decimal
 
 from pydantic import BaseModel, Field
 
-from app.models.enums import CurrencyType, LogisticsCostType, LogisticsStatus
+from app.models.enums import AllocationMethod, CurrencyType, LogisticsCostType, LogisticsStatus
+from app.schemas.common import CursorParams
 
 
 # --- Logistics Cost ---
@@ -105,7 +106,7 @@ class LogisticsRecordListRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
-class LogisticsRecordListParams(BaseModel):
+class LogisticsRecordListParams(CursorParams):
     status: LogisticsStatus | None = None
     container_plan_id: uuid.UUID | None = None
     keyword: str | None = None
@@ -127,3 +128,30 @@ class LogisticsKanbanItem(BaseModel):
 
 class LogisticsKanbanResponse(BaseModel):
     items: list[LogisticsKanbanItem]
+
+
+# --- Landed cost allocation ---
+
+
+class LandedCostAllocate(BaseModel):
+    method: AllocationMethod = AllocationMethod.VOLUME
+
+
+class LandedCostAllocationRead(BaseModel):
+    container_plan_item_id: uuid.UUID
+    sales_order_id: uuid.UUID | None
+    product_id: uuid.UUID
+    currency: CurrencyType
+    basis: Decimal
+    amount: Decimal
+
+    model_config = {"from_attributes": True}
+
+
+class LandedCostAllocationResponse(BaseModel):
+    logistics_record_id: uuid.UUID
+    # None until the record has been allocated
+    method: AllocationMethod | None = None
+    # The costs or plan items changed and the split could not be re-run
+    stale: bool = False
+    items: list[LandedCostAllocationRead]
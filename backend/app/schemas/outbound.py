@@ -4,6 +4,7 @@ from datetime import date, datetime
 from pydantic import BaseModel, Field
 
 from app.models.enums import OutboundOrderStatus
+from app.schemas.common import CursorParams
 
 
 # --- Outbound Order Item ---
@@ -58,7 +59,7 @@ class OutboundOrderListRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
-class OutboundOrderListParams(BaseModel):
+class OutboundOrderListParams(CursorParams):
     status: OutboundOrderStatus | None = None
     keyword: str | None = None
     page: int = Field(default=1, ge=1)
@@ -5,6 +5,7 @@ from decimal import Decimal
 from pydantic import BaseModel, Field
 
 from app.models.enums import ProductStatus
+from app.schemas.common import CursorParams
 
 
 class ProductCreate(BaseModel):
@@ -84,7 +85,13 @@ class ProductRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
-class ProductListParams(BaseModel):
+class ProductSearchHit(ProductRead):
+    score: float = 0.0
+    # field name -> HTML-escaped value with matches wrapped in <mark></mark>
+    highlights: dict[str, str] = {}
+
+
+class ProductListParams(CursorParams):
     keyword: str | None = None
     category_id: uuid.UUID | None = None
     brand: str | None = None
@@ -93,7 +100,24 @@ class ProductListParams(BaseModel):
     page_size: int = Field(default=20, ge=1, le=100)
     sort_by: str = "created_at"
     sort_order: str = Field(default="desc", pattern="^(asc|desc)$")
+    # Sparse fieldset: only these ProductRead fields (plus id) are returned
+    fields: list[str] | None = None
 
 
 class ProductStatusUpdate(BaseModel):
     status: ProductStatus
+
+
+class ProductImportReport(BaseModel):
+    """Diff report returned by an upsert import (also for dry runs)."""
+
+    mode: str
+    dry_run: bool
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deactivated: int = 0
+    created_skus: list[str] = []
+    updated_fields: dict[str, list[str]] = {}
+    deactivated_skus: list[str] = []
+    errors: list[dict] = []
@@ -5,6 +5,7 @@ from decimal import Decimal
 from pydantic import BaseModel, Field
 
 from app.models.enums import PurchaseOrderStatus, UnitType
+from app.schemas.common import CursorParams
 
 # --- Item schemas ---
 
@@ -85,7 +86,7 @@ class PurchaseOrderListRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
-class PurchaseOrderListParams(BaseModel):
+class PurchaseOrderListParams(CursorParams):
     keyword: str | None = None
     status: PurchaseOrderStatus | None = None
     supplier_id: uuid.UUID | None = None
@@ -97,3 +98,30 @@ class PurchaseOrderListParams(BaseModel):
 
 class LinkSalesOrdersRequest(BaseModel):
     sales_order_ids: list[uuid.UUID] = Field(..., min_length=1)
+
+
+class MrpRunRequest(BaseModel):
+    # Empty: every sales order in purchasing
+    sales_order_ids: list[uuid.UUID] = Field(default_factory=list)
+    order_date: date | None = None
+    required_date: date | None = None
+    dry_run: bool = False
+
+
+class MrpPurchaseOrder(BaseModel):
+    supplier_id: uuid.UUID
+    sales_order_ids: list[uuid.UUID]
+    item_count: int
+    total_quantity: int
+    total_amount: Decimal
+    # Filled once the order is written (empty in a dry run)
+    id: uuid.UUID | None = None
+    order_no: str | None = None
+
+
+class MrpRunResult(BaseModel):
+    dry_run: bool
+    order_date: date
+    purchase_orders: list[MrpPurchaseOrder] = []
+    # Open sales order lines whose product has neither a supplier price nor a default supplier
+    unassigned_item_ids: list[uuid.UUID] = []
@@ -11,6 +11,7 @@ from app.models.enums import (
     TradeTerm,
     UnitType,
 )
+from app.schemas.common import BulkIdsRequest, CursorParams
 
 # --- Item schemas ---
 
@@ -73,6 +74,26 @@ class SalesOrderUpdate(BaseModel):
     items: list[SalesOrderItemCreate] | None = None
 
 
+class SalesOrderImportOrder(BaseModel):
+    order_ref: str
+    customer_id: uuid.UUID
+    customer_code: str
+    order_date: date
+    currency: CurrencyType
+    item_count: int
+    total_quantity: int
+    total_amount: Decimal
+    # Filled once the order is written (empty in a dry run)
+    id: uuid.UUID | None = None
+    order_no: str | None = None
+
+
+class SalesOrderImportResult(BaseModel):
+    dry_run: bool
+    created: int = 0
+    orders: list[SalesOrderImportOrder] = []
+
+
 class SalesOrderRead(BaseModel):
     id: uuid.UUID
     order_no: str
@@ -119,7 +140,7 @@ class SalesOrderListRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
-class SalesOrderListParams(BaseModel):
+class SalesOrderListParams(CursorParams):
     keyword: str | None = None
     status: SalesOrderStatus | None = None
     customer_id: uuid.UUID | None = None
@@ -129,12 +150,18 @@ class SalesOrderListParams(BaseModel):
     page_size: int = Field(default=20, ge=1, le=100)
     sort_by: str = "created_at"
     sort_order: str = Field(default="desc", pattern="^(asc|desc)$")
+    # Sparse fieldset: only these SalesOrderListRead columns (plus id) are returned
+    fields: list[str] | None = None
 
 
 class SalesOrderStatusUpdate(BaseModel):
     status: SalesOrderStatus
 
 
+class SalesOrderBulkStatusUpdate(BulkIdsRequest):
+    status: SalesOrderStatus
+
+
 class KanbanItem(BaseModel):
     status: SalesOrderStatus
     count: int
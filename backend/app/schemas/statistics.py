@@ -1,7 +1,11 @@
+import uuid
+from datetime import date, datetime
 from decimal import Decimal
 
 from pydantic import BaseModel
 
+from app.models.enums import CurrencyType
+
 
 class SalesSummaryItem(BaseModel):
     group_key: str
@@ -11,6 +15,8 @@ class SalesSummaryItem(BaseModel):
 
 class SalesSummaryResponse(BaseModel):
     items: list[SalesSummaryItem]
+    # Amounts are converted to this currency; None = summed as stored
+    report_currency: CurrencyType | None = None
 
 
 class PurchaseSummaryItem(BaseModel):
@@ -42,6 +48,7 @@ class CustomerRankingItem(BaseModel):
 
 class CustomerRankingResponse(BaseModel):
     items: list[CustomerRankingItem]
+    report_currency: CurrencyType | None = None
 
 
 class ProductRankingItem(BaseModel):
@@ -53,3 +60,77 @@ class ProductRankingItem(BaseModel):
 
 class ProductRankingResponse(BaseModel):
     items: list[ProductRankingItem]
+    report_currency: CurrencyType | None = None
+
+
+class CategorySalesRollupItem(BaseModel):
+    # 0 = grand total, 1/2/3 = subtotal (or detail) at that category level
+    level: int
+    category_level1_id: uuid.UUID | None = None
+    category_level1_name: str | None = None
+    category_level2_id: uuid.UUID | None = None
+    category_level2_name: str | None = None
+    category_level3_id: uuid.UUID | None = None
+    category_level3_name: str | None = None
+    order_count: int
+    total_quantity: int
+    total_amount: Decimal
+
+
+class CategorySalesRollupResponse(BaseModel):
+    items: list[CategorySalesRollupItem]
+    report_currency: CurrencyType | None = None
+
+
+class PivotRow(BaseModel):
+    # One entry per requested dimension, in request order
+    keys: list[str | None]
+    labels: list[str | None]
+    values: dict[str, int | Decimal]
+
+
+class PivotResponse(BaseModel):
+    dimensions: list[str]
+    aggregates: list[str]
+    items: list[PivotRow]
+    total_groups: int
+    row_count: int
+    snapshot_at: datetime
+    # Amounts are in this currency; None when grouped by the orders' own currency
+    report_currency: CurrencyType | None = None
+
+
+class FxRateRead(BaseModel):
+    rate_date: date
+    currency: CurrencyType
+    # USD value of one unit of the currency
+    rate: Decimal
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class FxRateImportResult(BaseModel):
+    imported: int
+    currencies: list[CurrencyType]
+    date_from: date | None = None
+    date_to: date | None = None
+
+
+class MarginReportItem(BaseModel):
+    # Sales order id / product id, per group_by
+    group_key: str
+    label: str | None = None
+    quantity: int
+    revenue: Decimal
+    purchase_cost: Decimal
+    freight: Decimal
+    landed_cost: Decimal
+    margin: Decimal
+    # margin / revenue; None when there is no revenue
+    margin_rate: Decimal | None = None
+
+
+class MarginReportResponse(BaseModel):
+    items: list[MarginReportItem]
+    report_currency: CurrencyType
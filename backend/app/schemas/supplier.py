@@ -1,9 +1,11 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 
 from pydantic import BaseModel, Field
 
+from app.schemas.common import CursorParams
+
 
 class SupplierCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=200)
@@ -70,7 +72,35 @@ class SupplierProductRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
-class SupplierListParams(BaseModel):
+class SupplierPriceCreate(BaseModel):
+    product_id: uuid.UUID
+    # The tier applies to orders of at least this quantity
+    min_quantity: int = Field(default=1, ge=1)
+    unit_price: Decimal = Field(..., ge=0)
+    # Inclusive; an open bound never expires
+    valid_from: date | None = None
+    valid_to: date | None = None
+
+
+class SupplierPriceListUpdate(BaseModel):
+    # Replaces the supplier's whole price list
+    items: list[SupplierPriceCreate] = Field(default_factory=list, max_length=20000)
+
+
+class SupplierPriceRead(BaseModel):
+    id: uuid.UUID
+    supplier_id: uuid.UUID
+    product_id: uuid.UUID
+    min_quantity: int
+    unit_price: Decimal
+    valid_from: date | None = None
+    valid_to: date | None = None
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class SupplierListParams(CursorParams):
     keyword: str | None = None
     page: int = Field(default=1, ge=1)
     page_size: int = Field(default=20, ge=1, le=100)
@@ -5,6 +5,7 @@ from typing import Any
 from pydantic import BaseModel, Field
 
 from app.models.enums import AuditAction, UserRole
+from app.schemas.common import CursorParams
 
 # --- User management schemas ---
 
@@ -39,7 +40,7 @@ class SystemUserRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
-class SystemUserListParams(BaseModel):
+class SystemUserListParams(CursorParams):
     keyword: str | None = None
     role: UserRole | None = None
     is_active: bool | None = None
@@ -73,7 +74,7 @@ class AuditLogRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
-class AuditLogListParams(BaseModel):
+class AuditLogListParams(CursorParams):
     user_id: uuid.UUID | None = None
     action: AuditAction | None = None
     resource_type: str | None = None
@@ -102,3 +103,12 @@ class SystemConfigRead(BaseModel):
 class SystemConfigUpdate(BaseModel):
     config_value: Any
     description: str | None = None
+
+
+class CacheNamespaceStats(BaseModel):
+    namespace: str
+    hit: int
+    stale: int
+    miss: int
+    bypass: int
+    hit_ratio: float
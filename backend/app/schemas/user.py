@@ -17,6 +17,11 @@ class TokenResponse(BaseModel):
     token_type: str = "bearer"
 
 
+class StreamTicketResponse(BaseModel):
+    ticket: str
+    expires_in: int
+
+
 class RefreshRequest(BaseModel):
     refresh_token: str
 
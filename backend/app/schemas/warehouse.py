@@ -4,6 +4,7 @@ from datetime import date, datetime
 from pydantic import BaseModel, Field
 
 from app.models.enums import InspectionResult
+from app.schemas.common import CursorParams
 
 
 # --- Receiving Note Item ---
@@ -77,7 +78,7 @@ class ReceivingNoteListRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
-class ReceivingNoteListParams(BaseModel):
+class ReceivingNoteListParams(CursorParams):
     purchase_order_id: uuid.UUID | None = None
     keyword: str | None = None
     page: int = Field(default=1, ge=1)
@@ -116,7 +117,7 @@ class InventoryByOrderRead(BaseModel):
     available_quantity: int
 
 
-class InventoryListParams(BaseModel):
+class InventoryListParams(CursorParams):
     product_id: uuid.UUID | None = None
     sales_order_id: uuid.UUID | None = None
     keyword: str | None = None
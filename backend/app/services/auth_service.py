@@ -1,9 +1,12 @@
+import json
+import secrets
 import uuid
 
 from jose import JWTError
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.core.exceptions import AppError, NotFoundError
 from app.core.security import (
     create_access_token,
@@ -77,3 +80,17 @@ class AuthService:
     async def is_token_blacklisted(self, jti: str) -> bool:
         result = await self.redis.get(f"token_blacklist:{jti}")
         return result is not None
+
+    async def issue_stream_ticket(self, token: str) -> str:
+        """Trade a validated access token for a short-lived, single-use stream ticket.
+
+        The ticket stands in for the token in the event stream URL, so the token
+        itself never lands in access logs.
+        """
+        payload = decode_token(token)
+        ticket = secrets.token_urlsafe(32)
+        claims = {key: payload.get(key) for key in ("sub", "jti", "exp")}
+        await self.redis.setex(
+            f"stream_ticket:{ticket}", settings.STREAM_TICKET_EXPIRE_SECONDS, json.dumps(claims)
+        )
+        return ticket
@@ -0,0 +1,95 @@
+"""Status transitions applied to many orders with one UPDATE.
+
+The current status of every requested id is read with one query and checked
+against the transitions allowed into the target status. One
+``UPDATE ... WHERE id = ANY(:ids) AND status IN (:sources) RETURNING id`` then
+moves all eligible rows; the status guard makes a row changed concurrently
+since the check fail instead of being overwritten. Each id gets its own
+outcome, so one bad id does not block the rest.
+"""
+
+import enum
+import uuid
+from collections.abc import Collection
+
+from sqlalchemy import any_, bindparam, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.events import event_bus
+from app.models.base import Base
+from app.schemas.common import BulkStatusOutcome, BulkStatusResult
+from app.services.live_updates import TRACKED, plain
+
+
+def _id_array(ids: list[uuid.UUID]):
+    return bindparam("ids", ids, type_=ARRAY(UUID(as_uuid=True)), unique=True)
+
+
+async def transition_many(
+    db: AsyncSession,
+    model: type[Base],
+    ids: list[uuid.UUID],
+    new_status: enum.Enum,
+    sources: Collection[enum.Enum],
+    user_id: uuid.UUID,
+) -> BulkStatusResult:
+    """Move ``ids`` to ``new_status`` where their current status is in ``sources``."""
+    ids = list(dict.fromkeys(ids))
+    attrs = TRACKED[model].attrs
+    rows = {
+        row.id: row
+        for row in (
+            await db.execute(
+                select(model.id, *(getattr(model, a) for a in attrs)).where(
+                    model.id == any_(_id_array(ids))
+                )
+            )
+        ).all()
+    }
+
+    eligible = [id for id in ids if id in rows and rows[id].status in sources]
+    updated: set[uuid.UUID] = set()
+    if eligible:
+        result = await db.execute(
+            update(model)
+            .where(model.id == any_(_id_array(eligible)), model.status.in_(sources))
+            .values(status=new_status, updated_by=user_id)
+            .returning(model.id)
+        )
+        updated = set(result.scalars().all())
+
+    outcomes = []
+    for id in ids:
+        row = rows.get(id)
+        if row is None:
+            outcomes.append(BulkStatusOutcome(id=id, success=False, message="订单不存在"))
+            continue
+        previous = row.status.value
+        if id in updated:
+            before = {a: plain(getattr(row, a)) for a in attrs}
+            # Core UPDATE bypasses the flush-time change capture; publish it explicitly
+            event_bus.publish(
+                db.sync_session,
+                TRACKED[model].type,
+                id=str(id),
+                before=before,
+                after={**before, "status": plain(new_status)},
+            )
+            outcomes.append(BulkStatusOutcome(id=id, success=True, previous_status=previous))
+        elif row.status not in sources:
+            outcomes.append(
+                BulkStatusOutcome(
+                    id=id,
+                    success=False,
+                    previous_status=previous,
+                    message=f"不允许从 {previous} 转为 {new_status.value}",
+                )
+            )
+        else:
+            outcomes.append(
+                BulkStatusOutcome(
+                    id=id, success=False, previous_status=previous, message="订单状态已被修改"
+                )
+            )
+    return BulkStatusResult(updated=len(updated), items=outcomes)
@@ -0,0 +1,213 @@
+"""Process-wide cache of the product category tree.
+
+The tree is small and read on almost every product request, so each worker keeps
+an immutable snapshot with precomputed ancestor paths and leaf sets. Writes made
+through ``ProductCategoryService`` mark the session; once that transaction commits
+the local snapshot is dropped and a new version is published over Redis so the
+other workers drop theirs too.
+"""
+
+import asyncio
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.logging import logger
+from app.repositories.product_category_repo import ProductCategoryRepository
+
+CHANNEL = "category_tree:invalidate"
+VERSION_KEY = "category_tree:version"
+_DIRTY_FLAG = "category_tree_dirty"
+
+
+@dataclass(frozen=True)
+class CategoryNode:
+    id: uuid.UUID
+    name: str
+    level: int
+    parent_id: uuid.UUID | None
+    sort_order: int
+    created_at: datetime
+    updated_at: datetime
+    # Root-to-self path, including this node
+    path_ids: tuple[uuid.UUID, ...]
+    path_names: tuple[str, ...]
+    child_ids: tuple[uuid.UUID, ...]
+    # Leaf descendants (this node itself when it has no children)
+    leaf_ids: tuple[uuid.UUID, ...]
+
+    @property
+    def is_leaf(self) -> bool:
+        return not self.child_ids
+
+
+class CategoryTree:
+    """Immutable snapshot; every lookup is a dict access."""
+
+    def __init__(self, nodes: dict[uuid.UUID, CategoryNode], version: int):
+        self.nodes = nodes
+        self.version = version
+        self.roots = [n for n in nodes.values() if n.parent_id is None]
+        # Later (deeper / later-sorted) names win, matching the import lookup
+        self.by_name = {n.name: n.id for n in nodes.values()}
+
+    @classmethod
+    def build(cls, categories: list, version: int = 0) -> "CategoryTree":
+        """Build from categories ordered by level, sort_order, name."""
+        children: dict[uuid.UUID | None, list] = {}
+        for cat in categories:
+            children.setdefault(cat.parent_id, []).append(cat)
+
+        nodes: dict[uuid.UUID, CategoryNode] = {}
+
+        def visit(cat, path_ids: tuple, path_names: tuple) -> tuple[uuid.UUID, ...]:
+            path_ids = (*path_ids, cat.id)
+            path_names = (*path_names, cat.name)
+            kids = children.get(cat.id, [])
+            leaf_ids: tuple[uuid.UUID, ...] = ()
+            for kid in kids:
+                leaf_ids += visit(kid, path_ids, path_names)
+            if not kids:
+                leaf_ids = (cat.id,)
+            nodes[cat.id] = CategoryNode(
+                id=cat.id,
+                name=cat.name,
+                level=cat.level,
+                parent_id=cat.parent_id,
+                sort_order=cat.sort_order,
+                created_at=cat.created_at,
+                updated_at=cat.updated_at,
+                path_ids=path_ids,
+                path_names=path_names,
+                child_ids=tuple(k.id for k in kids),
+                leaf_ids=leaf_ids,
+            )
+            return leaf_ids
+
+        for root in children.get(None, []):
+            visit(root, (), ())
+        # Keep the load order so iteration matches get_all_ordered()
+        ordered = {cat.id: nodes[cat.id] for cat in categories if cat.id in nodes}
+        return cls(ordered, version)
+
+    def get(self, category_id: uuid.UUID | None) -> CategoryNode | None:
+        return self.nodes.get(category_id) if category_id else None
+
+    def is_leaf(self, category_id: uuid.UUID) -> bool:
+        node = self.nodes.get(category_id)
+        return node is not None and node.is_leaf
+
+    def leaf_ids(self, category_id: uuid.UUID) -> list[uuid.UUID]:
+        node = self.nodes.get(category_id)
+        return list(node.leaf_ids) if node else []
+
+    def level_names(self, category_id: uuid.UUID) -> dict[int, str]:
+        node = self.nodes.get(category_id)
+        if not node:
+            return {}
+        return {level: name for level, name in enumerate(node.path_names, start=1)}
+
+
+class CategoryTreeCache:
+    def __init__(self):
+        self._tree: CategoryTree | None = None
+        # Bumped on every invalidation so a load racing with a write is discarded
+        self._generation = 0
+        self.version = 0
+        self._redis: Redis | None = None
+        self._listener: asyncio.Task | None = None
+        self._pending: set[asyncio.Task] = set()
+
+    async def get(self, db: AsyncSession) -> CategoryTree:
+        if db.sync_session.info.get(_DIRTY_FLAG):
+            # Uncommitted category changes: build a private snapshot, never share it
+            return await self._load(db)
+        tree = self._tree
+        if tree is None:
+            # Concurrent misses may each load once; the tree is a single small query
+            generation = self._generation
+            tree = await self._load(db)
+            if generation == self._generation:
+                self._tree = tree
+        return tree
+
+    async def _load(self, db: AsyncSession) -> CategoryTree:
+        categories = await ProductCategoryRepository(db).get_all_ordered()
+        return CategoryTree.build(categories, self.version)
+
+    def invalidate(self, version: int | None = None) -> None:
+        self._generation += 1
+        self._tree = None
+        if version is not None and version > self.version:
+            self.version = version
+
+    def mark_dirty(self, db: AsyncSession) -> None:
+        """Record a category write; the cache is invalidated when the transaction ends."""
+        db.sync_session.info[_DIRTY_FLAG] = True
+        self.invalidate()
+
+    def publish_soon(self) -> None:
+        """Schedule :meth:`publish` from synchronous session event hooks."""
+        try:
+            task = asyncio.get_running_loop().create_task(self.publish())
+        except RuntimeError:
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def publish(self) -> None:
+        if self._redis is None:
+            return
+        try:
+            version = await self._redis.incr(VERSION_KEY)
+            self.invalidate(version)
+            await self._redis.publish(CHANNEL, version)
+        except Exception:
+            logger.warning("category_tree_publish_failed", exc_info=True)
+
+    async def start(self, redis: Redis) -> None:
+        self._redis = redis
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        self._redis = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.invalidate(int(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("category_tree_listener_error", exc_info=True)
+                # Updates may have been missed while disconnected
+                self.invalidate()
+                await asyncio.sleep(1)
+
+
+category_tree_cache = CategoryTreeCache()
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    if session.info.pop(_DIRTY_FLAG, False):
+        category_tree_cache.invalidate()
+        category_tree_cache.publish_soon()
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    if session.info.pop(_DIRTY_FLAG, False):
+        category_tree_cache.invalidate()
@@ -1,4 +1,3 @@
-import math
 import uuid
 from datetime import date
 from decimal import Decimal
@@ -7,6 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.events import event_bus
 from app.core.exceptions import BusinessError, NotFoundError
 from app.models.container import (
     ContainerPlan,
@@ -18,6 +18,7 @@ from app.models.enums import ContainerPlanStatus, SalesOrderStatus
 from app.models.sales_order import SalesOrder, SalesOrderItem
 from app.models.warehouse import InventoryRecord
 from app.repositories.container_repo import ContainerPlanRepository
+from app.repositories.fact_repo import FactRepository
 from app.repositories.warehouse_repo import InventoryRepository
 from app.schemas.common import PaginatedData
 from app.schemas.container import (
@@ -35,7 +36,8 @@ from app.schemas.container import (
     ContainerValidationResponse,
 )
 from app.services.container_calculator import CONTAINER_SPECS, recommend_container_type
-from app.utils.code_generator import generate_order_no
+from app.services.landed_cost_service import LandedCostService
+from app.services.sequence_service import SequenceService
 
 VALID_TRANSITIONS: dict[ContainerPlanStatus, set[ContainerPlanStatus]] = {
     ContainerPlanStatus.PLANNING: {ContainerPlanStatus.CONFIRMED},
@@ -50,18 +52,24 @@ class ContainerService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = ContainerPlanRepository(db)
+        self.sequences = SequenceService(db)
         self.inventory_repo = InventoryRepository(db)
+        self.fact_repo = FactRepository(db)
 
     # ==================== CRUD ====================
 
     async def create(self, data: ContainerPlanCreate, user_id: uuid.UUID) -> ContainerPlan:
         destination_ports = set()
+        sales_orders: list[SalesOrder] = []
 
         # If sales_order_ids provided, validate them (R04 - optional now)
         if data.sales_order_ids:
-            for so_id in data.sales_order_ids:
-                result = await self.db.execute(select(SalesOrder).where(SalesOrder.id == so_id))
-                so = result.scalar_one_or_none()
+            result = await self.db.execute(
+                select(SalesOrder).where(SalesOrder.id.in_(data.sales_order_ids))
+            )
+            found = {so.id: so for so in result.scalars().all()}
+            for so_id in dict.fromkeys(data.sales_order_ids):
+                so = found.get(so_id)
                 if not so:
                     raise NotFoundError("销售订单", str(so_id))
                 if so.status != SalesOrderStatus.GOODS_READY:
@@ -70,6 +78,7 @@ class ContainerService:
                         message=f"订单 {so.order_no} 状态为 {so.status.value}，需为'已到齐'才可排柜",
                     )
                 destination_ports.add(so.destination_port)
+                sales_orders.append(so)
 
             # R08: validate destination port consistency
             if len(destination_ports) > 1:
@@ -89,8 +98,7 @@ class ContainerService:
                 message="未关联销售订单时，必须手动指定目的港",
             )
 
-        seq = await self.repo.count_by_date(date.today()) + 1
-        plan_no = generate_order_no("CL", date.today(), seq)
+        plan_no = await self.sequences.order_no("CL", date.today())
 
         plan = ContainerPlan(
             plan_no=plan_no,
@@ -101,16 +109,14 @@ class ContainerService:
             remark=data.remark,
             created_by=user_id,
             updated_by=user_id,
+            # Link rows go out with the plan's INSERT; every collection starts loaded
+            items=[],
+            sales_orders=sales_orders,
+            stuffing_records=[],
         )
         plan = await self.repo.create(plan)
-
-        # Link sales orders if provided
-        if data.sales_order_ids:
-            await self.repo.link_sales_orders(plan.id, data.sales_order_ids)
-
-        plan_id = plan.id
-        self.db.expire(plan)
-        return await self.get_by_id(plan_id)
+        await self.fact_repo.refresh_containers([(plan.created_at, plan.container_type)])
+        return plan
 
     async def get_by_id(self, id: uuid.UUID) -> ContainerPlan:
         plan = await self.repo.get_with_items(id)
@@ -124,6 +130,7 @@ class ContainerService:
         plan = await self.get_by_id(id)
         if plan.status != ContainerPlanStatus.PLANNING:
             raise BusinessError(code=42254, message="只有规划中状态的排柜计划可以编辑")
+        old_fact_key = (plan.created_at, plan.container_type)
 
         update_fields = data.model_dump(exclude_unset=True)
         update_fields["updated_by"] = user_id
@@ -132,28 +139,30 @@ class ContainerService:
                 setattr(plan, key, value)
 
         await self.db.flush()
-        plan_id = plan.id
-        self.db.expire(plan)
-        return await self.get_by_id(plan_id)
+        await self.fact_repo.refresh_containers(
+            [old_fact_key, (plan.created_at, plan.container_type)]
+        )
+        return plan
 
     async def list_plans(
         self, params: ContainerPlanListParams
     ) -> PaginatedData[ContainerPlanListRead]:
         offset = (params.page - 1) * params.page_size
-        items, total = await self.repo.search(
+        result = await self.repo.search(
             status=params.status,
             keyword=params.keyword,
             offset=offset,
             limit=params.page_size,
             order_by=params.sort_by,
             order_desc=params.sort_order == "desc",
+            cursor=params.cursor,
+            include_total=params.include_total,
         )
-        return PaginatedData(
-            items=[ContainerPlanListRead.model_validate(item) for item in items],
-            total=total,
+        return PaginatedData.from_page(
+            [ContainerPlanListRead.model_validate(item) for item in result.items],
+            result,
             page=params.page,
             page_size=params.page_size,
-            total_pages=math.ceil(total / params.page_size) if total > 0 else 0,
         )
 
     # ==================== Items ====================
@@ -241,15 +250,15 @@ class ContainerService:
             volume_cbm=data.volume_cbm,
             weight_kg=data.weight_kg,
         )
-        created_item = await self.repo.add_item(item)
+        plan.items.append(item)
 
-        # Auto-sync M2M table if sales_order_id is set
+        # Auto-sync M2M table if sales_order_id is set (flushed with the item)
         if sales_order_id:
-            existing_so_ids = await self.repo.get_linked_so_ids(plan_id)
-            if sales_order_id not in existing_so_ids:
-                await self.repo.link_sales_orders(plan_id, [sales_order_id])
+            await self.repo.link_sales_orders(plan, [sales_order_id])
 
-        return created_item
+        item = await self.repo.add_item(item)
+        await LandedCostService(self.db).reallocate_plan(plan_id)
+        return item
 
     async def update_item(
         self, plan_id: uuid.UUID, item_id: uuid.UUID, data: ContainerPlanItemUpdate
@@ -269,6 +278,7 @@ class ContainerService:
 
         await self.db.flush()
         await self.db.refresh(item)
+        await LandedCostService(self.db).reallocate_plan(plan_id)
         return item
 
     async def delete_item(self, plan_id: uuid.UUID, item_id: uuid.UUID) -> None:
@@ -279,7 +289,9 @@ class ContainerService:
         item = await self.repo.get_item_by_id(item_id)
         if not item or item.container_plan_id != plan_id:
             raise NotFoundError("配载明细", str(item_id))
+        plan.items.remove(item)
         await self.repo.delete_item(item)
+        await LandedCostService(self.db).reallocate_plan(plan_id)
 
     # ==================== Summary & Validation ====================
 
@@ -327,7 +339,6 @@ class ContainerService:
     async def validate(self, plan_id: uuid.UUID) -> ContainerValidationResponse:
         """R06-R09: Validate the loading plan."""
         from app.models.product import Product
-        from app.models.warehouse import InventoryRecord
         from app.repositories.system_config_repo import SystemConfigRepository
 
         plan = await self.get_by_id(plan_id)
@@ -460,7 +471,7 @@ class ContainerService:
             )
 
         # Lock inventory: reserve for each item with inventory_record_id
-        items = await self.repo.get_items_by_plan(plan_id)
+        items = plan.items
         for item in items:
             if item.inventory_record_id:
                 await self.inventory_repo.reserve(item.inventory_record_id, item.quantity)
@@ -481,28 +492,31 @@ class ContainerService:
         plan.status = ContainerPlanStatus.CONFIRMED
         plan.updated_by = user_id
         await self.db.flush()
+        event_bus.publish(
+            self.db.sync_session,
+            "inventory.reserved",
+            container_plan_id=str(plan.id),
+            items=_reservation_items(items),
+        )
 
-        # R12: update linked SOs to container_planned
-        so_ids = await self.repo.get_linked_so_ids(plan_id)
-        for so_id in so_ids:
-            result = await self.db.execute(
+        # R12: update linked SOs to container_planned; the linked orders are already in
+        # plan.sales_orders, one query loads their items
+        if plan.sales_orders:
+            await self.db.execute(
                 select(SalesOrder)
                 .options(selectinload(SalesOrder.items))
-                .where(SalesOrder.id == so_id)
+                .where(SalesOrder.id.in_([so.id for so in plan.sales_orders]))
             )
-            so = result.scalar_one_or_none()
-            if so and so.status == SalesOrderStatus.GOODS_READY:
+        for so in plan.sales_orders:
+            if so.status == SalesOrderStatus.GOODS_READY:
                 # Check if all items are fully reserved
                 all_reserved = all(
                     so_item.reserved_quantity >= so_item.quantity for so_item in so.items
                 )
                 if all_reserved:
                     so.status = SalesOrderStatus.CONTAINER_PLANNED
-                    await self.db.flush()
-
-        plan_id_val = plan.id
-        self.db.expire(plan)
-        return await self.get_by_id(plan_id_val)
+        await self.db.flush()
+        return plan
 
     async def cancel_plan(self, plan_id: uuid.UUID, user_id: uuid.UUID) -> ContainerPlan:
         """Cancel a confirmed plan → release inventory reservations."""
@@ -511,7 +525,7 @@ class ContainerService:
             raise BusinessError(code=42263, message="只有已确认状态的排柜计划可以取消")
 
         # Release inventory reservations
-        items = await self.repo.get_items_by_plan(plan_id)
+        items = plan.items
         for item in items:
             if item.inventory_record_id:
                 await self.inventory_repo.release_reservation(
@@ -535,19 +549,19 @@ class ContainerService:
         plan.status = ContainerPlanStatus.PLANNING
         plan.updated_by = user_id
         await self.db.flush()
+        event_bus.publish(
+            self.db.sync_session,
+            "inventory.released",
+            container_plan_id=str(plan.id),
+            items=_reservation_items(items),
+        )
 
         # Rollback SO status if applicable
-        so_ids = await self.repo.get_linked_so_ids(plan_id)
-        for so_id in so_ids:
-            result = await self.db.execute(select(SalesOrder).where(SalesOrder.id == so_id))
-            so = result.scalar_one_or_none()
-            if so and so.status == SalesOrderStatus.CONTAINER_PLANNED:
+        for so in plan.sales_orders:
+            if so.status == SalesOrderStatus.CONTAINER_PLANNED:
                 so.status = SalesOrderStatus.GOODS_READY
-                await self.db.flush()
-
-        plan_id_val = plan.id
-        self.db.expire(plan)
-        return await self.get_by_id(plan_id_val)
+        await self.db.flush()
+        return plan
 
     async def record_stuffing(
         self, plan_id: uuid.UUID, data: ContainerStuffingCreate, user_id: uuid.UUID
@@ -649,3 +663,15 @@ class ContainerService:
                 for item in items
             ],
         }
+
+
+def _reservation_items(items: list[ContainerPlanItem]) -> list[dict]:
+    return [
+        {
+            "inventory_record_id": str(item.inventory_record_id),
+            "product_id": str(item.product_id),
+            "quantity": item.quantity,
+        }
+        for item in items
+        if item.inventory_record_id
+    ]
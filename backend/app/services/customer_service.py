@@ -1,23 +1,26 @@
-import math
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import LRUCache
 from app.core.exceptions import NotFoundError
 from app.models.customer import Customer
 from app.repositories.customer_repo import CustomerRepository
-from app.schemas.common import PaginatedData
+from app.schemas.common import PaginatedData, SuggestItem
 from app.schemas.customer import CustomerCreate, CustomerListParams, CustomerRead, CustomerUpdate
-from app.utils.code_generator import generate_entity_code
+from app.services.sequence_service import SequenceService
+
+_suggest_cache = LRUCache(maxsize=1024, ttl=30)
 
 
 class CustomerService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.repo = CustomerRepository(db)
+        self.sequences = SequenceService(db)
 
     async def create(self, data: CustomerCreate, user_id: uuid.UUID) -> Customer:
-        seq = await self.repo.get_next_sequence()
-        customer_code = generate_entity_code("CUS", seq)
+        customer_code = await self.sequences.entity_code("CUS")
 
         customer = Customer(
             customer_code=customer_code,
@@ -25,6 +28,7 @@ class CustomerService:
             created_by=user_id,
             updated_by=user_id,
         )
+        _suggest_cache.clear_on_commit(self.db)
         return await self.repo.create(customer)
 
     async def get_by_id(self, id: uuid.UUID) -> Customer:
@@ -37,22 +41,39 @@ class CustomerService:
         customer = await self.get_by_id(id)
         update_data = data.model_dump(exclude_unset=True)
         update_data["updated_by"] = user_id
+        _suggest_cache.clear_on_commit(self.db)
         return await self.repo.update(customer, update_data)
 
+    async def suggest(self, keyword: str, limit: int = 10) -> list[SuggestItem]:
+        key = (keyword.lower(), limit)
+        cached = _suggest_cache.get(key)
+        if cached is not None:
+            return cached
+        rows = await self.repo.suggest(
+            keyword,
+            code_column=Customer.customer_code,
+            name_columns=[Customer.name, Customer.short_name],
+            limit=limit,
+        )
+        items = [SuggestItem(id=id, code=code, name=name) for id, code, name in rows]
+        _suggest_cache.set(key, items)
+        return items
+
     async def list_customers(self, params: CustomerListParams) -> PaginatedData[CustomerRead]:
         offset = (params.page - 1) * params.page_size
-        items, total = await self.repo.search(
+        result = await self.repo.search(
             keyword=params.keyword,
             country=params.country,
             offset=offset,
             limit=params.page_size,
             order_by=params.sort_by,
             order_desc=params.sort_order == "desc",
+            cursor=params.cursor,
+            include_total=params.include_total,
         )
-        return PaginatedData(
-            items=[CustomerRead.model_validate(item) for item in items],
-            total=total,
+        return PaginatedData.from_page(
+            [CustomerRead.model_validate(item) for item in result.items],
+            result,
             page=params.page,
             page_size=params.page_size,
-            total_pages=math.ceil(total / params.page_size) if total > 0 else 0,
         )
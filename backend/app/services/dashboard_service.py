@@ -1,9 +1,11 @@
+import enum
 from datetime import date, timedelta
 from decimal import Decimal
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.result_cache import cached_result
 from app.models.enums import (
     LogisticsStatus,
     PurchaseOrderStatus,
@@ -16,6 +18,7 @@ from app.models.sales_order import SalesOrder
 from app.models.warehouse import InventoryRecord
 from app.repositories.system_config_repo import SystemConfigRepository
 from app.schemas.dashboard import (
+    DashboardSummaryResponse,
     ExpiryWarningItem,
     ExpiryWarningResponse,
     InTransitItem,
@@ -26,11 +29,37 @@ from app.schemas.dashboard import (
 )
 
 
+def _status_aggregates(model, statuses: type[enum.Enum], prefix: str) -> list:
+    columns = []
+    for status in statuses:
+        in_status = model.status == status
+        columns.append(func.count().filter(in_status).label(f"{prefix}_{status.value}_count"))
+        columns.append(
+            func.coalesce(func.sum(model.total_amount).filter(in_status), 0).label(
+                f"{prefix}_{status.value}_amount"
+            )
+        )
+    return columns
+
+
+def _overview_items(row, statuses: type[enum.Enum], prefix: str) -> list[OverviewItem]:
+    return [
+        OverviewItem(
+            status=status.value,
+            count=row[f"{prefix}_{status.value}_count"],
+            total_amount=Decimal(str(row[f"{prefix}_{status.value}_amount"])),
+        )
+        for status in statuses
+        if row[f"{prefix}_{status.value}_count"]
+    ]
+
+
 class DashboardService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.config_repo = SystemConfigRepository(db)
 
+    @cached_result("dashboard:overview", tags=("sales_orders", "purchase_orders"))
     async def get_overview(self) -> OverviewResponse:
         # Sales orders grouped by status
         so_result = await self.db.execute(
@@ -68,6 +97,49 @@ class DashboardService:
 
         return OverviewResponse(sales_orders=so_items, purchase_orders=po_items)
 
+    @cached_result(
+        "dashboard:summary", tags=("sales_orders", "purchase_orders", "logistics_records")
+    )
+    async def get_summary(self) -> DashboardSummaryResponse:
+        """Overview and todo counters in a single statement.
+
+        Each table is scanned once by a single-row CTE of ``FILTER`` aggregates;
+        the CTEs are then cross-joined into one result row.
+        """
+        so = select(*_status_aggregates(SalesOrder, SalesOrderStatus, "so")).cte("so")
+        po = select(*_status_aggregates(PurchaseOrder, PurchaseOrderStatus, "po")).cte("po")
+        today = date.today()
+        logistics = select(
+            func.count()
+            .filter(
+                LogisticsRecord.status.in_(
+                    [LogisticsStatus.LOADED_ON_SHIP, LogisticsStatus.IN_TRANSIT]
+                ),
+                LogisticsRecord.eta <= today + timedelta(days=7),
+                LogisticsRecord.eta >= today,
+            )
+            .label("arriving_soon")
+        ).cte("logistics")
+
+        result = await self.db.execute(
+            select(so, po, logistics).select_from(so.join(po, true()).join(logistics, true()))
+        )
+        row = result.one()._mapping
+
+        return DashboardSummaryResponse(
+            overview=OverviewResponse(
+                sales_orders=_overview_items(row, SalesOrderStatus, "so"),
+                purchase_orders=_overview_items(row, PurchaseOrderStatus, "po"),
+            ),
+            todos=TodoResponse(
+                draft_sales_orders=row["so_draft_count"],
+                ordered_purchase_orders=row["po_ordered_count"],
+                goods_ready_sales_orders=row["so_goods_ready_count"],
+                arriving_soon_containers=row["arriving_soon"],
+            ),
+        )
+
+    @cached_result("dashboard:todos", tags=("sales_orders", "purchase_orders", "logistics_records"))
     async def get_todos(self) -> TodoResponse:
         # Draft sales orders
         draft_so = await self.db.execute(
@@ -111,6 +183,7 @@ class DashboardService:
             arriving_soon_containers=arriving_soon.scalar_one(),
         )
 
+    @cached_result("dashboard:in-transit", tags=("logistics_records",))
     async def get_in_transit(self) -> InTransitResponse:
         result = await self.db.execute(
             select(LogisticsRecord)
@@ -141,6 +214,9 @@ class DashboardService:
         ]
         return InTransitResponse(items=items, total=len(items))
 
+    @cached_result(
+        "dashboard:expiry-warnings", tags=("inventory_records", "products", "system_configs")
+    )
     async def get_expiry_warnings(self) -> ExpiryWarningResponse:
         # Get threshold from config
         config = await self.config_repo.get_by_key("shelf_life_threshold")
@@ -0,0 +1,242 @@
+"""Exchange rates and conversion of sales amounts to a reporting currency.
+
+Rates are stored as the USD value of one unit of each currency, one row per
+currency and rate date; a rate stays in effect until the next one loaded. Each
+worker keeps the whole (small) table in memory, keyed by a cheap fingerprint
+query so a load made by any worker is picked up on the next request.
+
+Aggregates convert inside SQL: the in-memory table is expanded into one
+conversion factor per (day, currency) for the days the aggregated rows actually
+span and sent as three arrays, which the query unnests and equi-joins on the
+order date.
+"""
+
+import csv
+import io
+from bisect import bisect_right
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy import and_, case, func
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.exceptions import BusinessError
+from app.models.enums import CurrencyType
+from app.repositories.fx_rate_repo import FxRateRepository
+from app.schemas.statistics import FxRateImportResult, FxRateRead
+
+BASE_CURRENCY = CurrencyType.USD
+_FACTOR_PLACES = Decimal("1e-10")
+
+_tables = LRUCache(maxsize=2, ttl=3600)
+
+
+class FxRateTable:
+    """Immutable in-memory copy of the rate table."""
+
+    def __init__(self, rows: list[tuple[CurrencyType, date, Decimal]]):
+        self._dates: dict[CurrencyType, list[date]] = {}
+        self._rates: dict[CurrencyType, list[Decimal]] = {}
+        for currency, rate_date, rate in rows:
+            self._dates.setdefault(currency, []).append(rate_date)
+            self._rates.setdefault(currency, []).append(Decimal(rate))
+        all_dates = [d for dates in self._dates.values() for d in dates]
+        self.first_date = min(all_dates) if all_dates else None
+        self._factors = LRUCache(maxsize=32, ttl=3600)
+
+    def rate(self, currency: CurrencyType, day: date) -> Decimal | None:
+        """USD value of one unit of ``currency`` on ``day``."""
+        if currency == BASE_CURRENCY:
+            return Decimal(1)
+        dates = self._dates.get(currency)
+        if not dates:
+            return None
+        i = bisect_right(dates, day) - 1
+        return self._rates[currency][i] if i >= 0 else None
+
+    def convert(
+        self, amount: Decimal, from_currency: CurrencyType, to_currency: CurrencyType, day: date
+    ) -> Decimal | None:
+        if from_currency == to_currency:
+            return amount
+        source, target = self.rate(from_currency, day), self.rate(to_currency, day)
+        if source is None or target is None:
+            return None
+        return (amount * source / target).quantize(Decimal("0.01"))
+
+    def span(self, first_day: date, last_day: date) -> tuple[date, date] | None:
+        """Days between ``first_day`` and ``last_day`` that can have a factor at all:
+        none before the first rate, and the latest rates carry forward like in ``rate``."""
+        if self.first_date is None:
+            return None
+        start = max(first_day, self.first_date)
+        return (start, last_day) if start <= last_day else None
+
+    def factors(
+        self, report_currency: CurrencyType, start: date, end: date
+    ) -> tuple[list[date], list[str], list[Decimal]]:
+        """Per-day factors converting every other currency into ``report_currency``.
+
+        Days on which either rate is unknown are left out.
+        """
+        key = (report_currency, start, end)
+        cached = self._factors.get(key)
+        if cached is not None:
+            return cached
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        targets = [self.rate(report_currency, day) for day in days]
+        out_days, out_currencies, out_factors = [], [], []
+        for currency in CurrencyType:
+            if currency == report_currency:
+                continue
+            for day, target in zip(days, targets, strict=True):
+                source = self.rate(currency, day)
+                if source is None or target is None:
+                    continue
+                out_days.append(day)
+                out_currencies.append(currency.value)
+                out_factors.append((source / target).quantize(_FACTOR_PLACES))
+        result = (out_days, out_currencies, out_factors)
+        self._factors.set(key, result)
+        return result
+
+
+class FxConversion:
+    """SQL pieces converting an amount column into the reporting currency."""
+
+    def __init__(
+        self, currency: CurrencyType, days: list[date], currencies: list[str], factors: list
+    ):
+        self.currency = currency
+        self.table = (
+            func.unnest(
+                sa.literal(days, ARRAY(sa.Date)),
+                sa.literal(currencies, ARRAY(sa.String)),
+                sa.literal(factors, ARRAY(sa.Numeric)),
+            )
+            .table_valued(
+                sa.column("day", sa.Date),
+                sa.column("currency", sa.String),
+                sa.column("factor", sa.Numeric),
+            )
+            .render_derived(name="fx")
+        )
+
+    def join(self, query: sa.Select, day: Any, currency: Any) -> sa.Select:
+        return query.outerjoin(
+            self.table,
+            and_(self.table.c.day == day, self.table.c.currency == sa.cast(currency, sa.String)),
+        )
+
+    def amount(self, amount: Any, currency: Any) -> sa.ColumnElement:
+        same = sa.cast(currency, sa.String) == self.currency.value
+        return case((same, amount), else_=amount * self.table.c.factor)
+
+    def total(self, amount: Any, currency: Any) -> sa.ColumnElement:
+        return func.round(func.coalesce(func.sum(self.amount(amount, currency)), 0), 2)
+
+    def missing(self, currency: Any) -> sa.ColumnElement:
+        """Rows without a rate, counted over the whole result (before any LIMIT)."""
+        unconverted = func.count(
+            case(
+                (
+                    and_(
+                        sa.cast(currency, sa.String) != self.currency.value,
+                        self.table.c.factor.is_(None),
+                    ),
+                    1,
+                )
+            )
+        )
+        return func.sum(unconverted).over()
+
+    def check(self, rows: list) -> None:
+        if rows and rows[0].missing_rates:
+            raise missing_rate_error(self.currency)
+
+
+def missing_rate_error(currency: CurrencyType) -> BusinessError:
+    return BusinessError(code=42283, message=f"部分订单日期缺少汇率，无法换算为 {currency.value}")
+
+
+class FxRateService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repo = FxRateRepository(db)
+
+    async def get_table(self) -> FxRateTable:
+        version = await self.repo.get_version()
+        table = _tables.get(version)
+        if table is None:
+            table = FxRateTable(await self.repo.get_all())
+            _tables.set(version, table)
+        return table
+
+    async def conversion(
+        self, report_currency: CurrencyType, first_day: date | None, last_day: date | None
+    ) -> FxConversion:
+        """Conversion for rows dated ``first_day``..``last_day`` (the min / max date of
+        the data being aggregated; ``None`` when there is none)."""
+        table = await self.get_table()
+        span = table.span(first_day, last_day) if first_day and last_day else None
+        if span is None:
+            return FxConversion(report_currency, [], [], [])
+        return FxConversion(report_currency, *table.factors(report_currency, *span))
+
+    async def list_rates(
+        self,
+        currency: CurrencyType | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ) -> list[FxRateRead]:
+        rates = await self.repo.list_rates(currency, date_from, date_to)
+        return [FxRateRead.model_validate(r) for r in rates]
+
+    async def import_csv(self, content: bytes) -> FxRateImportResult:
+        """Load ``date,currency,rate`` rows (USD per unit); existing dates are overwritten."""
+        rows = parse_rates_csv(content)
+        await self.repo.upsert_many(rows)
+        return FxRateImportResult(
+            imported=len(rows),
+            currencies=sorted({r["currency"] for r in rows}, key=lambda c: c.value),
+            date_from=min((r["rate_date"] for r in rows), default=None),
+            date_to=max((r["rate_date"] for r in rows), default=None),
+        )
+
+
+def parse_rates_csv(content: bytes) -> list[dict]:
+    """Validate a rate file; the whole file is rejected if any row is invalid."""
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise BusinessError(code=42282, message="汇率文件需为 UTF-8 编码的 CSV")
+
+    reader = csv.DictReader(io.StringIO(text))
+    rows: dict[tuple[CurrencyType, date], dict] = {}
+    errors = []
+    for line, raw in enumerate(reader, start=2):
+        raw = {(k or "").strip().lower(): (v or "").strip() for k, v in raw.items()}
+        try:
+            rate_date = date.fromisoformat(raw.get("date") or raw.get("rate_date", ""))
+            currency = CurrencyType(raw.get("currency", "").upper())
+            rate = Decimal(raw.get("rate", ""))
+        except (ValueError, InvalidOperation):
+            errors.append({"row": line, "error": "日期、币种或汇率格式不正确"})
+            continue
+        if not rate.is_finite() or rate <= 0:
+            errors.append({"row": line, "error": "汇率必须大于 0"})
+        elif currency == BASE_CURRENCY and rate != 1:
+            errors.append({"row": line, "error": f"{BASE_CURRENCY.value} 为基准币种，汇率必须为 1"})
+        else:
+            rows[(currency, rate_date)] = {
+                "rate_date": rate_date,
+                "currency": currency,
+                "rate": rate,
+            }
+    if errors:
+        raise BusinessError(code=42282, message="汇率文件校验不通过", detail={"errors": errors})
+    return list(rows.values())
@@ -0,0 +1,327 @@
+"""Landed cost: logistics costs allocated to container plan items, and margins.
+
+A logistics record's costs are split, per cost currency, across every item of
+its container plan in proportion to the item's volume, weight or value. The
+split is done in whole cents with the largest-remainder method so the parts
+always add up to the record's total. Allocations are stored per item and
+re-run with the same method whenever the record's costs or its plan's items
+change. The report is optional, so a re-run that cannot be done (no items, a
+zero basis, a missing FX rate) never blocks the edit: the previous split is
+kept and flagged stale until an allocation succeeds again.
+"""
+
+import uuid
+from collections.abc import Sequence
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import sqlalchemy as sa
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import BusinessError, NotFoundError
+from app.core.logging import logger
+from app.models.container import ContainerPlanItem
+from app.models.enums import AllocationMethod, CurrencyType
+from app.models.logistics import LandedCostAllocation, LogisticsRecord
+from app.models.product import Product
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem
+from app.models.sales_order import SalesOrder, SalesOrderItem
+from app.repositories.container_repo import ContainerPlanRepository
+from app.repositories.logistics_repo import LogisticsRecordRepository
+from app.schemas.logistics import LandedCostAllocationRead, LandedCostAllocationResponse
+from app.schemas.statistics import MarginReportItem, MarginReportResponse
+from app.services.fx_rate_service import BASE_CURRENCY, FxRateService, missing_rate_error
+
+# Purchase orders carry no currency: suppliers invoice in RMB
+PURCHASE_CURRENCY = CurrencyType.RMB
+_CENT = Decimal("0.01")
+
+
+def allocate_cents(total: Decimal, weights: Sequence[float] | np.ndarray) -> np.ndarray:
+    """Split ``total`` into whole cents proportional to ``weights``.
+
+    Every item gets the floor of its exact share; the cents left over go to the
+    items with the largest fractional remainders (earliest first on ties).
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    cents = int((total / _CENT).to_integral_value())
+    weight_sum = weights.sum()
+    if weight_sum <= 0:
+        raise BusinessError(code=42290, message="分摊基数合计为 0，无法分摊物流费用")
+    exact = cents * weights / weight_sum
+    shares = np.floor(exact).astype(np.int64)
+    leftover = cents - int(shares.sum())
+    if leftover:
+        order = np.argsort(-(exact - shares), kind="stable")
+        shares[order[:leftover]] += 1
+    return shares
+
+
+class LandedCostService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repo = LogisticsRecordRepository(db)
+        self.container_repo = ContainerPlanRepository(db)
+
+    # ==================== Allocation ====================
+
+    async def allocate(
+        self, record_id: uuid.UUID, method: AllocationMethod
+    ) -> LandedCostAllocationResponse:
+        record = await self.repo.get_by_id(record_id)
+        if not record:
+            raise NotFoundError("物流记录", str(record_id))
+        await self._allocate(record, method)
+        return await self.get_allocations(record_id, method=method)
+
+    async def _allocate(self, record: LogisticsRecord, method: AllocationMethod) -> None:
+        """Replace the record's allocation; raises before writing anything if it cannot run."""
+        items = await self.container_repo.get_items_by_plan(record.container_plan_id)
+        if not items:
+            raise BusinessError(code=42291, message="排柜计划没有明细，无法分摊物流费用")
+        basis = await self._basis(items, method)
+
+        rows = []
+        for currency, total in (await self.repo.get_cost_totals(record.id)).items():
+            shares = allocate_cents(total, basis)
+            rows.extend(
+                {
+                    "logistics_record_id": record.id,
+                    "container_plan_item_id": item.id,
+                    "sales_order_id": item.sales_order_id,
+                    "product_id": item.product_id,
+                    "method": method,
+                    "currency": currency,
+                    "basis": Decimal(str(round(float(b), 4))),
+                    "amount": Decimal(int(cents)) * _CENT,
+                }
+                for item, b, cents in zip(items, basis, shares, strict=True)
+            )
+        await self.repo.replace_allocations(record.id, rows)
+        record.allocation_stale = False
+
+    async def reallocate(self, record_id: uuid.UUID) -> bool:
+        """Re-run an existing allocation after the record's costs or plan items changed.
+
+        Returns False when it cannot run; the stored split is then kept and marked stale.
+        """
+        method = await self.db.scalar(
+            select(LandedCostAllocation.method)
+            .where(LandedCostAllocation.logistics_record_id == record_id)
+            .limit(1)
+        )
+        if method is None:
+            return True
+        record = await self.repo.get_by_id(record_id)
+        try:
+            await self._allocate(record, method)
+        except BusinessError as e:
+            logger.warning(
+                "landed_cost_allocation_stale", logistics_record_id=str(record_id), code=e.code
+            )
+            record.allocation_stale = True
+            return False
+        return True
+
+    async def reallocate_plan(self, plan_id: uuid.UUID) -> None:
+        """Re-run the allocations of every logistics record shipping ``plan_id``."""
+        record_ids = (
+            await self.db.scalars(
+                select(LogisticsRecord.id).where(LogisticsRecord.container_plan_id == plan_id)
+            )
+        ).all()
+        for record_id in record_ids:
+            await self.reallocate(record_id)
+
+    async def get_allocations(
+        self, record_id: uuid.UUID, method: AllocationMethod | None = None
+    ) -> LandedCostAllocationResponse:
+        allocations = await self.repo.get_allocations(record_id)
+        record = await self.repo.get_by_id(record_id)
+        return LandedCostAllocationResponse(
+            logistics_record_id=record_id,
+            method=allocations[0].method if allocations else method,
+            stale=bool(record and record.allocation_stale),
+            items=[LandedCostAllocationRead.model_validate(a) for a in allocations],
+        )
+
+    async def _basis(self, items: list[ContainerPlanItem], method: AllocationMethod) -> np.ndarray:
+        if method == AllocationMethod.VOLUME:
+            return np.array([float(i.volume_cbm) for i in items], dtype=np.float64)
+        if method == AllocationMethod.WEIGHT:
+            return np.array([float(i.weight_kg) for i in items], dtype=np.float64)
+
+        # Value: quantity x sales price, in USD so orders in different currencies compare
+        so_ids = {i.sales_order_id for i in items if i.sales_order_id}
+        prices = {}
+        if so_ids:
+            result = await self.db.execute(
+                select(
+                    SalesOrderItem.sales_order_id,
+                    SalesOrderItem.product_id,
+                    func.avg(SalesOrderItem.unit_price),
+                    SalesOrder.currency,
+                    SalesOrder.order_date,
+                )
+                .join(SalesOrder, SalesOrderItem.sales_order_id == SalesOrder.id)
+                .where(SalesOrderItem.sales_order_id.in_(so_ids))
+                .group_by(
+                    SalesOrderItem.sales_order_id,
+                    SalesOrderItem.product_id,
+                    SalesOrder.currency,
+                    SalesOrder.order_date,
+                )
+            )
+            rates = await FxRateService(self.db).get_table()
+            for so_id, product_id, price, currency, order_date in result.all():
+                usd = rates.convert(Decimal(str(price)), currency, BASE_CURRENCY, order_date)
+                if usd is None:
+                    raise missing_rate_error(BASE_CURRENCY)
+                prices[(so_id, product_id)] = float(usd)
+        # Items not tied to a sales order have no price and take no share
+        return np.array(
+            [i.quantity * prices.get((i.sales_order_id, i.product_id), 0.0) for i in items],
+            dtype=np.float64,
+        )
+
+    # ==================== Margin report ====================
+
+    async def margin_report(
+        self,
+        group_by: str = "sales_order",
+        date_from: date | None = None,
+        date_to: date | None = None,
+        report_currency: CurrencyType = BASE_CURRENCY,
+    ) -> MarginReportResponse:
+        rates = await FxRateService(self.db).get_table()
+        so_filters = []
+        if date_from:
+            so_filters.append(SalesOrder.order_date >= date_from)
+        if date_to:
+            so_filters.append(SalesOrder.order_date <= date_to)
+        by_order = group_by == "sales_order"
+
+        def key_of(so_id, product_id):
+            return so_id if by_order else product_id
+
+        groups: dict[uuid.UUID, dict] = {}
+
+        def group(key) -> dict:
+            return groups.setdefault(
+                key,
+                {
+                    "label": None,
+                    "quantity": 0,
+                    "revenue": Decimal(0),
+                    "purchase_cost": Decimal(0),
+                    "freight": Decimal(0),
+                },
+            )
+
+        def convert(amount, currency: CurrencyType, day: date) -> Decimal:
+            value = rates.convert(Decimal(str(amount)), currency, report_currency, day)
+            if value is None:
+                raise missing_rate_error(report_currency)
+            return value
+
+        # Revenue per sales line
+        sales = await self.db.execute(
+            select(
+                SalesOrder.id,
+                SalesOrder.order_no,
+                SalesOrder.currency,
+                SalesOrder.order_date,
+                SalesOrderItem.product_id,
+                Product.name_cn,
+                func.sum(SalesOrderItem.quantity),
+                func.sum(SalesOrderItem.amount),
+            )
+            .join(SalesOrder, SalesOrderItem.sales_order_id == SalesOrder.id)
+            .join(Product, SalesOrderItem.product_id == Product.id)
+            .where(*so_filters)
+            .group_by(
+                SalesOrder.id,
+                SalesOrder.order_no,
+                SalesOrder.currency,
+                SalesOrder.order_date,
+                SalesOrderItem.product_id,
+                Product.name_cn,
+            )
+        )
+        for so_id, order_no, currency, order_date, product_id, name, qty, amount in sales.all():
+            g = group(key_of(so_id, product_id))
+            g["label"] = order_no if by_order else name
+            g["quantity"] += int(qty)
+            g["revenue"] += convert(amount, currency, order_date)
+
+        # Purchase cost of the sales lines, at each purchase order's date
+        purchases = await self.db.execute(
+            select(
+                SalesOrderItem.sales_order_id,
+                SalesOrderItem.product_id,
+                PurchaseOrder.order_date,
+                func.sum(PurchaseOrderItem.amount),
+            )
+            .join(SalesOrderItem, PurchaseOrderItem.sales_order_item_id == SalesOrderItem.id)
+            .join(SalesOrder, SalesOrderItem.sales_order_id == SalesOrder.id)
+            .join(PurchaseOrder, PurchaseOrderItem.purchase_order_id == PurchaseOrder.id)
+            .where(*so_filters)
+            .group_by(
+                SalesOrderItem.sales_order_id,
+                SalesOrderItem.product_id,
+                PurchaseOrder.order_date,
+            )
+        )
+        for so_id, product_id, order_date, amount in purchases.all():
+            group(key_of(so_id, product_id))["purchase_cost"] += convert(
+                amount, PURCHASE_CURRENCY, order_date
+            )
+
+        # Allocated freight, at the departure date (or the record's creation date)
+        shipped_on = func.coalesce(
+            LogisticsRecord.etd, sa.cast(LogisticsRecord.created_at, sa.Date)
+        )
+        freight = await self.db.execute(
+            select(
+                LandedCostAllocation.sales_order_id,
+                LandedCostAllocation.product_id,
+                LandedCostAllocation.currency,
+                shipped_on,
+                func.sum(LandedCostAllocation.amount),
+            )
+            .join(SalesOrder, LandedCostAllocation.sales_order_id == SalesOrder.id)
+            .join(LogisticsRecord, LandedCostAllocation.logistics_record_id == LogisticsRecord.id)
+            .where(*so_filters)
+            .group_by(
+                LandedCostAllocation.sales_order_id,
+                LandedCostAllocation.product_id,
+                LandedCostAllocation.currency,
+                shipped_on,
+            )
+        )
+        for so_id, product_id, currency, day, amount in freight.all():
+            group(key_of(so_id, product_id))["freight"] += convert(amount, currency, day)
+
+        items = []
+        for key, g in groups.items():
+            landed = g["purchase_cost"] + g["freight"]
+            margin = g["revenue"] - landed
+            items.append(
+                MarginReportItem(
+                    group_key=str(key),
+                    label=g["label"],
+                    quantity=g["quantity"],
+                    revenue=g["revenue"],
+                    purchase_cost=g["purchase_cost"],
+                    freight=g["freight"],
+                    landed_cost=landed,
+                    margin=margin,
+                    margin_rate=(margin / g["revenue"]).quantize(Decimal("0.0001"))
+                    if g["revenue"]
+                    else None,
+                )
+            )
+        items.sort(key=lambda item: item.margin, reverse=True)
+        return MarginReportResponse(items=items, report_currency=report_currency)
@@ -0,0 +1,187 @@
+"""Live dashboard and kanban updates pushed over server-sent events.
+
+Status / amount changes of sales orders, purchase orders and logistics records are
+captured when the session flushes, whichever service made them (cascades
+included), and published as ``<kind>.changed`` domain events carrying the tracked
+values before and after. Each SSE connection turns an event into the kanban and
+todo-counter deltas its user is allowed to see.
+"""
+
+import enum
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.events import event_bus
+from app.core.permissions import Permission
+from app.models.enums import LogisticsStatus, PurchaseOrderStatus, SalesOrderStatus
+from app.models.logistics import LogisticsRecord
+from app.models.purchase_order import PurchaseOrder
+from app.models.sales_order import SalesOrder
+
+# Counters shown on the dashboard todo panel (see DashboardService.get_todos)
+TODO_PERMISSION = Permission.SALES_ORDER_VIEW
+_ARRIVING_STATUSES = {LogisticsStatus.LOADED_ON_SHIP.value, LogisticsStatus.IN_TRANSIT.value}
+
+
+def _arriving_soon(values: dict) -> bool:
+    if values["status"] not in _ARRIVING_STATUSES or not values.get("eta"):
+        return False
+    today = date.today()
+    return today <= date.fromisoformat(values["eta"]) <= today + timedelta(days=7)
+
+
+@dataclass(frozen=True)
+class Tracked:
+    type: str
+    board: str
+    amount: str
+    permission: Permission
+    attrs: tuple[str, ...]
+    # todo counter -> "is this row counted" predicate over the tracked values
+    todos: tuple[tuple[str, Any], ...] = ()
+
+
+TRACKED: dict[type, Tracked] = {
+    SalesOrder: Tracked(
+        type="sales_order.changed",
+        board="sales_orders",
+        amount="total_amount",
+        permission=Permission.SALES_ORDER_VIEW,
+        attrs=("status", "total_amount"),
+        todos=(
+            ("draft_sales_orders", lambda v: v["status"] == SalesOrderStatus.DRAFT.value),
+            (
+                "goods_ready_sales_orders",
+                lambda v: v["status"] == SalesOrderStatus.GOODS_READY.value,
+            ),
+        ),
+    ),
+    PurchaseOrder: Tracked(
+        type="purchase_order.changed",
+        board="purchase_orders",
+        amount="total_amount",
+        permission=Permission.PURCHASE_ORDER_VIEW,
+        attrs=("status", "total_amount"),
+        todos=(
+            (
+                "ordered_purchase_orders",
+                lambda v: v["status"] == PurchaseOrderStatus.ORDERED.value,
+            ),
+        ),
+    ),
+    LogisticsRecord: Tracked(
+        type="logistics.changed",
+        board="logistics",
+        amount="total_cost",
+        permission=Permission.LOGISTICS_VIEW,
+        attrs=("status", "total_cost", "eta"),
+        todos=(("arriving_soon_containers", _arriving_soon),),
+    ),
+}
+_BY_TYPE = {t.type: t for t in TRACKED.values()}
+
+EVENT_PERMISSIONS: dict[str, Permission] = {
+    **{t.type: t.permission for t in TRACKED.values()},
+    "inventory.reserved": Permission.INVENTORY_VIEW,
+    "inventory.released": Permission.INVENTORY_VIEW,
+}
+
+
+def plain(value: Any) -> Any:
+    """JSON-friendly form used in event payloads."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def derive_messages(item: dict, permissions: set[Permission]) -> list[tuple[str, dict]]:
+    """SSE ``(event, data)`` messages for one domain event, filtered by permission."""
+    if item["type"] == "resync":
+        return [("resync", {})]
+    permission = EVENT_PERMISSIONS.get(item["type"])
+    if permission is None or permission not in permissions:
+        return []
+
+    messages = [(item["type"], item["data"])]
+    tracked = _BY_TYPE.get(item["type"])
+    if tracked is None:
+        return messages
+
+    before, after = item["data"]["before"], item["data"]["after"]
+    deltas: dict[str, dict] = {}
+    for values, sign in ((before, -1), (after, 1)):
+        if values is None:
+            continue
+        delta = deltas.setdefault(
+            values["status"],
+            {"status": values["status"], "count": 0, tracked.amount: Decimal(0)},
+        )
+        delta["count"] += sign
+        delta[tracked.amount] += sign * Decimal(values[tracked.amount] or 0)
+    changed = [
+        {**d, tracked.amount: str(d[tracked.amount])}
+        for d in deltas.values()
+        if d["count"] or d[tracked.amount]
+    ]
+    if changed:
+        messages.append(("kanban", {"board": tracked.board, "deltas": changed}))
+
+    if TODO_PERMISSION in permissions:
+        todos = {}
+        for name, counted in tracked.todos:
+            delta = int(bool(after and counted(after))) - int(bool(before and counted(before)))
+            if delta:
+                todos[name] = delta
+        if todos:
+            messages.append(("todos", todos))
+    return messages
+
+
+def _values(obj: Any, attrs: tuple[str, ...], side: str) -> dict:
+    state = inspect(obj)
+    values = {}
+    for name in attrs:
+        history = state.attrs[name].history
+        changed = history.deleted if side == "before" else history.added
+        if changed:
+            value = changed[0]
+        elif history.unchanged:
+            value = history.unchanged[0]
+        else:
+            # Never loaded: read what is in the instance dict without a lazy load
+            value = state.dict.get(name)
+        values[name] = plain(value)
+    return values
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_changes(session: Session, flush_context) -> None:
+    for objects, kind in (
+        (session.new, "new"),
+        (session.dirty, "dirty"),
+        (session.deleted, "deleted"),
+    ):
+        for obj in objects:
+            tracked = TRACKED.get(type(obj))
+            if tracked is None:
+                continue
+            if kind == "dirty":
+                state = inspect(obj)
+                if not any(state.attrs[a].history.has_changes() for a in tracked.attrs):
+                    continue
+            event_bus.publish(
+                session,
+                tracked.type,
+                id=str(obj.id),
+                before=None if kind == "new" else _values(obj, tracked.attrs, "before"),
+                after=None if kind == "deleted" else _values(obj, tracked.attrs, "after"),
+            )
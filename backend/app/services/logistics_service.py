@@ -1,4 +1,3 @@
-import math
 import uuid
 from datetime import date
 from decimal import Decimal
@@ -6,10 +5,10 @@ from decimal import Decimal
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.events import event_bus
 from app.core.exceptions import BusinessError, NotFoundError
 from app.models.enums import ContainerPlanStatus, LogisticsStatus, SalesOrderStatus
 from app.models.logistics import LogisticsCost, LogisticsRecord
-from app.models.sales_order import SalesOrder
 from app.repositories.container_repo import ContainerPlanRepository
 from app.repositories.logistics_repo import LogisticsRecordRepository
 from app.schemas.common import PaginatedData
@@ -23,7 +22,9 @@ from app.schemas.logistics import (
     LogisticsRecordListRead,
     LogisticsRecordUpdate,
 )
-from app.utils.code_generator import generate_order_no
+from app.services.landed_cost_service import LandedCostService
+from app.services.live_updates import plain
+from app.services.sequence_service import SequenceService
 
 # Logistics statuses must progress in order, no skipping or going back
 LOGISTICS_STATUS_ORDER = [
@@ -41,6 +42,7 @@ class LogisticsService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = LogisticsRecordRepository(db)
+        self.sequences = SequenceService(db)
         self.container_repo = ContainerPlanRepository(db)
 
     # ==================== CRUD ====================
@@ -53,8 +55,7 @@ class LogisticsService:
 
         port_of_discharge = data.port_of_discharge or plan.destination_port
 
-        seq = await self.repo.count_by_date(date.today()) + 1
-        logistics_no = generate_order_no("LOG", date.today(), seq)
+        logistics_no = await self.sequences.order_no("LOG", date.today())
 
         record = LogisticsRecord(
             logistics_no=logistics_no,
@@ -73,9 +74,9 @@ class LogisticsService:
             remark=data.remark,
             created_by=user_id,
             updated_by=user_id,
+            costs=[],
         )
-        record = await self.repo.create(record)
-        return await self.get_by_id(record.id)
+        return await self.repo.create(record)
 
     async def get_by_id(self, id: uuid.UUID) -> LogisticsRecord:
         record = await self.repo.get_with_costs(id)
@@ -95,15 +96,13 @@ class LogisticsService:
                 setattr(record, key, value)
 
         await self.db.flush()
-        record_id = record.id
-        self.db.expire(record)
-        return await self.get_by_id(record_id)
+        return record
 
     async def list_records(
         self, params: LogisticsRecordListParams
     ) -> PaginatedData[LogisticsRecordListRead]:
         offset = (params.page - 1) * params.page_size
-        items, total = await self.repo.search(
+        result = await self.repo.search(
             status=params.status,
             container_plan_id=params.container_plan_id,
             keyword=params.keyword,
@@ -111,13 +110,14 @@ class LogisticsService:
             limit=params.page_size,
             order_by=params.sort_by,
             order_desc=params.sort_order == "desc",
+            cursor=params.cursor,
+            include_total=params.include_total,
         )
-        return PaginatedData(
-            items=[LogisticsRecordListRead.model_validate(item) for item in items],
-            total=total,
+        return PaginatedData.from_page(
+            [LogisticsRecordListRead.model_validate(item) for item in result.items],
+            result,
             page=params.page,
             page_size=params.page_size,
-            total_pages=math.ceil(total / params.page_size) if total > 0 else 0,
         )
 
     # ==================== Status ====================
@@ -148,31 +148,21 @@ class LogisticsService:
         # Get container plan and linked SOs
         plan = await self.container_repo.get_with_items(record.container_plan_id)
         if plan:
-            so_ids = await self.container_repo.get_linked_so_ids(plan.id)
-
             # R14: loaded_on_ship → SO shipped, plan shipped
             if new_status == LogisticsStatus.LOADED_ON_SHIP:
                 plan.status = ContainerPlanStatus.SHIPPED
-                await self.db.flush()
-                for so_id in so_ids:
-                    result = await self.db.execute(select(SalesOrder).where(SalesOrder.id == so_id))
-                    so = result.scalar_one_or_none()
-                    if so and so.status == SalesOrderStatus.CONTAINER_LOADED:
+                for so in plan.sales_orders:
+                    if so.status == SalesOrderStatus.CONTAINER_LOADED:
                         so.status = SalesOrderStatus.SHIPPED
-                        await self.db.flush()
 
             # R15: delivered → SO delivered
             elif new_status == LogisticsStatus.DELIVERED:
-                for so_id in so_ids:
-                    result = await self.db.execute(select(SalesOrder).where(SalesOrder.id == so_id))
-                    so = result.scalar_one_or_none()
-                    if so and so.status == SalesOrderStatus.SHIPPED:
+                for so in plan.sales_orders:
+                    if so.status == SalesOrderStatus.SHIPPED:
                         so.status = SalesOrderStatus.DELIVERED
-                        await self.db.flush()
+            await self.db.flush()
 
-        record_id = record.id
-        self.db.expire(record)
-        return await self.get_by_id(record_id)
+        return record
 
     # ==================== Costs ====================
 
@@ -242,7 +232,27 @@ class LogisticsService:
         # Use direct UPDATE to avoid identity map staleness
         from sqlalchemy import update
 
+        before = (
+            await self.db.execute(
+                select(
+                    LogisticsRecord.status, LogisticsRecord.total_cost, LogisticsRecord.eta
+                ).where(LogisticsRecord.id == record_id)
+            )
+        ).one()
         await self.db.execute(
             update(LogisticsRecord).where(LogisticsRecord.id == record_id).values(total_cost=total)
         )
         await self.db.flush()
+
+        await LandedCostService(self.db).reallocate(record_id)
+
+        # Core UPDATE bypasses the flush-time change capture; publish it explicitly
+        if before.total_cost != total:
+            values = {"status": plain(before.status), "eta": plain(before.eta)}
+            event_bus.publish(
+                self.db.sync_session,
+                "logistics.changed",
+                id=str(record_id),
+                before={**values, "total_cost": plain(before.total_cost)},
+                after={**values, "total_cost": plain(total)},
+            )
@@ -0,0 +1,124 @@
+"""MRP run: consolidated purchase orders for the open demand of many sales orders.
+
+Net requirements (quantity minus purchased quantity) of every open sales order
+line are read and locked with one query. The best supplier and price for every
+product are then resolved in one call against the cached supplier price lists,
+at the product's total quantity in the run; products no price list covers fall
+back to their default supplier and purchase price. Lines are grouped by
+supplier and turned into one purchase order per supplier whose lines keep their
+``sales_order_item_id``. Order numbers are reserved as one block, the
+orders, items and sales order links are written with batched INSERTs and the
+covered lines are marked purchased with a single UPDATE, all in the caller's
+transaction.
+"""
+
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.enums import PurchaseOrderStatus, SalesOrderStatus
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem
+from app.repositories.fact_repo import FactRepository
+from app.repositories.purchase_order_repo import PurchaseOrderRepository
+from app.repositories.sales_order_repo import SalesOrderRepository
+from app.schemas.purchase_order import MrpPurchaseOrder, MrpRunRequest, MrpRunResult
+from app.services.sequence_service import SequenceService
+from app.services.supplier_price_cache import supplier_price_cache
+
+# A selected order may still be a draft (as with generating POs from one order)
+SELECTED_STATUSES = [SalesOrderStatus.DRAFT, SalesOrderStatus.PURCHASING]
+
+
+class MrpService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.po_repo = PurchaseOrderRepository(db)
+        self.so_repo = SalesOrderRepository(db)
+        self.sequences = SequenceService(db)
+        self.fact_repo = FactRepository(db)
+
+    async def run(self, data: MrpRunRequest, user_id: uuid.UUID) -> MrpRunResult:
+        order_date = data.order_date or date.today()
+        if data.sales_order_ids:
+            lines = await self.so_repo.get_net_requirements(SELECTED_STATUSES, data.sales_order_ids)
+        else:
+            lines = await self.so_repo.get_net_requirements([SalesOrderStatus.PURCHASING])
+
+        quantities: dict[uuid.UUID, int] = {}
+        for line in lines:
+            quantities[line.product_id] = quantities.get(line.product_id, 0) + line.quantity
+        price_book = await supplier_price_cache.get(self.db)
+        quotes = price_book.resolve(
+            quantities, order_date, {line.product_id: line.supplier_id for line in lines}
+        )
+
+        result = MrpRunResult(dry_run=data.dry_run, order_date=order_date)
+        orders: dict[uuid.UUID, PurchaseOrder] = {}
+        linked: dict[uuid.UUID, dict[uuid.UUID, None]] = {}
+        assigned: list[uuid.UUID] = []
+        for line in lines:
+            quote = quotes.get(line.product_id)
+            if quote is not None:
+                supplier_id, unit_price = quote.supplier_id, quote.unit_price
+            elif line.supplier_id is not None:
+                supplier_id, unit_price = line.supplier_id, Decimal(str(line.unit_price))
+            else:
+                result.unassigned_item_ids.append(line.id)
+                continue
+            order = orders.get(supplier_id)
+            if order is None:
+                order = orders[supplier_id] = PurchaseOrder(
+                    id=uuid.uuid4(),
+                    supplier_id=supplier_id,
+                    order_date=order_date,
+                    required_date=data.required_date,
+                    status=PurchaseOrderStatus.DRAFT,
+                    total_amount=Decimal(0),
+                    created_by=user_id,
+                    updated_by=user_id,
+                )
+            amount = line.quantity * unit_price
+            order.items.append(
+                PurchaseOrderItem(
+                    product_id=line.product_id,
+                    sales_order_item_id=line.id,
+                    quantity=line.quantity,
+                    unit=line.unit,
+                    unit_price=unit_price,
+                    amount=amount,
+                )
+            )
+            order.total_amount += amount
+            linked.setdefault(supplier_id, {})[line.sales_order_id] = None
+            assigned.append(line.id)
+
+        if orders and not data.dry_run:
+            order_nos = await self.sequences.order_nos("PO", order_date, len(orders))
+            for order, order_no in zip(orders.values(), order_nos, strict=True):
+                order.order_no = order_no
+            await self.po_repo.add_orders(
+                list(orders.values()),
+                [
+                    {"purchase_order_id": orders[supplier_id].id, "sales_order_id": so_id}
+                    for supplier_id, so_ids in linked.items()
+                    for so_id in so_ids
+                ],
+            )
+            await self.so_repo.mark_purchased(assigned)
+            await self.fact_repo.refresh_purchases({(order_date, s) for s in orders})
+
+        result.purchase_orders = [
+            MrpPurchaseOrder(
+                supplier_id=supplier_id,
+                sales_order_ids=list(linked[supplier_id]),
+                item_count=len(order.items),
+                total_quantity=sum(item.quantity for item in order.items),
+                total_amount=order.total_amount,
+                id=None if data.dry_run else order.id,
+                order_no=order.order_no,
+            )
+            for supplier_id, order in orders.items()
+        ]
+        return result
@@ -1,4 +1,3 @@
-import math
 import uuid
 from datetime import date
 
@@ -16,13 +15,14 @@ from app.repositories.outbound_repo import OutboundOrderRepository
 from app.repositories.warehouse_repo import InventoryRepository
 from app.schemas.common import PaginatedData
 from app.schemas.outbound import OutboundOrderListParams, OutboundOrderListRead
-from app.utils.code_generator import generate_order_no
+from app.services.sequence_service import SequenceService
 
 
 class OutboundService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = OutboundOrderRepository(db)
+        self.sequences = SequenceService(db)
         self.inventory_repo = InventoryRepository(db)
 
     async def create_from_container_plan(
@@ -53,21 +53,7 @@ class OutboundService:
                 message=f"排柜计划已有出库单 {existing.order_no}，不能重复创建",
             )
 
-        # 3. Generate order number
-        seq = await self.repo.count_by_date(date.today()) + 1
-        order_no = generate_order_no("OUT", date.today(), seq)
-
-        # 4. Create outbound order
-        order = OutboundOrder(
-            order_no=order_no,
-            container_plan_id=container_plan_id,
-            status=OutboundOrderStatus.DRAFT,
-            created_by=user_id,
-            updated_by=user_id,
-        )
-        order = await self.repo.create(order)
-
-        # 5. Copy items from container plan
+        # 3. Copy items from container plan
         items = []
         for cp_item in plan.items:
             if cp_item.inventory_record_id:
@@ -76,7 +62,6 @@ class OutboundService:
                 if inv:
                     items.append(
                         OutboundOrderItem(
-                            outbound_order_id=order.id,
                             container_plan_item_id=cp_item.id,
                             inventory_record_id=cp_item.inventory_record_id,
                             product_id=cp_item.product_id,
@@ -104,7 +89,6 @@ class OutboundService:
                 if inv_id:
                     items.append(
                         OutboundOrderItem(
-                            outbound_order_id=order.id,
                             container_plan_item_id=cp_item.id,
                             inventory_record_id=inv_id,
                             product_id=cp_item.product_id,
@@ -115,7 +99,20 @@ class OutboundService:
                         )
                     )
 
+        # 4. Generate order number, after every read, and create outbound order
+        order_no = await self.sequences.order_no("OUT", date.today())
+        order = OutboundOrder(
+            order_no=order_no,
+            container_plan_id=container_plan_id,
+            status=OutboundOrderStatus.DRAFT,
+            created_by=user_id,
+            updated_by=user_id,
+        )
+        order = await self.repo.create(order)
+
         if items:
+            for item in items:
+                item.outbound_order_id = order.id
             await self.repo.add_items(items)
 
         return await self.repo.get_with_items(order.id)
@@ -187,18 +184,19 @@ class OutboundService:
         self, params: OutboundOrderListParams
     ) -> PaginatedData[OutboundOrderListRead]:
         offset = (params.page - 1) * params.page_size
-        items, total = await self.repo.search(
+        result = await self.repo.search(
             status=params.status,
             keyword=params.keyword,
             offset=offset,
             limit=params.page_size,
             order_by=params.sort_by,
             order_desc=params.sort_order == "desc",
+            cursor=params.cursor,
+            include_total=params.include_total,
         )
-        return PaginatedData(
-            items=[OutboundOrderListRead.model_validate(item) for item in items],
-            total=total,
+        return PaginatedData.from_page(
+            [OutboundOrderListRead.model_validate(item) for item in result.items],
+            result,
             page=params.page,
             page_size=params.page_size,
-            total_pages=math.ceil(total / params.page_size) if total > 0 else 0,
         )
@@ -0,0 +1,336 @@
+"""Columnar in-memory engine for ad-hoc sales pivots.
+
+Sales line items are loaded once into NumPy arrays with every key dimension
+dictionary-encoded to small integers (codes follow label order, so sorting codes
+sorts labels). A pivot is then a handful of vectorised passes: mask the date
+range, fold up to three code columns into one int64 group key, ``np.unique`` it
+and ``np.bincount`` the measures per group. Amounts are in each order's own
+currency unless per-line conversion factors are passed in.
+"""
+
+import uuid
+from collections.abc import Hashable, Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from app.models.enums import CurrencyType, SalesOrderStatus
+from app.services.category_tree_cache import CategoryTree
+from app.services.fx_rate_service import FxRateTable
+
+DIMENSIONS = (
+    "customer",
+    "product",
+    "category_level1",
+    "category_level2",
+    "category_level3",
+    "currency",
+    "status",
+    "year",
+    "month",
+)
+AGGREGATES = ("count", "quantity_sum", "quantity_avg", "amount_sum", "amount_avg")
+MAX_DIMENSIONS = 3
+
+_CENT = Decimal("0.01")
+_EPOCH = date(1970, 1, 1)
+
+
+class Dictionary:
+    """Code <-> value mapping for one encoded column; code ``i`` is ``keys[i]``."""
+
+    def __init__(
+        self,
+        values: Iterable[Hashable] = (),
+        keys: Iterable[str | None] = (),
+        labels: Iterable[str | None] = (),
+    ):
+        self.values = list(values)
+        self.keys = list(keys)
+        self.labels = list(labels)
+        self.index = {v: i for i, v in enumerate(self.values)}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, values: Sequence[Hashable]) -> np.ndarray:
+        index = self.index
+
+        def code(value: Hashable) -> int:
+            found = index.get(value)
+            if found is None:
+                # Not in the preloaded dictionary (created after it was read)
+                found = index[value] = len(self.values)
+                self.values.append(value)
+                self.keys.append(str(value))
+                self.labels.append(None)
+            return found
+
+        return np.fromiter(map(code, values), dtype=np.int32, count=len(values))
+
+
+@dataclass
+class PivotGroup:
+    keys: tuple[str | None, ...]
+    labels: tuple[str | None, ...]
+    values: dict[str, int | Decimal]
+
+
+@dataclass
+class PivotResult:
+    groups: list[PivotGroup] = field(default_factory=list)
+    total_groups: int = 0
+    row_count: int = 0
+    # Some line in range had no conversion factor
+    missing_rates: bool = False
+
+
+class SnapshotBuilder:
+    """Accumulates streamed line-item rows into columnar chunks.
+
+    Rows are ``(order_date, customer_id, product_id, currency, status, quantity,
+    amount_cents)``.
+    """
+
+    def __init__(
+        self,
+        customers: Sequence[tuple[uuid.UUID, str]],
+        products: Sequence[tuple[uuid.UUID, str, uuid.UUID | None]],
+        tree: CategoryTree,
+    ):
+        self.customers = Dictionary(
+            (c[0] for c in customers), (str(c[0]) for c in customers), (c[1] for c in customers)
+        )
+        self.products = Dictionary(
+            (p[0] for p in products), (str(p[0]) for p in products), (p[1] for p in products)
+        )
+        self._product_category = {p[0]: p[2] for p in products}
+        self.tree = tree
+        self.currencies = _enum_dictionary(CurrencyType)
+        self.statuses = _enum_dictionary(SalesOrderStatus)
+        self._chunks: list[tuple[np.ndarray, ...]] = []
+
+    def add(self, rows: Sequence[Sequence]) -> None:
+        if not rows:
+            return
+        day, customer, product, currency, status, quantity, amount = zip(*rows, strict=True)
+        self._chunks.append(
+            (
+                np.array(day, dtype="datetime64[D]"),
+                self.customers.encode(customer),
+                self.products.encode(product),
+                self.currencies.encode(currency),
+                self.statuses.encode(status),
+                np.array(quantity, dtype=np.int64),
+                np.array(amount, dtype=np.int64),
+            )
+        )
+
+    def build(self, built_at: datetime) -> "SalesSnapshot":
+        if self._chunks:
+            columns = [np.concatenate(parts) for parts in zip(*self._chunks, strict=True)]
+        else:
+            columns = [
+                np.empty(0, dtype=dtype)
+                for dtype in ("datetime64[D]", *[np.int32] * 4, np.int64, np.int64)
+            ]
+        self._chunks = []
+        day, customer, product, currency, status, quantity, amount = columns
+
+        # Category code 0 is "no category at this level"
+        nodes = list(self.tree.nodes.values())
+        categories = Dictionary(
+            [None, *(n.id for n in nodes)],
+            [None, *(str(n.id) for n in nodes)],
+            [None, *(n.name for n in nodes)],
+        )
+        product_levels = np.zeros((len(self.products), 3), dtype=np.int32)
+        for code, product_id in enumerate(self.products.values):
+            node = self.tree.get(self._product_category.get(product_id))
+            if node is None:
+                continue
+            for level, category_id in enumerate(node.path_ids[:3]):
+                product_levels[code, level] = categories.index[category_id]
+
+        return SalesSnapshot(
+            day=day,
+            columns={
+                "customer": customer,
+                "product": product,
+                "currency": currency,
+                "status": status,
+            },
+            dictionaries={
+                "customer": self.customers,
+                "product": self.products,
+                "currency": self.currencies,
+                "status": self.statuses,
+                "category": categories,
+            },
+            product_levels=product_levels,
+            quantity=quantity,
+            amount_cents=amount,
+            built_at=built_at,
+        )
+
+
+class SalesSnapshot:
+    """Immutable columnar copy of every sales line item."""
+
+    def __init__(
+        self,
+        *,
+        day: np.ndarray,
+        columns: dict[str, np.ndarray],
+        dictionaries: dict[str, Dictionary],
+        product_levels: np.ndarray,
+        quantity: np.ndarray,
+        amount_cents: np.ndarray,
+        built_at: datetime,
+    ):
+        self.day = day
+        self.columns = columns
+        self.dictionaries = dictionaries
+        self.product_levels = product_levels
+        self.quantity = quantity
+        self.amount_cents = amount_cents
+        self.built_at = built_at
+
+        # Month / year codes are offsets from the first month / year present
+        months = day.astype("datetime64[M]").astype(np.int64)
+        years = day.astype("datetime64[Y]").astype(np.int64)
+        month_base = int(months.min()) if len(day) else 0
+        year_base = int(years.min()) if len(day) else 0
+        self.columns["month"] = (months - month_base).astype(np.int32)
+        self.columns["year"] = (years - year_base).astype(np.int32)
+        self.dictionaries["month"] = _period_dictionary(month_base, months, "M")
+        self.dictionaries["year"] = _period_dictionary(year_base, years, "Y")
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    def _dimension(self, name: str) -> tuple[np.ndarray, Dictionary]:
+        if name.startswith("category_level"):
+            level = int(name[-1]) - 1
+            codes = self.product_levels[:, level][self.columns["product"]]
+            return codes, self.dictionaries["category"]
+        return self.columns[name], self.dictionaries[name]
+
+    def amount_factors(self, rates: FxRateTable, currency: CurrencyType) -> np.ndarray:
+        """Per-line factors converting amounts into ``currency``; NaN where a rate is missing."""
+        currencies = self.dictionaries["currency"]
+        width = len(currencies)
+        # One rate lookup per distinct (day, currency) pair
+        pairs, inverse = np.unique(
+            self.day.astype(np.int64) * width + self.columns["currency"], return_inverse=True
+        )
+        factors = np.empty(len(pairs))
+        for i, pair in enumerate(pairs.tolist()):
+            day = _EPOCH + timedelta(days=pair // width)
+            source = currencies.values[pair % width]
+            if source == currency:
+                factors[i] = 1.0
+                continue
+            source_rate, target_rate = rates.rate(source, day), rates.rate(currency, day)
+            if source_rate is None or target_rate is None:
+                factors[i] = np.nan
+            else:
+                factors[i] = float(source_rate / target_rate)
+        return factors[inverse]
+
+    def pivot(
+        self,
+        dimensions: Sequence[str],
+        aggregates: Sequence[str],
+        date_from: date | None = None,
+        date_to: date | None = None,
+        limit: int | None = None,
+        amount_factors: np.ndarray | None = None,
+    ) -> PivotResult:
+        dims = [self._dimension(name) for name in dimensions]
+        quantity, amount = self.quantity, self.amount_cents
+
+        mask = None
+        if date_from:
+            mask = self.day >= np.datetime64(date_from, "D")
+        if date_to:
+            upper = self.day <= np.datetime64(date_to, "D")
+            mask = upper if mask is None else mask & upper
+        if mask is not None:
+            dims = [(codes[mask], dictionary) for codes, dictionary in dims]
+            quantity, amount = quantity[mask], amount[mask]
+            if amount_factors is not None:
+                amount_factors = amount_factors[mask]
+
+        row_count = len(quantity)
+        if row_count == 0:
+            return PivotResult()
+        if amount_factors is not None:
+            if np.isnan(amount_factors).any():
+                return PivotResult(row_count=row_count, missing_rates=True)
+            amount = amount * amount_factors
+
+        # Fold the code columns into one mixed-radix key
+        key = np.zeros(row_count, dtype=np.int64)
+        for codes, dictionary in dims:
+            key = key * len(dictionary) + codes
+        group_keys, inverse, counts = np.unique(key, return_inverse=True, return_counts=True)
+        total_groups = len(group_keys)
+        if limit is not None:
+            group_keys, counts = group_keys[:limit], counts[:limit]
+
+        # Float bincount is exact for integer sums below 2**53; converted sums are
+        # rounded to the cent
+        sums = {}
+        if {"quantity_sum", "quantity_avg"} & set(aggregates):
+            sums["quantity"] = np.bincount(inverse, weights=quantity)[: len(group_keys)]
+        if {"amount_sum", "amount_avg"} & set(aggregates):
+            sums["amount"] = np.bincount(inverse, weights=amount)[: len(group_keys)]
+
+        # Decode the group keys back into per-dimension codes
+        decoded = []
+        remainder = group_keys
+        for _codes, dictionary in reversed(dims):
+            decoded.append(remainder % len(dictionary))
+            remainder = remainder // len(dictionary)
+        decoded.reverse()
+
+        groups = []
+        for i in range(len(group_keys)):
+            count = int(counts[i])
+            values: dict[str, int | Decimal] = {}
+            for name in aggregates:
+                if name == "count":
+                    values[name] = count
+                elif name == "quantity_sum":
+                    values[name] = int(sums["quantity"][i])
+                elif name == "quantity_avg":
+                    values[name] = (Decimal(int(sums["quantity"][i])) / count).quantize(_CENT)
+                elif name == "amount_sum":
+                    values[name] = Decimal(round(sums["amount"][i])).scaleb(-2)
+                elif name == "amount_avg":
+                    values[name] = (
+                        (Decimal(round(sums["amount"][i])) / count).scaleb(-2).quantize(_CENT)
+                    )
+            codes = [int(column[i]) for column in decoded]
+            groups.append(
+                PivotGroup(
+                    keys=tuple(d.keys[c] for (_, d), c in zip(dims, codes, strict=True)),
+                    labels=tuple(d.labels[c] for (_, d), c in zip(dims, codes, strict=True)),
+                    values=values,
+                )
+            )
+        return PivotResult(groups=groups, total_groups=total_groups, row_count=row_count)
+
+
+def _enum_dictionary(enum_cls) -> Dictionary:
+    members = list(enum_cls)
+    return Dictionary(members, (m.value for m in members), (m.value for m in members))
+
+
+def _period_dictionary(base: int, periods: np.ndarray, unit: str) -> Dictionary:
+    size = int(periods.max()) - base + 1 if len(periods) else 0
+    keys = [str(np.datetime64(base + offset, unit)) for offset in range(size)]
+    return Dictionary(range(size), keys, keys)
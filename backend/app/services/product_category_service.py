@@ -11,38 +11,30 @@ from app.schemas.product_category import (
     ProductCategoryTreeNode,
     ProductCategoryUpdate,
 )
+from app.services.category_tree_cache import CategoryNode, category_tree_cache
 
 
 class ProductCategoryService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.repo = ProductCategoryRepository(db)
 
     async def get_tree(self) -> list[ProductCategoryTreeNode]:
-        all_cats = await self.repo.get_all_ordered()
-        cat_map: dict[uuid.UUID, ProductCategoryTreeNode] = {}
-        roots: list[ProductCategoryTreeNode] = []
-
-        for cat in all_cats:
-            node = ProductCategoryTreeNode(
-                id=cat.id,
-                name=cat.name,
-                level=cat.level,
-                parent_id=cat.parent_id,
-                sort_order=cat.sort_order,
-                created_at=cat.created_at,
-                updated_at=cat.updated_at,
-                children=[],
+        tree = await category_tree_cache.get(self.db)
+
+        def to_node(node: CategoryNode) -> ProductCategoryTreeNode:
+            return ProductCategoryTreeNode(
+                id=node.id,
+                name=node.name,
+                level=node.level,
+                parent_id=node.parent_id,
+                sort_order=node.sort_order,
+                created_at=node.created_at,
+                updated_at=node.updated_at,
+                children=[to_node(tree.nodes[child_id]) for child_id in node.child_ids],
             )
-            cat_map[cat.id] = node
 
-        for cat in all_cats:
-            node = cat_map[cat.id]
-            if cat.parent_id and cat.parent_id in cat_map:
-                cat_map[cat.parent_id].children.append(node)
-            else:
-                roots.append(node)
-
-        return roots
+        return [to_node(root) for root in tree.roots]
 
     async def get_children(
         self, parent_id: uuid.UUID | None
@@ -73,7 +65,10 @@ class ProductCategoryService:
             parent_id=data.parent_id,
             sort_order=data.sort_order,
         )
-        return await self.repo.create(cat)
+        category_tree_cache.mark_dirty(self.db)
+        cat = await self.repo.create(cat)
+        await self.repo.add_closure(cat.id, cat.parent_id)
+        return cat
 
     async def update(
         self, id: uuid.UUID, data: ProductCategoryUpdate
@@ -95,6 +90,7 @@ class ProductCategoryService:
                     message=f"同级下品类名 '{update_data['name']}' 已存在",
                 )
 
+        category_tree_cache.mark_dirty(self.db)
         return await self.repo.update(cat, update_data)
 
     async def delete(self, id: uuid.UUID) -> None:
@@ -109,6 +105,7 @@ class ProductCategoryService:
                 message="该品类或其子品类下存在商品，无法删除",
             )
 
+        category_tree_cache.mark_dirty(self.db)
         await self.repo.delete(cat)
 
     async def get_by_id(self, id: uuid.UUID) -> ProductCategoryModel:
@@ -1,21 +1,55 @@
-import math
+import html
+import re
 import uuid
+from decimal import Decimal
+from typing import Any
 
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import LRUCache
 from app.core.exceptions import BusinessError, ConflictError, NotFoundError
 from app.models.enums import ProductStatus
 from app.models.product import Product
-from app.models.product_category import ProductCategoryModel
+from app.repositories.base import sparse_fields
 from app.repositories.product_category_repo import ProductCategoryRepository
 from app.repositories.product_repo import ProductRepository
-from app.schemas.common import PaginatedData
-from app.schemas.product import ProductCreate, ProductListParams, ProductRead, ProductUpdate
+from app.schemas.common import PaginatedData, SuggestItem
+from app.schemas.product import (
+    ProductCreate,
+    ProductImportReport,
+    ProductListParams,
+    ProductRead,
+    ProductSearchHit,
+    ProductUpdate,
+)
+from app.services.category_tree_cache import CategoryTree, category_tree_cache
+
+# Columns an import sheet is allowed to set (and, in upsert mode, overwrite)
+IMPORT_FIELDS = [
+    "name_cn",
+    "name_en",
+    "category_id",
+    "brand",
+    "spec",
+    "unit_weight_kg",
+    "unit_volume_cbm",
+    "packing_spec",
+    "carton_length_cm",
+    "carton_width_cm",
+    "carton_height_cm",
+    "carton_gross_weight_kg",
+    "shelf_life_days",
+]
+
+# Hot typeahead prefixes; cleared on local product writes, TTL covers other workers
+_suggest_cache = LRUCache(maxsize=2048, ttl=30)
 
 
 class ProductService:
     def __init__(self, db: AsyncSession):
         self.repo = ProductRepository(db)
+        self.db = db
         self.category_repo = ProductCategoryRepository(db)
 
     async def create(self, data: ProductCreate, user_id: uuid.UUID) -> Product:
@@ -31,6 +65,7 @@ class ProductService:
             created_by=user_id,
             updated_by=user_id,
         )
+        _suggest_cache.clear_on_commit(self.db)
         return await self.repo.create(product)
 
     async def get_by_id(self, id: uuid.UUID) -> Product:
@@ -47,28 +82,34 @@ class ProductService:
             await self._validate_category_id(update_data["category_id"])
 
         update_data["updated_by"] = user_id
+        _suggest_cache.clear_on_commit(self.db)
         return await self.repo.update(product, update_data)
 
     async def update_status(
         self, id: uuid.UUID, status: ProductStatus, user_id: uuid.UUID
     ) -> Product:
         product = await self.get_by_id(id)
+        _suggest_cache.clear_on_commit(self.db)
         return await self.repo.update(product, {"status": status, "updated_by": user_id})
 
     async def list_products(self, params: ProductListParams) -> PaginatedData[ProductRead]:
         offset = (params.page - 1) * params.page_size
 
-        # If category_id is specified, find all descendant leaf IDs
+        # If category_id is specified, filter by its leaf descendants (precomputed)
+        tree = await category_tree_cache.get(self.db)
         category_ids = None
         if params.category_id:
-            category_ids = await self.category_repo.get_descendant_leaf_ids(
-                params.category_id
-            )
-            if not category_ids:
-                # Also include the ID itself in case it's a leaf
-                category_ids = [params.category_id]
+            category_ids = tree.leaf_ids(params.category_id) or [params.category_id]
 
-        items, total = await self.repo.search(
+        # Category names come from the tree, keyed by the category_id column
+        name_fields = [f for f in params.fields or () if f in CATEGORY_NAME_FIELDS]
+        fields = [f for f in params.fields or () if f not in CATEGORY_NAME_FIELDS]
+        lookup_only = bool(name_fields) and "category_id" not in fields
+        if lookup_only:
+            fields.append("category_id")
+        fields = sparse_fields(Product, fields, ProductRead)
+
+        result = await self.repo.search(
             keyword=params.keyword,
             category_ids=category_ids,
             brand=params.brand,
@@ -77,30 +118,177 @@ class ProductService:
             limit=params.page_size,
             order_by=params.sort_by,
             order_desc=params.sort_order == "desc",
+            cursor=params.cursor,
+            include_total=params.include_total,
+            fields=fields,
         )
 
-        # Load all categories once for efficient name resolution
-        cat_map = await self._load_category_map()
+        if fields:
+            for row in result.items:
+                names = tree.level_names(row["category_id"]) if name_fields else {}
+                for name in name_fields:
+                    row[name] = names.get(CATEGORY_NAME_FIELDS[name])
+                if lookup_only:
+                    del row["category_id"]
+            return PaginatedData.from_page(
+                result.items, result, page=params.page, page_size=params.page_size
+            )
 
         product_reads = []
-        for item in items:
+        for item in result.items:
             pr = ProductRead.model_validate(item)
-            self._fill_category_names_from_map(pr, cat_map)
+            self._fill_category_names_from_tree(pr, tree)
             product_reads.append(pr)
 
-        return PaginatedData(
-            items=product_reads,
-            total=total,
+        return PaginatedData.from_page(
+            product_reads,
+            result,
             page=params.page,
             page_size=params.page_size,
-            total_pages=math.ceil(total / params.page_size) if total > 0 else 0,
         )
 
+    async def search_products(
+        self,
+        keyword: str,
+        *,
+        category_id: uuid.UUID | None = None,
+        status: ProductStatus | None = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> PaginatedData[ProductSearchHit]:
+        tree = await category_tree_cache.get(self.db)
+        category_ids = None
+        if category_id:
+            category_ids = tree.leaf_ids(category_id) or [category_id]
+
+        rows, total = await self.repo.search_ranked(
+            keyword,
+            category_ids=category_ids,
+            status=status.value if status else None,
+            offset=(page - 1) * page_size,
+            limit=page_size,
+        )
+
+        hits = []
+        for product, score in rows:
+            hit = ProductSearchHit.model_validate(product)
+            hit.score = round(score, 4)
+            hit.highlights = _highlight(product, keyword)
+            self._fill_category_names_from_tree(hit, tree)
+            hits.append(hit)
+
+        return PaginatedData.build(hits, total, page=page, page_size=page_size)
+
+    async def suggest(self, keyword: str, limit: int = 10) -> list[SuggestItem]:
+        key = (keyword.lower(), limit)
+        cached = _suggest_cache.get(key)
+        if cached is not None:
+            return cached
+        rows = await self.repo.suggest(
+            keyword,
+            code_column=Product.sku_code,
+            name_columns=[Product.name_cn, Product.name_en],
+            limit=limit,
+            filters=[Product.status == ProductStatus.ACTIVE],
+        )
+        items = [SuggestItem(id=id, code=code, name=name) for id, code, name in rows]
+        _suggest_cache.set(key, items)
+        return items
+
+    async def import_rows(self, rows: list[dict], user_id: uuid.UUID) -> dict:
+        """Create-only import: each row is created individually, duplicates are errors."""
+        name_to_id = (await category_tree_cache.get(self.db)).by_name
+        created = 0
+        errors = []
+        for i, row in enumerate(rows):
+            try:
+                data = self._parse_import_row(row, name_to_id)
+                await self.create(data, user_id)
+                created += 1
+            except Exception as e:
+                errors.append({"row": i + 2, "error": str(e)})
+        return {"created": created, "errors": errors}
+
+    async def upsert_rows(
+        self,
+        rows: list[dict],
+        user_id: uuid.UUID,
+        *,
+        dry_run: bool = False,
+        deactivate_missing: bool = False,
+    ) -> ProductImportReport:
+        """Merge an import sheet into the catalogue.
+
+        Existing products are diffed in memory against a single bulk lookup, then
+        new and changed rows are written with one INSERT ... ON CONFLICT per batch.
+        """
+        tree = await category_tree_cache.get(self.db)
+        report = ProductImportReport(mode="upsert", dry_run=dry_run)
+
+        incoming: dict[str, ProductCreate] = {}
+        # Every SKU on the sheet, including rows that fail validation: a row with a
+        # typo must not get its product deactivated as "missing"
+        sheet_skus = {str(row["sku_code"]) for row in rows if row.get("sku_code") is not None}
+        for i, row in enumerate(rows):
+            try:
+                data = self._parse_import_row(row, tree.by_name)
+            except (ValueError, TypeError, ValidationError) as e:
+                report.errors.append({"row": i + 2, "error": str(e)})
+                continue
+            if not tree.is_leaf(data.category_id):
+                report.errors.append({"row": i + 2, "error": "请选择最末级品类"})
+                continue
+            if data.sku_code in incoming:
+                report.errors.append({"row": i + 2, "error": f"SKU 编码 {data.sku_code} 重复"})
+                continue
+            incoming[data.sku_code] = data
+
+        existing = await self.repo.get_by_sku_codes(list(incoming))
+        to_write: list[dict[str, Any]] = []
+        for sku_code, data in incoming.items():
+            values = data.model_dump(include=set(IMPORT_FIELDS))
+            product = existing.get(sku_code)
+            if product is None:
+                report.created_skus.append(sku_code)
+            else:
+                changed = [f for f in IMPORT_FIELDS if not _same(getattr(product, f), values[f])]
+                if product.status != ProductStatus.ACTIVE:
+                    changed.append("status")
+                if not changed:
+                    report.unchanged += 1
+                    continue
+                report.updated_fields[sku_code] = changed
+            to_write.append(
+                {
+                    **data.model_dump(),
+                    "id": uuid.uuid4(),
+                    "status": ProductStatus.ACTIVE,
+                    "created_by": user_id,
+                    "updated_by": user_id,
+                }
+            )
+
+        if deactivate_missing:
+            report.deactivated_skus = await self.repo.get_active_sku_codes_excluding(
+                list(sheet_skus | incoming.keys())
+            )
+
+        report.created = len(report.created_skus)
+        report.updated = len(report.updated_fields)
+        report.deactivated = len(report.deactivated_skus)
+
+        if not dry_run:
+            await self.repo.upsert_many(to_write, [*IMPORT_FIELDS, "status", "updated_by"])
+            await self.repo.deactivate_by_sku_codes(report.deactivated_skus, user_id)
+            _suggest_cache.clear_on_commit(self.db)
+        return report
+
     async def get_brands(self) -> list[str]:
         return await self.repo.get_distinct_brands()
 
     async def delete(self, id: uuid.UUID) -> None:
         product = await self.get_by_id(id)
+        _suggest_cache.clear_on_commit(self.db)
         await self.repo.delete(product)
 
     async def _validate_category_id(self, category_id: uuid.UUID) -> None:
@@ -112,32 +300,74 @@ class ProductService:
         if children:
             raise BusinessError(code=42204, message="请选择最末级品类")
 
-    async def _load_category_map(self) -> dict[uuid.UUID, "ProductCategoryModel"]:
-        """Load all categories into a dict keyed by ID."""
-        all_cats = await self.category_repo.get_all_ordered()
-        return {cat.id: cat for cat in all_cats}
-
-    def _fill_category_names_from_map(
-        self,
-        read: ProductRead,
-        cat_map: dict[uuid.UUID, "ProductCategoryModel"],
-    ) -> None:
-        """Fill category level names by walking the parent chain via in-memory map."""
-        cat = cat_map.get(read.category_id)
-        if not cat:
-            return
+    @staticmethod
+    def _parse_import_row(row: dict, name_to_id: dict[str, uuid.UUID]) -> ProductCreate:
+        # Blank cells come back as None; treat them like absent columns
+        row = {k: v for k, v in row.items() if v is not None and v != ""}
+        category_name = str(row.get("category_name", row.get("category", "")))
+        cat_id = name_to_id.get(category_name)
+        if not cat_id:
+            # Fall back: try matching against level-1 "其他" category
+            cat_id = name_to_id.get("其他")
+        if not cat_id:
+            raise ValueError(f"品类 '{category_name}' 未找到")
 
-        names: dict[int, str] = {}
-        current = cat
-        while current:
-            names[current.level] = current.name
-            current = cat_map.get(current.parent_id) if current.parent_id else None
+        return ProductCreate(
+            sku_code=str(row.get("sku_code", "")),
+            name_cn=str(row.get("name_cn", "")),
+            name_en=str(row.get("name_en", "")),
+            category_id=cat_id,
+            spec=str(row.get("spec", "N/A")),
+            unit_weight_kg=row.get("unit_weight_kg", 0.1),
+            unit_volume_cbm=row.get("unit_volume_cbm", 0.001),
+            packing_spec=str(row.get("packing_spec", "N/A")),
+            carton_length_cm=row.get("carton_length_cm", 40),
+            carton_width_cm=row.get("carton_width_cm", 30),
+            carton_height_cm=row.get("carton_height_cm", 25),
+            carton_gross_weight_kg=row.get("carton_gross_weight_kg", 10),
+            shelf_life_days=int(row.get("shelf_life_days", 365)),
+            brand=row.get("brand"),
+        )
 
+    @staticmethod
+    def _fill_category_names_from_tree(read: ProductRead, tree: CategoryTree) -> None:
+        """Fill category level names from the cached ancestor path."""
+        names = tree.level_names(read.category_id)
         read.category_level1_name = names.get(1)
         read.category_level2_name = names.get(2)
         read.category_level3_name = names.get(3)
 
     async def fill_category_names(self, read: ProductRead) -> None:
         """Fill category names for a single ProductRead (used by API endpoints)."""
-        cat_map = await self._load_category_map()
-        self._fill_category_names_from_map(read, cat_map)
+        tree = await category_tree_cache.get(self.db)
+        self._fill_category_names_from_tree(read, tree)
+
+
+SEARCH_FIELDS = ("sku_code", "name_cn", "name_en", "brand")
+CATEGORY_NAME_FIELDS = {f"category_level{level}_name": level for level in (1, 2, 3)}
+
+
+def _highlight(product: Product, keyword: str) -> dict[str, str]:
+    """Wrap case-insensitive keyword matches in <mark> for each matching search field."""
+    pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+    highlights = {}
+    for field in SEARCH_FIELDS:
+        value = getattr(product, field) or ""
+        parts = pattern.split(value)
+        if len(parts) == 1:
+            continue
+        matches = pattern.findall(value)
+        marked = html.escape(parts[0])
+        for match, rest in zip(matches, parts[1:], strict=True):
+            marked += f"<mark>{html.escape(match)}</mark>{html.escape(rest)}"
+        highlights[field] = marked
+    return highlights
+
+
+def _same(current: Any, incoming: Any) -> bool:
+    """Compare a stored column value with an imported one (numerics by value, '' == None)."""
+    if isinstance(current, Decimal) or isinstance(incoming, Decimal):
+        if current is None or incoming is None:
+            return current is incoming
+        return Decimal(str(current)) == Decimal(str(incoming))
+    return (current or None) == (incoming or None)
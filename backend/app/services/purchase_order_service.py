@@ -1,5 +1,5 @@
-import math
 import uuid
+from collections.abc import Iterable
 from decimal import Decimal
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,46 +7,35 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.exceptions import BusinessError, NotFoundError
 from app.models.enums import PurchaseOrderStatus
 from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem
+from app.models.sales_order import SalesOrderItem
+from app.repositories.fact_repo import FactRepository
 from app.repositories.purchase_order_repo import PurchaseOrderRepository
-from app.schemas.common import PaginatedData
+from app.schemas.common import BulkStatusResult, PaginatedData
 from app.schemas.purchase_order import (
     PurchaseOrderCreate,
     PurchaseOrderListParams,
     PurchaseOrderListRead,
     PurchaseOrderUpdate,
 )
-from app.utils.code_generator import generate_order_no
+from app.services.bulk_status import transition_many
+from app.services.sequence_service import SequenceService
 
 
 class PurchaseOrderService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = PurchaseOrderRepository(db)
+        self.sequences = SequenceService(db)
+        self.fact_repo = FactRepository(db)
 
     async def create(self, data: PurchaseOrderCreate, user_id: uuid.UUID) -> PurchaseOrder:
-        seq = await self.repo.count_by_date(data.order_date) + 1
-        order_no = generate_order_no("PO", data.order_date, seq)
-
-        # R02: validate purchased quantity does not exceed demand
-        for item_data in data.items:
-            if item_data.sales_order_item_id:
-                so_item = await self.repo.get_sales_order_item(item_data.sales_order_item_id)
-                if not so_item:
-                    raise NotFoundError("销售订单明细", str(item_data.sales_order_item_id))
-                remaining = so_item.quantity - so_item.purchased_quantity
-                if item_data.quantity > remaining:
-                    raise BusinessError(
-                        code=42230,
-                        message=f"采购数量 {item_data.quantity} 超过未采购需求 {remaining}",
-                        detail={
-                            "sales_order_item_id": str(item_data.sales_order_item_id),
-                            "requested": item_data.quantity,
-                            "remaining": remaining,
-                        },
-                    )
+        # R02: validate purchased quantity does not exceed demand. The lines are
+        # locked before the order number, in the same order as an MRP run.
+        demand = _demand(data.items)
+        so_items = await self.repo.lock_sales_order_items(demand)
+        _check_demand(so_items, demand)
 
         order = PurchaseOrder(
-            order_no=order_no,
             supplier_id=data.supplier_id,
             order_date=data.order_date,
             required_date=data.required_date,
@@ -55,6 +44,8 @@ class PurchaseOrderService:
             created_by=user_id,
             updated_by=user_id,
         )
+        # R01: link to sales orders if provided; written with the order's INSERT
+        await self.repo.link_sales_orders(order, data.sales_order_ids)
 
         for item_data in data.items:
             amount = Decimal(str(item_data.quantity)) * item_data.unit_price
@@ -70,24 +61,11 @@ class PurchaseOrderService:
             )
 
         self._calculate_total(order)
+        order.order_no = await self.sequences.order_no("PO", data.order_date)
         order = await self.repo.create(order)
-
-        # R01: link to sales orders if provided
-        if data.sales_order_ids:
-            await self.repo.link_sales_orders(order.id, data.sales_order_ids)
-
-        # Update SO items' purchased_quantity
-        for item_data in data.items:
-            if item_data.sales_order_item_id:
-                so_item = await self.repo.get_sales_order_item(item_data.sales_order_item_id)
-                if so_item:
-                    so_item.purchased_quantity += item_data.quantity
-                    await self.db.flush()
-
-        # Save ID before expiring, then re-fetch with eager loads
-        order_id = order.id
-        self.db.expire(order)
-        return await self.get_by_id(order_id)
+        await self.fact_repo.refresh_purchases([(order.order_date, order.supplier_id)])
+        await self.repo.add_purchased_quantities(so_items, demand)
+        return order
 
     async def get_by_id(self, id: uuid.UUID) -> PurchaseOrder:
         order = await self.repo.get_with_items(id)
@@ -102,6 +80,17 @@ class PurchaseOrderService:
 
         if order.status != PurchaseOrderStatus.DRAFT:
             raise BusinessError(code=42220, message="只有草稿状态的采购单可以编辑")
+        old_fact_key = (order.order_date, order.supplier_id)
+
+        # R02 re-validate: the order's current lines are given back first. Lines are
+        # locked before anything on the order changes, so the order is written once.
+        old_demand = _demand(order.items)
+        demand = old_demand
+        so_items: dict[uuid.UUID, SalesOrderItem] = {}
+        if data.items is not None:
+            demand = _demand(data.items)
+            so_items = await self.repo.lock_sales_order_items({**old_demand, **demand})
+            _check_demand(so_items, demand, old_demand)
 
         update_fields = data.model_dump(exclude_unset=True, exclude={"items"})
         update_fields["updated_by"] = user_id
@@ -111,33 +100,12 @@ class PurchaseOrderService:
                 setattr(order, key, value)
 
         if data.items is not None:
-            # Rollback old purchased_quantity before replacing items
-            old_items = await self.repo.delete_items(order.id)
-            for old_item in old_items:
-                if old_item.sales_order_item_id:
-                    so_item = await self.repo.get_sales_order_item(old_item.sales_order_item_id)
-                    if so_item:
-                        so_item.purchased_quantity -= old_item.quantity
-                        await self.db.flush()
-
-            # R02 re-validate + create new items
+            # Old items are deleted as orphans on flush
             order.items = []
             for item_data in data.items:
-                if item_data.sales_order_item_id:
-                    so_item = await self.repo.get_sales_order_item(item_data.sales_order_item_id)
-                    if not so_item:
-                        raise NotFoundError("销售订单明细", str(item_data.sales_order_item_id))
-                    remaining = so_item.quantity - so_item.purchased_quantity
-                    if item_data.quantity > remaining:
-                        raise BusinessError(
-                            code=42230,
-                            message=f"采购数量 {item_data.quantity} 超过未采购需求 {remaining}",
-                        )
-
                 amount = Decimal(str(item_data.quantity)) * item_data.unit_price
                 order.items.append(
                     PurchaseOrderItem(
-                        purchase_order_id=order.id,
                         product_id=item_data.product_id,
                         sales_order_item_id=item_data.sales_order_item_id,
                         quantity=item_data.quantity,
@@ -146,20 +114,20 @@ class PurchaseOrderService:
                         amount=amount,
                     )
                 )
-
-            # Update SO items' purchased_quantity for new items
-            for item_data in data.items:
-                if item_data.sales_order_item_id:
-                    so_item = await self.repo.get_sales_order_item(item_data.sales_order_item_id)
-                    if so_item:
-                        so_item.purchased_quantity += item_data.quantity
-                        await self.db.flush()
-
             self._calculate_total(order)
 
         await self.db.flush()
-        await self.db.refresh(order)
-        return await self.get_by_id(order.id)
+        await self.repo.add_purchased_quantities(
+            so_items,
+            {
+                so_item_id: demand.get(so_item_id, 0) - old_demand.get(so_item_id, 0)
+                for so_item_id in so_items
+            },
+        )
+        await self.fact_repo.refresh_purchases(
+            [old_fact_key, (order.order_date, order.supplier_id)]
+        )
+        return order
 
     async def confirm(self, id: uuid.UUID, user_id: uuid.UUID) -> PurchaseOrder:
         order = await self.get_by_id(id)
@@ -169,9 +137,17 @@ class PurchaseOrderService:
         order.status = PurchaseOrderStatus.ORDERED
         order.updated_by = user_id
         await self.db.flush()
-        order_id = order.id
-        self.db.expire(order)
-        return await self.get_by_id(order_id)
+        return order
+
+    async def bulk_confirm(self, ids: list[uuid.UUID], user_id: uuid.UUID) -> BulkStatusResult:
+        return await transition_many(
+            self.db,
+            PurchaseOrder,
+            ids,
+            PurchaseOrderStatus.ORDERED,
+            {PurchaseOrderStatus.DRAFT},
+            user_id,
+        )
 
     async def cancel(self, id: uuid.UUID, user_id: uuid.UUID) -> PurchaseOrder:
         order = await self.get_by_id(id)
@@ -179,33 +155,32 @@ class PurchaseOrderService:
             raise BusinessError(code=42222, message="只有草稿或已下单状态的采购单可以取消")
 
         # Rollback purchased_quantity on SO items
-        for item in order.items:
-            if item.sales_order_item_id:
-                so_item = await self.repo.get_sales_order_item(item.sales_order_item_id)
-                if so_item:
-                    so_item.purchased_quantity = max(0, so_item.purchased_quantity - item.quantity)
-                    await self.db.flush()
+        demand = _demand(order.items)
+        so_items = await self.repo.lock_sales_order_items(demand)
+        await self.repo.add_purchased_quantities(
+            so_items,
+            {
+                so_item_id: -min(demand[so_item_id], so_item.purchased_quantity)
+                for so_item_id, so_item in so_items.items()
+            },
+        )
 
         order.status = PurchaseOrderStatus.CANCELLED
         order.updated_by = user_id
         await self.db.flush()
-        order_id = order.id
-        self.db.expire(order)
-        return await self.get_by_id(order_id)
+        return order
 
     async def link_sales_orders(self, id: uuid.UUID, so_ids: list[uuid.UUID]) -> PurchaseOrder:
         order = await self.get_by_id(id)
-        await self.repo.link_sales_orders(order.id, so_ids)
-        # Expire cached state so get_by_id re-loads M2M relationships
-        order_id = order.id
-        self.db.expire(order)
-        return await self.get_by_id(order_id)
+        await self.repo.link_sales_orders(order, so_ids)
+        await self.db.flush()
+        return order
 
     async def list_orders(
         self, params: PurchaseOrderListParams
     ) -> PaginatedData[PurchaseOrderListRead]:
         offset = (params.page - 1) * params.page_size
-        items, total = await self.repo.search(
+        result = await self.repo.search(
             keyword=params.keyword,
             status=params.status,
             supplier_id=params.supplier_id,
@@ -213,16 +188,56 @@ class PurchaseOrderService:
             limit=params.page_size,
             order_by=params.sort_by,
             order_desc=params.sort_order == "desc",
+            cursor=params.cursor,
+            include_total=params.include_total,
         )
-        return PaginatedData(
-            items=[PurchaseOrderListRead.model_validate(item) for item in items],
-            total=total,
+        return PaginatedData.from_page(
+            [PurchaseOrderListRead.model_validate(item) for item in result.items],
+            result,
             page=params.page,
             page_size=params.page_size,
-            total_pages=math.ceil(total / params.page_size) if total > 0 else 0,
         )
 
     def _calculate_total(self, order: PurchaseOrder) -> None:
         order.total_amount = (
             sum(item.amount for item in order.items) if order.items else Decimal("0")
         )
+
+
+def _demand(items: Iterable) -> dict[uuid.UUID, int]:
+    """Quantity per referenced sales order line, summed over ``items``."""
+    demand: dict[uuid.UUID, int] = {}
+    for item in items:
+        if item.sales_order_item_id:
+            demand[item.sales_order_item_id] = (
+                demand.get(item.sales_order_item_id, 0) + item.quantity
+            )
+    return demand
+
+
+def _check_demand(
+    so_items: dict[uuid.UUID, SalesOrderItem],
+    demand: dict[uuid.UUID, int],
+    released: dict[uuid.UUID, int] | None = None,
+) -> None:
+    """R02: ``demand`` may not exceed each line's unpurchased quantity.
+
+    ``released`` is what the order being edited already holds on each line, which
+    becomes available again once its items are replaced.
+    """
+    released = released or {}
+    for so_item_id, requested in demand.items():
+        so_item = so_items.get(so_item_id)
+        if so_item is None:
+            raise NotFoundError("销售订单明细", str(so_item_id))
+        remaining = so_item.quantity - so_item.purchased_quantity + released.get(so_item_id, 0)
+        if requested > remaining:
+            raise BusinessError(
+                code=42230,
+                message=f"采购数量 {requested} 超过未采购需求 {remaining}",
+                detail={
+                    "sales_order_item_id": str(so_item_id),
+                    "requested": requested,
+                    "remaining": remaining,
+                },
+            )
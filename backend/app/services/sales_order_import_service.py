@@ -0,0 +1,317 @@
+"""Sales orders imported from a customer's Excel purchase order.
+
+One sheet may hold many orders: lines are grouped by customer code and the
+customer's order reference, and the order-level columns are read from the
+first line of each group (later lines may leave them blank). The sheet is
+parsed row by row, SKUs and customer codes are then resolved with one query
+each, and every order is validated before anything is written; a file with
+any invalid line is rejected as a whole. Valid orders are numbered with one
+sequence allocation per order date and inserted with their items in a single
+flush.
+"""
+
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import BusinessError
+from app.models.enums import (
+    CurrencyType,
+    PaymentMethod,
+    ProductStatus,
+    SalesOrderStatus,
+    TradeTerm,
+    UnitType,
+)
+from app.models.sales_order import SalesOrder, SalesOrderItem
+from app.repositories.customer_repo import CustomerRepository
+from app.repositories.fact_repo import FactRepository
+from app.repositories.product_repo import ProductRepository
+from app.repositories.sales_order_repo import SalesOrderRepository
+from app.schemas.sales_order import SalesOrderImportOrder, SalesOrderImportResult
+from app.services.sequence_service import SequenceService
+
+ORDER_COLUMNS = [
+    "customer_code",
+    "order_ref",
+    "order_date",
+    "required_delivery_date",
+    "destination_port",
+    "trade_term",
+    "currency",
+    "payment_method",
+    "payment_terms",
+    "remark",
+]
+LINE_COLUMNS = ["sku_code", "quantity", "unit", "unit_price"]
+IMPORT_HEADERS = ORDER_COLUMNS + LINE_COLUMNS
+
+# unit_price is Numeric(12, 2)
+_MAX_PRICE = Decimal("9999999999.99")
+
+
+@dataclass
+class ImportLine:
+    row: int
+    sku_code: str
+    quantity: int
+    unit: UnitType
+    unit_price: Decimal
+
+
+@dataclass
+class ImportGroup:
+    row: int
+    customer_code: str
+    order_ref: str
+    header: dict[str, str]
+    lines: list[ImportLine] = field(default_factory=list)
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        # Numeric SKUs / references come back from Excel as floats
+        value = int(value)
+    return str(value).strip()
+
+
+def _date(value: str) -> date | None:
+    return date.fromisoformat(value) if value else None
+
+
+def _parse_line(row: int, raw: dict) -> ImportLine:
+    sku_code = _text(raw.get("sku_code"))
+    if not sku_code:
+        raise ValueError("SKU 编码不能为空")
+
+    try:
+        quantity = Decimal(_text(raw.get("quantity")))
+    except InvalidOperation:
+        raise ValueError("数量格式不正确")
+    if not quantity.is_finite() or quantity != quantity.to_integral_value() or quantity <= 0:
+        raise ValueError("数量必须为正整数")
+
+    try:
+        unit = UnitType(_text(raw.get("unit")).lower())
+    except ValueError:
+        raise ValueError(f"单位必须为 {'/'.join(u.value for u in UnitType)}")
+
+    try:
+        unit_price = Decimal(_text(raw.get("unit_price")))
+    except InvalidOperation:
+        raise ValueError("单价格式不正确")
+    if not unit_price.is_finite() or unit_price < 0 or unit_price > _MAX_PRICE:
+        raise ValueError("单价必须为不小于 0 的金额")
+    if unit_price != unit_price.quantize(Decimal("0.01")):
+        raise ValueError("单价最多保留两位小数")
+
+    return ImportLine(
+        row=row,
+        sku_code=sku_code,
+        quantity=int(quantity),
+        unit=unit,
+        unit_price=unit_price.quantize(Decimal("0.01")),
+    )
+
+
+def group_import_rows(
+    rows: Iterable[tuple[int, dict]],
+) -> tuple[dict[tuple[str, str], ImportGroup], list[dict]]:
+    """Group sheet rows into orders and parse each line; returns ``(groups, errors)``."""
+    groups: dict[tuple[str, str], ImportGroup] = {}
+    errors: list[dict] = []
+    for row, raw in rows:
+        raw = {(k or "").strip().lower(): v for k, v in raw.items()}
+        customer_code = _text(raw.get("customer_code"))
+        order_ref = _text(raw.get("order_ref"))
+        if not customer_code:
+            errors.append({"row": row, "order_ref": order_ref, "error": "客户编码不能为空"})
+            continue
+
+        header = {c: _text(raw.get(c)) for c in ORDER_COLUMNS[2:]}
+
+        group = groups.get((customer_code, order_ref))
+        if group is None:
+            group = groups[(customer_code, order_ref)] = ImportGroup(
+                row=row, customer_code=customer_code, order_ref=order_ref, header=header
+            )
+        else:
+            conflicts = [
+                c for c, v in header.items() if v and group.header[c] and v != group.header[c]
+            ]
+            if conflicts:
+                errors.append(
+                    {
+                        "row": row,
+                        "order_ref": order_ref,
+                        "error": f"与本订单首行不一致: {', '.join(conflicts)}",
+                    }
+                )
+                continue
+            for c, v in header.items():
+                group.header[c] = group.header[c] or v
+
+        try:
+            group.lines.append(_parse_line(row, raw))
+        except ValueError as e:
+            errors.append({"row": row, "order_ref": order_ref, "error": str(e)})
+    return groups, errors
+
+
+class SalesOrderImportService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repo = SalesOrderRepository(db)
+        self.customer_repo = CustomerRepository(db)
+        self.product_repo = ProductRepository(db)
+        self.sequences = SequenceService(db)
+        self.fact_repo = FactRepository(db)
+
+    async def import_rows(
+        self, rows: Iterable[tuple[int, dict]], user_id: uuid.UUID, *, dry_run: bool = False
+    ) -> SalesOrderImportResult:
+        groups, errors = group_import_rows(rows)
+        if not groups and not errors:
+            raise BusinessError(code=42292, message="导入文件没有订单明细")
+
+        customers = await self.customer_repo.get_by_codes(
+            list({g.customer_code for g in groups.values()})
+        )
+        products = await self.product_repo.get_by_sku_codes(
+            list({line.sku_code for g in groups.values() for line in g.lines})
+        )
+
+        orders: list[SalesOrder] = []
+        for group in groups.values():
+            order = self._build_order(group, customers, products, user_id, errors)
+            if order is not None:
+                orders.append(order)
+        if errors:
+            errors.sort(key=lambda e: e["row"])
+            raise BusinessError(
+                code=42292, message="销售订单导入文件校验不通过", detail={"errors": errors}
+            )
+
+        result = SalesOrderImportResult(dry_run=dry_run)
+        if not dry_run:
+            by_date: dict[date, list[SalesOrder]] = {}
+            for order in orders:
+                by_date.setdefault(order.order_date, []).append(order)
+            for order_date, dated in by_date.items():
+                order_nos = await self.sequences.order_nos("SO", order_date, len(dated))
+                for order, order_no in zip(dated, order_nos, strict=True):
+                    order.order_no = order_no
+            await self.repo.add_orders(orders)
+            await self.fact_repo.refresh_sales({(o.order_date, o.customer_id) for o in orders})
+            result.created = len(orders)
+
+        for group, order in zip(groups.values(), orders, strict=True):
+            result.orders.append(
+                SalesOrderImportOrder(
+                    order_ref=group.order_ref,
+                    customer_id=order.customer_id,
+                    customer_code=group.customer_code,
+                    order_date=order.order_date,
+                    currency=order.currency,
+                    item_count=len(order.items),
+                    total_quantity=order.total_quantity,
+                    total_amount=order.total_amount,
+                    id=None if dry_run else order.id,
+                    order_no=order.order_no,
+                )
+            )
+        return result
+
+    @staticmethod
+    def _build_order(
+        group: ImportGroup,
+        customers: dict,
+        products: dict,
+        user_id: uuid.UUID,
+        errors: list[dict],
+    ) -> SalesOrder | None:
+        """Validate one group and build its order; problems are appended to ``errors``."""
+
+        def error(row: int, message: str) -> None:
+            errors.append({"row": row, "order_ref": group.order_ref, "error": message})
+
+        n_errors = len(errors)
+        header = group.header
+        customer = customers.get(group.customer_code)
+        if customer is None:
+            error(group.row, f"客户编码 {group.customer_code} 不存在")
+            return None
+
+        try:
+            order_date = _date(header["order_date"]) or date.today()
+            required_date = _date(header["required_delivery_date"])
+        except ValueError:
+            error(group.row, "日期格式不正确，应为 YYYY-MM-DD")
+            return None
+        try:
+            trade_term = TradeTerm(header["trade_term"].upper()) if header["trade_term"] else None
+            currency = CurrencyType(header["currency"].upper() or customer.currency)
+            payment_method = PaymentMethod(
+                header["payment_method"].upper() or customer.payment_method
+            )
+        except ValueError:
+            error(group.row, "贸易条款、币种或付款方式不正确")
+            return None
+        trade_term = trade_term or customer.trade_term
+        if trade_term is None:
+            error(group.row, "贸易条款不能为空")
+        if not header["destination_port"]:
+            error(group.row, "目的港不能为空")
+        if not group.lines:
+            error(group.row, "订单没有有效明细")
+
+        order = SalesOrder(
+            id=uuid.uuid4(),
+            customer_id=customer.id,
+            order_date=order_date,
+            required_delivery_date=required_date,
+            destination_port=header["destination_port"][:200],
+            trade_term=trade_term,
+            currency=currency,
+            payment_method=payment_method,
+            payment_terms=header["payment_terms"] or customer.payment_terms,
+            remark=header["remark"] or None,
+            status=SalesOrderStatus.DRAFT,
+            created_by=user_id,
+            updated_by=user_id,
+        )
+        total_amount, total_quantity = Decimal(0), 0
+        for line in group.lines:
+            product = products.get(line.sku_code)
+            if product is None:
+                error(line.row, f"SKU 编码 {line.sku_code} 不存在")
+                continue
+            if product.status != ProductStatus.ACTIVE:
+                error(line.row, f"商品 {line.sku_code} 已停用")
+                continue
+            amount = line.quantity * line.unit_price
+            total_amount += amount
+            total_quantity += line.quantity
+            order.items.append(
+                SalesOrderItem(
+                    product_id=product.id,
+                    quantity=line.quantity,
+                    unit=line.unit,
+                    unit_price=line.unit_price,
+                    amount=amount,
+                )
+            )
+        order.total_amount = total_amount
+        order.total_quantity = total_quantity
+        return order if len(errors) == n_errors else None
@@ -1,14 +1,21 @@
-import math
 import uuid
 from decimal import Decimal
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import BusinessError, NotFoundError
+from app.models.container import ContainerPlan, container_plan_sales_orders
 from app.models.enums import SalesOrderStatus
+from app.models.logistics import LogisticsRecord
+from app.models.purchase_order import PurchaseOrder, purchase_order_sales_orders
 from app.models.sales_order import SalesOrder, SalesOrderItem
+from app.models.warehouse import InventoryRecord, ReceivingNote
+from app.repositories.base import sparse_fields
+from app.repositories.fact_repo import FactRepository
 from app.repositories.sales_order_repo import SalesOrderRepository
-from app.schemas.common import PaginatedData
+from app.schemas.common import BulkStatusResult, PaginatedData
+from app.schemas.purchase_order import MrpRunRequest
 from app.schemas.sales_order import (
     KanbanItem,
     KanbanResponse,
@@ -17,7 +24,9 @@ from app.schemas.sales_order import (
     SalesOrderListRead,
     SalesOrderUpdate,
 )
-from app.utils.code_generator import generate_order_no
+from app.services.bulk_status import transition_many
+from app.services.mrp_service import MrpService
+from app.services.sequence_service import SequenceService
 
 # R10: confirm goes directly to purchasing (skip confirmed)
 VALID_TRANSITIONS: dict[SalesOrderStatus, set[SalesOrderStatus]] = {
@@ -40,13 +49,11 @@ class SalesOrderService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = SalesOrderRepository(db)
+        self.sequences = SequenceService(db)
+        self.fact_repo = FactRepository(db)
 
     async def create(self, data: SalesOrderCreate, user_id: uuid.UUID) -> SalesOrder:
-        seq = await self.repo.count_by_date(data.order_date) + 1
-        order_no = generate_order_no("SO", data.order_date, seq)
-
         order = SalesOrder(
-            order_no=order_no,
             customer_id=data.customer_id,
             order_date=data.order_date,
             required_delivery_date=data.required_delivery_date,
@@ -77,8 +84,10 @@ class SalesOrderService:
             )
 
         self._calculate_totals(order)
+        order.order_no = await self.sequences.order_no("SO", data.order_date)
         order = await self.repo.create(order)
-        return await self.get_by_id(order.id)
+        await self.fact_repo.refresh_sales([(order.order_date, order.customer_id)])
+        return order
 
     async def get_by_id(self, id: uuid.UUID) -> SalesOrder:
         order = await self.repo.get_with_items(id)
@@ -91,6 +100,7 @@ class SalesOrderService:
 
         if order.status not in (SalesOrderStatus.DRAFT, SalesOrderStatus.PURCHASING):
             raise BusinessError(code=42210, message="只有草稿或采购中状态的订单可以编辑")
+        old_fact_key = (order.order_date, order.customer_id)
 
         update_fields = data.model_dump(exclude_unset=True, exclude={"items"})
         update_fields["updated_by"] = user_id
@@ -99,15 +109,13 @@ class SalesOrderService:
             if value is not None:
                 setattr(order, key, value)
 
-        # Replace items if provided
+        # Replace items if provided; the old ones are deleted as orphans on flush
         if data.items is not None:
-            await self.repo.delete_items(order.id)
             order.items = []
             for item_data in data.items:
                 amount = Decimal(str(item_data.quantity)) * item_data.unit_price
                 order.items.append(
                     SalesOrderItem(
-                        sales_order_id=order.id,
                         product_id=item_data.product_id,
                         quantity=item_data.quantity,
                         unit=item_data.unit,
@@ -118,8 +126,8 @@ class SalesOrderService:
             self._calculate_totals(order)
 
         await self.db.flush()
-        await self.db.refresh(order)
-        return await self.get_by_id(order.id)
+        await self.fact_repo.refresh_sales([old_fact_key, (order.order_date, order.customer_id)])
+        return order
 
     async def confirm(self, id: uuid.UUID, user_id: uuid.UUID) -> SalesOrder:
         """R10: confirm directly sets status to purchasing (skip confirmed)."""
@@ -130,8 +138,7 @@ class SalesOrderService:
         order.status = SalesOrderStatus.PURCHASING
         order.updated_by = user_id
         await self.db.flush()
-        await self.db.refresh(order)
-        return await self.get_by_id(order.id)
+        return order
 
     async def update_status(
         self, id: uuid.UUID, new_status: SalesOrderStatus, user_id: uuid.UUID
@@ -147,12 +154,18 @@ class SalesOrderService:
         order.status = new_status
         order.updated_by = user_id
         await self.db.flush()
-        await self.db.refresh(order)
-        return await self.get_by_id(order.id)
+        return order
+
+    async def bulk_update_status(
+        self, ids: list[uuid.UUID], new_status: SalesOrderStatus, user_id: uuid.UUID
+    ) -> BulkStatusResult:
+        sources = {s for s, targets in VALID_TRANSITIONS.items() if new_status in targets}
+        return await transition_many(self.db, SalesOrder, ids, new_status, sources, user_id)
 
     async def list_orders(self, params: SalesOrderListParams) -> PaginatedData[SalesOrderListRead]:
         offset = (params.page - 1) * params.page_size
-        items, total = await self.repo.search(
+        fields = sparse_fields(SalesOrder, params.fields, SalesOrderListRead)
+        result = await self.repo.search(
             keyword=params.keyword,
             status=params.status,
             customer_id=params.customer_id,
@@ -162,25 +175,16 @@ class SalesOrderService:
             limit=params.page_size,
             order_by=params.sort_by,
             order_desc=params.sort_order == "desc",
-            load_items=True,
-        )
-        result_items = []
-        for order in items:
-            item_data = SalesOrderListRead.model_validate(order)
-            total_qty = sum(i.quantity for i in order.items) if order.items else 0
-            if total_qty > 0:
-                purchased_qty = sum(i.purchased_quantity for i in order.items)
-                received_qty = sum(i.received_quantity for i in order.items)
-                item_data.purchase_progress = round(purchased_qty / total_qty, 4)
-                item_data.arrival_progress = round(received_qty / total_qty, 4)
-            result_items.append(item_data)
-        return PaginatedData(
-            items=result_items,
-            total=total,
-            page=params.page,
-            page_size=params.page_size,
-            total_pages=math.ceil(total / params.page_size) if total > 0 else 0,
+            with_progress=True,
+            cursor=params.cursor,
+            include_total=params.include_total,
+            fields=fields,
         )
+        if fields:
+            items = result.items
+        else:
+            items = [SalesOrderListRead.model_validate(order) for order in result.items]
+        return PaginatedData.from_page(items, result, page=params.page, page_size=params.page_size)
 
     async def get_kanban(self) -> KanbanResponse:
         stats = await self.repo.get_kanban_stats()
@@ -189,66 +193,13 @@ class SalesOrderService:
         )
 
     async def generate_purchase_orders(self, so_id: uuid.UUID, user_id: uuid.UUID) -> dict:
-        """Generate purchase orders from a sales order, grouped by default_supplier_id."""
-        from sqlalchemy import select
-
-        from app.models.product import Product
-        from app.services.purchase_order_service import PurchaseOrderService
-
+        """Generate purchase orders from a sales order, one per supplier the MRP run picks."""
         order = await self.get_by_id(so_id)
         if order.status not in (SalesOrderStatus.PURCHASING, SalesOrderStatus.DRAFT):
             raise BusinessError(code=42213, message="只有草稿或采购中状态的订单可以生成采购单")
 
-        # Group items by supplier
-        supplier_items: dict[uuid.UUID | None, list] = {}
-        for item in order.items:
-            result = await self.db.execute(select(Product).where(Product.id == item.product_id))
-            product = result.scalar_one_or_none()
-            supplier_id = product.default_supplier_id if product else None
-            if supplier_id not in supplier_items:
-                supplier_items[supplier_id] = []
-            supplier_items[supplier_id].append((item, product))
-
-        po_service = PurchaseOrderService(self.db)
-        created_pos = []
-
-        for supplier_id, items_with_products in supplier_items.items():
-            if not supplier_id:
-                continue  # Skip items without supplier
-
-            from datetime import date
-
-            from app.schemas.purchase_order import PurchaseOrderCreate, PurchaseOrderItemCreate
-
-            po_items = []
-            for so_item, product in items_with_products:
-                remaining = so_item.quantity - so_item.purchased_quantity
-                if remaining <= 0:
-                    continue
-                po_items.append(
-                    PurchaseOrderItemCreate(
-                        product_id=so_item.product_id,
-                        sales_order_item_id=so_item.id,
-                        quantity=remaining,
-                        unit=so_item.unit,
-                        unit_price=Decimal(
-                            str(product.default_purchase_price or so_item.unit_price)
-                        ),
-                    )
-                )
-
-            if not po_items:
-                continue
-
-            po_data = PurchaseOrderCreate(
-                supplier_id=supplier_id,
-                order_date=date.today(),
-                sales_order_ids=[so_id],
-                items=po_items,
-            )
-            po = await po_service.create(po_data, user_id)
-            created_pos.append(str(po.id))
-
+        result = await MrpService(self.db).run(MrpRunRequest(sales_order_ids=[so_id]), user_id)
+        created_pos = [str(po.id) for po in result.purchase_orders]
         return {
             "sales_order_id": str(so_id),
             "created_purchase_orders": created_pos,
@@ -256,108 +207,160 @@ class SalesOrderService:
         }
 
     async def get_fulfillment(self, so_id: uuid.UUID) -> dict:
-        """Get fulfillment chain: SO → PO → Receiving Notes → Inventory → Container → Logistics."""
-        from sqlalchemy import select
-
-        from app.models.container import (
-            ContainerPlan,
-            container_plan_sales_orders,
-        )
-        from app.models.logistics import LogisticsRecord
-        from app.models.purchase_order import PurchaseOrder, purchase_order_sales_orders
-        from app.models.warehouse import InventoryRecord, ReceivingNote
-
-        order = await self.get_by_id(so_id)
-
-        # Get linked POs
-        po_result = await self.db.execute(
-            select(PurchaseOrder)
-            .join(
-                purchase_order_sales_orders,
-                PurchaseOrder.id == purchase_order_sales_orders.c.purchase_order_id,
+        traces = await self.get_fulfillments([so_id])
+        if not traces:
+            raise NotFoundError("销售订单", str(so_id))
+        return traces[0]
+
+    async def get_fulfillments(self, so_ids: list[uuid.UUID]) -> list[dict]:
+        """Fulfillment chains: SO → PO → Receiving Notes → Inventory → Container → Logistics.
+
+        Each layer is loaded with one query keyed by the previous layer's ids, so
+        the number of queries does not grow with the number of orders or links.
+        Unknown ids are skipped; traces come back in the order requested.
+        """
+        orders = (
+            await self.db.execute(
+                select(SalesOrder.id, SalesOrder.order_no, SalesOrder.status).where(
+                    SalesOrder.id.in_(so_ids)
+                )
             )
-            .where(purchase_order_sales_orders.c.sales_order_id == so_id)
-        )
-        pos = list(po_result.scalars().all())
-
-        # Get receiving notes for those POs
-        receiving_notes = []
-        for po in pos:
-            rn_result = await self.db.execute(
-                select(ReceivingNote).where(ReceivingNote.purchase_order_id == po.id)
+        ).all()
+        if not orders:
+            return []
+        found = [o.id for o in orders]
+
+        po_link = purchase_order_sales_orders
+        pos = (
+            await self.db.execute(
+                select(
+                    po_link.c.sales_order_id,
+                    PurchaseOrder.id,
+                    PurchaseOrder.order_no,
+                    PurchaseOrder.status,
+                )
+                .join(PurchaseOrder, PurchaseOrder.id == po_link.c.purchase_order_id)
+                .where(po_link.c.sales_order_id.in_(found))
+                .order_by(PurchaseOrder.order_no)
+            )
+        ).all()
+
+        notes_by_po: dict[uuid.UUID, list[dict]] = {}
+        po_ids = list({po.id for po in pos})
+        if po_ids:
+            notes = await self.db.execute(
+                select(
+                    ReceivingNote.id,
+                    ReceivingNote.note_no,
+                    ReceivingNote.purchase_order_id,
+                    ReceivingNote.receiving_date,
+                )
+                .where(ReceivingNote.purchase_order_id.in_(po_ids))
+                .order_by(ReceivingNote.note_no)
             )
-            for rn in rn_result.scalars().all():
-                receiving_notes.append(
+            for rn in notes.all():
+                notes_by_po.setdefault(rn.purchase_order_id, []).append(
                     {
                         "id": str(rn.id),
                         "note_no": rn.note_no,
-                        "purchase_order_id": str(po.id),
+                        "purchase_order_id": str(rn.purchase_order_id),
                         "receiving_date": str(rn.receiving_date),
                     }
                 )
 
-        # Get inventory records
-        inv_result = await self.db.execute(
-            select(InventoryRecord).where(InventoryRecord.sales_order_id == so_id)
-        )
-        inventory = [
-            {
-                "product_id": str(r.product_id),
-                "batch_no": r.batch_no,
-                "quantity": r.quantity,
-                "available_quantity": r.available_quantity,
-            }
-            for r in inv_result.scalars().all()
-        ]
-
-        # Get container plans
-        cp_result = await self.db.execute(
-            select(ContainerPlan)
-            .join(
-                container_plan_sales_orders,
-                ContainerPlan.id == container_plan_sales_orders.c.container_plan_id,
+        inventory = await self.db.execute(
+            select(
+                InventoryRecord.sales_order_id,
+                InventoryRecord.product_id,
+                InventoryRecord.batch_no,
+                InventoryRecord.quantity,
+                InventoryRecord.available_quantity,
             )
-            .where(container_plan_sales_orders.c.sales_order_id == so_id)
+            .where(InventoryRecord.sales_order_id.in_(found))
+            .order_by(InventoryRecord.batch_no)
         )
-        containers = [
-            {
-                "id": str(cp.id),
-                "plan_no": cp.plan_no,
-                "container_type": cp.container_type.value,
-                "status": cp.status.value,
-            }
-            for cp in cp_result.scalars().all()
-        ]
-
-        # Get logistics for those containers
-        logistics = []
-        for cp_data in containers:
-            lr_result = await self.db.execute(
-                select(LogisticsRecord).where(LogisticsRecord.container_plan_id == cp_data["id"])
+
+        cp_link = container_plan_sales_orders
+        containers = (
+            await self.db.execute(
+                select(
+                    cp_link.c.sales_order_id,
+                    ContainerPlan.id,
+                    ContainerPlan.plan_no,
+                    ContainerPlan.container_type,
+                    ContainerPlan.status,
+                )
+                .join(ContainerPlan, ContainerPlan.id == cp_link.c.container_plan_id)
+                .where(cp_link.c.sales_order_id.in_(found))
+                .order_by(ContainerPlan.plan_no)
+            )
+        ).all()
+
+        logistics_by_plan: dict[uuid.UUID, list[dict]] = {}
+        cp_ids = list({cp.id for cp in containers})
+        if cp_ids:
+            records = await self.db.execute(
+                select(
+                    LogisticsRecord.id,
+                    LogisticsRecord.logistics_no,
+                    LogisticsRecord.container_plan_id,
+                    LogisticsRecord.status,
+                    LogisticsRecord.eta,
+                )
+                .where(LogisticsRecord.container_plan_id.in_(cp_ids))
+                .order_by(LogisticsRecord.logistics_no)
             )
-            for lr in lr_result.scalars().all():
-                logistics.append(
+            for lr in records.all():
+                logistics_by_plan.setdefault(lr.container_plan_id, []).append(
                     {
                         "id": str(lr.id),
                         "logistics_no": lr.logistics_no,
-                        "container_plan_id": cp_data["id"],
+                        "container_plan_id": str(lr.container_plan_id),
                         "status": lr.status.value,
                         "eta": str(lr.eta) if lr.eta else None,
                     }
                 )
 
-        return {
-            "sales_order_id": str(so_id),
-            "order_no": order.order_no,
-            "status": order.status.value,
-            "purchase_orders": [
-                {"id": str(po.id), "order_no": po.order_no, "status": po.status.value} for po in pos
-            ],
-            "receiving_notes": receiving_notes,
-            "inventory": inventory,
-            "containers": containers,
-            "logistics": logistics,
+        traces = {
+            o.id: {
+                "sales_order_id": str(o.id),
+                "order_no": o.order_no,
+                "status": o.status.value,
+                "purchase_orders": [],
+                "receiving_notes": [],
+                "inventory": [],
+                "containers": [],
+                "logistics": [],
+            }
+            for o in orders
         }
+        for po in pos:
+            trace = traces[po.sales_order_id]
+            trace["purchase_orders"].append(
+                {"id": str(po.id), "order_no": po.order_no, "status": po.status.value}
+            )
+            trace["receiving_notes"].extend(notes_by_po.get(po.id, []))
+        for r in inventory.all():
+            traces[r.sales_order_id]["inventory"].append(
+                {
+                    "product_id": str(r.product_id),
+                    "batch_no": r.batch_no,
+                    "quantity": r.quantity,
+                    "available_quantity": r.available_quantity,
+                }
+            )
+        for cp in containers:
+            trace = traces[cp.sales_order_id]
+            trace["containers"].append(
+                {
+                    "id": str(cp.id),
+                    "plan_no": cp.plan_no,
+                    "container_type": cp.container_type.value,
+                    "status": cp.status.value,
+                }
+            )
+            trace["logistics"].extend(logistics_by_plan.get(cp.id, []))
+        return [traces[id] for id in dict.fromkeys(so_ids) if id in traces]
 
     def _calculate_totals(self, order: SalesOrder) -> None:
         order.total_amount = (
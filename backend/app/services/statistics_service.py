@@ -1,20 +1,34 @@
-from datetime import datetime
+import uuid
+from datetime import UTC, date, datetime
 from decimal import Decimal
 
 import sqlalchemy as sa
-from sqlalchemy import func, select
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.container import ContainerPlan
+from app.core.cache import LRUCache
+from app.core.exceptions import BusinessError
+from app.core.result_cache import cached_result
 from app.models.customer import Customer
+from app.models.enums import CurrencyType, SalesOrderStatus
+from app.models.fact import (
+    fact_container_daily,
+    fact_purchase_daily,
+    fact_sales_daily,
+    fact_sales_product_daily,
+)
 from app.models.product import Product
-from app.models.purchase_order import PurchaseOrder
+from app.models.product_category import ProductCategoryModel, product_category_closure
 from app.models.sales_order import SalesOrder, SalesOrderItem
 from app.schemas.statistics import (
+    CategorySalesRollupItem,
+    CategorySalesRollupResponse,
     ContainerSummaryStatItem,
     ContainerSummaryStatResponse,
     CustomerRankingItem,
     CustomerRankingResponse,
+    PivotResponse,
+    PivotRow,
     ProductRankingItem,
     ProductRankingResponse,
     PurchaseSummaryItem,
@@ -22,102 +36,133 @@ from app.schemas.statistics import (
     SalesSummaryItem,
     SalesSummaryResponse,
 )
+from app.services.category_tree_cache import category_tree_cache
+from app.services.fx_rate_service import FxConversion, FxRateService, missing_rate_error
+from app.services.pivot_engine import (
+    AGGREGATES,
+    DIMENSIONS,
+    MAX_DIMENSIONS,
+    SalesSnapshot,
+    SnapshotBuilder,
+)
+
+
+def _day_filters(day: sa.ColumnElement, date_from: str | None, date_to: str | None) -> list:
+    filters = []
+    if date_from:
+        filters.append(day >= datetime.fromisoformat(date_from).date())
+    if date_to:
+        filters.append(day <= datetime.fromisoformat(date_to).date())
+    return filters
+
+
+# Line-item columnar snapshot for pivots, rebuilt once per day (or on demand)
+_pivot_snapshots = LRUCache(maxsize=1, ttl=24 * 3600)
+_PIVOT_CHUNK_ROWS = 50_000
+
+_ROLLUP_TAGS = (
+    "fx_rates",
+    "sales_orders",
+    "sales_order_items",
+    "products",
+    "product_categories",
+    "product_category_closure",
+)
 
 
 class StatisticsService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @cached_result("statistics:sales-summary", tags=("fact_sales_daily", "fx_rates"))
     async def sales_summary(
         self,
         group_by: str = "month",
         date_from: str | None = None,
         date_to: str | None = None,
+        report_currency: CurrencyType | None = None,
     ) -> SalesSummaryResponse:
-        filters = []
-        if date_from:
-            filters.append(SalesOrder.order_date >= datetime.fromisoformat(date_from).date())
-        if date_to:
-            filters.append(SalesOrder.order_date <= datetime.fromisoformat(date_to).date())
-
+        fact = fact_sales_daily
+        fx = await self._conversion(report_currency, fact.c.day, date_from, date_to)
+        total = (
+            fx.total(fact.c.total_amount, fact.c.currency)
+            if fx
+            else func.coalesce(func.sum(fact.c.total_amount), 0)
+        )
         if group_by == "customer":
-            group_col = sa.cast(SalesOrder.customer_id, sa.String).label("group_key")
+            group_col = sa.cast(fact.c.customer_id, sa.String).label("group_key")
             query = (
                 select(
                     group_col,
-                    func.count().label("order_count"),
-                    func.coalesce(func.sum(SalesOrder.total_amount), 0).label("total_amount"),
+                    func.sum(fact.c.order_count).label("order_count"),
+                    total.label("total_amount"),
                 )
-                .group_by(SalesOrder.customer_id)
-                .order_by(func.sum(SalesOrder.total_amount).desc())
+                .group_by(fact.c.customer_id)
+                .order_by(total.desc())
             )
         else:
-            group_col = func.to_char(SalesOrder.order_date, sa.literal("YYYY-MM")).label(
-                "group_key"
-            )
+            group_col = func.to_char(fact.c.day, sa.literal("YYYY-MM")).label("group_key")
             query = (
                 select(
                     group_col,
-                    func.count().label("order_count"),
-                    func.coalesce(func.sum(SalesOrder.total_amount), 0).label("total_amount"),
+                    func.sum(fact.c.order_count).label("order_count"),
+                    total.label("total_amount"),
                 )
                 .group_by(group_col)
                 .order_by(group_col)
             )
 
-        for f in filters:
-            query = query.where(f)
+        query = query.where(*_day_filters(fact.c.day, date_from, date_to))
+        if fx:
+            query = fx.join(query, fact.c.day, fact.c.currency).add_columns(
+                fx.missing(fact.c.currency).label("missing_rates")
+            )
 
-        result = await self.db.execute(query)
+        rows = (await self.db.execute(query)).all()
+        if fx:
+            fx.check(rows)
         items = [
             SalesSummaryItem(
                 group_key=str(row.group_key),
                 order_count=row.order_count,
                 total_amount=Decimal(str(row.total_amount)),
             )
-            for row in result.all()
+            for row in rows
         ]
-        return SalesSummaryResponse(items=items)
+        return SalesSummaryResponse(items=items, report_currency=report_currency)
 
+    @cached_result("statistics:purchase-summary", tags=("fact_purchase_daily",))
     async def purchase_summary(
         self,
         group_by: str = "month",
         date_from: str | None = None,
         date_to: str | None = None,
     ) -> PurchaseSummaryResponse:
-        filters = []
-        if date_from:
-            filters.append(PurchaseOrder.order_date >= datetime.fromisoformat(date_from).date())
-        if date_to:
-            filters.append(PurchaseOrder.order_date <= datetime.fromisoformat(date_to).date())
-
+        fact = fact_purchase_daily
         if group_by == "supplier":
-            group_col = sa.cast(PurchaseOrder.supplier_id, sa.String).label("group_key")
+            group_col = sa.cast(fact.c.supplier_id, sa.String).label("group_key")
             query = (
                 select(
                     group_col,
-                    func.count().label("order_count"),
-                    func.coalesce(func.sum(PurchaseOrder.total_amount), 0).label("total_amount"),
+                    func.sum(fact.c.order_count).label("order_count"),
+                    func.coalesce(func.sum(fact.c.total_amount), 0).label("total_amount"),
                 )
-                .group_by(PurchaseOrder.supplier_id)
-                .order_by(func.sum(PurchaseOrder.total_amount).desc())
+                .group_by(fact.c.supplier_id)
+                .order_by(func.sum(fact.c.total_amount).desc())
             )
         else:
-            group_col = func.to_char(PurchaseOrder.order_date, sa.literal("YYYY-MM")).label(
-                "group_key"
-            )
+            group_col = func.to_char(fact.c.day, sa.literal("YYYY-MM")).label("group_key")
             query = (
                 select(
                     group_col,
-                    func.count().label("order_count"),
-                    func.coalesce(func.sum(PurchaseOrder.total_amount), 0).label("total_amount"),
+                    func.sum(fact.c.order_count).label("order_count"),
+                    func.coalesce(func.sum(fact.c.total_amount), 0).label("total_amount"),
                 )
                 .group_by(group_col)
                 .order_by(group_col)
             )
 
-        for f in filters:
-            query = query.where(f)
+        query = query.where(*_day_filters(fact.c.day, date_from, date_to))
 
         result = await self.db.execute(query)
         items = [
@@ -130,51 +175,38 @@ class StatisticsService:
         ]
         return PurchaseSummaryResponse(items=items)
 
+    @cached_result("statistics:container-summary", tags=("fact_container_daily",))
     async def container_summary(
         self,
         group_by: str = "month",
         date_from: str | None = None,
         date_to: str | None = None,
     ) -> ContainerSummaryStatResponse:
-        filters = []
-        if date_from:
-            filters.append(ContainerPlan.created_at >= datetime.fromisoformat(date_from))
-        if date_to:
-            filters.append(
-                ContainerPlan.created_at <= datetime.fromisoformat(date_to + "T23:59:59")
-            )
-
+        fact = fact_container_daily
         if group_by == "container_type":
-            group_col = sa.cast(ContainerPlan.container_type, sa.String).label("group_key")
+            group_col = sa.cast(fact.c.container_type, sa.String).label("group_key")
             query = (
                 select(
                     group_col,
-                    func.count().label("plan_count"),
-                    func.coalesce(func.sum(ContainerPlan.container_count), 0).label(
-                        "container_count"
-                    ),
+                    func.sum(fact.c.plan_count).label("plan_count"),
+                    func.coalesce(func.sum(fact.c.container_count), 0).label("container_count"),
                 )
-                .group_by(ContainerPlan.container_type)
-                .order_by(func.count().desc())
+                .group_by(fact.c.container_type)
+                .order_by(func.sum(fact.c.plan_count).desc())
             )
         else:
-            group_col = func.to_char(ContainerPlan.created_at, sa.literal("YYYY-MM")).label(
-                "group_key"
-            )
+            group_col = func.to_char(fact.c.day, sa.literal("YYYY-MM")).label("group_key")
             query = (
                 select(
                     group_col,
-                    func.count().label("plan_count"),
-                    func.coalesce(func.sum(ContainerPlan.container_count), 0).label(
-                        "container_count"
-                    ),
+                    func.sum(fact.c.plan_count).label("plan_count"),
+                    func.coalesce(func.sum(fact.c.container_count), 0).label("container_count"),
                 )
                 .group_by(group_col)
                 .order_by(group_col)
             )
 
-        for f in filters:
-            query = query.where(f)
+        query = query.where(*_day_filters(fact.c.day, date_from, date_to))
 
         result = await self.db.execute(query)
         items = [
@@ -187,35 +219,44 @@ class StatisticsService:
         ]
         return ContainerSummaryStatResponse(items=items)
 
+    @cached_result(
+        "statistics:customer-ranking", tags=("fact_sales_daily", "customers", "fx_rates")
+    )
     async def customer_ranking(
         self,
         date_from: str | None = None,
         date_to: str | None = None,
         top_n: int = 20,
+        report_currency: CurrencyType | None = None,
     ) -> CustomerRankingResponse:
-        filters = []
-        if date_from:
-            filters.append(SalesOrder.order_date >= datetime.fromisoformat(date_from).date())
-        if date_to:
-            filters.append(SalesOrder.order_date <= datetime.fromisoformat(date_to).date())
-
+        fact = fact_sales_daily
+        fx = await self._conversion(report_currency, fact.c.day, date_from, date_to)
+        total = (
+            fx.total(fact.c.total_amount, fact.c.currency)
+            if fx
+            else func.coalesce(func.sum(fact.c.total_amount), 0)
+        )
         query = (
             select(
-                sa.cast(SalesOrder.customer_id, sa.String).label("customer_id"),
+                sa.cast(fact.c.customer_id, sa.String).label("customer_id"),
                 Customer.name.label("customer_name"),
-                func.count().label("order_count"),
-                func.coalesce(func.sum(SalesOrder.total_amount), 0).label("total_amount"),
+                func.sum(fact.c.order_count).label("order_count"),
+                total.label("total_amount"),
             )
-            .join(Customer, SalesOrder.customer_id == Customer.id)
-            .group_by(SalesOrder.customer_id, Customer.name)
-            .order_by(func.sum(SalesOrder.total_amount).desc())
+            .join(Customer, fact.c.customer_id == Customer.id)
+            .where(*_day_filters(fact.c.day, date_from, date_to))
+            .group_by(fact.c.customer_id, Customer.name)
+            .order_by(total.desc())
             .limit(top_n)
         )
+        if fx:
+            query = fx.join(query, fact.c.day, fact.c.currency).add_columns(
+                fx.missing(fact.c.currency).label("missing_rates")
+            )
 
-        for f in filters:
-            query = query.where(f)
-
-        result = await self.db.execute(query)
+        rows = (await self.db.execute(query)).all()
+        if fx:
+            fx.check(rows)
         items = [
             CustomerRankingItem(
                 customer_id=str(row.customer_id),
@@ -223,40 +264,48 @@ class StatisticsService:
                 order_count=row.order_count,
                 total_amount=Decimal(str(row.total_amount)),
             )
-            for row in result.all()
+            for row in rows
         ]
-        return CustomerRankingResponse(items=items)
+        return CustomerRankingResponse(items=items, report_currency=report_currency)
 
+    @cached_result(
+        "statistics:product-ranking", tags=("fact_sales_product_daily", "products", "fx_rates")
+    )
     async def product_ranking(
         self,
         date_from: str | None = None,
         date_to: str | None = None,
         top_n: int = 20,
+        report_currency: CurrencyType | None = None,
     ) -> ProductRankingResponse:
-        filters = []
-        if date_from:
-            filters.append(SalesOrder.order_date >= datetime.fromisoformat(date_from).date())
-        if date_to:
-            filters.append(SalesOrder.order_date <= datetime.fromisoformat(date_to).date())
-
+        fact = fact_sales_product_daily
+        fx = await self._conversion(report_currency, fact.c.day, date_from, date_to)
+        total = (
+            fx.total(fact.c.total_amount, fact.c.currency)
+            if fx
+            else func.coalesce(func.sum(fact.c.total_amount), 0)
+        )
         query = (
             select(
-                sa.cast(SalesOrderItem.product_id, sa.String).label("product_id"),
+                sa.cast(fact.c.product_id, sa.String).label("product_id"),
                 Product.name_cn.label("product_name"),
-                func.coalesce(func.sum(SalesOrderItem.quantity), 0).label("total_quantity"),
-                func.coalesce(func.sum(SalesOrderItem.amount), 0).label("total_amount"),
+                func.coalesce(func.sum(fact.c.total_quantity), 0).label("total_quantity"),
+                total.label("total_amount"),
             )
-            .join(SalesOrder, SalesOrderItem.sales_order_id == SalesOrder.id)
-            .join(Product, SalesOrderItem.product_id == Product.id)
-            .group_by(SalesOrderItem.product_id, Product.name_cn)
-            .order_by(func.sum(SalesOrderItem.amount).desc())
+            .join(Product, fact.c.product_id == Product.id)
+            .where(*_day_filters(fact.c.day, date_from, date_to))
+            .group_by(fact.c.product_id, Product.name_cn)
+            .order_by(total.desc())
             .limit(top_n)
         )
+        if fx:
+            query = fx.join(query, fact.c.day, fact.c.currency).add_columns(
+                fx.missing(fact.c.currency).label("missing_rates")
+            )
 
-        for f in filters:
-            query = query.where(f)
-
-        result = await self.db.execute(query)
+        rows = (await self.db.execute(query)).all()
+        if fx:
+            fx.check(rows)
         items = [
             ProductRankingItem(
                 product_id=str(row.product_id),
@@ -264,6 +313,226 @@ class StatisticsService:
                 total_quantity=int(row.total_quantity),
                 total_amount=Decimal(str(row.total_amount)),
             )
-            for row in result.all()
+            for row in rows
         ]
-        return ProductRankingResponse(items=items)
+        return ProductRankingResponse(items=items, report_currency=report_currency)
+
+    @cached_result("statistics:category-sales", tags=_ROLLUP_TAGS)
+    async def category_sales_rollup(
+        self,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        statuses: list[SalesOrderStatus] | None = None,
+        category_id: uuid.UUID | None = None,
+        report_currency: CurrencyType | None = None,
+    ) -> CategorySalesRollupResponse:
+        status_values = sorted(s.value for s in statuses or [])
+        fx = await self._conversion(report_currency, SalesOrder.order_date, date_from, date_to)
+        total = (
+            fx.total(SalesOrderItem.amount, SalesOrder.currency)
+            if fx
+            else func.coalesce(func.sum(SalesOrderItem.amount), 0)
+        )
+
+        closure = product_category_closure
+        # One (leaf -> ancestor at level N) mapping per level; at most one row per leaf
+        level_maps = []
+        for level in (1, 2, 3):
+            level_maps.append(
+                select(
+                    closure.c.descendant_id,
+                    closure.c.ancestor_id.label("category_id"),
+                    ProductCategoryModel.name.label("category_name"),
+                )
+                .join(ProductCategoryModel, ProductCategoryModel.id == closure.c.ancestor_id)
+                .where(ProductCategoryModel.level == level)
+                .subquery(f"category_level{level}")
+            )
+        l1, l2, l3 = level_maps
+
+        query = (
+            select(
+                func.grouping(l1.c.category_id, l2.c.category_id, l3.c.category_id).label(
+                    "grouping"
+                ),
+                l1.c.category_id.label("l1_id"),
+                l1.c.category_name.label("l1_name"),
+                l2.c.category_id.label("l2_id"),
+                l2.c.category_name.label("l2_name"),
+                l3.c.category_id.label("l3_id"),
+                l3.c.category_name.label("l3_name"),
+                func.count(sa.distinct(SalesOrder.id)).label("order_count"),
+                func.coalesce(func.sum(SalesOrderItem.quantity), 0).label("total_quantity"),
+                total.label("total_amount"),
+            )
+            .select_from(SalesOrderItem)
+            .join(SalesOrder, SalesOrderItem.sales_order_id == SalesOrder.id)
+            .join(Product, SalesOrderItem.product_id == Product.id)
+            .join(l1, l1.c.descendant_id == Product.category_id)
+            .outerjoin(l2, l2.c.descendant_id == Product.category_id)
+            .outerjoin(l3, l3.c.descendant_id == Product.category_id)
+            .group_by(
+                func.rollup(
+                    tuple_(l1.c.category_id, l1.c.category_name),
+                    tuple_(l2.c.category_id, l2.c.category_name),
+                    tuple_(l3.c.category_id, l3.c.category_name),
+                )
+            )
+            .order_by(
+                l1.c.category_name.nulls_first(),
+                l2.c.category_name.nulls_first(),
+                l3.c.category_name.nulls_first(),
+            )
+        )
+        if date_from:
+            query = query.where(SalesOrder.order_date >= datetime.fromisoformat(date_from).date())
+        if date_to:
+            query = query.where(SalesOrder.order_date <= datetime.fromisoformat(date_to).date())
+        if status_values:
+            query = query.where(SalesOrder.status.in_(status_values))
+        if category_id:
+            # Drill-down: restrict to the subtree under category_id
+            query = query.where(
+                sa.exists().where(
+                    closure.c.ancestor_id == category_id,
+                    closure.c.descendant_id == Product.category_id,
+                )
+            )
+
+        if fx:
+            query = fx.join(query, SalesOrder.order_date, SalesOrder.currency).add_columns(
+                fx.missing(SalesOrder.currency).label("missing_rates")
+            )
+
+        rows = (await self.db.execute(query)).all()
+        if fx:
+            fx.check(rows)
+        items = []
+        for row in rows:
+            # GROUPING() bits are set for rolled-up columns: 0 -> level 3, 1 -> 2, 3 -> 1, 7 -> total
+            level = {0: 3, 1: 2, 3: 1, 7: 0}[row.grouping]
+            ids = (row.l1_id, row.l2_id, row.l3_id)
+            if level and ids[level - 1] is None:
+                # Products filed under a shallower leaf repeat their parent subtotal here
+                continue
+            items.append(
+                CategorySalesRollupItem(
+                    level=level,
+                    category_level1_id=row.l1_id,
+                    category_level1_name=row.l1_name,
+                    category_level2_id=row.l2_id,
+                    category_level2_name=row.l2_name,
+                    category_level3_id=row.l3_id,
+                    category_level3_name=row.l3_name,
+                    order_count=row.order_count,
+                    total_quantity=int(row.total_quantity),
+                    total_amount=Decimal(str(row.total_amount)),
+                )
+            )
+        return CategorySalesRollupResponse(items=items, report_currency=report_currency)
+
+    async def _conversion(
+        self,
+        report_currency: CurrencyType | None,
+        day: sa.ColumnElement,
+        date_from: str | None,
+        date_to: str | None,
+    ) -> FxConversion | None:
+        if report_currency is None:
+            return None
+        # Only the days the aggregated rows span get factors; ``day`` is indexed
+        first_day, last_day = (
+            await self.db.execute(
+                select(func.min(day), func.max(day)).where(*_day_filters(day, date_from, date_to))
+            )
+        ).one()
+        return await FxRateService(self.db).conversion(report_currency, first_day, last_day)
+
+    async def pivot(
+        self,
+        dimensions: list[str],
+        aggregates: list[str],
+        date_from: str | None = None,
+        date_to: str | None = None,
+        limit: int = 5000,
+        refresh: bool = False,
+        report_currency: CurrencyType | None = None,
+    ) -> PivotResponse:
+        if not 1 <= len(dimensions) <= MAX_DIMENSIONS or len(set(dimensions)) != len(dimensions):
+            raise BusinessError(
+                code=42280, message=f"透视维度需为 1-{MAX_DIMENSIONS} 个不重复的维度"
+            )
+        invalid = [d for d in dimensions if d not in DIMENSIONS] + [
+            a for a in aggregates if a not in AGGREGATES
+        ]
+        if invalid:
+            raise BusinessError(code=42281, message=f"不支持的透视字段: {', '.join(invalid)}")
+        amounts = {"amount_sum", "amount_avg"} & set(aggregates)
+        if amounts and report_currency is None and "currency" not in dimensions:
+            # Amounts in different currencies cannot be added up as they are
+            raise BusinessError(code=42286, message="金额汇总需按币种分组或指定报表币种")
+
+        snapshot = await self._sales_snapshot(refresh)
+        factors = None
+        if amounts and report_currency is not None:
+            rates = await FxRateService(self.db).get_table()
+            factors = snapshot.amount_factors(rates, report_currency)
+        result = snapshot.pivot(
+            dimensions,
+            aggregates,
+            date_from=datetime.fromisoformat(date_from).date() if date_from else None,
+            date_to=datetime.fromisoformat(date_to).date() if date_to else None,
+            limit=limit,
+            amount_factors=factors,
+        )
+        if result.missing_rates:
+            raise missing_rate_error(report_currency)
+        return PivotResponse(
+            dimensions=dimensions,
+            aggregates=aggregates,
+            items=[
+                PivotRow(keys=list(g.keys), labels=list(g.labels), values=g.values)
+                for g in result.groups
+            ],
+            total_groups=result.total_groups,
+            row_count=result.row_count,
+            snapshot_at=snapshot.built_at,
+            report_currency=report_currency,
+        )
+
+    async def _sales_snapshot(self, refresh: bool = False) -> SalesSnapshot:
+        today = date.today()
+        snapshot = None if refresh else _pivot_snapshots.get(today)
+        if snapshot is None:
+            snapshot = await self._load_sales_snapshot()
+            _pivot_snapshots.set(today, snapshot)
+        return snapshot
+
+    async def _load_sales_snapshot(self) -> SalesSnapshot:
+        # Dictionaries are preloaded in label order so group codes sort by label
+        customers = await self.db.execute(
+            select(Customer.id, Customer.name).order_by(Customer.name)
+        )
+        products = await self.db.execute(
+            select(Product.id, Product.name_cn, Product.category_id).order_by(Product.name_cn)
+        )
+        tree = await category_tree_cache.get(self.db)
+        builder = SnapshotBuilder(customers.all(), products.all(), tree)
+
+        query = (
+            select(
+                SalesOrder.order_date,
+                SalesOrder.customer_id,
+                SalesOrderItem.product_id,
+                SalesOrder.currency,
+                SalesOrder.status,
+                SalesOrderItem.quantity,
+                sa.cast(SalesOrderItem.amount * 100, sa.BigInteger),
+            )
+            .join(SalesOrder, SalesOrderItem.sales_order_id == SalesOrder.id)
+            .execution_options(yield_per=_PIVOT_CHUNK_ROWS)
+        )
+        result = await self.db.stream(query)
+        async for partition in result.partitions():
+            builder.add(partition)
+        return builder.build(datetime.now(UTC))
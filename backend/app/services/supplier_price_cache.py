@@ -0,0 +1,165 @@
+"""Process-wide cache of supplier price lists for purchase price lookups.
+
+Each supplier's tiers (its price list plus the flat supply price of its linked
+products) are held as parallel typed arrays sorted by product and minimum
+quantity, so tens of thousands of tiers stay a handful of compact buffers per
+supplier instead of one object per row. :meth:`PriceBook.resolve` quotes any
+number of products in one call: for each product it bisects into the arrays of
+the suppliers offering it and scans that product's few tiers.
+
+Writes made through ``SupplierService`` mark the session dirty; invalidation
+across workers is handled by ``app.core.snapshot_cache``.
+"""
+
+import uuid
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.snapshot_cache import SnapshotCache, register
+from app.repositories.supplier_repo import SupplierRepository
+
+# Open validity bounds as date ordinals
+_OPEN_FROM = 0
+_OPEN_TO = date.max.toordinal()
+
+
+@dataclass(frozen=True)
+class Quote:
+    supplier_id: uuid.UUID
+    unit_price: Decimal
+    # Minimum quantity of the tier the price comes from
+    min_quantity: int
+
+
+class SupplierPrices:
+    """One supplier's tiers, sorted by product index and then minimum quantity."""
+
+    __slots__ = ("products", "min_quantities", "prices", "valid_from", "valid_to")
+
+    def __init__(self):
+        self.products = array("i")
+        self.min_quantities = array("i")
+        # Unit prices in cents
+        self.prices = array("q")
+        self.valid_from = array("i")
+        self.valid_to = array("i")
+
+    def append(
+        self, product: int, min_quantity: int, price: int, valid_from: int, valid_to: int
+    ) -> None:
+        self.products.append(product)
+        self.min_quantities.append(min_quantity)
+        self.prices.append(price)
+        self.valid_from.append(valid_from)
+        self.valid_to.append(valid_to)
+
+    def quote(self, product: int, quantity: int, day: int) -> tuple[int, int] | None:
+        """Lowest ``(price, min_quantity)`` of the tiers covering ``quantity`` on ``day``."""
+        lo = bisect_left(self.products, product)
+        hi = bisect_right(self.products, product, lo)
+        best = None
+        for i in range(lo, hi):
+            if self.min_quantities[i] > quantity:
+                break
+            if self.valid_from[i] <= day <= self.valid_to[i] and (
+                best is None or self.prices[i] < best[0]
+            ):
+                best = (self.prices[i], self.min_quantities[i])
+        return best
+
+
+class PriceBook:
+    """Immutable snapshot of every supplier's price list."""
+
+    def __init__(
+        self,
+        product_index: dict[uuid.UUID, int],
+        suppliers: dict[uuid.UUID, SupplierPrices],
+        offered_by: dict[int, tuple[uuid.UUID, ...]],
+        version: int,
+    ):
+        self.product_index = product_index
+        self.suppliers = suppliers
+        self.offered_by = offered_by
+        self.version = version
+
+    @classmethod
+    def build(cls, tiers: Iterable, version: int = 0) -> "PriceBook":
+        """Build from tiers ordered by supplier, product and min quantity."""
+        tiers = list(tiers)
+        # Indexes follow product id order, so each supplier's array stays sorted
+        product_index = {
+            product_id: i for i, product_id in enumerate(sorted({t.product_id for t in tiers}))
+        }
+        suppliers: dict[uuid.UUID, SupplierPrices] = {}
+        offered_by: dict[int, list[uuid.UUID]] = {}
+        for tier in tiers:
+            prices = suppliers.get(tier.supplier_id)
+            if prices is None:
+                prices = suppliers[tier.supplier_id] = SupplierPrices()
+            product = product_index[tier.product_id]
+            if not prices.products or prices.products[-1] != product:
+                offered_by.setdefault(product, []).append(tier.supplier_id)
+            prices.append(
+                product,
+                tier.min_quantity,
+                int(Decimal(tier.unit_price).scaleb(2)),
+                tier.valid_from.toordinal() if tier.valid_from else _OPEN_FROM,
+                tier.valid_to.toordinal() if tier.valid_to else _OPEN_TO,
+            )
+        return cls(
+            product_index,
+            suppliers,
+            {product: tuple(ids) for product, ids in offered_by.items()},
+            version,
+        )
+
+    def resolve(
+        self,
+        quantities: Mapping[uuid.UUID, int],
+        on: date,
+        preferred: Mapping[uuid.UUID, uuid.UUID | None] | None = None,
+    ) -> dict[uuid.UUID, Quote]:
+        """Best quote for each product at its quantity on ``on``.
+
+        The lowest unit price wins; on a tie the product's ``preferred`` supplier
+        wins, then the supplier with the lowest id. Products no supplier quotes at
+        that quantity and date are left out.
+        """
+        day = on.toordinal()
+        preferred = preferred or {}
+        quotes: dict[uuid.UUID, Quote] = {}
+        for product_id, quantity in quantities.items():
+            product = self.product_index.get(product_id)
+            if product is None:
+                continue
+            favourite = preferred.get(product_id)
+            best = None
+            for supplier_id in self.offered_by[product]:
+                tier = self.suppliers[supplier_id].quote(product, quantity, day)
+                if tier is None:
+                    continue
+                key = (tier[0], supplier_id != favourite)
+                if best is None or key < best[0]:
+                    best = (key, supplier_id, tier)
+            if best is not None:
+                _, supplier_id, (price, min_quantity) = best
+                quotes[product_id] = Quote(supplier_id, Decimal(price).scaleb(-2), min_quantity)
+        return quotes
+
+
+class SupplierPriceCache(SnapshotCache[PriceBook]):
+    name = "supplier_prices"
+
+    async def _load(self, db: AsyncSession) -> PriceBook:
+        tiers = await SupplierRepository(db).get_price_tiers()
+        return PriceBook.build(tiers, self.version)
+
+
+supplier_price_cache = register(SupplierPriceCache())
@@ -1,30 +1,35 @@
-import math
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.exceptions import ConflictError, NotFoundError
-from app.models.supplier import Supplier, SupplierProduct
+from app.core.cache import LRUCache
+from app.core.exceptions import BusinessError, ConflictError, NotFoundError
+from app.models.supplier import Supplier, SupplierPrice, SupplierProduct
 from app.repositories.supplier_repo import SupplierRepository
-from app.schemas.common import PaginatedData
+from app.schemas.common import PaginatedData, SuggestItem
 from app.schemas.supplier import (
     SupplierCreate,
     SupplierListParams,
+    SupplierPriceListUpdate,
     SupplierProductCreate,
     SupplierProductRead,
     SupplierRead,
     SupplierUpdate,
 )
-from app.utils.code_generator import generate_entity_code
+from app.services.sequence_service import SequenceService
+from app.services.supplier_price_cache import supplier_price_cache
+
+_suggest_cache = LRUCache(maxsize=1024, ttl=30)
 
 
 class SupplierService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.repo = SupplierRepository(db)
+        self.sequences = SequenceService(db)
 
     async def create(self, data: SupplierCreate, user_id: uuid.UUID) -> Supplier:
-        seq = await self.repo.get_next_sequence()
-        supplier_code = generate_entity_code("SUP", seq)
+        supplier_code = await self.sequences.entity_code("SUP")
 
         supplier = Supplier(
             supplier_code=supplier_code,
@@ -32,6 +37,7 @@ class SupplierService:
             created_by=user_id,
             updated_by=user_id,
         )
+        _suggest_cache.clear_on_commit(self.db)
         return await self.repo.create(supplier)
 
     async def get_by_id(self, id: uuid.UUID) -> Supplier:
@@ -44,23 +50,40 @@ class SupplierService:
         supplier = await self.get_by_id(id)
         update_data = data.model_dump(exclude_unset=True)
         update_data["updated_by"] = user_id
+        _suggest_cache.clear_on_commit(self.db)
         return await self.repo.update(supplier, update_data)
 
+    async def suggest(self, keyword: str, limit: int = 10) -> list[SuggestItem]:
+        key = (keyword.lower(), limit)
+        cached = _suggest_cache.get(key)
+        if cached is not None:
+            return cached
+        rows = await self.repo.suggest(
+            keyword,
+            code_column=Supplier.supplier_code,
+            name_columns=[Supplier.name],
+            limit=limit,
+        )
+        items = [SuggestItem(id=id, code=code, name=name) for id, code, name in rows]
+        _suggest_cache.set(key, items)
+        return items
+
     async def list_suppliers(self, params: SupplierListParams) -> PaginatedData[SupplierRead]:
         offset = (params.page - 1) * params.page_size
-        items, total = await self.repo.search(
+        result = await self.repo.search(
             keyword=params.keyword,
             offset=offset,
             limit=params.page_size,
             order_by=params.sort_by,
             order_desc=params.sort_order == "desc",
+            cursor=params.cursor,
+            include_total=params.include_total,
         )
-        return PaginatedData(
-            items=[SupplierRead.model_validate(item) for item in items],
-            total=total,
+        return PaginatedData.from_page(
+            [SupplierRead.model_validate(item) for item in result.items],
+            result,
             page=params.page,
             page_size=params.page_size,
-            total_pages=math.ceil(total / params.page_size) if total > 0 else 0,
         )
 
     async def add_product(
@@ -78,15 +101,46 @@ class SupplierService:
             supply_price=data.supply_price,
             remark=data.remark,
         )
+        supplier_price_cache.mark_dirty(self.db)
         return await self.repo.add_product(sp)
 
     async def remove_product(self, supplier_id: uuid.UUID, product_id: uuid.UUID) -> None:
         sp = await self.repo.get_supplier_product(supplier_id, product_id)
         if not sp:
             raise NotFoundError("供应商商品关联", f"{supplier_id}/{product_id}")
+        supplier_price_cache.mark_dirty(self.db)
         await self.repo.remove_product(sp)
 
     async def get_products(self, supplier_id: uuid.UUID) -> list[SupplierProductRead]:
         await self.get_by_id(supplier_id)
         items = await self.repo.get_supplier_products(supplier_id)
         return [SupplierProductRead.model_validate(item) for item in items]
+
+    async def get_prices(self, supplier_id: uuid.UUID) -> list[SupplierPrice]:
+        await self.get_by_id(supplier_id)
+        return await self.repo.get_prices(supplier_id)
+
+    async def replace_prices(
+        self, supplier_id: uuid.UUID, data: SupplierPriceListUpdate
+    ) -> list[SupplierPrice]:
+        """Replace the supplier's whole price list; a list with any invalid tier is rejected."""
+        await self.get_by_id(supplier_id)
+
+        errors = []
+        unknown = await self.repo.get_unknown_product_ids(item.product_id for item in data.items)
+        for index, item in enumerate(data.items):
+            if item.product_id in unknown:
+                errors.append({"index": index, "error": f"商品 {item.product_id} 不存在"})
+            elif item.valid_from and item.valid_to and item.valid_to < item.valid_from:
+                errors.append({"index": index, "error": "失效日期不能早于生效日期"})
+        if errors:
+            raise BusinessError(
+                code=42293, message="供应商价格表校验不通过", detail={"errors": errors}
+            )
+
+        prices = [
+            SupplierPrice(supplier_id=supplier_id, **item.model_dump()) for item in data.items
+        ]
+        supplier_price_cache.mark_dirty(self.db)
+        await self.repo.replace_prices(supplier_id, prices)
+        return prices
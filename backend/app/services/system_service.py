@@ -1,7 +1,6 @@
-import math
 import uuid
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import BusinessError, NotFoundError
@@ -9,6 +8,7 @@ from app.core.security import hash_password
 from app.models.enums import UserRole
 from app.models.user import User
 from app.repositories.audit_log_repo import AuditLogRepository
+from app.repositories.base import paginate
 from app.repositories.system_config_repo import SystemConfigRepository
 from app.schemas.common import PaginatedData
 from app.schemas.system import (
@@ -32,9 +32,6 @@ class SystemService:
     # ==================== User Management ====================
 
     async def list_users(self, params: SystemUserListParams) -> PaginatedData[SystemUserRead]:
-        query = select(User)
-        count_query = select(func.count()).select_from(User)
-
         filters = []
         if params.keyword:
             filters.append(
@@ -49,30 +46,24 @@ class SystemService:
         if params.is_active is not None:
             filters.append(User.is_active == params.is_active)
 
-        for f in filters:
-            query = query.where(f)
-            count_query = count_query.where(f)
-
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar_one()
-
-        order_col = getattr(User, params.sort_by, User.created_at)
-        if params.sort_order == "desc":
-            query = query.order_by(order_col.desc())
-        else:
-            query = query.order_by(order_col.asc())
-
-        offset = (params.page - 1) * params.page_size
-        query = query.offset(offset).limit(params.page_size)
-        result = await self.db.execute(query)
-        users = list(result.scalars().all())
+        result = await paginate(
+            self.db,
+            User,
+            select(User),
+            offset=(params.page - 1) * params.page_size,
+            limit=params.page_size,
+            order_by=params.sort_by,
+            order_desc=params.sort_order == "desc",
+            filters=filters,
+            cursor=params.cursor,
+            include_total=params.include_total,
+        )
 
-        return PaginatedData(
-            items=[SystemUserRead.model_validate(u) for u in users],
-            total=total,
+        return PaginatedData.from_page(
+            [SystemUserRead.model_validate(u) for u in result.items],
+            result,
             page=params.page,
             page_size=params.page_size,
-            total_pages=math.ceil(total / params.page_size) if total > 0 else 0,
         )
 
     async def create_user(self, data: SystemUserCreate) -> User:
@@ -134,7 +125,7 @@ class SystemService:
 
     async def list_audit_logs(self, params: AuditLogListParams) -> PaginatedData[AuditLogRead]:
         offset = (params.page - 1) * params.page_size
-        items, total = await self.audit_repo.search(
+        result = await self.audit_repo.search(
             user_id=params.user_id,
             action=params.action,
             resource_type=params.resource_type,
@@ -144,13 +135,14 @@ class SystemService:
             limit=params.page_size,
             order_by=params.sort_by,
             order_desc=params.sort_order == "desc",
+            cursor=params.cursor,
+            include_total=params.include_total,
         )
-        return PaginatedData(
-            items=[AuditLogRead.model_validate(item) for item in items],
-            total=total,
+        return PaginatedData.from_page(
+            [AuditLogRead.model_validate(item) for item in result.items],
+            result,
             page=params.page,
             page_size=params.page_size,
-            total_pages=math.ceil(total / params.page_size) if total > 0 else 0,
         )
 
     # ==================== System Configs ====================
@@ -1,4 +1,3 @@
-import math
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -23,13 +22,14 @@ from app.schemas.warehouse import (
     ReceivingNoteListRead,
     ReceivingNoteUpdate,
 )
-from app.utils.code_generator import generate_order_no
+from app.services.sequence_service import SequenceService
 
 
 class WarehouseService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.note_repo = ReceivingNoteRepository(db)
+        self.sequences = SequenceService(db)
         self.inventory_repo = InventoryRepository(db)
         self.note_item_repo = ReceivingNoteItemRepository(db)
 
@@ -38,12 +38,13 @@ class WarehouseService:
     async def create_receiving_note(
         self, data: ReceivingNoteCreate, user_id: uuid.UUID
     ) -> ReceivingNote:
-        seq = await self.note_repo.count_by_date(data.receiving_date) + 1
-        note_no = generate_order_no("RCV", data.receiving_date, seq)
-
-        # R03: validate actual_quantity does not exceed remaining on PO item
+        # R03: validate actual_quantity does not exceed remaining on PO item. The
+        # lines are locked before the note number is allocated.
+        po_items = await self.note_repo.lock_purchase_order_items(
+            [item_data.purchase_order_item_id for item_data in data.items]
+        )
         for item_data in data.items:
-            po_item = await self.note_repo.get_purchase_order_item(item_data.purchase_order_item_id)
+            po_item = po_items.get(item_data.purchase_order_item_id)
             if not po_item:
                 raise NotFoundError("采购单明细", str(item_data.purchase_order_item_id))
             remaining = po_item.quantity - po_item.received_quantity
@@ -58,6 +59,7 @@ class WarehouseService:
                     },
                 )
 
+        note_no = await self.sequences.order_no("RCV", data.receiving_date)
         note = ReceivingNote(
             note_no=note_no,
             purchase_order_id=data.purchase_order_id,
@@ -129,20 +131,21 @@ class WarehouseService:
         self, params: ReceivingNoteListParams
     ) -> PaginatedData[ReceivingNoteListRead]:
         offset = (params.page - 1) * params.page_size
-        items, total = await self.note_repo.search(
+        result = await self.note_repo.search(
             purchase_order_id=params.purchase_order_id,
             keyword=params.keyword,
             offset=offset,
             limit=params.page_size,
             order_by=params.sort_by,
             order_desc=params.sort_order == "desc",
+            cursor=params.cursor,
+            include_total=params.include_total,
         )
-        return PaginatedData(
-            items=[ReceivingNoteListRead.model_validate(item) for item in items],
-            total=total,
+        return PaginatedData.from_page(
+            [ReceivingNoteListRead.model_validate(item) for item in result.items],
+            result,
             page=params.page,
             page_size=params.page_size,
-            total_pages=math.ceil(total / params.page_size) if total > 0 else 0,
         )
 
     # ==================== Inventory ====================
@@ -151,15 +154,18 @@ class WarehouseService:
         self, params: InventoryListParams
     ) -> PaginatedData[InventoryByProductRead]:
         offset = (params.page - 1) * params.page_size
-        items, total = await self.inventory_repo.get_by_product(
-            product_id=params.product_id, offset=offset, limit=params.page_size
+        result = await self.inventory_repo.get_by_product(
+            product_id=params.product_id,
+            offset=offset,
+            limit=params.page_size,
+            cursor=params.cursor,
+            include_total=params.include_total,
         )
-        return PaginatedData(
-            items=[InventoryByProductRead(**item) for item in items],
-            total=total,
+        return PaginatedData.from_page(
+            [InventoryByProductRead(**item) for item in result.items],
+            result,
             page=params.page,
             page_size=params.page_size,
-            total_pages=math.ceil(total / params.page_size) if total > 0 else 0,
         )
 
     async def get_inventory_by_order(self, sales_order_id: uuid.UUID) -> list[InventoryByOrderRead]:
@@ -209,17 +215,18 @@ class WarehouseService:
         self, params: InventoryListParams
     ) -> PaginatedData[ReceivingNoteItemRead]:
         offset = (params.page - 1) * params.page_size
-        items, total = await self.note_item_repo.search_pending_inspection(
+        result = await self.note_item_repo.search_pending_inspection(
             keyword=params.keyword,
             offset=offset,
             limit=params.page_size,
+            cursor=params.cursor,
+            include_total=params.include_total,
         )
-        return PaginatedData(
-            items=[ReceivingNoteItemRead.model_validate(item) for item in items],
-            total=total,
+        return PaginatedData.from_page(
+            [ReceivingNoteItemRead.model_validate(item) for item in result.items],
+            result,
             page=params.page,
             page_size=params.page_size,
-            total_pages=math.ceil(total / params.page_size) if total > 0 else 0,
         )
 
     # ==================== Internal Helpers ====================
@@ -0,0 +1,16 @@
+import hashlib
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+
+def etag_response(request: Request, payload: BaseModel) -> Response:
+    """Serialise ``payload`` with a content ETag; answer 304 when the client has it."""
+    body = payload.model_dump_json().encode()
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
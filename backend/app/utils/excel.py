@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from io import BytesIO
 from typing import Any
 
@@ -43,26 +44,32 @@ def create_workbook(title: str, headers: list[str], rows: list[list[Any]]) -> By
     return output
 
 
-def read_workbook(content: bytes) -> list[dict]:
-    wb = load_workbook(BytesIO(content), read_only=True)
-    ws = wb.active
+def iter_workbook(content: bytes) -> Iterator[tuple[int, dict]]:
+    """Yield ``(row_number, {header: value})`` for each non-empty data row.
 
-    rows = list(ws.iter_rows(values_only=True))
-    if not rows:
-        return []
+    The sheet is read in read-only mode, one row at a time, so large files are
+    never held in memory as a whole.
+    """
+    wb = load_workbook(BytesIO(content), read_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        first = next(rows, None)
+        if first is None:
+            return
+        headers = [str(h).strip() if h else f"col_{i}" for i, h in enumerate(first)]
+        for row_number, row in enumerate(rows, 2):
+            if all(v is None for v in row):
+                continue
+            yield (
+                row_number,
+                {header: row[i] if i < len(row) else None for i, header in enumerate(headers)},
+            )
+    finally:
+        wb.close()
 
-    headers = [str(h).strip() if h else f"col_{i}" for i, h in enumerate(rows[0])]
-    result = []
-    for row in rows[1:]:
-        if all(v is None for v in row):
-            continue
-        item = {}
-        for i, header in enumerate(headers):
-            item[header] = row[i] if i < len(row) else None
-        result.append(item)
 
-    wb.close()
-    return result
+def read_workbook(content: bytes) -> list[dict]:
+    return [item for _, item in iter_workbook(content)]
 
 
 def create_template(title: str, headers: list[str]) -> BytesIO:
@@ -0,0 +1,29 @@
+"""Load daily exchange rates from a CSV file.
+
+The file has a header row with the columns date,currency,rate where rate is the
+USD value of one unit of the currency. Rows for dates already loaded are
+overwritten.
+
+Usage: python -m scripts.load_fx_rates rates.csv
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from app.database import async_session_factory
+from app.services.fx_rate_service import FxRateService
+
+
+async def load(path: Path) -> None:
+    async with async_session_factory() as session:
+        result = await FxRateService(session).import_csv(path.read_bytes())
+        await session.commit()
+    print(f"Loaded {result.imported} rates for {result.date_from} .. {result.date_to}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", type=Path)
+    args = parser.parse_args()
+    asyncio.run(load(args.path))
@@ -0,0 +1,26 @@
+"""Rebuild the daily statistics fact tables from the order tables.
+
+Usage: python -m scripts.rebuild_facts [--date-from YYYY-MM-DD] [--date-to YYYY-MM-DD]
+"""
+
+import argparse
+import asyncio
+from datetime import date
+
+from app.database import async_session_factory
+from app.repositories.fact_repo import FactRepository
+
+
+async def rebuild(date_from: date | None, date_to: date | None) -> None:
+    async with async_session_factory() as session:
+        await FactRepository(session).rebuild(date_from, date_to)
+        await session.commit()
+    print(f"Rebuilt fact tables for {date_from or 'beginning'} .. {date_to or 'today'}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--date-from", type=date.fromisoformat)
+    parser.add_argument("--date-to", type=date.fromisoformat)
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.date_from, args.date_to))
@@ -3,7 +3,7 @@
 import asyncio
 import uuid
 
-from sqlalchemy import select
+from sqlalchemy import select, text
 
 from app.core.security import hash_password
 from app.database import async_session_factory
@@ -64,6 +64,14 @@ async def seed() -> None:
                 )
                 session.add(cat)
             await session.flush()
+            # Level-1 categories only need their depth-0 closure rows
+            await session.execute(
+                text(
+                    "INSERT INTO product_category_closure (ancestor_id, descendant_id, depth) "
+                    "SELECT id, id, 0 FROM product_categories WHERE level = 1 "
+                    "ON CONFLICT DO NOTHING"
+                )
+            )
             print(f"Created {len(CATEGORY_SEEDS)} level-1 product categories.")
 
         await session.commit()
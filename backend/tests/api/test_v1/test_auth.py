@@ -1,5 +1,10 @@
+import pytest
+from fastapi import HTTPException
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_stream_user
+from app.main import app
 from app.models.user import User
 from tests.conftest import get_auth_headers
 
@@ -76,3 +81,40 @@ class TestLogout:
         headers = get_auth_headers(admin_user)
         resp = await client.post("/api/v1/auth/logout", headers=headers)
         assert resp.status_code == 200
+
+
+class TestStreamTicket:
+    async def test_ticket_opens_stream_once(
+        self, client: AsyncClient, db_session: AsyncSession, admin_user: User
+    ):
+        headers = get_auth_headers(admin_user)
+        resp = await client.post("/api/v1/events/ticket", headers=headers)
+        assert resp.status_code == 200
+        ticket = resp.json()["data"]["ticket"]
+
+        redis = app.state.redis
+        auth = await get_stream_user(None, ticket, db_session, redis)
+        assert auth.user.id == admin_user.id
+        assert await auth.is_valid(redis)
+
+        with pytest.raises(HTTPException) as exc:
+            await get_stream_user(None, ticket, db_session, redis)
+        assert exc.value.status_code == 401
+
+    async def test_stream_invalid_after_logout(
+        self, client: AsyncClient, db_session: AsyncSession, admin_user: User
+    ):
+        headers = get_auth_headers(admin_user)
+        ticket = (await client.post("/api/v1/events/ticket", headers=headers)).json()["data"][
+            "ticket"
+        ]
+        redis = app.state.redis
+        auth = await get_stream_user(None, ticket, db_session, redis)
+
+        await client.post("/api/v1/auth/logout", headers=headers)
+        assert not await auth.is_valid(redis)
+
+    async def test_stream_rejects_access_token_param(self, client: AsyncClient, admin_user: User):
+        token = get_auth_headers(admin_user)["Authorization"].split()[1]
+        resp = await client.get("/api/v1/events/stream", params={"access_token": token})
+        assert resp.status_code == 401
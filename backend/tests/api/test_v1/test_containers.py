@@ -3,10 +3,11 @@ from datetime import date
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.enums import InspectionResult, UnitType
 from app.models.user import User
-from tests.conftest import get_auth_headers
+from tests.conftest import get_auth_headers, measure, reads, writes
 from tests.factories import (
     make_container_plan_data,
     make_customer_data,
@@ -524,3 +525,29 @@ class TestStuffing:
             f"/api/v1/containers/{plan_id}/stuffing", json=stuffing_data, headers=headers
         )
         assert resp.status_code == 422
+
+
+class TestMutationQueryCount:
+    async def test_update(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        sql_log: list[str],
+        admin_user: User,
+        seed_goods_ready_so: dict,
+    ):
+        """Updating a plan reads it once, as a GET does, and writes it once."""
+        headers = get_auth_headers(admin_user)
+        data = make_container_plan_data([seed_goods_ready_so["so_id"]])
+        create_resp = await client.post("/api/v1/containers", json=data, headers=headers)
+        url = f"/api/v1/containers/{create_resp.json()['data']['id']}"
+        _, get_sql = await measure(client, db_session, sql_log, "GET", url, headers=headers)
+
+        resp, sql = await measure(
+            client, db_session, sql_log, "PUT", url, json={"remark": "revised"}, headers=headers
+        )
+        assert resp.status_code == 200
+        assert resp.json()["data"]["remark"] == "revised"
+        assert resp.json()["data"]["linked_sales_order_ids"] == [seed_goods_ready_so["so_id"]]
+        assert len(reads(sql)) == len(reads(get_sql))
+        assert len(writes(sql, "container_plans")) == 1
@@ -46,6 +46,52 @@ class TestListCustomers:
         for item in resp.json()["data"]["items"]:
             assert item["country"] == "Japan"
 
+    async def test_list_customers_cursor(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        for _ in range(3):
+            await client.post("/api/v1/customers", json=make_customer_data(), headers=headers)
+
+        seen = []
+        url = "/api/v1/customers?page_size=2&include_total=false"
+        resp = await client.get(url, headers=headers)
+        while True:
+            assert resp.status_code == 200
+            data = resp.json()["data"]
+            assert data["total"] is None
+            seen.extend(item["id"] for item in data["items"])
+            if not data["next_cursor"]:
+                break
+            resp = await client.get(f"{url}&cursor={data['next_cursor']}", headers=headers)
+
+        resp = await client.get("/api/v1/customers?page_size=100", headers=headers)
+        assert seen == [item["id"] for item in resp.json()["data"]["items"]]
+
+    async def test_list_customers_invalid_cursor(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        resp = await client.get("/api/v1/customers?cursor=not-a-cursor", headers=headers)
+        assert resp.status_code == 422
+        assert resp.json()["code"] == 42284
+
+
+class TestSuggestCustomers:
+    async def test_suggest_by_name(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        name = f"Suggest Trading {uuid.uuid4().hex[:6]}"
+        create_resp = await client.post(
+            "/api/v1/customers", json=make_customer_data(name=name), headers=headers
+        )
+        code = create_resp.json()["data"]["customer_code"]
+
+        resp = await client.get(f"/api/v1/customers/suggest?q={name[-6:]}", headers=headers)
+        assert resp.status_code == 200
+        assert resp.json()["data"][0]["code"] == code
+        assert resp.json()["data"][0]["name"] == name
+
+    async def test_suggest_requires_three_characters(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        resp = await client.get("/api/v1/customers/suggest?q=Su", headers=headers)
+        assert resp.status_code == 422
+
 
 class TestGetCustomer:
     async def test_get_customer(self, client: AsyncClient, admin_user: User):
@@ -1,7 +1,14 @@
+import uuid
+
 import pytest
 from httpx import AsyncClient
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.core.result_cache import ResultCache
 from app.models.user import User
+from app.schemas.dashboard import TodoResponse
 from tests.conftest import get_auth_headers
 
 
@@ -50,3 +57,58 @@ class TestDashboard:
         headers = get_auth_headers(viewer_user)
         resp = await client.get("/api/v1/dashboard/overview", headers=headers)
         assert resp.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_summary_matches_todos_and_supports_etag(
+        self, client: AsyncClient, admin_user: User
+    ):
+        headers = get_auth_headers(admin_user)
+        resp = await client.get("/api/v1/dashboard/summary", headers=headers)
+        assert resp.status_code == 200
+        summary = resp.json()["data"]
+        todos = await client.get("/api/v1/dashboard/todos", headers=headers)
+        assert summary["todos"] == todos.json()["data"]
+        assert "sales_orders" in summary["overview"]
+
+        etag = resp.headers["etag"]
+        resp = await client.get(
+            "/api/v1/dashboard/summary", headers={**headers, "If-None-Match": etag}
+        )
+        assert resp.status_code == 304
+        assert resp.headers["etag"] == etag
+
+
+class TestResultCache:
+    @pytest.mark.asyncio
+    async def test_tags_and_pending_writes(self, db_session: AsyncSession):
+        redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        cache = ResultCache()
+        await cache.start(redis)
+        calls = []
+
+        async def compute(db: AsyncSession) -> TodoResponse:
+            calls.append(db)
+            return TodoResponse(
+                draft_sales_orders=len(calls),
+                ordered_purchase_orders=0,
+                goods_ready_sales_orders=0,
+                arriving_soon_containers=0,
+            )
+
+        tag = f"test_{uuid.uuid4().hex}"
+        args = (db_session, f"test:{tag}", {"x": 1}, [tag], TodoResponse, compute)
+        try:
+            first = await cache.get_or_compute(*args)
+            assert await cache.get_or_compute(*args) == first
+            assert len(calls) == 1
+
+            # A committed write to the table turns the entry into a miss
+            await cache.bump([tag])
+            assert (await cache.get_or_compute(*args)).draft_sales_orders == 2
+
+            # Uncommitted writes in this session bypass the cache
+            cache.mark_dirty(db_session.sync_session, tag)
+            assert (await cache.get_or_compute(*args)).draft_sales_orders == 3
+        finally:
+            await cache.stop()
+            await redis.aclose()
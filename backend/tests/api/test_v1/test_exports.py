@@ -82,6 +82,114 @@ class TestProductExports:
         data = resp.json()["data"]
         assert data["created"] >= 1
 
+    @pytest.mark.asyncio
+    async def test_import_products_upsert(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        from app.utils.excel import create_workbook
+
+        existing = make_product_data()
+        create_resp = await client.post("/api/v1/products", headers=headers, json=existing)
+        product_id = create_resp.json()["data"]["id"]
+        new_sku = f"SKU-UPS-{uuid.uuid4().hex[:6]}"
+
+        headers_list = [
+            "sku_code",
+            "name_cn",
+            "name_en",
+            "category_name",
+            "brand",
+            "spec",
+            "unit_weight_kg",
+            "unit_volume_cbm",
+            "packing_spec",
+            "carton_length_cm",
+            "carton_width_cm",
+            "carton_height_cm",
+            "carton_gross_weight_kg",
+            "shelf_life_days",
+        ]
+        common = ["糖果", "测试品牌", "500g/袋", "0.550", "0.001200", "24袋/箱"]
+        common += ["40.00", "30.00", "25.00", "13.500", "365"]
+        rows = [
+            [existing["sku_code"], "改名零食", "Test Snack", *common],
+            [new_sku, "新零食", "New Snack", *common],
+        ]
+        content = create_workbook("导入", headers_list, rows).getvalue()
+        files = {
+            "file": (
+                "products.xlsx",
+                content,
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        }
+
+        resp = await client.post(
+            "/api/v1/products/import?mode=upsert&dry_run=true", headers=headers, files=files
+        )
+        assert resp.status_code == 200
+        report = resp.json()["data"]
+        assert report["dry_run"] is True
+        assert report["created_skus"] == [new_sku]
+        assert report["updated_fields"] == {existing["sku_code"]: ["name_cn"]}
+        assert report["unchanged"] == 0
+        resp = await client.get(f"/api/v1/products/{product_id}", headers=headers)
+        assert resp.json()["data"]["name_cn"] == "测试零食"
+
+        resp = await client.post(
+            "/api/v1/products/import?mode=upsert", headers=headers, files=files
+        )
+        report = resp.json()["data"]
+        assert report["created"] == 1
+        assert report["updated"] == 1
+        resp = await client.get(f"/api/v1/products/{product_id}", headers=headers)
+        assert resp.json()["data"]["name_cn"] == "改名零食"
+
+        # Re-running the same sheet is a no-op
+        resp = await client.post(
+            "/api/v1/products/import?mode=upsert&dry_run=true", headers=headers, files=files
+        )
+        report = resp.json()["data"]
+        assert report["created"] == 0
+        assert report["updated"] == 0
+        assert report["unchanged"] == 2
+
+    @pytest.mark.asyncio
+    async def test_import_upsert_invalid_rows_not_deactivated(
+        self, client: AsyncClient, admin_user: User
+    ):
+        headers = get_auth_headers(admin_user)
+        from app.utils.excel import create_workbook
+
+        existing = make_product_data()
+        await client.post("/api/v1/products", headers=headers, json=existing)
+        new_sku = f"SKU-UPS-{uuid.uuid4().hex[:6]}"
+
+        headers_list = ["sku_code", "name_cn", "name_en", "category_name"]
+        headers_list += ["unit_weight_kg", "shelf_life_days"]
+        rows = [
+            # Fails validation: must be reported, not deactivated
+            [existing["sku_code"], "测试零食", "Test Snack", "糖果", "not-a-number", "365"],
+            # Blank shelf life falls back to the default
+            [new_sku, "新零食", "New Snack", "糖果", "0.5", None],
+        ]
+        content = create_workbook("导入", headers_list, rows).getvalue()
+        resp = await client.post(
+            "/api/v1/products/import?mode=upsert&dry_run=true&deactivate_missing=true",
+            headers=headers,
+            files={
+                "file": (
+                    "products.xlsx",
+                    content,
+                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                )
+            },
+        )
+        assert resp.status_code == 200
+        report = resp.json()["data"]
+        assert [e["row"] for e in report["errors"]] == [2]
+        assert report["created_skus"] == [new_sku]
+        assert existing["sku_code"] not in report["deactivated_skus"]
+
 
 class TestCustomerExport:
     @pytest.mark.asyncio
@@ -141,3 +141,46 @@ class TestFulfillment:
         headers = get_auth_headers(admin_user)
         resp = await client.get(f"/api/v1/sales-orders/{uuid.uuid4()}/fulfillment", headers=headers)
         assert resp.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_get_fulfillment_batch(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        cust_resp = await client.post(
+            "/api/v1/customers", headers=headers, json=make_customer_data()
+        )
+        customer_id = cust_resp.json()["data"]["id"]
+        prod_resp = await client.post("/api/v1/products", headers=headers, json=make_product_data())
+        product_id = prod_resp.json()["data"]["id"]
+        sup_resp = await client.post(
+            "/api/v1/suppliers", headers=headers, json=make_supplier_data()
+        )
+        supplier_id = sup_resp.json()["data"]["id"]
+
+        so_ids = []
+        for _ in range(2):
+            so_data = make_sales_order_data(customer_id, product_id)
+            so_resp = await client.post("/api/v1/sales-orders", headers=headers, json=so_data)
+            so_ids.append(so_resp.json()["data"]["id"])
+        po_data = make_purchase_order_data(supplier_id, product_id, sales_order_ids=[so_ids[1]])
+        po_resp = await client.post("/api/v1/purchase-orders", headers=headers, json=po_data)
+        po_id = po_resp.json()["data"]["id"]
+
+        # Unknown ids are skipped, the rest keep the requested order
+        ids = [so_ids[1], str(uuid.uuid4()), so_ids[0]]
+        resp = await client.get(
+            "/api/v1/sales-orders/fulfillment", params={"ids": ids}, headers=headers
+        )
+        assert resp.status_code == 200
+        data = resp.json()["data"]
+        assert [d["sales_order_id"] for d in data] == [so_ids[1], so_ids[0]]
+        assert [po["id"] for po in data[0]["purchase_orders"]] == [po_id]
+        assert data[1]["purchase_orders"] == []
+
+    @pytest.mark.asyncio
+    async def test_get_fulfillment_batch_limit(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        ids = [str(uuid.uuid4()) for _ in range(101)]
+        resp = await client.get(
+            "/api/v1/sales-orders/fulfillment", params={"ids": ids}, headers=headers
+        )
+        assert resp.status_code == 422
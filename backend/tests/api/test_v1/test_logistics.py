@@ -3,6 +3,7 @@ from datetime import date
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.enums import (
     CurrencyType,
@@ -11,7 +12,7 @@ from app.models.enums import (
     UnitType,
 )
 from app.models.user import User
-from tests.conftest import get_auth_headers
+from tests.conftest import get_auth_headers, measure, reads, writes
 from tests.factories import (
     make_container_plan_data,
     make_customer_data,
@@ -25,8 +26,8 @@ from tests.factories import (
 
 
 @pytest.fixture
-async def seed_loaded_plan(client: AsyncClient, admin_user: User) -> dict:
-    """Create a loaded container plan (full chain: SO→PO→RCV→goods_ready→plan→confirm→stuffing→loaded)."""
+async def seed_planning_plan(client: AsyncClient, admin_user: User) -> dict:
+    """Create a container plan still in planning with one batch item (SO→PO→RCV→plan→item)."""
     headers = get_auth_headers(admin_user)
 
     # Create entities
@@ -99,8 +100,17 @@ async def seed_loaded_plan(client: AsyncClient, admin_user: User) -> dict:
         "volume_cbm": "3.0",
         "weight_kg": "1000.0",
     }
-    await client.post(f"/api/v1/containers/{plan_id}/items", json=item_data, headers=headers)
+    item_resp = await client.post(
+        f"/api/v1/containers/{plan_id}/items", json=item_data, headers=headers
+    )
+    return {"plan_id": plan_id, "so_id": so_id, "item_id": item_resp.json()["data"]["id"]}
+
 
+@pytest.fixture
+async def seed_loaded_plan(client: AsyncClient, admin_user: User, seed_planning_plan: dict) -> dict:
+    """Create a loaded container plan (full chain: SO→PO→RCV→goods_ready→plan→confirm→stuffing→loaded)."""
+    headers = get_auth_headers(admin_user)
+    plan_id = seed_planning_plan["plan_id"]
     await client.post(f"/api/v1/containers/{plan_id}/confirm", headers=headers)
 
     stuffing_data = {
@@ -111,7 +121,7 @@ async def seed_loaded_plan(client: AsyncClient, admin_user: User) -> dict:
     }
     await client.post(f"/api/v1/containers/{plan_id}/stuffing", json=stuffing_data, headers=headers)
 
-    return {"plan_id": plan_id, "so_id": so_id}
+    return seed_planning_plan
 
 
 class TestCreateLogisticsRecord:
@@ -304,3 +314,119 @@ class TestLogisticsKanban:
         resp = await client.get("/api/v1/logistics/kanban", headers=headers)
         assert resp.status_code == 200
         assert "items" in resp.json()["data"]
+
+
+class TestLandedCost:
+    async def test_allocate_and_margin(
+        self, client: AsyncClient, admin_user: User, seed_loaded_plan: dict
+    ):
+        headers = get_auth_headers(admin_user)
+        data = make_logistics_record_data(seed_loaded_plan["plan_id"])
+        create_resp = await client.post("/api/v1/logistics", json=data, headers=headers)
+        record_id = create_resp.json()["data"]["id"]
+        for amount, currency in (("5000.00", "USD"), ("700.00", "RMB")):
+            cost_data = {
+                "cost_type": LogisticsCostType.OCEAN_FREIGHT.value,
+                "amount": amount,
+                "currency": currency,
+            }
+            await client.post(
+                f"/api/v1/logistics/{record_id}/costs", json=cost_data, headers=headers
+            )
+
+        resp = await client.post(
+            f"/api/v1/logistics/{record_id}/allocations",
+            json={"method": "weight"},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        allocation = resp.json()["data"]
+        assert allocation["method"] == "weight"
+        assert sorted((a["currency"], a["amount"]) for a in allocation["items"]) == [
+            ("RMB", "700.00"),
+            ("USD", "5000.00"),
+        ]
+
+        # Changing the costs re-runs the allocation
+        cost_data = {"cost_type": "customs_fee", "amount": "100.00", "currency": "USD"}
+        await client.post(f"/api/v1/logistics/{record_id}/costs", json=cost_data, headers=headers)
+        resp = await client.get(f"/api/v1/logistics/{record_id}/allocations", headers=headers)
+        amounts = {a["currency"]: a["amount"] for a in resp.json()["data"]["items"]}
+        assert amounts == {"RMB": "700.00", "USD": "5100.00"}
+
+        rates = b"date,currency,rate\n2000-01-01,RMB,0.14\n"
+        await client.post(
+            "/api/v1/statistics/fx-rates/import",
+            files={"file": ("rates.csv", rates, "text/csv")},
+            headers=headers,
+        )
+        resp = await client.get("/api/v1/statistics/margin", headers=headers)
+        item = next(
+            i for i in resp.json()["data"]["items"] if i["group_key"] == seed_loaded_plan["so_id"]
+        )
+        # 2550 revenue; 2000 RMB purchase = 280; freight 5100 + 700 RMB = 5198
+        assert item["purchase_cost"] == "280.00"
+        assert item["freight"] == "5198.00"
+        assert item["margin"] == "-2928.00"
+
+    async def test_stale_allocation_does_not_block_edits(
+        self, client: AsyncClient, admin_user: User, seed_planning_plan: dict
+    ):
+        headers = get_auth_headers(admin_user)
+        plan_id = seed_planning_plan["plan_id"]
+        item_url = f"/api/v1/containers/{plan_id}/items/{seed_planning_plan['item_id']}"
+        data = make_logistics_record_data(plan_id)
+        create_resp = await client.post("/api/v1/logistics", json=data, headers=headers)
+        record_id = create_resp.json()["data"]["id"]
+        costs_url = f"/api/v1/logistics/{record_id}/costs"
+        allocations_url = f"/api/v1/logistics/{record_id}/allocations"
+        cost_data = {"cost_type": "ocean_freight", "amount": "1000.00", "currency": "USD"}
+        await client.post(costs_url, json=cost_data, headers=headers)
+        resp = await client.post(allocations_url, json={"method": "weight"}, headers=headers)
+        assert resp.json()["data"]["stale"] is False
+
+        # A zero weight basis cannot be split: the item edit still succeeds
+        resp = await client.put(item_url, json={"weight_kg": "0"}, headers=headers)
+        assert resp.status_code == 200
+        resp = await client.get(allocations_url, headers=headers)
+        allocation = resp.json()["data"]
+        assert allocation["stale"] is True
+        assert [a["amount"] for a in allocation["items"]] == ["1000.00"]
+
+        # ... and so does recording another cost
+        cost_data = {"cost_type": "customs_fee", "amount": "50.00", "currency": "USD"}
+        resp = await client.post(costs_url, json=cost_data, headers=headers)
+        assert resp.status_code == 201
+        assert (await client.get(allocations_url, headers=headers)).json()["data"]["stale"]
+
+        # Once the plan item can be split again the allocation catches up
+        resp = await client.put(item_url, json={"weight_kg": "800"}, headers=headers)
+        assert resp.status_code == 200
+        allocation = (await client.get(allocations_url, headers=headers)).json()["data"]
+        assert allocation["stale"] is False
+        assert [a["amount"] for a in allocation["items"]] == ["1050.00"]
+
+
+class TestMutationQueryCount:
+    async def test_update(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        sql_log: list[str],
+        admin_user: User,
+        seed_loaded_plan: dict,
+    ):
+        """Updating a record reads it once, as a GET does, and writes it once."""
+        headers = get_auth_headers(admin_user)
+        data = make_logistics_record_data(seed_loaded_plan["plan_id"])
+        create_resp = await client.post("/api/v1/logistics", json=data, headers=headers)
+        url = f"/api/v1/logistics/{create_resp.json()['data']['id']}"
+        _, get_sql = await measure(client, db_session, sql_log, "GET", url, headers=headers)
+
+        resp, sql = await measure(
+            client, db_session, sql_log, "PUT", url, json={"bl_no": "BL-001"}, headers=headers
+        )
+        assert resp.status_code == 200
+        assert resp.json()["data"]["bl_no"] == "BL-001"
+        assert len(reads(sql)) == len(reads(get_sql))
+        assert len(writes(sql, "logistics_records")) == 1
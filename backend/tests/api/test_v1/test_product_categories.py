@@ -0,0 +1,42 @@
+from httpx import AsyncClient
+
+from app.models.user import User
+from tests.conftest import get_auth_headers
+from tests.factories import CATEGORY_ID_CANDY, make_product_data
+
+
+async def _create_category(client: AsyncClient, headers: dict, name: str, parent_id) -> str:
+    resp = await client.post(
+        "/api/v1/product-categories",
+        json={"name": name, "parent_id": str(parent_id)},
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    return resp.json()["data"]["id"]
+
+
+class TestDeleteCategory:
+    async def test_delete_blocked_by_descendant_products(
+        self, client: AsyncClient, admin_user: User
+    ):
+        headers = get_auth_headers(admin_user)
+        level2 = await _create_category(client, headers, "夹心糖", CATEGORY_ID_CANDY)
+        level3 = await _create_category(client, headers, "夹心硬糖", level2)
+        await client.post(
+            "/api/v1/products", json=make_product_data(category_id=level3), headers=headers
+        )
+
+        resp = await client.delete(f"/api/v1/product-categories/{level2}", headers=headers)
+        assert resp.status_code == 422
+        assert resp.json()["code"] == 42202
+
+    async def test_delete_empty_subtree(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        level2 = await _create_category(client, headers, "软糖类", CATEGORY_ID_CANDY)
+        await _create_category(client, headers, "橡皮糖", level2)
+
+        resp = await client.delete(f"/api/v1/product-categories/{level2}", headers=headers)
+        assert resp.status_code == 200
+        resp = await client.get("/api/v1/product-categories/tree", headers=headers)
+        candy = next(n for n in resp.json()["data"] if n["id"] == str(CATEGORY_ID_CANDY))
+        assert candy["children"] == []
@@ -1,8 +1,11 @@
 from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
+from app.repositories.product_repo import keyword_grams
 from tests.conftest import get_auth_headers
-from tests.factories import make_product_data
+from tests.factories import CATEGORY_ID_CANDY, make_product_data
 
 
 class TestCreateProduct:
@@ -49,12 +52,163 @@ class TestListProducts:
         assert body["data"]["total"] >= 1
         assert len(body["data"]["items"]) >= 1
 
+    async def test_list_products_by_parent_category(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        level2 = await client.post(
+            "/api/v1/product-categories",
+            json={"name": "硬糖类", "parent_id": str(CATEGORY_ID_CANDY)},
+            headers=headers,
+        )
+        level3 = await client.post(
+            "/api/v1/product-categories",
+            json={"name": "水果硬糖", "parent_id": level2.json()["data"]["id"]},
+            headers=headers,
+        )
+        data = make_product_data(category_id=level3.json()["data"]["id"])
+        await client.post("/api/v1/products", json=data, headers=headers)
+
+        resp = await client.get(
+            f"/api/v1/products?category_id={CATEGORY_ID_CANDY}", headers=headers
+        )
+        items = resp.json()["data"]["items"]
+        assert [item["sku_code"] for item in items] == [data["sku_code"]]
+        assert items[0]["category_level1_name"] == "糖果"
+        assert items[0]["category_level2_name"] == "硬糖类"
+        assert items[0]["category_level3_name"] == "水果硬糖"
+
     async def test_list_products_with_keyword(self, client: AsyncClient, admin_user: User):
         headers = get_auth_headers(admin_user)
         resp = await client.get("/api/v1/products?keyword=nonexistent_xxx", headers=headers)
         assert resp.status_code == 200
         assert resp.json()["data"]["total"] == 0
 
+    async def test_list_products_sparse_fields(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        data = make_product_data(category_id=str(CATEGORY_ID_CANDY))
+        await client.post("/api/v1/products", json=data, headers=headers)
+
+        resp = await client.get(
+            f"/api/v1/products?keyword={data['sku_code']}"
+            "&fields=sku_code,name_cn,unit_volume_cbm,category_level1_name",
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        item = resp.json()["data"]["items"][0]
+        assert set(item) == {"id", "sku_code", "name_cn", "unit_volume_cbm", "category_level1_name"}
+        assert item["sku_code"] == data["sku_code"]
+        assert item["category_level1_name"] == "糖果"
+
+        # category_id is only dropped when it was fetched for the name lookup
+        resp = await client.get(
+            f"/api/v1/products?keyword={data['sku_code']}"
+            "&fields=sku_code,category_id,category_level1_name",
+            headers=headers,
+        )
+        item = resp.json()["data"]["items"][0]
+        assert set(item) == {"id", "sku_code", "category_id", "category_level1_name"}
+        assert item["category_id"] == str(CATEGORY_ID_CANDY)
+
+    async def test_list_products_unknown_field(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        resp = await client.get("/api/v1/products?fields=sku_code,category", headers=headers)
+        assert resp.status_code == 422
+        assert resp.json()["detail"]["fields"] == ["category"]
+
+
+class TestSearchProducts:
+    async def test_search_ranked_with_highlights(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        await client.post(
+            "/api/v1/products",
+            json=make_product_data(name_cn="番茄味薯片", name_en="Tomato Chips"),
+            headers=headers,
+        )
+        await client.post(
+            "/api/v1/products",
+            json=make_product_data(name_cn="薯片", name_en="Chips"),
+            headers=headers,
+        )
+        await client.post(
+            "/api/v1/products",
+            json=make_product_data(name_cn="牛肉干", name_en="Beef Jerky"),
+            headers=headers,
+        )
+
+        resp = await client.get("/api/v1/products/search?q=薯片", headers=headers)
+        assert resp.status_code == 200
+        data = resp.json()["data"]
+        assert data["total"] == 2
+        # The exact name ranks above the longer one
+        assert [item["name_cn"] for item in data["items"]] == ["薯片", "番茄味薯片"]
+        assert data["items"][1]["highlights"]["name_cn"] == "番茄味<mark>薯片</mark>"
+        assert data["items"][0]["category_level1_name"] == "糖果"
+
+    async def test_search_single_cjk_character(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        for name_cn in ("番茄味薯片", "薯条", "牛肉干"):
+            await client.post(
+                "/api/v1/products", json=make_product_data(name_cn=name_cn), headers=headers
+            )
+
+        resp = await client.get("/api/v1/products/search?q=薯", headers=headers)
+        assert resp.status_code == 200
+        names = {item["name_cn"] for item in resp.json()["data"]["items"]}
+        assert names == {"番茄味薯片", "薯条"}
+
+    async def test_short_cjk_query_uses_gram_index(self, db_session: AsyncSession):
+        # pg_trgm extracts no trigram from a two-character query; the gram index does
+        grams = (
+            await db_session.execute(text("SELECT product_search_grams('番茄味薯片')"))
+        ).scalar()
+        assert {"薯", "薯片", "番茄"} <= set(grams)
+
+        await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = await db_session.execute(
+            text(
+                "EXPLAIN SELECT id FROM products WHERE product_search_grams("
+                "sku_code, name_cn, name_en, brand) @> CAST(:grams AS text[])"
+            ),
+            {"grams": keyword_grams("薯片")},
+        )
+        assert "idx_products_search_grams" in "\n".join(plan.scalars())
+
+    async def test_search_escapes_wildcards(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        await client.post("/api/v1/products", json=make_product_data(), headers=headers)
+        resp = await client.get("/api/v1/products/search?q=%25", headers=headers)
+        assert resp.status_code == 200
+        assert resp.json()["data"]["total"] == 0
+
+
+class TestSuggestProducts:
+    async def test_suggest_returns_compact_matches(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        data = make_product_data(name_cn="海苔卷心酥")
+        await client.post("/api/v1/products", json=data, headers=headers)
+
+        resp = await client.get("/api/v1/products/suggest?q=海苔卷", headers=headers)
+        assert resp.status_code == 200
+        items = resp.json()["data"]
+        assert items[0] == {
+            "id": items[0]["id"],
+            "code": data["sku_code"],
+            "name": "海苔卷心酥",
+        }
+
+        resp = await client.get(
+            f"/api/v1/products/suggest?q={data['sku_code'][:6].lower()}", headers=headers
+        )
+        assert data["sku_code"] in [item["code"] for item in resp.json()["data"]]
+
+    async def test_suggest_short_keyword(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        data = make_product_data(name_cn="榴莲糯米糍")
+        await client.post("/api/v1/products", json=data, headers=headers)
+
+        for q in ("榴莲", "糍"):
+            resp = await client.get(f"/api/v1/products/suggest?q={q}", headers=headers)
+            assert data["sku_code"] in [item["code"] for item in resp.json()["data"]]
+
 
 class TestGetProduct:
     async def test_get_product(self, client: AsyncClient, admin_user: User):
@@ -1,8 +1,35 @@
+import asyncio
+import uuid
+from datetime import date
+
 import pytest
 from httpx import AsyncClient
-
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.security import hash_password
+from app.models.customer import Customer
+from app.models.enums import UserRole
+from app.models.fact import fact_purchase_daily, fact_sales_daily, fact_sales_product_daily
+from app.models.product import Product
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem, purchase_order_sales_orders
+from app.models.sales_order import SalesOrder, SalesOrderItem
+from app.models.sequence import BusinessSequence
+from app.models.supplier import Supplier
 from app.models.user import User
-from tests.conftest import get_auth_headers
+from app.schemas.customer import CustomerCreate
+from app.schemas.product import ProductCreate
+from app.schemas.purchase_order import MrpRunRequest, PurchaseOrderCreate
+from app.schemas.sales_order import SalesOrderCreate
+from app.schemas.supplier import SupplierCreate
+from app.services.customer_service import CustomerService
+from app.services.mrp_service import MrpService
+from app.services.product_service import ProductService
+from app.services.purchase_order_service import PurchaseOrderService
+from app.services.sales_order_service import SalesOrderService
+from app.services.sequence_service import SequenceService
+from app.services.supplier_service import SupplierService
+from tests.conftest import TEST_DATABASE_URL, get_auth_headers, measure, reads, writes
 from tests.factories import (
     make_customer_data,
     make_product_data,
@@ -131,6 +158,35 @@ class TestCreatePurchaseOrder:
         assert resp.status_code == 422
         assert resp.json()["code"] == 42230
 
+    async def test_create_r02_lines_summed(
+        self,
+        client: AsyncClient,
+        admin_user: User,
+        seed_supplier: str,
+        seed_product: str,
+        seed_sales_order: dict,
+    ):
+        """R02: lines on the same SO item count together against its demand."""
+        headers = get_auth_headers(admin_user)
+        so_item_id = seed_sales_order["items"][0]["id"]
+        line = {
+            "product_id": seed_product,
+            "quantity": 60,
+            "unit": "carton",
+            "unit_price": "20.00",
+            "sales_order_item_id": so_item_id,
+        }
+        data = make_purchase_order_data(seed_supplier, seed_product, items=[line, line])
+        resp = await client.post("/api/v1/purchase-orders", json=data, headers=headers)
+        assert resp.status_code == 422
+        assert resp.json()["code"] == 42230
+        assert resp.json()["detail"]["requested"] == 120
+
+        so_resp = await client.get(
+            f"/api/v1/sales-orders/{seed_sales_order['id']}", headers=headers
+        )
+        assert so_resp.json()["data"]["items"][0]["purchased_quantity"] == 0
+
     async def test_create_no_auth(self, client: AsyncClient, seed_supplier: str, seed_product: str):
         data = make_purchase_order_data(seed_supplier, seed_product)
         resp = await client.post("/api/v1/purchase-orders", json=data)
@@ -233,6 +289,50 @@ class TestUpdatePurchaseOrder:
         )
         assert resp.status_code == 422
 
+    async def test_update_r02_releases_own_demand(
+        self,
+        client: AsyncClient,
+        admin_user: User,
+        seed_supplier: str,
+        seed_product: str,
+        seed_sales_order: dict,
+    ):
+        """R02: an edit may re-use the demand the order already holds."""
+        headers = get_auth_headers(admin_user)
+        so_item_id = seed_sales_order["items"][0]["id"]
+        line = {
+            "product_id": seed_product,
+            "quantity": 100,
+            "unit": "carton",
+            "unit_price": "20.00",
+            "sales_order_item_id": so_item_id,
+        }
+        create_resp = await client.post(
+            "/api/v1/purchase-orders",
+            json=make_purchase_order_data(seed_supplier, seed_product, items=[line]),
+            headers=headers,
+        )
+        po_id = create_resp.json()["data"]["id"]
+
+        resp = await client.put(
+            f"/api/v1/purchase-orders/{po_id}",
+            json={"items": [{**line, "quantity": 70}, {**line, "quantity": 30}]},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        assert len(resp.json()["data"]["items"]) == 2
+
+        resp = await client.put(
+            f"/api/v1/purchase-orders/{po_id}",
+            json={"items": [{**line, "quantity": 40}]},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        so_resp = await client.get(
+            f"/api/v1/sales-orders/{seed_sales_order['id']}", headers=headers
+        )
+        assert so_resp.json()["data"]["items"][0]["purchased_quantity"] == 40
+
 
 class TestConfirmPurchaseOrder:
     async def test_confirm(
@@ -265,6 +365,33 @@ class TestConfirmPurchaseOrder:
         resp = await client.post(f"/api/v1/purchase-orders/{po_id}/confirm", headers=headers)
         assert resp.status_code == 422
 
+    async def test_bulk_confirm(
+        self, client: AsyncClient, admin_user: User, seed_supplier: str, seed_product: str
+    ):
+        headers = get_auth_headers(admin_user)
+        po_ids = []
+        for _ in range(3):
+            create_resp = await client.post(
+                "/api/v1/purchase-orders",
+                json=make_purchase_order_data(seed_supplier, seed_product),
+                headers=headers,
+            )
+            po_ids.append(create_resp.json()["data"]["id"])
+        await client.post(f"/api/v1/purchase-orders/{po_ids[2]}/confirm", headers=headers)
+
+        resp = await client.post(
+            "/api/v1/purchase-orders/confirm", json={"ids": po_ids}, headers=headers
+        )
+        assert resp.status_code == 200
+        data = resp.json()["data"]
+        assert data["updated"] == 2
+        assert [item["success"] for item in data["items"]] == [True, True, False]
+        assert data["items"][2]["previous_status"] == "ordered"
+
+        for po_id in po_ids:
+            detail = await client.get(f"/api/v1/purchase-orders/{po_id}", headers=headers)
+            assert detail.json()["data"]["status"] == "ordered"
+
 
 class TestCancelPurchaseOrder:
     async def test_cancel_draft(
@@ -383,3 +510,310 @@ class TestLinkSalesOrders:
         )
         assert resp.status_code == 200
         assert seed_sales_order["id"] in resp.json()["data"]["linked_sales_order_ids"]
+
+
+class TestMrpRun:
+    async def test_consolidates_purchasing_orders(
+        self,
+        client: AsyncClient,
+        admin_user: User,
+        seed_supplier: str,
+        seed_customer: str,
+    ):
+        headers = get_auth_headers(admin_user)
+        product = await client.post(
+            "/api/v1/products",
+            json=make_product_data(
+                default_supplier_id=seed_supplier, default_purchase_price="12.00"
+            ),
+            headers=headers,
+        )
+        product_id = product.json()["data"]["id"]
+        so_ids = []
+        for _ in range(2):
+            so = await client.post(
+                "/api/v1/sales-orders",
+                json=make_sales_order_data(seed_customer, product_id),
+                headers=headers,
+            )
+            so_id = so.json()["data"]["id"]
+            await client.post(f"/api/v1/sales-orders/{so_id}/confirm", headers=headers)
+            so_ids.append(so_id)
+
+        dry = await client.post(
+            "/api/v1/purchase-orders/mrp-run", json={"dry_run": True}, headers=headers
+        )
+        assert dry.status_code == 200
+        (planned,) = dry.json()["data"]["purchase_orders"]
+        assert planned["id"] is None
+        assert planned["item_count"] == 2
+
+        resp = await client.post("/api/v1/purchase-orders/mrp-run", json={}, headers=headers)
+        assert resp.status_code == 200
+        (po,) = resp.json()["data"]["purchase_orders"]
+        assert po["supplier_id"] == seed_supplier
+        assert sorted(po["sales_order_ids"]) == sorted(so_ids)
+        assert po["total_quantity"] == 200
+        assert po["total_amount"] == "2400.00"
+
+        detail = await client.get(f"/api/v1/purchase-orders/{po['id']}", headers=headers)
+        data = detail.json()["data"]
+        assert data["order_no"] == po["order_no"]
+        assert len(data["items"]) == 2
+        assert all(item["sales_order_item_id"] for item in data["items"])
+        assert sorted(data["linked_sales_order_ids"]) == sorted(so_ids)
+
+        # Demand is now fully purchased: a second run creates nothing
+        again = await client.post("/api/v1/purchase-orders/mrp-run", json={}, headers=headers)
+        assert again.json()["data"]["purchase_orders"] == []
+
+    async def test_prices_from_supplier_price_lists(
+        self,
+        client: AsyncClient,
+        admin_user: User,
+        seed_supplier: str,
+        seed_customer: str,
+    ):
+        headers = get_auth_headers(admin_user)
+        product = await client.post(
+            "/api/v1/products",
+            json=make_product_data(
+                default_supplier_id=seed_supplier, default_purchase_price="12.00"
+            ),
+            headers=headers,
+        )
+        product_id = product.json()["data"]["id"]
+        cheaper = await client.post("/api/v1/suppliers", json=make_supplier_data(), headers=headers)
+        cheaper_id = cheaper.json()["data"]["id"]
+        # The volume tier only applies once both orders' demand (2 x 100) is combined
+        await client.put(
+            f"/api/v1/suppliers/{cheaper_id}/prices",
+            json={
+                "items": [
+                    {"product_id": product_id, "unit_price": "12.50"},
+                    {"product_id": product_id, "min_quantity": 150, "unit_price": "11.00"},
+                ]
+            },
+            headers=headers,
+        )
+        for _ in range(2):
+            so = await client.post(
+                "/api/v1/sales-orders",
+                json=make_sales_order_data(seed_customer, product_id),
+                headers=headers,
+            )
+            await client.post(
+                f"/api/v1/sales-orders/{so.json()['data']['id']}/confirm", headers=headers
+            )
+
+        resp = await client.post(
+            "/api/v1/purchase-orders/mrp-run", json={"dry_run": True}, headers=headers
+        )
+        (po,) = resp.json()["data"]["purchase_orders"]
+        assert po["supplier_id"] == cheaper_id
+        assert po["total_amount"] == "2200.00"
+
+    async def test_skips_products_without_supplier(
+        self, client: AsyncClient, admin_user: User, seed_sales_order: dict
+    ):
+        headers = get_auth_headers(admin_user)
+        resp = await client.post(
+            "/api/v1/purchase-orders/mrp-run",
+            json={"sales_order_ids": [seed_sales_order["id"]]},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        data = resp.json()["data"]
+        assert data["purchase_orders"] == []
+        assert len(data["unassigned_item_ids"]) == 1
+
+
+class TestMutationQueryCount:
+    """A mutation reads the order once, as a GET does, and writes it once."""
+
+    async def test_confirm_and_cancel(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        sql_log: list[str],
+        admin_user: User,
+        seed_supplier: str,
+        seed_product: str,
+    ):
+        headers = get_auth_headers(admin_user)
+        create_resp = await client.post(
+            "/api/v1/purchase-orders",
+            json=make_purchase_order_data(seed_supplier, seed_product),
+            headers=headers,
+        )
+        url = f"/api/v1/purchase-orders/{create_resp.json()['data']['id']}"
+        _, get_sql = await measure(client, db_session, sql_log, "GET", url, headers=headers)
+
+        for action, status in (("confirm", "ordered"), ("cancel", "cancelled")):
+            resp, sql = await measure(
+                client, db_session, sql_log, "POST", f"{url}/{action}", headers=headers
+            )
+            assert resp.status_code == 200
+            assert resp.json()["data"]["status"] == status
+            assert len(reads(sql)) == len(reads(get_sql))
+            assert len(writes(sql, "purchase_orders")) == 1
+
+    async def test_create_locks_demand_once(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        sql_log: list[str],
+        admin_user: User,
+        seed_supplier: str,
+        seed_product: str,
+        seed_sales_order: dict,
+    ):
+        headers = get_auth_headers(admin_user)
+        line = {
+            "product_id": seed_product,
+            "quantity": 30,
+            "unit": "carton",
+            "unit_price": "20.00",
+            "sales_order_item_id": seed_sales_order["items"][0]["id"],
+        }
+        data = make_purchase_order_data(seed_supplier, seed_product, items=[line, line, line])
+        resp, sql = await measure(
+            client,
+            db_session,
+            sql_log,
+            "POST",
+            "/api/v1/purchase-orders",
+            json=data,
+            headers=headers,
+        )
+        assert resp.status_code == 201
+        locks = [s for s in reads(sql) if "sales_order_items" in s and "FOR UPDATE" in s]
+        assert len(locks) == 1
+        # Demand is locked before the order number, as an MRP run does
+        (allocate,) = writes(sql, "business_sequences")
+        assert sql.index(locks[0]) < sql.index(allocate)
+        assert len(writes(sql, "sales_order_items")) == 1
+
+        so_resp = await client.get(
+            f"/api/v1/sales-orders/{seed_sales_order['id']}", headers=headers
+        )
+        assert so_resp.json()["data"]["items"][0]["purchased_quantity"] == 90
+
+
+class TestConcurrentDemand:
+    """Writers on separate connections, with committed data, so row locks really contend."""
+
+    async def test_create_and_mrp_run_do_not_deadlock(self, db_session: AsyncSession):
+        engine = create_async_engine(TEST_DATABASE_URL)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        day = date(2099, 1, 1)
+        async with factory() as db:
+            user = User(
+                username=f"mrp_{uuid.uuid4().hex[:8]}",
+                password_hash=hash_password("testpass123"),
+                display_name="MRP",
+                role=UserRole.SUPER_ADMIN,
+                is_active=True,
+            )
+            db.add(user)
+            await db.flush()
+            supplier = await SupplierService(db).create(
+                SupplierCreate(**make_supplier_data()), user.id
+            )
+            product = await ProductService(db).create(
+                ProductCreate(
+                    **make_product_data(
+                        default_supplier_id=str(supplier.id), default_purchase_price="12.00"
+                    )
+                ),
+                user.id,
+            )
+            customer = await CustomerService(db).create(
+                CustomerCreate(**make_customer_data()), user.id
+            )
+            so = await SalesOrderService(db).create(
+                SalesOrderCreate(
+                    **make_sales_order_data(
+                        str(customer.id), str(product.id), order_date=day.isoformat()
+                    )
+                ),
+                user.id,
+            )
+            so_item_id = so.items[0].id
+            await db.commit()
+
+        try:
+            po_data = PurchaseOrderCreate(
+                **make_purchase_order_data(
+                    str(supplier.id),
+                    str(product.id),
+                    order_date=day.isoformat(),
+                    items=[
+                        {
+                            "product_id": str(product.id),
+                            "quantity": 30,
+                            "unit": "carton",
+                            "unit_price": "20.00",
+                            "sales_order_item_id": str(so_item_id),
+                        }
+                    ],
+                )
+            )
+            async with factory() as blocker, factory() as first, factory() as second:
+                # Hold the day's PO counter so both writers are mid-flight at once
+                await SequenceService(blocker).order_no("PO", day)
+                create = asyncio.create_task(PurchaseOrderService(first).create(po_data, user.id))
+                await asyncio.sleep(0.3)
+                run = asyncio.create_task(
+                    MrpService(second).run(
+                        MrpRunRequest(sales_order_ids=[so.id], order_date=day), user.id
+                    )
+                )
+                await asyncio.sleep(0.3)
+                await blocker.rollback()
+
+                po = await asyncio.wait_for(create, 5)
+                await first.commit()
+                result = await asyncio.wait_for(run, 5)
+                await second.commit()
+
+            assert po.order_no == "PO-20990101-001"
+            # The run waited for the create and bought only the remaining demand
+            (planned,) = result.purchase_orders
+            assert planned.order_no == "PO-20990101-002"
+            assert planned.total_quantity == 70
+        finally:
+            async with engine.begin() as conn:
+                po_ids = select(PurchaseOrder.id).where(PurchaseOrder.supplier_id == supplier.id)
+                await conn.execute(
+                    delete(PurchaseOrderItem).where(PurchaseOrderItem.purchase_order_id.in_(po_ids))
+                )
+                await conn.execute(
+                    delete(purchase_order_sales_orders).where(
+                        purchase_order_sales_orders.c.purchase_order_id.in_(po_ids)
+                    )
+                )
+                await conn.execute(
+                    delete(PurchaseOrder).where(PurchaseOrder.supplier_id == supplier.id)
+                )
+                await conn.execute(
+                    delete(SalesOrderItem).where(SalesOrderItem.sales_order_id == so.id)
+                )
+                await conn.execute(delete(SalesOrder).where(SalesOrder.id == so.id))
+                for fact in (fact_sales_daily, fact_sales_product_daily):
+                    await conn.execute(delete(fact).where(fact.c.customer_id == customer.id))
+                await conn.execute(
+                    delete(fact_purchase_daily).where(
+                        fact_purchase_daily.c.supplier_id == supplier.id
+                    )
+                )
+                await conn.execute(delete(Product).where(Product.id == product.id))
+                await conn.execute(delete(Customer).where(Customer.id == customer.id))
+                await conn.execute(delete(Supplier).where(Supplier.id == supplier.id))
+                await conn.execute(delete(User).where(User.id == user.id))
+                await conn.execute(
+                    delete(BusinessSequence).where(
+                        BusinessSequence.period == day.strftime("%Y%m%d")
+                    )
+                )
+            await engine.dispose()
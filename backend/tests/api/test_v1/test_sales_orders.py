@@ -1,10 +1,16 @@
+import asyncio
 import uuid
+from datetime import date
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from app.models.sequence import BusinessSequence
 from app.models.user import User
-from tests.conftest import get_auth_headers
+from app.services.sequence_service import SequenceService
+from tests.conftest import TEST_DATABASE_URL, get_auth_headers, measure, reads, writes
 from tests.factories import make_customer_data, make_product_data, make_sales_order_data
 
 
@@ -153,6 +159,26 @@ class TestListSalesOrders:
         for item in resp.json()["data"]["items"]:
             assert item["customer_id"] == seed_customer
 
+    async def test_list_sparse_fields(
+        self, client: AsyncClient, admin_user: User, seed_customer: str, seed_product: str
+    ):
+        headers = get_auth_headers(admin_user)
+        await client.post(
+            "/api/v1/sales-orders",
+            json=make_sales_order_data(seed_customer, seed_product),
+            headers=headers,
+        )
+        resp = await client.get(
+            "/api/v1/sales-orders?fields=order_no,status,total_amount", headers=headers
+        )
+        assert resp.status_code == 200
+        items = resp.json()["data"]["items"]
+        assert len(items) >= 1
+        assert set(items[0]) == {"id", "order_no", "status", "total_amount"}
+        # Computed progress fields are not projectable
+        resp = await client.get("/api/v1/sales-orders?fields=purchase_progress", headers=headers)
+        assert resp.status_code == 422
+
 
 class TestGetSalesOrder:
     async def test_get_with_items(
@@ -371,3 +397,288 @@ class TestStatusUpdate:
             headers=viewer_headers,
         )
         assert resp.status_code == 403
+
+
+class TestBulkStatusUpdate:
+    async def test_bulk_status_change(
+        self, client: AsyncClient, admin_user: User, seed_customer: str, seed_product: str
+    ):
+        headers = get_auth_headers(admin_user)
+        order_ids = []
+        for _ in range(3):
+            create_resp = await client.post(
+                "/api/v1/sales-orders",
+                json=make_sales_order_data(seed_customer, seed_product),
+                headers=headers,
+            )
+            order_ids.append(create_resp.json()["data"]["id"])
+        for order_id in order_ids[:2]:
+            await client.post(f"/api/v1/sales-orders/{order_id}/confirm", headers=headers)
+        missing_id = str(uuid.uuid4())
+
+        resp = await client.patch(
+            "/api/v1/sales-orders/status",
+            json={"ids": [*order_ids, missing_id], "status": "goods_ready"},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        data = resp.json()["data"]
+        assert data["updated"] == 2
+        outcomes = {item["id"]: item for item in data["items"]}
+        for order_id in order_ids[:2]:
+            assert outcomes[order_id]["success"] is True
+            assert outcomes[order_id]["previous_status"] == "purchasing"
+        assert outcomes[order_ids[2]]["success"] is False
+        assert outcomes[order_ids[2]]["previous_status"] == "draft"
+        assert outcomes[missing_id]["success"] is False
+        assert outcomes[missing_id]["previous_status"] is None
+
+        for order_id, status in zip(order_ids, ["goods_ready", "goods_ready", "draft"]):
+            detail = await client.get(f"/api/v1/sales-orders/{order_id}", headers=headers)
+            assert detail.json()["data"]["status"] == status
+
+    async def test_non_admin_bulk_status_change_forbidden(
+        self, client: AsyncClient, viewer_user: User
+    ):
+        resp = await client.patch(
+            "/api/v1/sales-orders/status",
+            json={"ids": [str(uuid.uuid4())], "status": "purchasing"},
+            headers=get_auth_headers(viewer_user),
+        )
+        assert resp.status_code == 403
+
+    async def test_empty_ids_rejected(self, client: AsyncClient, admin_user: User):
+        resp = await client.patch(
+            "/api/v1/sales-orders/status",
+            json={"ids": [], "status": "purchasing"},
+            headers=get_auth_headers(admin_user),
+        )
+        assert resp.status_code == 422
+
+
+class TestImportSalesOrders:
+    @staticmethod
+    def _sheet(rows: list[list]) -> bytes:
+        from app.services.sales_order_import_service import IMPORT_HEADERS
+        from app.utils.excel import create_workbook
+
+        return create_workbook("orders", IMPORT_HEADERS, rows).getvalue()
+
+    async def _seed(self, client: AsyncClient, headers: dict) -> tuple[str, str]:
+        customer = await client.post(
+            "/api/v1/customers", json=make_customer_data(), headers=headers
+        )
+        product = await client.post("/api/v1/products", json=make_product_data(), headers=headers)
+        return customer.json()["data"]["customer_code"], product.json()["data"]["sku_code"]
+
+    async def test_import_groups_orders(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        customer_code, sku = await self._seed(client, headers)
+        # order, customer defaults for currency / payment method
+        head = [customer_code, "PO-A", "2026-02-27", None, "Bangkok", "FOB", None, None, None, None]
+        blank = [customer_code, "PO-A"] + [None] * 8
+        other = [customer_code, "PO-B", "2026-02-27", None, "Laem Chabang", "CIF"] + [None] * 4
+        content = self._sheet(
+            [
+                head + [sku, 100, "carton", 25.5],
+                blank + [sku, 20, "piece", "1.25"],
+                other + [sku, 10, "carton", 30],
+            ]
+        )
+        resp = await client.post(
+            "/api/v1/sales-orders/import",
+            files={"file": ("orders.xlsx", content)},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        data = resp.json()["data"]
+        assert data["created"] == 2
+        first, second = data["orders"]
+        assert first["order_ref"] == "PO-A"
+        assert first["item_count"] == 2
+        assert first["total_quantity"] == 120
+        assert first["total_amount"] == "2575.00"
+        assert first["currency"] == "USD"
+        assert first["order_no"].startswith("SO-20260227-")
+        assert second["order_no"] != first["order_no"]
+
+        order = await client.get(f"/api/v1/sales-orders/{first['id']}", headers=headers)
+        assert order.json()["data"]["destination_port"] == "Bangkok"
+        assert len(order.json()["data"]["items"]) == 2
+
+    async def test_import_rejects_whole_file(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        customer_code, sku = await self._seed(client, headers)
+        head = [customer_code, "PO-C", "2026-02-27", None, "Bangkok", "FOB"] + [None] * 4
+        content = self._sheet(
+            [
+                head + [sku, 100, "carton", 25.5],
+                head + ["NO-SUCH-SKU", 5, "carton", 1],
+                head + [sku, 0, "box", 1.234],
+            ]
+        )
+        resp = await client.post(
+            "/api/v1/sales-orders/import",
+            files={"file": ("orders.xlsx", content)},
+            headers=headers,
+        )
+        assert resp.status_code == 422
+        errors = resp.json()["detail"]["errors"]
+        assert [e["row"] for e in errors] == [3, 4]
+
+        listing = await client.get("/api/v1/sales-orders", headers=headers)
+        assert listing.json()["data"]["total"] == 0
+
+
+class TestMutationQueryCount:
+    """A mutation reads the order once, as a GET does, and writes it once."""
+
+    async def test_create_allocates_number_last(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        sql_log: list[str],
+        admin_user: User,
+        seed_customer: str,
+        seed_product: str,
+    ):
+        headers = get_auth_headers(admin_user)
+        resp, sql = await measure(
+            client,
+            db_session,
+            sql_log,
+            "POST",
+            "/api/v1/sales-orders",
+            json=make_sales_order_data(seed_customer, seed_product),
+            headers=headers,
+        )
+        assert resp.status_code == 201
+        # The counter row is locked by the statement right before the order INSERT
+        (allocate,) = writes(sql, "business_sequences")
+        (insert,) = writes(sql, "sales_orders")
+        assert sql.index(insert) == sql.index(allocate) + 1
+
+    async def test_confirm(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        sql_log: list[str],
+        admin_user: User,
+        seed_customer: str,
+        seed_product: str,
+    ):
+        headers = get_auth_headers(admin_user)
+        create_resp = await client.post(
+            "/api/v1/sales-orders",
+            json=make_sales_order_data(seed_customer, seed_product),
+            headers=headers,
+        )
+        url = f"/api/v1/sales-orders/{create_resp.json()['data']['id']}"
+        _, get_sql = await measure(client, db_session, sql_log, "GET", url, headers=headers)
+
+        resp, sql = await measure(
+            client, db_session, sql_log, "POST", f"{url}/confirm", headers=headers
+        )
+        assert resp.status_code == 200
+        assert resp.json()["data"]["status"] == "purchasing"
+        assert len(reads(sql)) == len(reads(get_sql))
+        assert len(writes(sql, "sales_orders")) == 1
+
+    async def test_status_change(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        sql_log: list[str],
+        admin_user: User,
+        seed_customer: str,
+        seed_product: str,
+    ):
+        headers = get_auth_headers(admin_user)
+        create_resp = await client.post(
+            "/api/v1/sales-orders",
+            json=make_sales_order_data(seed_customer, seed_product),
+            headers=headers,
+        )
+        url = f"/api/v1/sales-orders/{create_resp.json()['data']['id']}"
+        _, get_sql = await measure(client, db_session, sql_log, "GET", url, headers=headers)
+
+        resp, sql = await measure(
+            client,
+            db_session,
+            sql_log,
+            "PATCH",
+            f"{url}/status",
+            json={"status": "abnormal"},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        assert len(reads(sql)) == len(reads(get_sql))
+        assert len(writes(sql, "sales_orders")) == 1
+
+    async def test_update_with_items(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        sql_log: list[str],
+        admin_user: User,
+        seed_customer: str,
+        seed_product: str,
+    ):
+        headers = get_auth_headers(admin_user)
+        create_resp = await client.post(
+            "/api/v1/sales-orders",
+            json=make_sales_order_data(seed_customer, seed_product),
+            headers=headers,
+        )
+        url = f"/api/v1/sales-orders/{create_resp.json()['data']['id']}"
+        _, get_sql = await measure(client, db_session, sql_log, "GET", url, headers=headers)
+
+        items = [
+            {"product_id": seed_product, "quantity": q, "unit": "carton", "unit_price": "10.00"}
+            for q in (10, 20)
+        ]
+        resp, sql = await measure(
+            client,
+            db_session,
+            sql_log,
+            "PUT",
+            url,
+            json={"remark": "revised", "items": items},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        data = resp.json()["data"]
+        assert data["total_quantity"] == 30
+        assert sorted(item["quantity"] for item in data["items"]) == [10, 20]
+        assert len(reads(sql)) == len(reads(get_sql))
+        assert len(writes(sql, "sales_orders")) == 1
+        # One multi-row INSERT for the new lines, one DELETE for the replaced line
+        assert len(writes(sql, "sales_order_items")) == 2
+
+
+class TestOrderNumberLocking:
+    async def test_concurrent_allocation_waits_for_commit(self, db_session: AsyncSession):
+        # Separate connections: the counter row lock is only visible across sessions
+        engine = create_async_engine(TEST_DATABASE_URL)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        prefix = f"T{uuid.uuid4().hex[:8].upper()}"
+        day = date(2026, 2, 27)
+        try:
+            async with factory() as first, factory() as second:
+                assert (
+                    await SequenceService(first).order_no(prefix, day) == f"{prefix}-20260227-001"
+                )
+                waiting = asyncio.create_task(SequenceService(second).order_no(prefix, day))
+                await asyncio.sleep(0.3)
+                assert not waiting.done()
+
+                # The rolled-back number goes to the waiter, leaving no gap
+                await first.rollback()
+                assert await asyncio.wait_for(waiting, 5) == f"{prefix}-20260227-001"
+                await second.commit()
+        finally:
+            async with engine.begin() as conn:
+                await conn.execute(
+                    delete(BusinessSequence).where(BusinessSequence.prefix == prefix)
+                )
+            await engine.dispose()
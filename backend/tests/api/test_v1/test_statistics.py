@@ -3,6 +3,12 @@ from httpx import AsyncClient
 
 from app.models.user import User
 from tests.conftest import get_auth_headers
+from tests.factories import (
+    CATEGORY_ID_CANDY,
+    make_customer_data,
+    make_product_data,
+    make_sales_order_data,
+)
 
 
 class TestStatistics:
@@ -55,6 +61,174 @@ class TestStatistics:
         assert resp.status_code == 200
         assert "items" in resp.json()["data"]
 
+    @pytest.mark.asyncio
+    async def test_category_sales_rollup(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        level2 = await client.post(
+            "/api/v1/product-categories",
+            json={"name": "统计糖类", "parent_id": str(CATEGORY_ID_CANDY)},
+            headers=headers,
+        )
+        level2_id = level2.json()["data"]["id"]
+        level3 = await client.post(
+            "/api/v1/product-categories",
+            json={"name": "统计软糖", "parent_id": level2_id},
+            headers=headers,
+        )
+        product = await client.post(
+            "/api/v1/products",
+            json=make_product_data(category_id=level3.json()["data"]["id"]),
+            headers=headers,
+        )
+        customer = await client.post(
+            "/api/v1/customers", json=make_customer_data(), headers=headers
+        )
+        data = make_sales_order_data(customer.json()["data"]["id"], product.json()["data"]["id"])
+        await client.post("/api/v1/sales-orders", json=data, headers=headers)
+
+        resp = await client.get(
+            f"/api/v1/statistics/category-sales?category_id={level2_id}&status=draft",
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        items = resp.json()["data"]["items"]
+        assert [item["level"] for item in items] == [0, 1, 2, 3]
+        assert items[1]["category_level1_name"] == "糖果"
+        assert items[3]["category_level3_name"] == "统计软糖"
+        for item in items:
+            assert item["order_count"] == 1
+            assert item["total_quantity"] == 100
+            assert item["total_amount"] == "2550.00"
+
+    @pytest.mark.asyncio
+    async def test_statistics_follow_order_writes(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        product = await client.post("/api/v1/products", json=make_product_data(), headers=headers)
+        customer = await client.post(
+            "/api/v1/customers", json=make_customer_data(), headers=headers
+        )
+        data = make_sales_order_data(
+            customer.json()["data"]["id"], product.json()["data"]["id"], order_date="2001-01-15"
+        )
+        order = await client.post("/api/v1/sales-orders", json=data, headers=headers)
+        # Moving the order must clear the old day and fill the new one
+        await client.put(
+            f"/api/v1/sales-orders/{order.json()['data']['id']}",
+            json={"order_date": "2001-02-15"},
+            headers=headers,
+        )
+
+        params = "date_from=2001-01-01&date_to=2001-12-31"
+        resp = await client.get(
+            f"/api/v1/statistics/sales-summary?group_by=month&{params}", headers=headers
+        )
+        items = resp.json()["data"]["items"]
+        assert items == [{"group_key": "2001-02", "order_count": 1, "total_amount": "2550.00"}]
+
+        resp = await client.get(f"/api/v1/statistics/product-ranking?{params}", headers=headers)
+        items = resp.json()["data"]["items"]
+        assert len(items) == 1
+        assert items[0]["product_id"] == product.json()["data"]["id"]
+        assert items[0]["total_quantity"] == 100
+
+    @pytest.mark.asyncio
+    async def test_report_currency(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        rates = b"date,currency,rate\n2001-03-01,EUR,1.10\n2001-04-01,EUR,1.20\n"
+        resp = await client.post(
+            "/api/v1/statistics/fx-rates/import",
+            files={"file": ("rates.csv", rates, "text/csv")},
+            headers=headers,
+        )
+        assert resp.json()["data"]["imported"] == 2
+
+        product = await client.post("/api/v1/products", json=make_product_data(), headers=headers)
+        customer = await client.post(
+            "/api/v1/customers", json=make_customer_data(), headers=headers
+        )
+        customer_id, product_id = customer.json()["data"]["id"], product.json()["data"]["id"]
+        for order_date, currency in (("2001-04-10", "EUR"), ("2001-04-11", "USD")):
+            data = make_sales_order_data(
+                customer_id, product_id, order_date=order_date, currency=currency
+            )
+            await client.post("/api/v1/sales-orders", json=data, headers=headers)
+
+        params = "group_by=month&date_from=2001-04-01&date_to=2001-04-30"
+        resp = await client.get(
+            f"/api/v1/statistics/sales-summary?{params}&report_currency=USD", headers=headers
+        )
+        assert resp.json()["data"]["report_currency"] == "USD"
+        # 2550 EUR at 1.20 + 2550 USD
+        assert resp.json()["data"]["items"][0]["total_amount"] == "5610.00"
+        resp = await client.get(
+            f"/api/v1/statistics/sales-summary?{params}&report_currency=EUR", headers=headers
+        )
+        assert resp.json()["data"]["items"][0]["total_amount"] == "4675.00"
+
+        # No THB rate loaded: converting must fail rather than drop the order
+        data = make_sales_order_data(
+            customer_id, product_id, order_date="2001-04-12", currency="THB"
+        )
+        await client.post("/api/v1/sales-orders", json=data, headers=headers)
+        resp = await client.get(
+            f"/api/v1/statistics/customer-ranking?{params}&report_currency=USD", headers=headers
+        )
+        assert resp.status_code == 422
+        assert resp.json()["code"] == 42283
+
+    @pytest.mark.asyncio
+    async def test_pivot(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        product = await client.post(
+            "/api/v1/products",
+            json=make_product_data(category_id=str(CATEGORY_ID_CANDY)),
+            headers=headers,
+        )
+        customer = await client.post(
+            "/api/v1/customers", json=make_customer_data(), headers=headers
+        )
+        customer_id = customer.json()["data"]["id"]
+        data = make_sales_order_data(
+            customer_id, product.json()["data"]["id"], order_date="2001-03-09"
+        )
+        await client.post("/api/v1/sales-orders", json=data, headers=headers)
+
+        resp = await client.get(
+            "/api/v1/statistics/pivot?dimensions=customer&dimensions=month"
+            "&dimensions=category_level1&aggregates=count&aggregates=amount_sum"
+            "&date_from=2001-01-01&date_to=2001-12-31&refresh=true&report_currency=USD",
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        assert resp.json()["data"]["report_currency"] == "USD"
+        items = resp.json()["data"]["items"]
+        assert len(items) == 1
+        assert items[0]["keys"] == [customer_id, "2001-03", str(CATEGORY_ID_CANDY)]
+        assert items[0]["labels"][2] == "糖果"
+        assert items[0]["values"] == {"count": 1, "amount_sum": "2550.00"}
+
+    @pytest.mark.asyncio
+    async def test_pivot_amounts_need_currency(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        resp = await client.get(
+            "/api/v1/statistics/pivot?dimensions=customer&aggregates=amount_sum", headers=headers
+        )
+        assert resp.status_code == 422
+        assert resp.json()["code"] == 42286
+
+        resp = await client.get(
+            "/api/v1/statistics/pivot?dimensions=customer&dimensions=currency"
+            "&aggregates=amount_sum",
+            headers=headers,
+        )
+        assert resp.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_pivot_rejects_unknown_dimension(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        resp = await client.get("/api/v1/statistics/pivot?dimensions=warehouse", headers=headers)
+        assert resp.status_code == 422
+
     @pytest.mark.asyncio
     async def test_viewer_cannot_access_statistics(self, client: AsyncClient, viewer_user: User):
         headers = get_auth_headers(viewer_user)
@@ -106,3 +106,76 @@ class TestSupplierProducts:
             headers=headers,
         )
         assert resp3.status_code == 204
+
+
+class TestSupplierPrices:
+    async def test_replace_price_list(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        sup_resp = await client.post(
+            "/api/v1/suppliers", json=make_supplier_data(), headers=headers
+        )
+        supplier_id = sup_resp.json()["data"]["id"]
+        prod_resp = await client.post("/api/v1/products", json=make_product_data(), headers=headers)
+        product_id = prod_resp.json()["data"]["id"]
+
+        resp = await client.put(
+            f"/api/v1/suppliers/{supplier_id}/prices",
+            json={
+                "items": [
+                    {"product_id": product_id, "unit_price": "10.00"},
+                    {
+                        "product_id": product_id,
+                        "min_quantity": 500,
+                        "unit_price": "9.20",
+                        "valid_from": "2026-01-01",
+                        "valid_to": "2026-12-31",
+                    },
+                ]
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        assert len(resp.json()["data"]) == 2
+
+        # A second PUT replaces the list
+        resp = await client.put(
+            f"/api/v1/suppliers/{supplier_id}/prices",
+            json={"items": [{"product_id": product_id, "min_quantity": 50, "unit_price": "9.80"}]},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        resp = await client.get(f"/api/v1/suppliers/{supplier_id}/prices", headers=headers)
+        (price,) = resp.json()["data"]
+        assert price["min_quantity"] == 50
+        assert price["unit_price"] == "9.80"
+
+    async def test_invalid_tiers_rejected(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        sup_resp = await client.post(
+            "/api/v1/suppliers", json=make_supplier_data(), headers=headers
+        )
+        supplier_id = sup_resp.json()["data"]["id"]
+        prod_resp = await client.post("/api/v1/products", json=make_product_data(), headers=headers)
+        product_id = prod_resp.json()["data"]["id"]
+
+        resp = await client.put(
+            f"/api/v1/suppliers/{supplier_id}/prices",
+            json={
+                "items": [
+                    {"product_id": str(uuid.uuid4()), "unit_price": "1.00"},
+                    {
+                        "product_id": product_id,
+                        "unit_price": "1.00",
+                        "valid_from": "2026-02-01",
+                        "valid_to": "2026-01-01",
+                    },
+                ]
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 422
+        assert resp.json()["code"] == 42293
+        assert [e["index"] for e in resp.json()["detail"]["errors"]] == [0, 1]
+
+        resp = await client.get(f"/api/v1/suppliers/{supplier_id}/prices", headers=headers)
+        assert resp.json()["data"] == []
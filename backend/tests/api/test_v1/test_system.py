@@ -164,6 +164,13 @@ class TestSystemConfigs:
         assert resp.status_code == 200
         assert resp.json()["code"] == 0
 
+    @pytest.mark.asyncio
+    async def test_cache_stats(self, client: AsyncClient, admin_user: User):
+        headers = get_auth_headers(admin_user)
+        resp = await client.get("/api/v1/system/cache-stats", headers=headers)
+        assert resp.status_code == 200
+        assert isinstance(resp.json()["data"], list)
+
     @pytest.mark.asyncio
     async def test_update_config(self, client: AsyncClient, admin_user: User):
         headers = get_auth_headers(admin_user)
@@ -1,12 +1,14 @@
+import re
 import uuid
 from datetime import date
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.enums import InspectionResult, UnitType
 from app.models.user import User
-from tests.conftest import get_auth_headers
+from tests.conftest import get_auth_headers, measure, reads, writes
 from tests.factories import (
     make_customer_data,
     make_product_data,
@@ -117,6 +119,39 @@ class TestCreateReceivingNote:
         assert body["data"]["note_no"].startswith("RCV-")
         assert len(body["data"]["items"]) == 1
 
+    async def test_create_locks_lines_before_number(
+        self,
+        client: AsyncClient,
+        admin_user: User,
+        seed_confirmed_po: dict,
+        db_session: AsyncSession,
+        sql_log: list[str],
+    ):
+        headers = get_auth_headers(admin_user)
+        data = make_receiving_note_data(
+            seed_confirmed_po["po_id"],
+            seed_confirmed_po["po_item_id"],
+            seed_confirmed_po["product_id"],
+        )
+        resp, sql = await measure(
+            client,
+            db_session,
+            sql_log,
+            "POST",
+            "/api/v1/warehouse/receiving-notes",
+            json=data,
+            headers=headers,
+        )
+        assert resp.status_code == 201
+        # Sales order lines, then purchase order lines, then the note number
+        locks = [s for s in reads(sql) if "FOR UPDATE" in s]
+        assert [re.search(r"\nFROM (\w+)", lock)[1] for lock in locks] == [
+            "sales_order_items",
+            "purchase_order_items",
+        ]
+        (allocate,) = writes(sql, "business_sequences")
+        assert sql.index(locks[-1]) < sql.index(allocate)
+
     async def test_create_r03_exceeds_remaining(
         self, client: AsyncClient, admin_user: User, seed_confirmed_po: dict
     ):
@@ -1,10 +1,11 @@
+import re
 import uuid
 from collections.abc import AsyncGenerator
 
 import pytest_asyncio
-from httpx import ASGITransport, AsyncClient
+from httpx import ASGITransport, AsyncClient, Response
 from redis.asyncio import Redis
-from sqlalchemy import text
+from sqlalchemy import event, text
 from sqlalchemy.dialects.postgresql import ENUM as PG_ENUM
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
@@ -73,6 +74,7 @@ _ENUM_DEFS = [
         "logistics_cost_type",
         ["ocean_freight", "customs_fee", "port_charge", "trucking_fee", "insurance_fee", "other"],
     ),
+    ("allocation_method", ["volume", "weight", "value"]),
     (
         "audit_action",
         [
@@ -115,6 +117,7 @@ async def _ensure_test_db_ready():
     # Create enum types and tables
     setup_engine = create_async_engine(TEST_DATABASE_URL, echo=False)
     async with setup_engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         for name, values in _ENUM_DEFS:
             enum = PG_ENUM(*values, name=name, create_type=False)
             await conn.run_sync(lambda sc, e=enum: e.create(sc, checkfirst=True))
@@ -148,7 +151,16 @@ async def _ensure_test_db_ready():
                     sort_order=sort,
                 )
                 session.add(cat)
-            await session.commit()
+            await session.flush()
+        # Seeded categories are all level 1: closure needs only their depth-0 rows
+        await session.execute(
+            text(
+                "INSERT INTO product_category_closure (ancestor_id, descendant_id, depth) "
+                "SELECT id, id, 0 FROM product_categories WHERE level = 1 "
+                "ON CONFLICT DO NOTHING"
+            )
+        )
+        await session.commit()
     await setup_engine.dispose()
 
 
@@ -277,3 +289,39 @@ def get_auth_headers(user: User) -> dict:
 
     token = create_access_token(user.id, user.role.value)
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest_asyncio.fixture
+async def sql_log(db_session: AsyncSession) -> AsyncGenerator[list[str], None]:
+    """SQL statements executed on the test engine, in order."""
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _record)
+
+
+async def measure(
+    client: AsyncClient, db_session: AsyncSession, sql_log: list[str], method: str, url: str, **kw
+) -> tuple[Response, list[str]]:
+    """Send one request with an empty identity map, as a fresh request session would have,
+    and return the response with the SQL it ran."""
+    db_session.expunge_all()
+    sql_log.clear()
+    resp = await client.request(method, url, **kw)
+    return resp, list(sql_log)
+
+
+def reads(statements: list[str]) -> list[str]:
+    """SELECT statements, without the advisory locks taken by fact refreshes."""
+    return [s for s in statements if s.startswith("SELECT") and "pg_advisory_xact_lock" not in s]
+
+
+def writes(statements: list[str], table: str) -> list[str]:
+    """INSERT / UPDATE / DELETE statements against one table."""
+    pattern = re.compile(rf"(INSERT INTO|UPDATE|DELETE FROM) {table}\b")
+    return [s for s in statements if pattern.match(s)]
@@ -0,0 +1,47 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_expired_entries_are_misses(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+        cache = LRUCache(maxsize=10, ttl=5)
+        cache.set("a", 1)
+        now[0] += 6
+        assert cache.get("a", "miss") == "miss"
+        assert len(cache) == 0
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.set("a", 1)
+        cache.clear()
+        assert cache.get("a") is None
+
+    async def test_clear_on_commit(self):
+        cache = LRUCache()
+        db = AsyncSession()
+        db.sync_session.begin()
+        cache.set("a", 1)
+        cache.clear_on_commit(db)
+        # Still served until the writing transaction commits
+        assert cache.get("a") == 1
+        await db.commit()
+        assert cache.get("a") is None
+
+        cache.set("a", 1)
+        db.sync_session.begin()
+        cache.clear_on_commit(db)
+        await db.rollback()
+        assert cache.get("a") is None
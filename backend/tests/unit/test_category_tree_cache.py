@@ -0,0 +1,53 @@
+import uuid
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from app.services.category_tree_cache import CategoryTree, CategoryTreeCache
+
+
+def _cat(name: str, level: int, parent=None, sort_order: int = 0):
+    now = datetime.now(UTC)
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        name=name,
+        level=level,
+        parent_id=parent.id if parent else None,
+        sort_order=sort_order,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+class TestCategoryTree:
+    def setup_method(self):
+        self.snack = _cat("零食", 1)
+        self.other = _cat("其他", 1, sort_order=1)
+        self.candy = _cat("糖果", 2, self.snack)
+        self.hard = _cat("硬糖", 3, self.candy)
+        self.soft = _cat("软糖", 3, self.candy, sort_order=1)
+        self.tree = CategoryTree.build(
+            [self.snack, self.other, self.candy, self.hard, self.soft], version=3
+        )
+
+    def test_leaf_sets(self):
+        assert self.tree.leaf_ids(self.snack.id) == [self.hard.id, self.soft.id]
+        assert self.tree.leaf_ids(self.other.id) == [self.other.id]
+        assert self.tree.leaf_ids(uuid.uuid4()) == []
+        assert self.tree.is_leaf(self.soft.id)
+        assert not self.tree.is_leaf(self.candy.id)
+
+    def test_ancestor_paths(self):
+        assert self.tree.level_names(self.soft.id) == {1: "零食", 2: "糖果", 3: "软糖"}
+        assert self.tree.get(self.soft.id).path_ids == (self.snack.id, self.candy.id, self.soft.id)
+        assert [n.id for n in self.tree.roots] == [self.snack.id, self.other.id]
+        assert self.tree.by_name["硬糖"] == self.hard.id
+        assert self.tree.version == 3
+
+
+class TestCategoryTreeCache:
+    def test_invalidate_keeps_highest_version(self):
+        cache = CategoryTreeCache()
+        cache.invalidate(5)
+        cache.invalidate(2)
+        cache.invalidate()
+        assert cache.version == 5
@@ -0,0 +1,192 @@
+import base64
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import inspect, select
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.core.exceptions import BusinessError
+from app.models.audit_log import AuditLog
+from app.models.logistics import LogisticsRecord
+from app.models.sales_order import SalesOrder, SalesOrderItem
+from app.repositories.base import (
+    Explain,
+    _after_cursor,
+    _sort_key,
+    count_rows,
+    decode_cursor,
+    encode_cursor,
+    sparse_fields,
+)
+from app.repositories.sales_order_repo import _progress
+from app.schemas.common import PaginatedData
+from app.schemas.sales_order import SalesOrderListRead
+
+COLUMNS = inspect(SalesOrder).columns
+
+
+def _sql(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+class TestCursorToken:
+    @pytest.mark.parametrize(
+        "key, value",
+        [
+            ("created_at", datetime(2025, 3, 1, 8, 30, tzinfo=timezone.utc)),
+            ("order_date", date(2025, 3, 1)),
+            ("total_amount", Decimal("1234.50")),
+            ("order_no", "SO-20250301-001"),
+            ("status", SalesOrder.status.type.python_type("draft")),
+        ],
+    )
+    def test_round_trip(self, key, value):
+        id = uuid.uuid4()
+        token = encode_cursor(key, True, value, id)
+        assert "=" not in token
+        assert decode_cursor(token, key, COLUMNS[key], True) == (value, id)
+
+    def test_null_value(self):
+        id = uuid.uuid4()
+        token = encode_cursor("order_date", False, None, id)
+        assert decode_cursor(token, "order_date", COLUMNS["order_date"], False) == (None, id)
+
+    def test_rejects_other_sort(self):
+        token = encode_cursor("created_at", True, datetime.now(timezone.utc), uuid.uuid4())
+        with pytest.raises(BusinessError):
+            decode_cursor(token, "order_date", COLUMNS["order_date"], True)
+        with pytest.raises(BusinessError):
+            decode_cursor(token, "created_at", COLUMNS["created_at"], False)
+
+    @pytest.mark.parametrize("token", ["garbage!", "e30", "W10"])
+    def test_rejects_malformed(self, token):
+        with pytest.raises(BusinessError):
+            decode_cursor(token, "created_at", COLUMNS["created_at"], True)
+
+    def test_rejects_malformed_numeric_value(self):
+        payload = {"s": "total_amount", "d": True, "v": "12abc", "i": str(uuid.uuid4())}
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        with pytest.raises(BusinessError) as exc:
+            decode_cursor(token, "total_amount", COLUMNS["total_amount"], True)
+        assert exc.value.code == 42284
+
+
+class TestAfterCursor:
+    def test_non_null_column_uses_row_comparison(self):
+        clause = _after_cursor(
+            COLUMNS["created_at"], COLUMNS["id"], True, datetime.now(), uuid.uuid4()
+        )
+        assert "(sales_orders.created_at, sales_orders.id) <" in _sql(clause)
+
+    def test_id_only(self):
+        clause = _after_cursor(COLUMNS["id"], COLUMNS["id"], False, None, uuid.uuid4())
+        assert _sql(clause) == "sales_orders.id > %(id_1)s::UUID"
+
+    def test_nullable_ascending_keeps_trailing_nulls(self):
+        eta = inspect(LogisticsRecord).columns["eta"]
+        id_col = inspect(LogisticsRecord).columns["id"]
+        sql = _sql(_after_cursor(eta, id_col, False, date(2025, 1, 1), uuid.uuid4()))
+        assert "logistics_records.eta IS NULL" in sql
+        sql = _sql(_after_cursor(eta, id_col, False, None, uuid.uuid4()))
+        assert "logistics_records.eta IS NOT NULL" not in sql
+
+    def test_nullable_descending_after_null_moves_to_values(self):
+        eta = inspect(LogisticsRecord).columns["eta"]
+        id_col = inspect(LogisticsRecord).columns["id"]
+        sql = _sql(_after_cursor(eta, id_col, True, None, uuid.uuid4()))
+        assert "logistics_records.eta IS NOT NULL" in sql
+
+
+class TestPaginatedData:
+    def test_without_total(self):
+        data = PaginatedData.build([], None, page=1, page_size=20, next_cursor="abc")
+        assert data.total is None and data.total_pages is None
+        assert data.next_cursor == "abc"
+
+    def test_estimate_flag(self):
+        page = SimpleNamespace(total=1_200_000, next_cursor=None, total_is_estimate=True)
+        data = PaginatedData.from_page([], page, page=1, page_size=20)
+        assert data.total_is_estimate and data.total_pages == 60_000
+
+    def test_total_pages(self):
+        assert PaginatedData.build([], 41, page=1, page_size=20).total_pages == 3
+        assert PaginatedData.build([], 0, page=1, page_size=20).total_pages == 0
+
+
+class _EstimatingSession:
+    """Answers planner lookups with ``estimate`` and count(*) with ``exact``."""
+
+    def __init__(self, estimate: int, exact: int):
+        self.estimate, self.exact = estimate, exact
+        self.statements = []
+
+    async def scalar(self, statement, params=None):
+        self.statements.append(statement)
+        if isinstance(statement, Explain):
+            return json.dumps([{"Plan": {"Plan Rows": self.estimate}}])
+        return float(self.estimate)
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(scalar_one=lambda: self.exact)
+
+
+class TestApproximateCount:
+    async def test_exact_by_default(self):
+        db = _EstimatingSession(estimate=10**7, exact=42)
+        assert await count_rows(db, AuditLog, []) == (42, False)
+
+    async def test_unfiltered_uses_table_statistics(self):
+        db = _EstimatingSession(estimate=2_500_000, exact=42)
+        assert await count_rows(db, AuditLog, [], approximate=True) == (2_500_000, True)
+        assert "pg_class" in str(db.statements[0])
+
+    async def test_filtered_uses_plan_estimate(self):
+        db = _EstimatingSession(estimate=1_200_000, exact=42)
+        filters = [AuditLog.resource_type == "sales_order"]
+        assert await count_rows(db, AuditLog, filters, approximate=True) == (1_200_000, True)
+        sql = _sql(db.statements[0])
+        assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT audit_logs.id")
+
+    async def test_small_estimate_counts_exactly(self):
+        db = _EstimatingSession(estimate=settings.APPROX_COUNT_THRESHOLD - 1, exact=42)
+        assert await count_rows(db, AuditLog, [], approximate=True) == (42, False)
+        # Never analyzed: reltuples is -1
+        db = _EstimatingSession(estimate=-1, exact=7)
+        assert await count_rows(db, AuditLog, [], approximate=True) == (7, False)
+
+
+class TestSparseFields:
+    def test_none_means_full_entities(self):
+        assert sparse_fields(SalesOrder, None, SalesOrderListRead) is None
+        assert sparse_fields(SalesOrder, [], SalesOrderListRead) is None
+
+    def test_keeps_order_and_drops_duplicates(self):
+        fields = ["status", "order_no", "status"]
+        assert sparse_fields(SalesOrder, fields, SalesOrderListRead) == ["status", "order_no"]
+
+    def test_rejects_computed_and_unexposed_fields(self):
+        with pytest.raises(BusinessError) as exc:
+            sparse_fields(SalesOrder, ["order_no", "purchase_progress"], SalesOrderListRead)
+        assert exc.value.detail["fields"] == ["purchase_progress"]
+        # A real column that the read schema does not expose
+        with pytest.raises(BusinessError):
+            sparse_fields(SalesOrder, ["created_by"], SalesOrderListRead)
+
+
+class TestListProgress:
+    def test_correlated_aggregate(self):
+        sql = _sql(select(SalesOrder.id, _progress(SalesOrderItem.purchased_quantity)))
+        assert "sum(sales_order_items.purchased_quantity)" in sql
+        assert "nullif(sum(sales_order_items.quantity)" in sql
+        assert "WHERE sales_order_items.sales_order_id = sales_orders.id" in sql
+        assert "JOIN" not in sql
+
+    def test_progress_is_not_a_sort_key(self):
+        assert _sort_key(SalesOrder, "purchase_progress") == "created_at"
+        assert _sort_key(SalesOrder, "order_date") == "order_date"
@@ -0,0 +1,70 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.core.exceptions import BusinessError
+from app.models.enums import CurrencyType
+from app.services.fx_rate_service import FxRateTable, parse_rates_csv
+
+EUR, GBP, USD = CurrencyType.EUR, CurrencyType.GBP, CurrencyType.USD
+
+
+class TestFxRateTable:
+    def setup_method(self):
+        self.table = FxRateTable(
+            [
+                (EUR, date(2026, 1, 1), Decimal("1.10")),
+                (EUR, date(2026, 1, 5), Decimal("1.20")),
+                (GBP, date(2026, 1, 3), Decimal("1.25")),
+            ]
+        )
+
+    def test_rate_carries_forward(self):
+        assert self.table.rate(EUR, date(2025, 12, 31)) is None
+        assert self.table.rate(EUR, date(2026, 1, 4)) == Decimal("1.10")
+        assert self.table.rate(EUR, date(2026, 3, 1)) == Decimal("1.20")
+        assert self.table.rate(USD, date(2000, 1, 1)) == 1
+
+    def test_convert(self):
+        day = date(2026, 1, 5)
+        assert self.table.convert(Decimal("100"), EUR, USD, day) == Decimal("120.00")
+        assert self.table.convert(Decimal("125"), GBP, EUR, day) == Decimal("130.21")
+        assert self.table.convert(Decimal("1"), GBP, USD, date(2026, 1, 1)) is None
+
+    def test_span_starts_at_first_rate(self):
+        assert self.table.span(date(2025, 6, 1), date(2026, 1, 10)) == (
+            date(2026, 1, 1),
+            date(2026, 1, 10),
+        )
+        # The latest rates carry forward without limit, as ``rate`` does
+        assert self.table.span(date(2026, 1, 2), date(2030, 1, 1)) == (
+            date(2026, 1, 2),
+            date(2030, 1, 1),
+        )
+        assert self.table.rate(EUR, date(2030, 1, 1)) == Decimal("1.20")
+        assert self.table.span(date(2025, 1, 1), date(2025, 12, 31)) is None
+        assert FxRateTable([]).span(date(2026, 1, 1), date(2026, 1, 2)) is None
+
+    def test_factors_skip_days_without_rates(self):
+        days, currencies, factors = self.table.factors(EUR, date(2026, 1, 2), date(2026, 1, 3))
+        assert list(zip(days, currencies, factors, strict=True)) == [
+            (date(2026, 1, 2), "USD", Decimal("0.9090909091")),
+            (date(2026, 1, 3), "USD", Decimal("0.9090909091")),
+            (date(2026, 1, 3), "GBP", Decimal("1.1363636364")),
+        ]
+
+
+class TestParseRatesCsv:
+    def test_parses_and_deduplicates(self):
+        content = "﻿Date,Currency,Rate\n2026-01-01,eur,1.1\n2026-01-01,EUR,1.2\n".encode()
+        assert parse_rates_csv(content) == [
+            {"rate_date": date(2026, 1, 1), "currency": EUR, "rate": Decimal("1.2")}
+        ]
+
+    def test_rejects_invalid_rows(self):
+        content = b"date,currency,rate\n2026-01-01,XXX,1\n2026-01-02,EUR,0\n2026-01-03,USD,7\n"
+        with pytest.raises(BusinessError) as exc:
+            parse_rates_csv(content)
+        assert exc.value.code == 42282
+        assert [e["row"] for e in exc.value.detail["errors"]] == [2, 3, 4]
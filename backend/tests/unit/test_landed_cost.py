@@ -0,0 +1,23 @@
+from decimal import Decimal
+
+import pytest
+
+from app.core.exceptions import BusinessError
+from app.services.landed_cost_service import allocate_cents
+
+
+class TestAllocateCents:
+    def test_proportional(self):
+        assert allocate_cents(Decimal("100.00"), [1, 3]).tolist() == [2500, 7500]
+
+    def test_remainder_goes_to_largest_fractions(self):
+        shares = allocate_cents(Decimal("100.00"), [1, 1, 1])
+        assert shares.tolist() == [3334, 3333, 3333]
+        shares = allocate_cents(Decimal("0.05"), [0.2, 0.5, 0.3])
+        assert shares.tolist() == [1, 3, 1]
+        assert shares.sum() == 5
+
+    def test_zero_weights(self):
+        assert allocate_cents(Decimal("10"), [0, 2]).tolist() == [0, 1000]
+        with pytest.raises(BusinessError):
+            allocate_cents(Decimal("10"), [0, 0])
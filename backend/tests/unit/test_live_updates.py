@@ -0,0 +1,91 @@
+import asyncio
+from datetime import date, timedelta
+
+from app.core.events import RESYNC, EventBus
+from app.core.permissions import Permission
+from app.services.live_updates import derive_messages
+
+ALL = set(Permission)
+
+
+def _so(before, after):
+    return {"type": "sales_order.changed", "data": {"id": "x", "before": before, "after": after}}
+
+
+class TestDeriveMessages:
+    def test_status_change_moves_kanban_and_todos(self):
+        item = _so(
+            {"status": "draft", "total_amount": "100.00"},
+            {"status": "confirmed", "total_amount": "100.00"},
+        )
+        messages = dict(derive_messages(item, ALL))
+        assert messages["sales_order.changed"] == item["data"]
+        assert messages["kanban"] == {
+            "board": "sales_orders",
+            "deltas": [
+                {"status": "draft", "count": -1, "total_amount": "-100.00"},
+                {"status": "confirmed", "count": 1, "total_amount": "100.00"},
+            ],
+        }
+        assert messages["todos"] == {"draft_sales_orders": -1}
+
+    def test_amount_change_in_same_status(self):
+        item = _so(
+            {"status": "draft", "total_amount": "100.00"},
+            {"status": "draft", "total_amount": "150.50"},
+        )
+        messages = dict(derive_messages(item, ALL))
+        assert messages["kanban"]["deltas"] == [
+            {"status": "draft", "count": 0, "total_amount": "50.50"}
+        ]
+        assert "todos" not in messages
+
+    def test_new_logistics_record_arriving_soon(self):
+        eta = (date.today() + timedelta(days=3)).isoformat()
+        item = {
+            "type": "logistics.changed",
+            "data": {
+                "id": "x",
+                "before": None,
+                "after": {"status": "in_transit", "total_cost": None, "eta": eta},
+            },
+        }
+        messages = dict(derive_messages(item, ALL))
+        assert messages["kanban"]["deltas"] == [
+            {"status": "in_transit", "count": 1, "total_cost": "0"}
+        ]
+        assert messages["todos"] == {"arriving_soon_containers": 1}
+
+    def test_filtered_by_permission(self):
+        item = _so(None, {"status": "draft", "total_amount": "1"})
+        assert derive_messages(item, {Permission.LOGISTICS_VIEW}) == []
+        reserved = {"type": "inventory.reserved", "data": {"items": []}}
+        assert derive_messages(reserved, {Permission.INVENTORY_VIEW}) == [
+            ("inventory.reserved", {"items": []})
+        ]
+        assert derive_messages(RESYNC, set()) == [("resync", {})]
+
+
+class TestEventBus:
+    async def test_send_without_redis_dispatches_locally(self):
+        bus = EventBus()
+        async with bus.subscribe() as first, bus.subscribe() as second:
+            await bus.send([{"type": "a", "data": {}}])
+            assert first.get_nowait()["type"] == "a"
+            assert second.get_nowait()["type"] == "a"
+        assert not bus._subscribers
+
+    async def test_slow_subscriber_gets_resync(self):
+        bus = EventBus()
+        async with bus.subscribe(maxsize=2) as queue:
+            for i in range(3):
+                bus.dispatch({"type": str(i), "data": {}})
+            assert queue.get_nowait() is RESYNC
+            assert queue.empty()
+
+    async def test_publish_soon_delivers_in_background(self):
+        bus = EventBus()
+        async with bus.subscribe() as queue:
+            bus.publish_soon([{"type": "a", "data": {}}])
+            item = await asyncio.wait_for(queue.get(), 1)
+        assert item["type"] == "a"
@@ -0,0 +1,105 @@
+import uuid
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.models.enums import CurrencyType, SalesOrderStatus
+from app.services.category_tree_cache import CategoryTree
+from app.services.fx_rate_service import FxRateTable
+from app.services.pivot_engine import SnapshotBuilder
+
+
+def _cat(name: str, level: int, parent=None):
+    now = datetime.now(UTC)
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        name=name,
+        level=level,
+        parent_id=parent.id if parent else None,
+        sort_order=0,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+class TestSalesSnapshot:
+    def setup_method(self):
+        snack = _cat("零食", 1)
+        candy = _cat("糖果", 2, snack)
+        tree = CategoryTree.build([snack, candy])
+        self.acme, self.bolt = uuid.uuid4(), uuid.uuid4()
+        self.gum, self.tea = uuid.uuid4(), uuid.uuid4()
+        builder = SnapshotBuilder(
+            customers=[(self.acme, "Acme"), (self.bolt, "Bolt")],
+            products=[(self.gum, "口香糖", candy.id), (self.tea, "茶", None)],
+            tree=tree,
+        )
+        usd, draft = CurrencyType.USD, SalesOrderStatus.DRAFT
+        builder.add(
+            [
+                (date(2026, 1, 5), self.acme, self.gum, usd, draft, 10, 1050),
+                (date(2026, 1, 20), self.acme, self.gum, usd, draft, 5, 525),
+                (date(2026, 2, 1), self.bolt, self.tea, usd, draft, 3, 999),
+            ]
+        )
+        # Customer missing from the preloaded dictionary
+        self.late = uuid.uuid4()
+        builder.add([(date(2026, 2, 3), self.late, self.gum, usd, draft, 1, 100)])
+        self.snapshot = builder.build(datetime.now(UTC))
+
+    def test_group_by_customer_and_month(self):
+        result = self.snapshot.pivot(["customer", "month"], ["count", "amount_sum", "amount_avg"])
+        assert result.row_count == 4
+        assert [(g.labels, g.values["count"]) for g in result.groups] == [
+            (("Acme", "2026-01"), 2),
+            (("Bolt", "2026-02"), 1),
+            ((None, "2026-02"), 1),
+        ]
+        acme = result.groups[0]
+        assert acme.keys == (str(self.acme), "2026-01")
+        assert acme.values["amount_sum"] == Decimal("15.75")
+        assert acme.values["amount_avg"] == Decimal("7.88")
+        assert result.groups[2].keys == (str(self.late), "2026-02")
+
+    def test_category_levels_and_date_filter(self):
+        result = self.snapshot.pivot(
+            ["category_level1", "category_level2"],
+            ["quantity_sum", "quantity_avg"],
+            date_from=date(2026, 1, 10),
+        )
+        assert [(g.labels, g.values) for g in result.groups] == [
+            ((None, None), {"quantity_sum": 3, "quantity_avg": Decimal("3.00")}),
+            (("零食", "糖果"), {"quantity_sum": 6, "quantity_avg": Decimal("3.00")}),
+        ]
+
+    def test_limit_and_empty_range(self):
+        result = self.snapshot.pivot(["product"], ["count"], limit=1)
+        assert result.total_groups == 2
+        assert len(result.groups) == 1
+        assert self.snapshot.pivot(["year"], ["count"], date_from=date(2030, 1, 1)).groups == []
+
+    def test_amounts_converted_to_report_currency(self):
+        eur, draft = CurrencyType.EUR, SalesOrderStatus.DRAFT
+        builder = SnapshotBuilder(
+            [(self.acme, "Acme")], [(self.gum, "口香糖", None)], CategoryTree.build([])
+        )
+        builder.add(
+            [
+                (date(2026, 1, 5), self.acme, self.gum, CurrencyType.USD, draft, 1, 1000),
+                (date(2026, 1, 6), self.acme, self.gum, eur, draft, 1, 1000),
+            ]
+        )
+        snapshot = builder.build(datetime.now(UTC))
+        rates = FxRateTable([(eur, date(2026, 1, 6), Decimal("1.10"))])
+
+        factors = snapshot.amount_factors(rates, CurrencyType.USD)
+        result = snapshot.pivot(["customer"], ["amount_sum"], amount_factors=factors)
+        assert result.groups[0].values["amount_sum"] == Decimal("21.00")
+
+        # EUR has no rate before 2026-01-06, so the USD line cannot be converted
+        factors = snapshot.amount_factors(rates, eur)
+        assert snapshot.pivot(["customer"], ["amount_sum"], amount_factors=factors).missing_rates
+        result = snapshot.pivot(
+            ["customer"], ["amount_sum"], date_from=date(2026, 1, 6), amount_factors=factors
+        )
+        assert result.groups[0].values["amount_sum"] == Decimal("10.00")
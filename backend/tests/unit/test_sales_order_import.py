@@ -0,0 +1,84 @@
+from datetime import datetime
+from decimal import Decimal
+
+from app.models.enums import UnitType
+from app.services.sales_order_import_service import group_import_rows
+
+
+def _row(customer_code="CUS-0001", order_ref="PO-1", **values) -> dict:
+    return {"customer_code": customer_code, "order_ref": order_ref, **values}
+
+
+LINE = {"sku_code": "SKU-1", "quantity": 10, "unit": "carton", "unit_price": 2.5}
+
+
+class TestGroupImportRows:
+    def test_groups_by_customer_and_reference(self):
+        groups, errors = group_import_rows(
+            [
+                (2, _row(order_date=datetime(2026, 2, 27), destination_port="Bangkok", **LINE)),
+                (3, _row(**LINE)),
+                (4, _row(order_ref="PO-2", **LINE)),
+                (5, _row(customer_code="CUS-0002", **LINE)),
+            ]
+        )
+        assert errors == []
+        assert list(groups) == [("CUS-0001", "PO-1"), ("CUS-0001", "PO-2"), ("CUS-0002", "PO-1")]
+        first = groups[("CUS-0001", "PO-1")]
+        assert first.row == 2
+        assert first.header["order_date"] == "2026-02-27"
+        assert first.header["destination_port"] == "Bangkok"
+        assert [line.row for line in first.lines] == [2, 3]
+
+    def test_parses_excel_cell_types(self):
+        groups, _ = group_import_rows(
+            [
+                (
+                    2,
+                    {
+                        "Customer_Code ": "CUS-0001",
+                        "order_ref": 4500012345.0,
+                        "sku_code": 6901234.0,
+                        "quantity": "12",
+                        "unit": "PIECE",
+                        "unit_price": "3.5",
+                    },
+                )
+            ]
+        )
+        ((key, group),) = groups.items()
+        assert key == ("CUS-0001", "4500012345")
+        (line,) = group.lines
+        assert line.sku_code == "6901234"
+        assert line.quantity == 12
+        assert line.unit == UnitType.PIECE
+        assert line.unit_price == Decimal("3.50")
+
+    def test_line_errors(self):
+        _, errors = group_import_rows(
+            [
+                (2, _row(**{**LINE, "quantity": 1.5})),
+                (3, _row(**{**LINE, "quantity": None})),
+                (4, _row(**{**LINE, "unit": "box"})),
+                (5, _row(**{**LINE, "unit_price": -1})),
+                (6, _row(**{**LINE, "unit_price": "1.234"})),
+                (7, _row(**{**LINE, "sku_code": ""})),
+                (8, _row(customer_code=None, **LINE)),
+            ]
+        )
+        assert [e["row"] for e in errors] == [2, 3, 4, 5, 6, 7, 8]
+
+    def test_conflicting_order_columns(self):
+        groups, errors = group_import_rows(
+            [
+                (2, _row(currency="USD", **LINE)),
+                (3, _row(currency="EUR", **LINE)),
+                (4, _row(currency="USD", trade_term="FOB", **LINE)),
+            ]
+        )
+        assert [e["row"] for e in errors] == [3]
+        assert "currency" in errors[0]["error"]
+        group = groups[("CUS-0001", "PO-1")]
+        assert [line.row for line in group.lines] == [2, 4]
+        # Blank order columns of the first line are filled from later lines
+        assert group.header["trade_term"] == "FOB"
@@ -0,0 +1,60 @@
+from datetime import date
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.sequence_service import SequenceService
+
+
+class _CounterSession:
+    """Stands in for the database: keeps the counters and answers the upsert."""
+
+    def __init__(self):
+        self.counters: dict[tuple[str, str], int] = {}
+        self.statements: list[str] = []
+
+    async def execute(self, stmt):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        self.statements.append(str(compiled))
+        params = compiled.params
+        key = (params["prefix"], params["period"])
+        self.counters[key] = self.counters.get(key, 0) + params["last_value"]
+        return SimpleNamespace(scalar_one=lambda: self.counters[key])
+
+
+class TestSequenceService:
+    async def test_order_numbers_per_day(self):
+        db = _CounterSession()
+        sequences = SequenceService(db)
+        day = date(2026, 2, 27)
+        assert await sequences.order_no("SO", day) == "SO-20260227-001"
+        assert await sequences.order_no("SO", day) == "SO-20260227-002"
+        assert await sequences.order_no("SO", date(2026, 2, 28)) == "SO-20260228-001"
+        assert await sequences.order_no("PO", day) == "PO-20260227-001"
+
+    async def test_block_allocation(self):
+        db = _CounterSession()
+        sequences = SequenceService(db)
+        day = date(2026, 2, 27)
+        await sequences.order_no("PO", day)
+        assert await sequences.order_nos("PO", day, 3) == [
+            "PO-20260227-002",
+            "PO-20260227-003",
+            "PO-20260227-004",
+        ]
+        assert await sequences.order_no("PO", day) == "PO-20260227-005"
+        assert len(db.statements) == 3
+
+    async def test_entity_codes(self):
+        db = _CounterSession()
+        sequences = SequenceService(db)
+        assert await sequences.entity_code("CUS") == "CUS-0001"
+        assert await sequences.entity_codes("CUS", 2) == ["CUS-0002", "CUS-0003"]
+        assert db.counters == {("CUS", ""): 3}
+
+    async def test_single_upsert_statement(self):
+        db = _CounterSession()
+        await SequenceService(db).order_no("OUT", date(2026, 2, 27))
+        (sql,) = db.statements
+        assert "ON CONFLICT (prefix, period) DO UPDATE" in sql
+        assert "RETURNING business_sequences.last_value" in sql
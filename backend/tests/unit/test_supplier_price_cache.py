@@ -0,0 +1,67 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.services.supplier_price_cache import PriceBook
+
+
+def _tier(supplier_id, product_id, price, min_quantity=1, valid_from=None, valid_to=None):
+    return SimpleNamespace(
+        supplier_id=supplier_id,
+        product_id=product_id,
+        min_quantity=min_quantity,
+        unit_price=Decimal(price),
+        valid_from=valid_from,
+        valid_to=valid_to,
+    )
+
+
+class TestPriceBook:
+    def setup_method(self):
+        self.a, self.b = sorted([uuid.uuid4(), uuid.uuid4()])
+        self.candy, self.chips = sorted([uuid.uuid4(), uuid.uuid4()])
+        self.book = PriceBook.build(
+            [
+                _tier(self.a, self.candy, "10.00"),
+                _tier(self.a, self.candy, "8.50", min_quantity=100),
+                _tier(self.a, self.chips, "5.00", valid_to=date(2026, 3, 31)),
+                _tier(self.b, self.candy, "9.00", valid_from=date(2026, 4, 1)),
+                _tier(self.b, self.chips, "6.00"),
+            ],
+            version=2,
+        )
+
+    def test_moq_tiers(self):
+        quotes = self.book.resolve({self.candy: 50}, date(2026, 3, 1))
+        assert quotes[self.candy].supplier_id == self.a
+        assert quotes[self.candy].unit_price == Decimal("10.00")
+
+        quotes = self.book.resolve({self.candy: 100}, date(2026, 3, 1))
+        assert quotes[self.candy].unit_price == Decimal("8.50")
+        assert quotes[self.candy].min_quantity == 100
+
+    def test_validity_dates(self):
+        march = self.book.resolve({self.candy: 50, self.chips: 10}, date(2026, 3, 31))
+        assert march[self.chips].supplier_id == self.a
+        assert march[self.candy].supplier_id == self.a
+
+        april = self.book.resolve({self.candy: 50, self.chips: 10}, date(2026, 4, 1))
+        assert april[self.chips].supplier_id == self.b
+        assert april[self.candy].supplier_id == self.b
+        assert april[self.candy].unit_price == Decimal("9.00")
+
+    def test_tie_prefers_given_supplier(self):
+        book = PriceBook.build(
+            [_tier(self.a, self.candy, "7.00"), _tier(self.b, self.candy, "7.00")]
+        )
+        today = date(2026, 3, 1)
+        assert book.resolve({self.candy: 1}, today)[self.candy].supplier_id == self.a
+        quotes = book.resolve({self.candy: 1}, today, {self.candy: self.b})
+        assert quotes[self.candy].supplier_id == self.b
+
+    def test_unquoted_products_left_out(self):
+        unknown = uuid.uuid4()
+        quotes = self.book.resolve({unknown: 1, self.chips: 1}, date(2026, 5, 1))
+        assert set(quotes) == {self.chips}
+        assert self.book.version == 2
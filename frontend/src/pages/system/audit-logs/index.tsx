@@ -1,13 +1,14 @@
-import { useRef } from 'react';
+import { useRef, useState } from 'react';
 import { PageContainer, ProTable, type ActionType, type ProColumns } from '@ant-design/pro-components';
 import { listAuditLogs } from '@/api/system';
 import { AuditActionLabels } from '@/types/api';
 import type { AuditLogRead } from '@/types/models';
-import { formatDateTime } from '@/utils/format';
+import { formatApproxCount, formatDateTime } from '@/utils/format';
 import StatusTag from '@/components/StatusTag';
 
 export default function AuditLogsPage() {
   const actionRef = useRef<ActionType>();
+  const [totalIsEstimate, setTotalIsEstimate] = useState(false);
 
   const columns: ProColumns<AuditLogRead>[] = [
     { title: 'ID', dataIndex: 'id', width: 60, hideInSearch: true },
@@ -58,8 +59,13 @@ export default function AuditLogsPage() {
             page_size: pageSize,
             ...rest,
           });
+          setTotalIsEstimate(!!data.total_is_estimate);
           return { data: data.items, total: data.total, success: true };
         }}
+        pagination={{
+          showTotal: (total) =>
+            totalIsEstimate ? `共 ${formatApproxCount(total)} 条` : `共 ${total} 条`,
+        }}
         search={{ labelWidth: 'auto' }}
       />
     </PageContainer>
@@ -12,6 +12,8 @@ export interface PaginatedData<T> {
   page: number;
   page_size: number;
   total_pages: number;
+  next_cursor?: string | null;
+  total_is_estimate?: boolean;
 }
 
 export interface PaginatedResponse<T> {
@@ -26,6 +28,10 @@ export interface ListParams {
   page_size?: number;
   sort_by?: string;
   sort_order?: 'asc' | 'desc';
+  cursor?: string;
+  include_total?: boolean;
+  /** Comma-separated sparse fieldset, e.g. "sku_code,name_cn" */
+  fields?: string;
 }
 
 // ===== Enums =====
@@ -30,3 +30,16 @@ export function formatEnum(
   if (!value) return '-';
   return labelMap[value] || value;
 }
+
+/** Compact form of an estimated row count, e.g. 1234567 -> "~1.2M". */
+export function formatApproxCount(value: number): string {
+  const units: [number, string][] = [
+    [1e9, 'B'],
+    [1e6, 'M'],
+    [1e3, 'K'],
+  ];
+  for (const [size, suffix] of units) {
+    if (value >= size) return `~${Number((value / size).toFixed(1))}${suffix}`;
+  }
+  return `~${value}`;
+}